@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Clients — pooled keep-alive httpx clients for Ollama and MCP
+
+Every Ollama chat, embedding and MCP call used to open its own
+httpx.AsyncClient, paying a fresh TCP connect per request. This module
+keeps one pooled AsyncClient per endpoint so connections are reused
+across calls (keep-alive), with shared pool limits and a timeout per
+endpoint.
+
+httpx async clients are bound to the event loop that opened their
+connections, so clients are kept per (event loop, endpoint) and dropped
+with their loop. Whoever owns the loop closes them at shutdown via
+aclose() or lifespan().
+
+Endpoints:
+  ollama  — /api/chat (long generations)
+  embed   — /api/embed
+  mcp     — Junos MCP server (streamable HTTP)
+  health  — quick liveness probes (/api/tags, /health)
+
+Usage:
+  from http_clients import http_clients
+  http_clients.configure(**config.get("http", {}))     # optional
+  client = http_clients.get("ollama")
+  resp = await client.post(url, json=payload)
+"""
+
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+
+import httpx
+
+logger = logging.getLogger("http_clients")
+
+DEFAULT_TIMEOUTS = {
+    "ollama": 600.0,
+    "embed": 120.0,
+    "mcp": 600.0,
+    "health": 5.0,
+}
+
+
+class HTTPClientManager:
+    """Owns the pooled AsyncClient for each endpoint on each event loop."""
+
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 60.0, connect_timeout: float = 10.0,
+                 timeouts: dict | None = None):
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+        self.configure(max_connections, max_keepalive_connections, keepalive_expiry,
+                       connect_timeout, timeouts)
+
+    def configure(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                  keepalive_expiry: float = 60.0, connect_timeout: float = 10.0,
+                  timeouts: dict | None = None):
+        """Set pool limits and per-endpoint read timeouts (the config.yaml `http:` block).
+        Applies to clients created afterwards."""
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.connect_timeout = connect_timeout
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+
+    def get(self, endpoint: str) -> httpx.AsyncClient:
+        """Return the pooled client for endpoint on the running event loop."""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(endpoint)
+        if client is None or client.is_closed:
+            timeout = self.timeouts.get(endpoint, self.timeouts["ollama"])
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(timeout, connect=min(self.connect_timeout, timeout)),
+                limits=self.limits,
+            )
+            clients[endpoint] = client
+            logger.debug(f"Opened pooled HTTP client for {endpoint} (timeout {timeout}s)")
+        return client
+
+    async def aclose(self):
+        """Close every client opened on the running event loop."""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for endpoint, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Closing {endpoint} client failed: {e}")
+
+    @asynccontextmanager
+    async def lifespan(self, endpoint: str | None = None):
+        """Keep the pooled clients open for the block, closing them on exit.
+        Yields the endpoint's client when one is named."""
+        try:
+            yield self.get(endpoint) if endpoint else self
+        finally:
+            await self.aclose()
+
+    def stats(self) -> dict:
+        """Endpoints with an open client, per event loop."""
+        return {
+            "loops": len(self._clients),
+            "endpoints": sorted({ep for clients in self._clients.values() for ep in clients}),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+
+
+# Process-wide manager shared by the CLI, RAG engine and web UI
+http_clients = HTTPClientManager()
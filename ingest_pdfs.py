@@ -313,7 +313,7 @@ def main():
         final_kb = f.read()
     
     print(f"● KB updated: {len(final_kb):,} chars, {len(final_kb.splitlines()):,} lines")
-    print(f"▲  Run the app to auto-rebuild the RAG vector store with new content.")
+    print(f"▲  Run the app to update the RAG vector store (only the new chunks are embedded).")
 
 
 if __name__ == "__main__":
@@ -20,6 +20,8 @@
 from __future__ import annotations as _annotations
 
 import argparse
+import hashlib
+import re
 import time
 from datetime import datetime, timezone
 import logging
@@ -82,6 +84,10 @@ from jnpr.junos.exception import ConnectError, ConfigLoadError, CommitError, Loc
 from jnpr.junos.utils.config import Config
 
 from utils.config import prepare_connection_params, validate_device_config, validate_all_devices
+from utils.session_pool import DeviceSessionPool, TRANSPORT_ERRORS
+from utils.worker_pool import DeviceWorkerPool
+from utils.admission import AdmissionController, gateway_for_device
+from utils.junos_json import structured_cli
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -94,6 +100,51 @@ devices = {}
 JUNOS_MCP = 'jmcp-server'
 
 
+def get_env_number(name: str, default: float) -> float:
+    """Read a numeric setting from the environment, falling back to default on bad values"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return type(default)(value)
+    except ValueError:
+        log.warning(f"Invalid {name} environment variable value: {value}. Using default {default}.")
+        return default
+
+
+# Long-lived NETCONF sessions shared by all tool handlers
+session_pool = DeviceSessionPool(
+    max_sessions_per_device=get_env_number('JUNOS_POOL_MAX_SESSIONS', 2),
+    idle_timeout=get_env_number('JUNOS_POOL_IDLE_TIMEOUT', 300.0),
+    health_check_interval=get_env_number('JUNOS_POOL_HEALTH_INTERVAL', 60.0),
+)
+
+# Bounded thread pool that every blocking PyEZ call goes through, so one slow
+# router never stalls the event loop serving other clients
+device_workers = DeviceWorkerPool(
+    max_workers=get_env_number('JUNOS_WORKER_THREADS', 32),
+    per_device_limit=get_env_number('JUNOS_DEVICE_CONCURRENCY', session_pool.max_sessions_per_device),
+)
+
+# Admission control for fan-out tools: a global cap, per-jump-host AIMD windows
+# and token buckets, so large batches are paced by the server instead of clients
+batch_admission = AdmissionController(
+    max_concurrency=get_env_number('JUNOS_BATCH_MAX_CONCURRENCY', device_workers.max_workers),
+    gateway_concurrency=get_env_number('JUNOS_GATEWAY_CONCURRENCY', 8),
+    gateway_rate=get_env_number('JUNOS_GATEWAY_RATE', 5.0),
+    device_rate=get_env_number('JUNOS_DEVICE_RATE', 2.0),
+    device_burst=device_workers.per_device_limit,
+)
+
+
+# Set-format config returned by get_junos_config; config checksums hash this exact text
+CONFIG_SET_COMMAND = "show configuration | display inheritance no-comments | display set | no-more"
+
+# Per-router config checksum keyed by the newest commit, so an unchanged router
+# answers a checksum request with one "show system commit" instead of its config
+config_checksums: dict[str, dict] = {}
+
+
 class Context(BaseModel, Generic[ServerSessionT, LifespanContextT, RequestT]):
     """Context object providing access to MCP capabilities.
 
@@ -176,6 +227,7 @@ class Context(BaseModel, Generic[ServerSessionT, LifespanContextT, RequestT]):
             progress=progress,
             total=total,
             message=message,
+            related_request_id=self.request_id,
         )
 
     async def read_resource(self, uri: str | AnyUrl) -> Iterable[ReadResourceContents]:
@@ -585,6 +637,14 @@ The device is now available for use with all Junos MCP tools."""
         return [types.TextContent(type="text", text=f"❌ Failed to add device: {str(e)}")]
 
 
+def _cli_output(junos_device, command: str) -> str:
+    """Run one CLI command; "| display json" commands run as a JSON RPC and return compact JSON."""
+    structured = structured_cli(junos_device, command)
+    if structured is not None:
+        return structured
+    return junos_device.cli(command, warning=False)
+
+
 def _run_junos_cli_command(router_name: str, command: str, timeout: int = 360) -> str:
     """Internal helper to connect and run a Junos CLI command."""
     log.debug(f"Executing command {command} on router {router_name} with timeout {timeout}s (internal)")
@@ -593,16 +653,72 @@ def _run_junos_cli_command(router_name: str, command: str, timeout: int = 360) -
         connect_params = prepare_connection_params(device_info, router_name)
     except ValueError as ve:
         return f"Error: {ve}"
+
+    def _cli(junos_device):
+        junos_device.timeout = timeout
+        return _cli_output(junos_device, command)
+
     try:
-        with Device(**connect_params) as junos_device:            
-            junos_device.timeout = timeout
-            op = junos_device.cli(command, warning=False)
-            return op
+        return session_pool.run(router_name, connect_params, _cli)
     except ConnectError as ce:
         return f"Connection error to {router_name}: {ce}"
     except Exception as e:
         return f"An error occurred: {e}"
 
+def _run_junos_cli_commands(router_name: str, commands: list[str], timeout: int = 360) -> dict:
+    """Internal helper to run several Junos CLI commands sequentially over one pooled session.
+
+    Returns {command: {"status", "output", "execution_duration"}} in command order. If the
+    session drops part-way through, the remaining commands are retried once on a fresh session.
+    """
+    log.debug(f"Executing {len(commands)} commands on router {router_name} with timeout {timeout}s (internal)")
+    results = {}
+    device_info = devices[router_name]
+    try:
+        connect_params = prepare_connection_params(device_info, router_name)
+    except ValueError as ve:
+        return {command: {"status": "failed", "output": f"Error: {ve}", "execution_duration": 0.0}
+                for command in commands}
+
+    pending = list(commands)
+    last_error = None
+    for attempt in range(2):
+        try:
+            with session_pool.session(router_name, connect_params) as junos_device:
+                junos_device.timeout = timeout
+                while pending:
+                    command = pending[0]
+                    start_time = time.time()
+                    try:
+                        output = _cli_output(junos_device, command)
+                        status = "success"
+                    except TRANSPORT_ERRORS:
+                        raise
+                    except Exception as e:
+                        output = f"An error occurred: {e}"
+                        status = "failed"
+                    results[command] = {
+                        "status": status,
+                        "output": output,
+                        "execution_duration": round(time.time() - start_time, 3)
+                    }
+                    pending.pop(0)
+            break
+        except TRANSPORT_ERRORS as e:
+            # Checked before ConnectError: ConnectClosedError (a stale pooled session) subclasses it
+            last_error = f"Connection error to {router_name}: {e}"
+            log.info(f"Session to {router_name} dropped with {len(pending)} command(s) left (attempt {attempt + 1})")
+        except ConnectError as ce:
+            last_error = f"Connection error to {router_name}: {ce}"
+            break
+        except Exception as e:
+            last_error = f"An error occurred: {e}"
+            break
+
+    for command in pending:
+        results[command] = {"status": "failed", "output": last_error, "execution_duration": 0.0}
+    return {command: results[command] for command in commands}
+
 def get_timeout_with_fallback(arguments_timeout: int = None) -> int:
     """Get timeout value with fallback priority: arguments -> ENV -> default (360)"""
     if arguments_timeout is not None:
@@ -685,6 +801,41 @@ class BearerTokenMiddleware(BaseHTTPMiddleware):
         log.debug("Token validation successful")
         return await call_next(request)
 
+async def _stream_router_result(context: Context, completed: int, total: int, router_result: dict) -> None:
+    """Send one router's finished result as a progress notification.
+
+    Clients that pass a progressToken receive each router's result as soon as it
+    completes instead of waiting for the slowest router; the message is the
+    router's result as compact JSON. Without a token this is a no-op.
+    """
+    try:
+        await context.report_progress(completed, total, message=json.dumps(router_result, default=str))
+    except Exception as e:
+        log.debug(f"Could not stream result for {router_result.get('router_name')}: {e}")
+
+
+def _is_connect_error(result: str) -> bool:
+    """True for the error strings the _run_* helpers return when a router is unreachable"""
+    return isinstance(result, str) and result.startswith("Connection error")
+
+
+async def _admitted_device_call(router_name: str, func, *args):
+    """Run a blocking device call for a fan-out tool under admission control.
+
+    The call waits for room under the global cap and its jump host's window, then
+    runs on the device worker pool. Connect errors are fed back so the jump host's
+    window backs off while it is struggling.
+    """
+    gateway = gateway_for_device(devices[router_name])
+    async with batch_admission.admit(router_name, gateway) as ticket:
+        result = await device_workers.run(router_name, func, *args)
+        if isinstance(result, dict):
+            ticket.report(any(_is_connect_error(r.get("output")) for r in result.values()))
+        else:
+            ticket.report(_is_connect_error(result))
+        return result
+
+
 async def handle_execute_junos_command(arguments: dict, context: Context) -> list[types.ContentBlock]:
     """Handler for execute_junos_command tool"""
     start_time = time.time()
@@ -697,7 +848,7 @@ async def handle_execute_junos_command(arguments: dict, context: Context) -> lis
         result = f"Router {router_name} not found in the device mapping."
     else:
         log.debug(f"Executing command {command} on router {router_name} with timeout {timeout}s")
-        result = _run_junos_cli_command(router_name, command, timeout)
+        result = await device_workers.run(router_name, _run_junos_cli_command, router_name, command, timeout)
 
     end_time = time.time()
     end_timestamp = datetime.now(timezone.utc).isoformat()
@@ -727,8 +878,9 @@ async def handle_execute_junos_command_batch(arguments: dict, context: Context)
     1. ASYNC/AWAIT: Allows cooperative multitasking - while one router is waiting for network I/O,
        other routers can be contacted simultaneously
 
-    2. THREAD POOL: PyEZ's Device.cli() is synchronous (blocking), so we use anyio.to_thread.run_sync()
-       to run it in a background thread without blocking the async event loop
+    2. THREAD POOL: PyEZ's Device.cli() is synchronous (blocking), so we hand it to the shared
+       device worker pool, which runs it in a bounded background thread without blocking the
+       async event loop
 
     3. ASYNCIO.GATHER: Launches multiple async operations simultaneously and waits for all to complete
 
@@ -793,27 +945,34 @@ async def handle_execute_junos_command_batch(arguments: dict, context: Context)
 
         try:
             # ----------------------------------------------------------------
-            # THE MAGIC: anyio.to_thread.run_sync()
+            # THE MAGIC: device_workers.run()
             # ----------------------------------------------------------------
             # Problem: _run_junos_cli_command() is SYNCHRONOUS (blocking)
             # - It uses PyEZ's Device.cli() which blocks the thread while waiting
             # - If we called it directly, it would block the async event loop
             # - This would make everything serial again (defeating parallelism)
             #
-            # Solution: anyio.to_thread.run_sync()
-            # - Runs the blocking function in a background thread pool
+            # Solution: the shared device worker pool
+            # - Runs the blocking function in a bounded background thread pool
             # - The async event loop remains free to handle other tasks
-            # - Multiple threads can run simultaneously (one per router)
+            # - Per-device slots stop one router from soaking up every worker,
+            #   and the global cap keeps a 500-router batch from spawning 500 threads
             #
-            # Result: True parallel execution!
+            # Result: True parallel execution, bounded across every tool!
             # - While router1's thread waits for SSH response, router2's thread
             #   can be establishing its connection, and router3's thread can be
             #   sending its command, etc.
             #
-            # Think of it like: Each router gets its own phone line (thread),
-            # and all phone calls happen at the same time instead of one after another.
+            # Think of it like: A call centre with a fixed number of phone lines
+            # shared by every tool, and no router is called on more lines than it can answer.
+            #
+            # On top of that, _admitted_device_call() paces the batch: routers behind
+            # the same jump host share a window that halves when connect errors spike
+            # and grows back as calls succeed, so a 500-router batch never opens
+            # 500 SSH sessions through one gateway at once.
 
-            result = await anyio.to_thread.run_sync(
+            result = await _admitted_device_call(
+                router_name,              # Router the call is admitted for
                 _run_junos_cli_command,  # The synchronous function to run
                 router_name,              # Arguments to pass to it
                 command,
@@ -882,8 +1041,23 @@ async def handle_execute_junos_command_batch(arguments: dict, context: Context)
     # Key: Each router runs in its own thread, so they all complete in the time
     # it takes for the slowest one to finish!
 
+    #
+    # Streaming: each router's result is also pushed to the client as a progress
+    # notification the moment it finishes, so callers can start parsing fast
+    # routers while stragglers are still running. gather() still returns the
+    # complete, ordered list for the final response.
+
+    completed = 0
+
+    async def execute_and_stream(router_name: str) -> dict:
+        nonlocal completed
+        router_result = await execute_on_router(router_name)
+        completed += 1
+        await _stream_router_result(context, completed, len(router_names), router_result)
+        return router_result
+
     results = await asyncio.gather(
-        *[execute_on_router(router_name) for router_name in router_names],
+        *[execute_and_stream(router_name) for router_name in router_names],
         return_exceptions=False  # If any task raises an exception, propagate it immediately
     )
 
@@ -911,9 +1085,9 @@ async def handle_execute_junos_command_batch(arguments: dict, context: Context)
         "results": results  # This contains all per-router results in order
     }
 
-    # Format as pretty JSON for LLM consumption
-    # The LLM can easily parse this and identify which output came from which router
-    formatted_output = json.dumps(response_data, indent=2)
+    # Format as compact JSON - every consumer parses it, and pretty-printing
+    # large multi-router outputs only inflates the payload
+    formatted_output = json.dumps(response_data)
 
     log.info(f"Batch command execution completed: {successful_count} successful, {failed_count} failed, {batch_duration}s total")
     await context.info(f"Batch execution complete: {successful_count}/{len(router_names)} successful")
@@ -937,6 +1111,116 @@ async def handle_execute_junos_command_batch(arguments: dict, context: Context)
     return [content_block]
 
 
+async def handle_execute_junos_commands_matrix(arguments: dict, context: Context) -> list[types.ContentBlock]:
+    """
+    Handler for execute_junos_commands_matrix tool - runs a list of commands on a list of routers.
+
+    Each router gets ONE pooled session on which all commands run back to back, while the
+    routers themselves are processed in parallel (same thread-pool pattern as
+    execute_junos_command_batch). A full audit therefore costs N sessions instead of
+    commands × N, and a single MCP round-trip instead of one per command.
+    """
+    import asyncio
+
+    matrix_start_time = time.time()
+    router_names = arguments.get("router_names", [])
+    commands = arguments.get("commands", [])
+    timeout = get_timeout_with_fallback(arguments.get("timeout"))
+
+    if not router_names:
+        return [types.TextContent(
+            type="text",
+            text="Error: router_names list is required and cannot be empty"
+        )]
+
+    # Drop blanks and duplicates while keeping the caller's order
+    commands = list(dict.fromkeys(c for c in commands if c))
+    if not commands:
+        return [types.TextContent(
+            type="text",
+            text="Error: commands list is required and cannot be empty"
+        )]
+
+    invalid_routers = [r for r in router_names if r not in devices]
+    if invalid_routers:
+        return [types.TextContent(
+            type="text",
+            text=f"Error: The following routers not found in device mapping: {', '.join(invalid_routers)}"
+        )]
+
+    log.info(f"Executing {len(commands)} commands on {len(router_names)} routers (one session per router)")
+    await context.info(f"Executing {len(commands)} commands on {len(router_names)} routers in parallel...")
+
+    async def execute_on_router(router_name: str) -> tuple[str, dict, float]:
+        nonlocal completed
+        start_time = time.time()
+        try:
+            router_results = await _admitted_device_call(
+                router_name,
+                _run_junos_cli_commands,
+                router_name,
+                commands,
+                timeout
+            )
+        except Exception as e:
+            router_results = {command: {"status": "failed",
+                                        "output": f"Exception during execution: {str(e)}",
+                                        "execution_duration": 0.0}
+                              for command in commands}
+        duration = round(time.time() - start_time, 3)
+        completed += 1
+        await _stream_router_result(context, completed, len(router_names), {
+            "router_name": router_name, "results": router_results, "execution_duration": duration})
+        return router_name, router_results, duration
+
+    completed = 0
+    gathered = await asyncio.gather(*[execute_on_router(r) for r in router_names])
+
+    results = {}
+    router_durations = {}
+    failed_commands = 0
+    failed_routers = 0
+    for router_name, router_results, duration in gathered:
+        results[router_name] = router_results
+        router_durations[router_name] = duration
+        router_failures = sum(1 for r in router_results.values() if r["status"] != "success")
+        failed_commands += router_failures
+        if router_failures == len(commands):
+            failed_routers += 1
+
+    matrix_duration = round(time.time() - matrix_start_time, 3)
+    response_data = {
+        "summary": {
+            "commands": commands,
+            "total_routers": len(router_names),
+            "successful_routers": len(router_names) - failed_routers,
+            "failed_routers": failed_routers,
+            "total_commands": len(commands) * len(router_names),
+            "failed_commands": failed_commands,
+            "router_durations": router_durations,
+            "total_duration": matrix_duration
+        },
+        "results": results
+    }
+
+    log.info(f"Matrix execution completed: {failed_commands} failed command(s), {matrix_duration}s total")
+    await context.info(f"Matrix execution complete: {len(router_names) - failed_routers}/{len(router_names)} routers reachable")
+
+    return [types.TextContent(
+        type="text",
+        text=json.dumps(response_data),
+        annotations={
+            "router_names": router_names,
+            "matrix_metadata": {
+                "commands": len(commands),
+                "total_routers": len(router_names),
+                "failed_commands": failed_commands,
+                "total_duration": matrix_duration
+            }
+        }
+    )]
+
+
 async def handle_get_junos_config(arguments: dict, context: Context) -> list[types.ContentBlock]:
     """Handler for get_junos_config tool"""
     router_name = arguments.get("router_name", "")
@@ -945,7 +1229,7 @@ async def handle_get_junos_config(arguments: dict, context: Context) -> list[typ
         result = f"Router {router_name} not found in the device mapping."
     else:
         log.debug(f"Getting configuration from router {router_name}")
-        result = _run_junos_cli_command(router_name, "show configuration | display inheritance no-comments | display set | no-more")
+        result = await device_workers.run(router_name, _run_junos_cli_command, router_name, CONFIG_SET_COMMAND)
     
     content_block = types.TextContent(
         type="text",
@@ -966,7 +1250,9 @@ async def handle_junos_config_diff(arguments: dict, context: Context) -> list[ty
         result = f"Router {router_name} not found in the device mapping."
     else:
         log.debug(f"Getting configuration diff from router {router_name} for version {version}")
-        result = _run_junos_cli_command(router_name, f"show configuration | compare rollback {version}")
+        result = await device_workers.run(
+            router_name, _run_junos_cli_command, router_name, f"show configuration | compare rollback {version}"
+        )
 
     content_block = types.TextContent(
         type="text",
@@ -977,6 +1263,91 @@ async def handle_junos_config_diff(arguments: dict, context: Context) -> list[ty
 
     return [content_block]
 
+def _apply_rendered_config(router_name: str, rendered_config: str, commit_comment: str,
+                           dry_run: bool) -> tuple[str, list[tuple[str, str]]]:
+    """Internal helper to load rendered `set` config in exclusive mode and commit (or dry-run) it.
+
+    Runs on the device worker pool, so it cannot await the MCP context. Returns the
+    router's result line and the (level, message) progress events to send afterwards.
+    """
+    events = []
+
+    def note(level: str, message: str):
+        events.append((level, message))
+
+    def fail(message: str) -> tuple[str, list]:
+        note("error", f"{router_name}: {message}")
+        return f"❌ {router_name}: {message}", events
+
+    try:
+        connect_params = prepare_connection_params(devices[router_name], router_name)
+    except ValueError as ve:
+        return fail(str(ve))
+
+    try:
+        # Check out a pooled session to the device
+        with session_pool.session(router_name, connect_params) as dev:
+            note("info", f"Connected to {router_name}")
+
+            # Load configuration using exclusive mode
+            with Config(dev, mode='exclusive') as cu:
+                note("info", f"Loading configuration on {router_name}...")
+                cu.load(rendered_config, format='set')
+
+                # Get diff
+                diff = cu.diff()
+
+                if not diff:
+                    result_msg = "No configuration changes detected"
+                    note("info", f"{router_name}: {result_msg}")
+                    return f"ℹ️  {router_name}: {result_msg}", events
+
+                note("info", f"Performing commit check on {router_name}...")
+                if dry_run:
+                    # DRY RUN: Perform commit check, show diff, and rollback without committing
+                    try:
+                        if not cu.commit_check():
+                            result = fail("Commit check failed - configuration has errors")
+                        else:
+                            result_msg = f"Configuration check successful. Changes:\n\n{diff}"
+                            note("info", f"{router_name}: Dry-run commit check passed")
+                            result = f"🔍 {router_name}: {result_msg}", events
+                    except Exception as check_error:
+                        result = fail(f"Commit check error: {check_error}")
+                    finally:
+                        # CRITICAL: Always rollback in dry-run mode
+                        note("info", f"{router_name}: Rolling back changes (dry-run mode)")
+                        try:
+                            cu.rollback()
+                            # After a successful rollback, there should be no differences
+                            remaining = cu.diff()
+                            if remaining:
+                                note("error", f"{router_name}: Rollback verification failed - unexpected changes remain")
+                                note("error", f"{router_name}: Remaining diff:\n{remaining}")
+                            else:
+                                note("info", f"{router_name}: Rollback verified successfully - no pending changes")
+                        except Exception as rollback_error:
+                            note("error", f"{router_name}: Rollback failed with error: {str(rollback_error)}")
+                    return result
+
+                # REAL COMMIT: Perform commit check before committing
+                if not cu.commit_check():
+                    cu.rollback()
+                    return fail("Commit check failed - configuration has errors")
+                # Apply the changes
+                note("info", f"Committing configuration on {router_name}...")
+                cu.commit(comment=commit_comment)
+                note("info", f"{router_name}: Configuration committed successfully")
+                return f"✅ {router_name}: Configuration committed successfully. Changes:\n\n{diff}", events
+
+    except (ConfigLoadError, CommitError, LockError) as e:
+        return fail(f"Configuration error: {e}")
+    except ConnectError as e:
+        return fail(f"Connection failed: {e}")
+    except Exception as e:
+        return fail(f"Failed to apply configuration: {e}")
+
+
 async def handle_render_and_apply_j2_template(arguments: dict, context) -> list[types.ContentBlock]:
     """
     Handler for render_and_apply_j2_template tool
@@ -1109,117 +1480,21 @@ To apply this configuration to devices, set apply_config=true and provide router
             await context.warning(f"Router {rtr_name} not found")
             continue
         
+        await context.info(f"{'Checking' if dry_run else 'Applying'} configuration on {rtr_name}...")
+        
+        # The session checkout, load, commit check and commit all block, so they run on
+        # the device worker pool; the progress they record is relayed to the client here.
         try:
-            await context.info(f"{'Checking' if dry_run else 'Applying'} configuration on {rtr_name}...")
-            
-            device_info = devices[rtr_name]
-            
-            # Use prepare_connection_params to get proper connection parameters
-            try:
-                connect_params = prepare_connection_params(device_info, rtr_name)
-            except ValueError as ve:
-                application_results.append(f"❌ {rtr_name}: {ve}")
-                await context.error(f"{rtr_name}: {ve}")
-                continue
-            
-            # Connect to device
-            dev = Device(**connect_params)
-            
-            try:
-                dev.open()
-                await context.info(f"Connected to {rtr_name}")
-                
-                # Load configuration using exclusive mode
-                try:
-                    with Config(dev, mode='exclusive') as cu:
-                        await context.info(f"Loading configuration on {rtr_name}...")
-                        cu.load(rendered_config, format='set')
-                        
-                        # Get diff
-                        diff = cu.diff()
-                        
-                        if not diff:
-                            result_msg = "No configuration changes detected"
-                            application_results.append(f"ℹ️  {rtr_name}: {result_msg}")
-                            await context.info(f"{rtr_name}: {result_msg}")
-                        else:
-                            if dry_run:
-                                # DRY RUN: Perform commit check, show diff, and rollback without committing
-                                await context.info(f"Performing commit check on {rtr_name}...")
-                                
-                                try:
-                                    check_result = cu.commit_check()
-                                    
-                                    if not check_result:
-                                        result_msg = f"Commit check failed - configuration has errors"
-                                        application_results.append(f"❌ {rtr_name}: {result_msg}")
-                                        await context.error(f"{rtr_name}: {result_msg}")
-                                    else:
-                                        result_msg = f"Configuration check successful. Changes:\n\n{diff}"
-                                        application_results.append(f"🔍 {rtr_name}: {result_msg}")
-                                        await context.info(f"{rtr_name}: Dry-run commit check passed")
-                                    
-                                except Exception as check_error:
-                                    result_msg = f"Commit check error: {check_error}"
-                                    application_results.append(f"❌ {rtr_name}: {result_msg}")
-                                    await context.error(f"{rtr_name}: {result_msg}")
-                                finally:
-                                    # CRITICAL: Always rollback in dry-run mode
-                                    await context.info(f"{rtr_name}: Rolling back changes (dry-run mode)")
-                                    try:
-                                        # Perform the rollback
-                                        cu.rollback()
-                                        # Verify rollback success by checking if there are pending changes
-                                        # After a successful rollback, there should be no differences
-                                        diff = cu.diff()
-                                        
-                                        if diff:
-                                            await context.error(f"{rtr_name}: Rollback verification failed - unexpected changes remain")
-                                            await context.error(f"{rtr_name}: Remaining diff:\n{diff}")
-                                        else:
-                                            await context.info(f"{rtr_name}: Rollback verified successfully - no pending changes")
-                                            
-                                    except Exception as rollback_error:
-                                        await context.error(f"{rtr_name}: Rollback failed with error: {str(rollback_error)}")
-                            else:
-                                # REAL COMMIT: Perform commit check before committing
-                                await context.info(f"Performing commit check on {rtr_name}...")
-                                check_result = cu.commit_check()
-                                
-                                if not check_result:
-                                    result_msg = "Commit check failed - configuration has errors"
-                                    application_results.append(f"❌ {rtr_name}: {result_msg}")
-                                    await context.error(f"{rtr_name}: {result_msg}")
-                                    cu.rollback()
-                                else:
-                                    # Apply the changes
-                                    await context.info(f"Committing configuration on {rtr_name}...")
-                                    cu.commit(comment=commit_comment)
-                                    result_msg = f"Configuration committed successfully. Changes:\n\n{diff}"
-                                    application_results.append(f"✅ {rtr_name}: {result_msg}")
-                                    await context.info(f"{rtr_name}: Configuration committed successfully")
-
-                except (ConfigLoadError, CommitError, LockError) as e:
-                    error_msg = f"Configuration error: {e}"
-                    application_results.append(f"❌ {rtr_name}: {error_msg}")
-                    await context.error(f"{rtr_name}: {error_msg}")
-
-            except ConnectError as e:
-                error_msg = f"Connection failed: {e}"
-                application_results.append(f"❌ {rtr_name}: {error_msg}")
-                await context.error(f"{rtr_name}: {error_msg}")
-            finally:
-                # Always close the device connection
-                try:
-                    dev.close()
-                    await context.info(f"Disconnected from {rtr_name}")
-                except Exception as close_error:
-                    log.warning(f"Error while closing test connection to {rtr_name}: {close_error}")
-
+            result_line, events = await device_workers.run(
+                rtr_name, _apply_rendered_config, rtr_name, rendered_config, commit_comment, dry_run
+            )
         except Exception as e:
             error_msg = f"Failed to apply configuration: {e}"
-            application_results.append(f"❌ {rtr_name}: {error_msg}")
-            await context.error(f"{rtr_name}: {error_msg}")
+            result_line, events = f"❌ {rtr_name}: {error_msg}", [("error", f"{rtr_name}: {error_msg}")]
+        
+        for level, message in events:
+            await getattr(context, level)(message)
+        application_results.append(result_line)
     
     # Step 6: Format final results
     summary = "\n".join(application_results)
@@ -1248,6 +1523,82 @@ To apply this configuration to devices, set apply_config=true and provide router
         }
     )]
 
+def _gather_device_facts(router_name: str, timeout: int = 360) -> str:
+    """Internal helper to collect device facts over a pooled session and serialize them as JSON."""
+    device_info = devices[router_name]
+    try:
+        connect_params = prepare_connection_params(device_info, router_name)
+    except ValueError as ve:
+        return f"Error: {ve}"
+
+    def _facts(junos_device):
+        junos_device.timeout = timeout
+        # Pooled sessions keep their fact cache, so refresh to report current values
+        junos_device.facts_refresh()
+        # Convert _FactCache to a regular dict
+        return dict(junos_device.facts)
+
+    # Custom JSON encoder to handle version_info and other complex objects
+    def json_serializer(obj):
+        if hasattr(obj, '_asdict'):  # Named tuples like version_info
+            return obj._asdict()
+        elif hasattr(obj, '__dict__'):  # Objects with __dict__
+            return obj.__dict__
+        else:
+            return str(obj)
+
+    try:
+        facts_dict = session_pool.run(router_name, connect_params, _facts)
+        return json.dumps(facts_dict, indent=2, default=json_serializer)
+    except ConnectError as ce:
+        return f"Connection error to {router_name}: {ce}"
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+
+def _last_commit_marker(commit_history: str) -> str | None:
+    """Return the newest entry ("0   <time> by <user> via <client>") of show system commit."""
+    match = re.search(r"^\s*0\s+(\S.*)$", commit_history or "", re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+def _config_checksum(router_name: str, timeout: int = 360) -> str:
+    """Internal helper returning the config checksum of a router as JSON.
+
+    The sha256 covers the stripped get_junos_config text, the same value stored
+    in golden .meta files. It is recomputed only when the newest commit differs
+    from the one it was computed for.
+    """
+    device_info = devices[router_name]
+    try:
+        connect_params = prepare_connection_params(device_info, router_name)
+    except ValueError as ve:
+        return f"Error: {ve}"
+
+    def _checksum(junos_device):
+        junos_device.timeout = timeout
+        marker = _last_commit_marker(junos_device.cli("show system commit", warning=False))
+        known = config_checksums.get(router_name)
+        if marker and known and known["last_commit"] == marker:
+            return dict(known, cached=True)
+        config_text = junos_device.cli(CONFIG_SET_COMMAND, warning=False).strip()
+        entry = {
+            "sha256": hashlib.sha256(config_text.encode()).hexdigest(),
+            "lines": len(config_text.splitlines()),
+            "last_commit": marker,
+        }
+        if marker:
+            config_checksums[router_name] = entry
+        return dict(entry, cached=False)
+
+    try:
+        return json.dumps(session_pool.run(router_name, connect_params, _checksum))
+    except ConnectError as ce:
+        return f"Connection error to {router_name}: {ce}"
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+
 async def handle_gather_device_facts(arguments: dict, context: Context) -> list[types.ContentBlock]:
     """Handler for gather_device_facts tool"""
     router_name = arguments.get("router_name", "")
@@ -1257,33 +1608,7 @@ async def handle_gather_device_facts(arguments: dict, context: Context) -> list[
         result = f"Router {router_name} not found in the device mapping."
     else:
         log.debug(f"Getting facts from router {router_name} with timeout {timeout}s")
-        device_info = devices[router_name]
-        try:
-            connect_params = prepare_connection_params(device_info, router_name)
-            connect_params['timeout'] = timeout
-        except ValueError as ve:
-            result = f"Error: {ve}"
-        else:
-            try:
-                with Device(**connect_params) as junos_device:
-                    facts = junos_device.facts
-                    # Convert _FactCache to a regular dict
-                    facts_dict = dict(facts)
-                    
-                    # Custom JSON encoder to handle version_info and other complex objects
-                    def json_serializer(obj):
-                        if hasattr(obj, '_asdict'):  # Named tuples like version_info
-                            return obj._asdict()
-                        elif hasattr(obj, '__dict__'):  # Objects with __dict__
-                            return obj.__dict__
-                        else:
-                            return str(obj)
-                    
-                    result = json.dumps(facts_dict, indent=2, default=json_serializer)
-            except ConnectError as ce:
-                result = f"Connection error to {router_name}: {ce}"
-            except Exception as e:
-                result = f"An error occurred: {e}"
+        result = await _admitted_device_call(router_name, _gather_device_facts, router_name, timeout)
 
     content_block = types.TextContent(
         type="text",
@@ -1295,6 +1620,30 @@ async def handle_gather_device_facts(arguments: dict, context: Context) -> list[
     return [content_block]
 
 
+async def handle_get_junos_config_checksum(arguments: dict, context: Context) -> list[types.ContentBlock]:
+    """Handler for get_junos_config_checksum tool"""
+    import asyncio
+
+    router_names = arguments.get("router_names", [])
+    timeout = get_timeout_with_fallback(arguments.get("timeout"))
+
+    async def checksum(router_name: str) -> dict:
+        if router_name not in devices:
+            return {"status": "failed", "error": f"Router {router_name} not found in the device mapping."}
+        result = await _admitted_device_call(router_name, _config_checksum, router_name, timeout)
+        try:
+            return {"status": "success", **json.loads(result)}
+        except json.JSONDecodeError:
+            return {"status": "failed", "error": result}
+
+    log.debug(f"Getting config checksums from {len(router_names)} routers")
+    checksums = await asyncio.gather(*(checksum(r) for r in router_names))
+    return [types.TextContent(
+        type="text",
+        text=json.dumps({"results": dict(zip(router_names, checksums))})
+    )]
+
+
 async def handle_reload_devices(arguments: dict, context: Context) -> list[types.ContentBlock]:
     """Handler for reload_devices tool - reload devices dict from a new JSON file"""
     global devices
@@ -1319,6 +1668,8 @@ async def handle_reload_devices(arguments: dict, context: Context) -> list[types
     old_count = len(devices)
     devices = new_devices
     new_count = len(devices)
+    # Drop pooled sessions so routers are reached with the reloaded parameters
+    session_pool.invalidate()
 
     log.info(f"Reloaded devices from '{file_name}': {old_count} -> {new_count} device(s)")
 
@@ -1364,6 +1715,68 @@ async def handle_get_router_list(arguments: dict, context: Context) -> list[type
     return [content_block]
 
 
+def _load_and_commit_config(router_name: str, config_text: str, config_format: str,
+                            commit_comment: str, timeout: int = 360) -> str:
+    """Internal helper to load, diff and commit configuration over a pooled session."""
+    device_info = devices[router_name]
+    
+    try:
+        connect_params = prepare_connection_params(device_info, router_name)
+    except ValueError as ve:
+        result = f"Error: {ve}"
+    else:
+        try:
+            with session_pool.session(router_name, connect_params) as junos_device:
+                # Initialize configuration utility
+                config_util = Config(junos_device)
+                
+                # Lock the configuration
+                try:
+                    config_util.lock()
+                except Exception as e:
+                    result = f"Failed to lock configuration: {e}"
+                else:
+                    try:
+                        # Load the configuration based on format
+                        if config_format.lower() == "set":
+                            config_util.load(config_text, format='set')
+                        elif config_format.lower() == "text":
+                            config_util.load(config_text, format='text')
+                        elif config_format.lower() == "xml":
+                            config_util.load(config_text, format='xml')
+                        else:
+                            config_util.unlock()
+                            result = f"Error: Unsupported config format '{config_format}'. Use 'set', 'text', or 'xml'"
+                        
+                        if 'result' not in locals():
+                            # Check for differences
+                            diff = config_util.diff()
+                            if not diff:
+                                config_util.unlock()
+                                result = "No configuration changes detected"
+                            else:
+                                # Commit the configuration
+                                config_util.commit(comment=commit_comment, timeout=timeout)
+                                config_util.unlock()
+                                result = f"Configuration successfully loaded and committed on {router_name}. Changes:\n{diff}"
+                                
+                    except Exception as e:
+                        # If anything fails, rollback and unlock
+                        try:
+                            config_util.rollback()
+                            config_util.unlock()
+                        except:
+                            pass
+                        result = f"Failed to load/commit configuration: {e}"
+                        
+        except ConnectError as ce:
+            result = f"Connection error to {router_name}: {ce}"
+        except Exception as e:
+            result = f"An error occurred: {e}"
+
+    return result
+
+
 async def handle_load_and_commit_config(arguments: dict, context: Context) -> list[types.ContentBlock]:
     """Handler for load_and_commit_config tool"""
     router_name = arguments.get("router_name", "")
@@ -1376,61 +1789,10 @@ async def handle_load_and_commit_config(arguments: dict, context: Context) -> li
         result = f"Router {router_name} not found in the device mapping."
     else:
         log.debug(f"Loading and committing config on router {router_name} with format {config_format}")
-        device_info = devices[router_name]
-        
-        try:
-            connect_params = prepare_connection_params(device_info, router_name)
-        except ValueError as ve:
-            result = f"Error: {ve}"
-        else:
-            try:
-                with Device(**connect_params) as junos_device:
-                    # Initialize configuration utility
-                    config_util = Config(junos_device)
-                    
-                    # Lock the configuration
-                    try:
-                        config_util.lock()
-                    except Exception as e:
-                        result = f"Failed to lock configuration: {e}"
-                    else:
-                        try:
-                            # Load the configuration based on format
-                            if config_format.lower() == "set":
-                                config_util.load(config_text, format='set')
-                            elif config_format.lower() == "text":
-                                config_util.load(config_text, format='text')
-                            elif config_format.lower() == "xml":
-                                config_util.load(config_text, format='xml')
-                            else:
-                                config_util.unlock()
-                                result = f"Error: Unsupported config format '{config_format}'. Use 'set', 'text', or 'xml'"
-                            
-                            if 'result' not in locals():
-                                # Check for differences
-                                diff = config_util.diff()
-                                if not diff:
-                                    config_util.unlock()
-                                    result = "No configuration changes detected"
-                                else:
-                                    # Commit the configuration
-                                    config_util.commit(comment=commit_comment, timeout=timeout)
-                                    config_util.unlock()
-                                    result = f"Configuration successfully loaded and committed on {router_name}. Changes:\n{diff}"
-                                    
-                        except Exception as e:
-                            # If anything fails, rollback and unlock
-                            try:
-                                config_util.rollback()
-                                config_util.unlock()
-                            except:
-                                pass
-                            result = f"Failed to load/commit configuration: {e}"
-                            
-            except ConnectError as ce:
-                result = f"Connection error to {router_name}: {ce}"
-            except Exception as e:
-                result = f"An error occurred: {e}"
+        result = await device_workers.run(
+            router_name, _load_and_commit_config, router_name, config_text,
+            config_format, commit_comment, timeout
+        )
     
     content_block = types.TextContent(
         type="text",
@@ -1450,10 +1812,12 @@ async def handle_load_and_commit_config(arguments: dict, context: Context) -> li
 TOOL_HANDLERS = {
     "execute_junos_command": handle_execute_junos_command,
     "execute_junos_command_batch": handle_execute_junos_command_batch,
+    "execute_junos_commands_matrix": handle_execute_junos_commands_matrix,
     "get_junos_config": handle_get_junos_config,
     "junos_config_diff": handle_junos_config_diff,
     "render_and_apply_j2_template": handle_render_and_apply_j2_template,
     "gather_device_facts": handle_gather_device_facts,
+    "get_junos_config_checksum": handle_get_junos_config_checksum,
     "get_router_list": handle_get_router_list,
     "load_and_commit_config": handle_load_and_commit_config,
     "add_device": handle_add_device,     # Dynamic device management
@@ -1505,7 +1869,7 @@ def create_mcp_server() -> Server:
                     "type": "object",
                     "properties": {
                         "router_name": {"type": "string", "description": "The name of the router"},
-                        "command": {"type": "string", "description": "The command to execute on the router"},
+                        "command": {"type": "string", "description": "The command to execute on the router. Append '| display json' to get compact structured JSON instead of CLI text"},
                         "timeout": {"type": "integer", "description": "Command timeout in seconds", "default": 360}
                     },
                     "required": ["router_name", "command"]
@@ -1522,12 +1886,33 @@ def create_mcp_server() -> Server:
                             "items": {"type": "string"},
                             "description": "List of router names to execute the command on"
                         },
-                        "command": {"type": "string", "description": "The command to execute on all routers"},
+                        "command": {"type": "string", "description": "The command to execute on all routers. Append '| display json' to get compact structured JSON instead of CLI text"},
                         "timeout": {"type": "integer", "description": "Command timeout in seconds per router", "default": 360}
                     },
                     "required": ["router_names", "command"]
                 }
             ),
+            types.Tool(
+                name="execute_junos_commands_matrix",
+                description="Execute a list of Junos commands on multiple routers. Commands run sequentially over one session per router while routers run in parallel. Returns structured JSON keyed by router and command.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "router_names": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "List of router names to execute the commands on"
+                        },
+                        "commands": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "List of commands to execute on every router, in order. Commands ending in '| display json' return compact structured JSON"
+                        },
+                        "timeout": {"type": "integer", "description": "Per-command timeout in seconds", "default": 360}
+                    },
+                    "required": ["router_names", "commands"]
+                }
+            ),
             types.Tool(
                 name="get_junos_config",
                 description="Get the configuration of the router",
@@ -1539,6 +1924,24 @@ def create_mcp_server() -> Server:
                     "required": ["router_name"]
                 }
             ),
+            types.Tool(
+                name="get_junos_config_checksum",
+                description="Get a sha256 checksum of each router's set-format configuration (as returned by get_junos_config) "
+                            "plus its last commit, without transferring the configuration. The checksum is only "
+                            "recomputed on the router after a new commit",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "router_names": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "List of router names"
+                        },
+                        "timeout": {"type": "integer", "description": "Command timeout in seconds per router", "default": 360}
+                    },
+                    "required": ["router_names"]
+                }
+            ),
             types.Tool(
                 name="junos_config_diff",
                 description="Get the configuration diff against a rollback version",
@@ -1692,11 +2095,15 @@ def main():
     # Set up signal handler for clean shutdown
     def signal_handler(sig, frame):
         print("\nShutting down MCP server...")
+        session_pool.close_all()
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    # Close idle NETCONF sessions in the background
+    session_pool.start_reaper()
+
     # Create MCP server
     mcp_server = create_mcp_server()
 
@@ -1737,6 +2144,7 @@ def main():
                         log.info(f"Streamable HTTP server started on http://{args.host}:{args.port}")
                         yield
                         log.info("Server shutting down...")
+                        session_pool.close_all()
                 
                 # Enhancement #12: Health check endpoint for monitoring/load balancers
                 async def health_check(request):
@@ -1749,6 +2157,9 @@ def main():
                         "device_names": list(devices.keys()),
                         "transport": "streamable-http",
                         "auth_enabled": auth_enabled,
+                        "session_pool": session_pool.stats(),
+                        "worker_pool": device_workers.stats(),
+                        "admission": batch_admission.stats(),
                         "timestamp": datetime.now(timezone.utc).isoformat()
                     })
                 
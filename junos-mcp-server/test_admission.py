@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batch admission control (utils/admission.py)
+Covers the global cap, per-gateway AIMD windows, token-bucket pacing and
+jump-host grouping from ssh_config
+"""
+import json
+import os
+import sys
+import asyncio
+import tempfile
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import jmcp
+from utils.admission import AdmissionController, AIMDWindow, TokenBucket, gateway_for_device, DIRECT
+from utils.worker_pool import DeviceWorkerPool
+
+
+class InFlightProbe:
+    """Async callable recording peak in-flight operations"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, controller, router_name, gateway=DIRECT, connect_error=False):
+        async with controller.admit(router_name, gateway) as ticket:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(self.delay)
+            self.active -= 1
+            ticket.report(connect_error)
+
+
+async def test_global_cap():
+    """No more than max_concurrency operations are admitted at once"""
+    print("\n=== Testing Global Cap ===")
+    controller = AdmissionController(max_concurrency=3, device_rate=0)
+    probe = InFlightProbe()
+    await asyncio.gather(*[probe(controller, f"r{i}") for i in range(10)])
+
+    if probe.peak != 3 or controller.stats()["in_flight"] != 0:
+        print(f"❌ Expected peak of 3, got {probe.peak}, stats={controller.stats()}")
+        return False
+    print("✅ Peak of 3 operations for 10 routers")
+    return True
+
+
+async def test_gateway_window():
+    """Routers behind one jump host are limited by the gateway window"""
+    print("\n=== Testing Gateway Window ===")
+    controller = AdmissionController(max_concurrency=50, gateway_concurrency=2,
+                                     gateway_rate=0, device_rate=0)
+    probe = InFlightProbe()
+    await asyncio.gather(*[probe(controller, f"r{i}", "proxy:bastion") for i in range(6)])
+
+    if probe.peak != 2:
+        print(f"❌ Expected peak of 2 through the gateway, got {probe.peak}")
+        return False
+    print("✅ Gateway window held concurrency at 2")
+    return True
+
+
+async def test_aimd_backoff():
+    """A connect-error spike halves the window once; successes grow it back"""
+    print("\n=== Testing AIMD Backoff ===")
+    window = AIMDWindow(max_limit=8, spike_threshold=3)
+    window.on_connect_error(time.monotonic())
+    window.on_success()
+    if window.limit != 8 or window.recent_errors != 0:
+        print(f"❌ A lone connect error should not shrink the window, got {window.limit}")
+        return False
+    admitted_at = time.monotonic()
+    reduced = [window.on_connect_error(admitted_at) for _ in range(5)]
+    if reduced != [False, False, True, False, False] or int(window.limit) != 4:
+        print(f"❌ Expected a single halving to 4, got reductions={reduced}, limit={window.limit}")
+        return False
+    for _ in range(40):
+        window.on_success()
+    if window.limit != 8:
+        print(f"❌ Expected window to recover to 8, got {window.limit}")
+        return False
+    print("✅ Window halved once per spike and recovered additively")
+    return True
+
+
+async def test_controller_reports_connect_errors():
+    """Connect errors reported through tickets shrink the gateway window"""
+    print("\n=== Testing Connect Error Feedback ===")
+    controller = AdmissionController(max_concurrency=50, gateway_concurrency=8,
+                                     gateway_rate=0, device_rate=0)
+    probe = InFlightProbe(delay=0.01)
+    await asyncio.gather(*[probe(controller, f"r{i}", "proxy:bastion", connect_error=True) for i in range(8)])
+
+    gateway = controller.stats()["gateways"]["proxy:bastion"]
+    if gateway["connect_errors"] != 8 or gateway["limit"] >= 8:
+        print(f"❌ Expected the window to back off, got {gateway}")
+        return False
+    print(f"✅ Window backed off to {gateway['limit']} after {gateway['connect_errors']} connect errors")
+    return True
+
+
+async def test_token_bucket_pacing():
+    """Operations beyond the burst are spaced out at the configured rate"""
+    print("\n=== Testing Token Bucket ===")
+    bucket = TokenBucket(rate=10, burst=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    if delays[0] != 0 or delays[1] != 0 or not (0.08 <= delays[2] <= 0.11) or not (0.18 <= delays[3] <= 0.21):
+        print(f"❌ Unexpected delays: {delays}")
+        return False
+
+    controller = AdmissionController(max_concurrency=10, device_rate=20, device_burst=1)
+    started = time.monotonic()
+    probe = InFlightProbe(delay=0)
+    await asyncio.gather(*[probe(controller, "r1") for _ in range(4)])
+    elapsed = time.monotonic() - started
+    if elapsed < 0.14 or controller.stats()["paced"] != 3:
+        print(f"❌ Expected 3 paced starts over ~0.15s, got {elapsed:.3f}s, stats={controller.stats()}")
+        return False
+    print(f"✅ Device bucket spaced 4 starts over {elapsed:.2f}s")
+    return True
+
+
+async def test_gateway_for_device():
+    """Devices sharing a ProxyJump share a gateway; others are direct"""
+    print("\n=== Testing Gateway Grouping ===")
+    with tempfile.NamedTemporaryFile("w", suffix=".conf", delete=False) as f:
+        f.write("Host 10.0.*\n    ProxyJump bastion.example.net\n")
+        path = f.name
+    try:
+        a = gateway_for_device({"ip": "10.0.0.1", "ssh_config": path})
+        b = gateway_for_device({"ip": "10.0.0.2", "ssh_config": path})
+        c = gateway_for_device({"ip": "192.168.1.1", "ssh_config": path})
+        d = gateway_for_device({"ip": "10.0.0.3"})
+    finally:
+        os.unlink(path)
+
+    if a != b or a != "proxy:bastion.example.net" or c != f"ssh_config:{path}" or d != DIRECT:
+        print(f"❌ Unexpected gateways: {a}, {b}, {c}, {d}")
+        return False
+    print(f"✅ Grouped behind {a}")
+    return True
+
+
+async def test_batch_handler_admission():
+    """execute_junos_command_batch goes through admission control"""
+    print("\n=== Testing Batch Handler Integration ===")
+    originals = (jmcp.devices, jmcp._run_junos_cli_command, jmcp.device_workers, jmcp.batch_admission)
+    jmcp.devices = {f"router-{i}": {"ip": f"192.168.1.{i}", "port": 22, "username": "admin",
+                                    "auth": {"type": "password", "password": "secret123"}}
+                    for i in range(1, 7)}
+
+    def fake_cli(router, command, timeout):
+        time.sleep(0.05)
+        if router == "router-6":
+            return f"Connection error to {router}: unreachable"
+        return f"output of {command}"
+
+    jmcp._run_junos_cli_command = fake_cli
+    jmcp.device_workers = DeviceWorkerPool(max_workers=16, per_device_limit=2)
+    jmcp.batch_admission = AdmissionController(max_concurrency=2, device_rate=0)
+    context = MagicMock()
+    context.info = AsyncMock()
+    try:
+        result = await jmcp.handle_execute_junos_command_batch(
+            {"router_names": list(jmcp.devices), "command": "show version"}, context)
+        stats = jmcp.batch_admission.stats()
+    finally:
+        jmcp.devices, jmcp._run_junos_cli_command, jmcp.device_workers, jmcp.batch_admission = originals
+
+    data = json.loads(result[0].text)
+    direct = stats["gateways"][DIRECT]
+    if data["summary"]["successful"] != 5 or stats["admitted"] != 6 or direct["connect_errors"] != 1 \
+            or direct["decreases"] != 0:
+        print(f"❌ Unexpected result summary={data['summary']}, stats={stats}")
+        return False
+    if data["summary"]["total_duration"] < 0.15:
+        print(f"❌ Global cap of 2 should serialize 6 routers into 3 waves, took {data['summary']['total_duration']}s")
+        return False
+    print(f"✅ 6 routers admitted 2 at a time in {data['summary']['total_duration']}s")
+    return True
+
+
+def run_async_test(test_func):
+    """Helper to run async test functions"""
+    return asyncio.run(test_func())
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Batch Admission Control Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_global_cap,
+        test_gateway_window,
+        test_aimd_backoff,
+        test_controller_reports_connect_errors,
+        test_token_bucket_pacing,
+        test_gateway_for_device,
+        test_batch_handler_admission,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if run_async_test(test):
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-router result streaming in execute_junos_command_batch
+and execute_junos_commands_matrix
+"""
+import json
+import sys
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import jmcp
+from utils.admission import AdmissionController
+from utils.worker_pool import DeviceWorkerPool
+
+DELAYS = {"router-slow": 0.3, "router-mid": 0.15, "router-fast": 0.0}
+
+
+def create_mock_context():
+    """Create a mock Context object recording progress notifications"""
+    mock_context = MagicMock()
+    mock_context.info = AsyncMock()
+    mock_context.report_progress = AsyncMock()
+    return mock_context
+
+
+def fake_cli(router, command, timeout):
+    time.sleep(DELAYS[router])
+    return f"{router}: output of {command}"
+
+
+def fake_cli_many(router, commands, timeout):
+    time.sleep(DELAYS[router])
+    return {c: {"status": "success", "output": f"{router}: {c}", "execution_duration": 0.0} for c in commands}
+
+
+async def run_handler(handler, arguments, context):
+    originals = (jmcp.devices, jmcp._run_junos_cli_command, jmcp._run_junos_cli_commands,
+                 jmcp.device_workers, jmcp.batch_admission)
+    jmcp.devices = {name: {"ip": f"192.168.1.{i}", "port": 22, "username": "admin",
+                           "auth": {"type": "password", "password": "secret123"}}
+                    for i, name in enumerate(DELAYS, start=1)}
+    jmcp._run_junos_cli_command = fake_cli
+    jmcp._run_junos_cli_commands = fake_cli_many
+    jmcp.device_workers = DeviceWorkerPool(max_workers=8, per_device_limit=1)
+    jmcp.batch_admission = AdmissionController(max_concurrency=8, device_rate=0)
+    try:
+        return await handler(arguments, context)
+    finally:
+        (jmcp.devices, jmcp._run_junos_cli_command, jmcp._run_junos_cli_commands,
+         jmcp.device_workers, jmcp.batch_admission) = originals
+
+
+async def test_batch_streams_in_completion_order():
+    """Each router's result is reported as soon as it finishes"""
+    print("\n=== Testing Batch Streaming Order ===")
+    context = create_mock_context()
+    result = await run_handler(jmcp.handle_execute_junos_command_batch,
+                               {"router_names": list(DELAYS), "command": "show version"}, context)
+
+    calls = context.report_progress.await_args_list
+    streamed = [json.loads(c.kwargs["message"]) for c in calls]
+    order = [r["router_name"] for r in streamed]
+    progress = [c.args for c in calls]
+    if order != ["router-fast", "router-mid", "router-slow"]:
+        print(f"❌ Expected completion order, got {order}")
+        return False
+    if progress != [(1, 3), (2, 3), (3, 3)]:
+        print(f"❌ Unexpected progress values: {progress}")
+        return False
+    if streamed[0]["output"] != "router-fast: output of show version" or streamed[0]["status"] != "success":
+        print(f"❌ Unexpected streamed payload: {streamed[0]}")
+        return False
+
+    data = json.loads(result[0].text)
+    if [r["router_name"] for r in data["results"]] != list(DELAYS):
+        print("❌ Final response should keep the requested router order")
+        return False
+    print(f"✅ Streamed {order}")
+    return True
+
+
+async def test_batch_response_is_compact():
+    """The final batch response is compact JSON"""
+    print("\n=== Testing Compact Response ===")
+    result = await run_handler(jmcp.handle_execute_junos_command_batch,
+                               {"router_names": ["router-fast"], "command": "show version"},
+                               create_mock_context())
+    if "\n" in result[0].text:
+        print("❌ Response is still pretty-printed")
+        return False
+    print("✅ Response is compact")
+    return True
+
+
+async def test_matrix_streams_per_router():
+    """The matrix tool streams one notification per router"""
+    print("\n=== Testing Matrix Streaming ===")
+    context = create_mock_context()
+    await run_handler(jmcp.handle_execute_junos_commands_matrix,
+                      {"router_names": list(DELAYS), "commands": ["show version", "show chassis alarms"]},
+                      context)
+    streamed = [json.loads(c.kwargs["message"]) for c in context.report_progress.await_args_list]
+    if [r["router_name"] for r in streamed] != ["router-fast", "router-mid", "router-slow"]:
+        print(f"❌ Unexpected streamed routers: {streamed}")
+        return False
+    if list(streamed[0]["results"]) != ["show version", "show chassis alarms"]:
+        print(f"❌ Unexpected streamed commands: {streamed[0]}")
+        return False
+    print("✅ Matrix streamed each router's commands")
+    return True
+
+
+async def test_streaming_failure_does_not_fail_batch():
+    """A client that cannot receive progress still gets the full result"""
+    print("\n=== Testing Streaming Failure ===")
+    context = create_mock_context()
+    context.report_progress = AsyncMock(side_effect=RuntimeError("stream closed"))
+    result = await run_handler(jmcp.handle_execute_junos_command_batch,
+                               {"router_names": list(DELAYS), "command": "show version"}, context)
+    data = json.loads(result[0].text)
+    if data["summary"]["successful"] != 3:
+        print(f"❌ Unexpected summary: {data['summary']}")
+        return False
+    print("✅ Batch completed despite progress errors")
+    return True
+
+
+def run_async_test(test_func):
+    """Helper to run async test functions"""
+    return asyncio.run(test_func())
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Batch Result Streaming Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_batch_streams_in_completion_order,
+        test_batch_response_is_compact,
+        test_matrix_streams_per_router,
+        test_streaming_failure_does_not_fail_batch,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if run_async_test(test):
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Unit tests for handle_execute_junos_commands_matrix()
+Verifies one session per router and the router/command keyed result structure
+"""
+import json
+import sys
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import jmcp
+from utils.session_pool import DeviceSessionPool
+from jnpr.junos.exception import ConnectClosedError
+
+from test_session_pool import FakeDevice
+
+DEVICES = {
+    name: {"ip": f"192.168.1.{i}", "port": 22, "username": "admin",
+           "auth": {"type": "password", "password": "secret123"}}
+    for i, name in enumerate(["router-1", "router-2", "router-3"], start=1)
+}
+
+
+def create_mock_context():
+    """Create a mock Context object with awaitable log helpers"""
+    mock_context = MagicMock()
+    mock_context.info = AsyncMock()
+    return mock_context
+
+
+async def run_matrix(arguments):
+    original_devices, original_pool = jmcp.devices, jmcp.session_pool
+    FakeDevice.instances = []
+    jmcp.devices = DEVICES
+    jmcp.session_pool = DeviceSessionPool(device_factory=FakeDevice)
+    try:
+        result = await jmcp.handle_execute_junos_commands_matrix(arguments, create_mock_context())
+        return result, jmcp.session_pool.stats()
+    finally:
+        jmcp.devices, jmcp.session_pool = original_devices, original_pool
+
+
+async def test_one_session_per_router():
+    """All commands for a router share one session"""
+    print("\n=== Testing One Session per Router ===")
+    commands = ["show version", "show interfaces terse", "show bgp summary"]
+    result, stats = await run_matrix({"router_names": list(DEVICES), "commands": commands})
+    data = json.loads(result[0].text)
+
+    if stats["opened"] != 3 or len(FakeDevice.instances) != 3:
+        print(f"❌ Expected 3 sessions, got {stats['opened']}")
+        return False
+    if set(data["results"]) != set(DEVICES):
+        print(f"❌ Unexpected routers in result: {list(data['results'])}")
+        return False
+    for router, per_cmd in data["results"].items():
+        if list(per_cmd) != commands:
+            print(f"❌ {router}: commands out of order or missing: {list(per_cmd)}")
+            return False
+        if per_cmd["show version"]["output"] != "output of show version":
+            print(f"❌ {router}: wrong output {per_cmd['show version']}")
+            return False
+    if data["summary"]["failed_commands"] != 0 or data["summary"]["total_commands"] != 9:
+        print(f"❌ Unexpected summary: {data['summary']}")
+        return False
+    print("✅ 9 commands ran over 3 sessions")
+    return True
+
+
+class DroppingDevice(FakeDevice):
+    """FakeDevice whose first session closes on the second command"""
+    dropped = False
+
+    def cli(self, command, warning=False):
+        if command == "show interfaces terse" and not DroppingDevice.dropped:
+            DroppingDevice.dropped = True
+            self.connected = False
+            raise ConnectClosedError(self)
+        return super().cli(command, warning)
+
+
+async def test_dropped_session_retries_remaining():
+    """A session closed mid-run (ConnectClosedError) retries the remaining commands on a fresh one"""
+    print("\n=== Testing Dropped Session Retry ===")
+    original_devices, original_pool = jmcp.devices, jmcp.session_pool
+    DroppingDevice.dropped = False
+    FakeDevice.instances = []
+    jmcp.devices = DEVICES
+    jmcp.session_pool = DeviceSessionPool(device_factory=DroppingDevice)
+    commands = ["show version", "show interfaces terse", "show bgp summary"]
+    try:
+        results = jmcp._run_junos_cli_commands("router-1", commands)
+        stats = jmcp.session_pool.stats()
+    finally:
+        jmcp.devices, jmcp.session_pool = original_devices, original_pool
+
+    if list(results) != commands or any(r["status"] != "success" for r in results.values()):
+        print(f"❌ Expected every command to succeed after the retry, got {results}")
+        return False
+    if results["show interfaces terse"]["output"] != "output of show interfaces terse" or stats["opened"] != 2:
+        print(f"❌ Expected the dropped command rerun on a second session, got {results}, stats={stats}")
+        return False
+    print("✅ Dropped session reopened once and the remaining 2 commands ran")
+    return True
+
+
+async def test_duplicate_commands_collapsed():
+    """Duplicate and empty commands are dropped"""
+    print("\n=== Testing Duplicate Commands ===")
+    result, _ = await run_matrix({"router_names": ["router-1"],
+                                  "commands": ["show version", "", "show version"]})
+    data = json.loads(result[0].text)
+    if data["summary"]["commands"] != ["show version"]:
+        print(f"❌ Expected a single command, got {data['summary']['commands']}")
+        return False
+    print("✅ Duplicates collapsed")
+    return True
+
+
+async def test_invalid_router():
+    """Unknown routers are rejected before anything runs"""
+    print("\n=== Testing Invalid Router ===")
+    result, stats = await run_matrix({"router_names": ["router-1", "nope"], "commands": ["show version"]})
+    if "nope" not in result[0].text or stats["opened"] != 0:
+        print(f"❌ Expected validation error, got: {result[0].text}")
+        return False
+    print("✅ Invalid router rejected")
+    return True
+
+
+async def test_empty_commands():
+    """An empty command list is an error"""
+    print("\n=== Testing Empty Commands ===")
+    result, _ = await run_matrix({"router_names": ["router-1"], "commands": []})
+    if not result[0].text.startswith("Error: commands"):
+        print(f"❌ Expected commands error, got: {result[0].text}")
+        return False
+    print("✅ Empty commands rejected")
+    return True
+
+
+def run_async_test(test_func):
+    """Helper to run async test functions"""
+    return asyncio.run(test_func())
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("handle_execute_junos_commands_matrix() Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_one_session_per_router,
+        test_dropped_session_retries_remaining,
+        test_duplicate_commands_collapsed,
+        test_invalid_router,
+        test_empty_commands,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if run_async_test(test):
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the get_junos_config_checksum tool
+"""
+import hashlib
+import json
+import sys
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import jmcp
+from utils.admission import AdmissionController
+from utils.worker_pool import DeviceWorkerPool
+
+CONFIG = "set system host-name {router}\nset interfaces lo0 unit 0 family inet address 10.0.0.1/32\n"
+
+
+class FakeDevice:
+    """PyEZ Device stand-in recording CLI commands"""
+
+    def __init__(self, router):
+        self.router = router
+        self.commit = "0   2026-10-16 10:00:00 UTC by admin via cli"
+        self.commands = []
+        self.timeout = None
+
+    def cli(self, command, warning=True):
+        self.commands.append(command)
+        if command == "show system commit":
+            return f"\n{self.commit}\n1   2026-10-01 09:00:00 UTC by admin via netconf\n"
+        if command == jmcp.CONFIG_SET_COMMAND:
+            return CONFIG.format(router=self.router)
+        raise AssertionError(f"unexpected command {command}")
+
+
+class FakeSessionPool:
+    """Session pool stand-in handing out one FakeDevice per router"""
+
+    def __init__(self):
+        self.sessions = {}
+
+    def run(self, router_name, connect_params, func):
+        device = self.sessions.setdefault(router_name, FakeDevice(router_name))
+        return func(device)
+
+
+def create_mock_context():
+    """Create a mock Context object"""
+    mock_context = MagicMock()
+    mock_context.info = AsyncMock()
+    return mock_context
+
+
+async def call_tool(arguments, pool):
+    originals = (jmcp.devices, jmcp.session_pool, jmcp.device_workers, jmcp.batch_admission)
+    jmcp.devices = {name: {"ip": f"192.168.1.{i}", "port": 22, "username": "admin",
+                           "auth": {"type": "password", "password": "secret123"}}
+                    for i, name in enumerate(["router1", "router2"], start=1)}
+    jmcp.session_pool = pool
+    jmcp.device_workers = DeviceWorkerPool(max_workers=4, per_device_limit=1)
+    jmcp.batch_admission = AdmissionController(max_concurrency=4, device_rate=0)
+    try:
+        result = await jmcp.handle_get_junos_config_checksum(arguments, create_mock_context())
+        return json.loads(result[0].text)["results"]
+    finally:
+        jmcp.devices, jmcp.session_pool, jmcp.device_workers, jmcp.batch_admission = originals
+
+
+async def test_checksum_matches_golden_meta():
+    """The checksum equals sha256 of the stripped get_junos_config text"""
+    print("\n=== Testing Checksum Value ===")
+    jmcp.config_checksums.clear()
+    results = await call_tool({"router_names": ["router1", "router2"]}, FakeSessionPool())
+    expected = hashlib.sha256(CONFIG.format(router="router1").strip().encode()).hexdigest()
+    if results["router1"]["sha256"] != expected or results["router1"]["lines"] != 2:
+        print(f"❌ Unexpected checksum: {results['router1']}")
+        return False
+    if results["router1"]["sha256"] == results["router2"]["sha256"]:
+        print("❌ Different configs produced the same checksum")
+        return False
+    if results["router1"]["last_commit"] != "2026-10-16 10:00:00 UTC by admin via cli":
+        print(f"❌ Unexpected commit marker: {results['router1']['last_commit']}")
+        return False
+    print("✅ Checksum matches golden .meta sha256")
+    return True
+
+
+async def test_config_read_only_after_commit():
+    """The config is only pulled again after a new commit"""
+    print("\n=== Testing Commit-Keyed Reuse ===")
+    jmcp.config_checksums.clear()
+    pool = FakeSessionPool()
+    await call_tool({"router_names": ["router1"]}, pool)
+    second = await call_tool({"router_names": ["router1"]}, pool)
+    device = pool.sessions["router1"]
+    if device.commands.count(jmcp.CONFIG_SET_COMMAND) != 1 or not second["router1"]["cached"]:
+        print(f"❌ Config re-read without a commit: {device.commands}")
+        return False
+    device.commit = "0   2026-10-16 11:00:00 UTC by admin via cli"
+    third = await call_tool({"router_names": ["router1"]}, pool)
+    if device.commands.count(jmcp.CONFIG_SET_COMMAND) != 2 or third["router1"]["cached"]:
+        print(f"❌ Config not re-read after a commit: {device.commands}")
+        return False
+    print("✅ Config read once per commit")
+    return True
+
+
+async def test_unknown_router_fails():
+    """Unknown routers are reported per router without failing the call"""
+    print("\n=== Testing Unknown Router ===")
+    results = await call_tool({"router_names": ["router1", "nope"]}, FakeSessionPool())
+    if results["nope"]["status"] != "failed" or results["router1"]["status"] != "success":
+        print(f"❌ Unexpected results: {results}")
+        return False
+    print("✅ Unknown router reported as failed")
+    return True
+
+
+def run_async_test(test_func):
+    """Helper to run async test functions"""
+    return asyncio.run(test_func())
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Config Checksum Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_checksum_matches_golden_meta,
+        test_config_read_only_after_commit,
+        test_unknown_router_fails,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if run_async_test(test):
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for structured (| display json) command output
+"""
+import json
+import sys
+import asyncio
+from unittest.mock import MagicMock
+
+import jmcp
+from utils.junos_json import compact_junos_json, split_json_pipe, structured_cli
+
+RAW_BGP = {
+    "bgp-information": [{
+        "attributes": {"xmlns": "http://xml.juniper.net/junos/21.4R0/junos-routing"},
+        "group-count": [{"data": "1"}],
+        "bgp-peer": [{
+            "attributes": {"junos:style": "terse"},
+            "peer-address": [{"data": "10.0.0.2"}],
+            "peer-state": [{"data": "Established", "attributes": {"junos:format": "Establ"}}],
+            "bgp-rib": [{"name": [{"data": "inet.0"}]}],
+        }],
+    }]
+}
+
+
+def fake_device(reply):
+    """Create a mock PyEZ Device whose cli() returns reply for JSON requests"""
+    device = MagicMock()
+    device.cli = MagicMock(side_effect=lambda cmd, format="text", warning=True:
+                           reply if format == "json" else f"text: {cmd}")
+    return device
+
+
+async def test_split_json_pipe():
+    """Only a trailing '| display json' is recognised"""
+    print("\n=== Testing JSON Pipe Detection ===")
+    cases = {
+        "show bgp summary | display json": ("show bgp summary", True),
+        "show bgp summary |display  JSON ": ("show bgp summary", True),
+        "show bgp summary": ("show bgp summary", False),
+        "show configuration | display json | no-more": ("show configuration | display json | no-more", False),
+    }
+    for command, expected in cases.items():
+        if split_json_pipe(command) != expected:
+            print(f"❌ {command!r} -> {split_json_pipe(command)}, expected {expected}")
+            return False
+    print("✅ Pipe detection correct")
+    return True
+
+
+async def test_compact_drops_wrappers():
+    """Leaf wrappers and attributes are removed, containers stay lists"""
+    print("\n=== Testing Compaction ===")
+    compact = compact_junos_json(RAW_BGP)
+    peer = compact["bgp-information"][0]["bgp-peer"][0]
+    if peer != {"peer-address": "10.0.0.2", "peer-state": "Established", "bgp-rib": [{"name": "inet.0"}]}:
+        print(f"❌ Unexpected peer: {peer}")
+        return False
+    if compact["bgp-information"][0]["group-count"] != "1":
+        print("❌ Leaf value not collapsed")
+        return False
+    if compact_junos_json({"flag": [None], "list": [{"data": "a"}, {"data": "b"}]}) != {"flag": True, "list": ["a", "b"]}:
+        print("❌ Empty leaf or leaf-list not handled")
+        return False
+    print("✅ Compaction correct")
+    return True
+
+
+async def test_structured_cli_returns_compact_json():
+    """JSON commands run with format='json' and come back compact"""
+    print("\n=== Testing structured_cli ===")
+    device = fake_device(RAW_BGP)
+    text = structured_cli(device, "show bgp summary | display json")
+    device.cli.assert_called_once_with("show bgp summary", format="json", warning=False)
+    if " " in text or json.loads(text) != compact_junos_json(RAW_BGP):
+        print(f"❌ Unexpected output: {text}")
+        return False
+    if structured_cli(device, "show bgp summary") is not None:
+        print("❌ Plain commands should not be handled")
+        return False
+    if structured_cli(fake_device(""), "show ldp session | display json") != "{}":
+        print("❌ Empty reply should become an empty object")
+        return False
+    print("✅ structured_cli returned compact JSON")
+    return True
+
+
+async def test_cli_output_routes_by_command():
+    """_cli_output uses JSON RPCs only for '| display json' commands"""
+    print("\n=== Testing _cli_output Routing ===")
+    device = fake_device(json.dumps(RAW_BGP))
+    if jmcp._cli_output(device, "show version") != "text: show version":
+        print("❌ Plain command not run as CLI text")
+        return False
+    structured = json.loads(jmcp._cli_output(device, "show bgp summary | display json"))
+    if structured["bgp-information"][0]["bgp-peer"][0]["peer-state"] != "Established":
+        print(f"❌ Unexpected structured output: {structured}")
+        return False
+    print("✅ Commands routed correctly")
+    return True
+
+
+def run_async_test(test_func):
+    """Helper to run async test functions"""
+    return asyncio.run(test_func())
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Structured JSON Output Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_split_json_pipe,
+        test_compact_drops_wrappers,
+        test_structured_cli_returns_compact_json,
+        test_cli_output_routes_by_command,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if run_async_test(test):
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
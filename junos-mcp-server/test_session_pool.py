@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the persistent per-device session pool (utils/session_pool.py)
+Uses a fake Device so no router is contacted
+"""
+import sys
+import threading
+import time
+
+from jnpr.junos.exception import ConnectClosedError, ConnectError
+
+from utils.session_pool import DeviceSessionPool
+
+PARAMS = {"host": "192.168.1.1", "port": 22, "user": "admin", "password": "secret123",
+          "gather_facts": False, "timeout": 360}
+
+
+class FakeDevice:
+    """Minimal stand-in for jnpr.junos.Device"""
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.hostname = kwargs.get("host")
+        self.connected = False
+        self.open_count = 0
+        self.close_count = 0
+        self.fail_next_cli = False
+        self.timeout = kwargs.get("timeout", 30)
+        FakeDevice.instances.append(self)
+
+    def open(self):
+        self.connected = True
+        self.open_count += 1
+        return self
+
+    def close(self):
+        self.connected = False
+        self.close_count += 1
+
+    def cli(self, command, warning=False):
+        if self.fail_next_cli:
+            self.fail_next_cli = False
+            self.connected = False
+            raise ConnectClosedError(self)
+        return f"output of {command}"
+
+
+def make_pool(**kwargs):
+    FakeDevice.instances = []
+    return DeviceSessionPool(device_factory=FakeDevice, **kwargs)
+
+
+def test_session_reuse():
+    """Sequential commands to one router share a single connection"""
+    print("\n=== Testing Session Reuse ===")
+    pool = make_pool()
+    for _ in range(5):
+        pool.run("r1", PARAMS, lambda dev: dev.cli("show version"))
+
+    stats = pool.stats()
+    if len(FakeDevice.instances) != 1 or stats["opened"] != 1 or stats["reused"] != 4:
+        print(f"❌ Expected 1 connection reused 4 times, got {len(FakeDevice.instances)} devices, stats={stats}")
+        return False
+    print("✅ One connection served 5 commands")
+    return True
+
+
+def test_idle_eviction():
+    """Sessions idle longer than idle_timeout are closed"""
+    print("\n=== Testing Idle Eviction ===")
+    pool = make_pool(idle_timeout=0.05)
+    pool.run("r1", PARAMS, lambda dev: dev.cli("show version"))
+    time.sleep(0.1)
+    evicted = pool.evict_idle()
+
+    dev = FakeDevice.instances[0]
+    if evicted != 1 or dev.connected or pool.stats()["idle"]:
+        print(f"❌ Expected idle session to be evicted, evicted={evicted}, connected={dev.connected}")
+        return False
+    print("✅ Idle session evicted and closed")
+    return True
+
+
+def test_health_check_replaces_dead_session():
+    """A pooled session that dropped while idle is replaced on next use"""
+    print("\n=== Testing Health Check ===")
+    pool = make_pool(health_check_interval=0)
+    pool.run("r1", PARAMS, lambda dev: dev.cli("show version"))
+    FakeDevice.instances[0].connected = False  # Transport died while idle
+    pool.run("r1", PARAMS, lambda dev: dev.cli("show version"))
+
+    if len(FakeDevice.instances) != 2:
+        print(f"❌ Expected a replacement connection, got {len(FakeDevice.instances)} devices")
+        return False
+    print("✅ Dead session replaced with a fresh connection")
+    return True
+
+
+def test_reconnect_on_failure():
+    """A stale pooled session is discarded and the command retried once"""
+    print("\n=== Testing Reconnect on Failure ===")
+    pool = make_pool()
+    pool.run("r1", PARAMS, lambda dev: dev.cli("show version"))
+    FakeDevice.instances[0].fail_next_cli = True
+    result = pool.run("r1", PARAMS, lambda dev: dev.cli("show version"))
+
+    if result != "output of show version" or pool.stats()["reconnects"] != 1:
+        print(f"❌ Expected transparent reconnect, got result={result!r}, stats={pool.stats()}")
+        return False
+    print("✅ Command succeeded after reconnecting")
+    return True
+
+
+def test_max_sessions_per_device():
+    """Concurrent callers never exceed max_sessions_per_device"""
+    print("\n=== Testing Max Sessions per Device ===")
+    pool = make_pool(max_sessions_per_device=2)
+    peak = [0]
+    active = [0]
+    lock = threading.Lock()
+
+    def slow(dev):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return "ok"
+
+    threads = [threading.Thread(target=pool.run, args=("r1", PARAMS, slow)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if peak[0] > 2 or len(FakeDevice.instances) > 2:
+        print(f"❌ Expected at most 2 sessions, peak={peak[0]}, opened={len(FakeDevice.instances)}")
+        return False
+    print(f"✅ Peak concurrency {peak[0]} with {len(FakeDevice.instances)} connection(s)")
+    return True
+
+
+def test_acquire_timeout():
+    """Waiting for a busy router's slot eventually raises ConnectError"""
+    print("\n=== Testing Acquire Timeout ===")
+    pool = make_pool(max_sessions_per_device=1, acquire_timeout=0.05)
+    held = pool.acquire("r1", PARAMS)
+    try:
+        pool.acquire("r1", PARAMS)
+        print("❌ Expected ConnectError while the only slot is held")
+        return False
+    except ConnectError as e:
+        print(f"✅ Correctly raised: {e}")
+        return True
+    finally:
+        pool.release("r1", held)
+
+
+def test_changed_params_invalidate_session():
+    """Editing a device's connection parameters forces a new connection"""
+    print("\n=== Testing Parameter Change ===")
+    pool = make_pool()
+    pool.run("r1", PARAMS, lambda dev: dev.cli("show version"))
+    pool.run("r1", {**PARAMS, "host": "192.168.1.2"}, lambda dev: dev.cli("show version"))
+
+    first = FakeDevice.instances[0]
+    if len(FakeDevice.instances) != 2 or first.connected:
+        print("❌ Expected old session closed and a new one opened")
+        return False
+    print("✅ Session rebuilt for new connection parameters")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("DeviceSessionPool Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_session_reuse,
+        test_idle_eviction,
+        test_health_check_replaces_dead_session,
+        test_reconnect_on_failure,
+        test_max_sessions_per_device,
+        test_acquire_timeout,
+        test_changed_params_invalidate_session,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bounded device worker pool (utils/worker_pool.py)
+Uses plain blocking functions so no router is contacted
+"""
+import sys
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import jmcp
+from utils.session_pool import DeviceSessionPool
+from utils.worker_pool import DeviceWorkerPool
+
+DEVICES = {"router-1": {"ip": "192.168.1.1", "port": 22, "username": "admin",
+                        "auth": {"type": "password", "password": "secret123"}}}
+
+
+class ConcurrencyProbe:
+    """Blocking callable that records peak concurrency per router and overall"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.total_active = 0
+        self.total_peak = 0
+
+    def __call__(self, router_name):
+        with self.lock:
+            self.active[router_name] = self.active.get(router_name, 0) + 1
+            self.peak[router_name] = max(self.peak.get(router_name, 0), self.active[router_name])
+            self.total_active += 1
+            self.total_peak = max(self.total_peak, self.total_active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[router_name] -= 1
+            self.total_active -= 1
+        return f"done {router_name}"
+
+
+async def test_per_device_limit():
+    """No router ever runs more than per_device_limit calls at once"""
+    print("\n=== Testing Per-Device Limit ===")
+    pool = DeviceWorkerPool(max_workers=16, per_device_limit=2)
+    probe = ConcurrencyProbe()
+    await asyncio.gather(*[pool.run("r1", probe, "r1") for _ in range(6)])
+
+    if probe.peak["r1"] != 2:
+        print(f"❌ Expected peak of 2 calls to r1, got {probe.peak['r1']}")
+        return False
+    print("✅ r1 never exceeded 2 concurrent calls")
+    return True
+
+
+async def test_global_limit():
+    """Total concurrency across routers is capped at max_workers"""
+    print("\n=== Testing Global Limit ===")
+    pool = DeviceWorkerPool(max_workers=3, per_device_limit=2)
+    probe = ConcurrencyProbe()
+    routers = [f"r{i}" for i in range(8)]
+    await asyncio.gather(*[pool.run(r, probe, r) for r in routers])
+
+    if probe.total_peak > 3:
+        print(f"❌ Expected at most 3 concurrent workers, got {probe.total_peak}")
+        return False
+    print(f"✅ Peak of {probe.total_peak} workers for {len(routers)} routers")
+    return True
+
+
+async def test_queue_depth_metrics():
+    """Waiting calls are visible as queue depth while they wait"""
+    print("\n=== Testing Queue Depth Metrics ===")
+    pool = DeviceWorkerPool(max_workers=4, per_device_limit=1)
+    probe = ConcurrencyProbe(delay=0.1)
+    tasks = [asyncio.create_task(pool.run("r1", probe, "r1")) for _ in range(4)]
+    await asyncio.sleep(0.05)
+    during = pool.stats()
+    await asyncio.gather(*tasks)
+    after = pool.stats()
+
+    if during["queue_depth"] != 3 or during["queued"] != {"r1": 3} or during["active_workers"] != 1:
+        print(f"❌ Unexpected in-flight stats: {during}")
+        return False
+    if after["queue_depth"] != 0 or after["completed"] != 4 or after["max_queue_depth"] < 3:
+        print(f"❌ Unexpected final stats: {after}")
+        return False
+    print(f"✅ Queue depth peaked at {after['max_queue_depth']}, avg wait {after['avg_wait']}s")
+    return True
+
+
+async def test_event_loop_not_blocked():
+    """The event loop keeps ticking while workers block"""
+    print("\n=== Testing Event Loop Responsiveness ===")
+    pool = DeviceWorkerPool(max_workers=2, per_device_limit=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    tick_task = asyncio.create_task(ticker())
+    await pool.run("r1", time.sleep, 0.2)
+    tick_task.cancel()
+
+    if ticks < 5:
+        print(f"❌ Event loop looked blocked, only {ticks} ticks")
+        return False
+    print(f"✅ Event loop ticked {ticks} times during a blocking call")
+    return True
+
+
+async def test_failures_counted():
+    """Exceptions propagate to the caller and are counted"""
+    print("\n=== Testing Failure Accounting ===")
+    pool = DeviceWorkerPool(max_workers=2, per_device_limit=1)
+
+    def boom():
+        raise RuntimeError("boom")
+
+    try:
+        await pool.run("r1", boom)
+        print("❌ Expected RuntimeError to propagate")
+        return False
+    except RuntimeError:
+        pass
+    stats = pool.stats()
+    if stats["failed"] != 1 or stats["active_workers"] != 0:
+        print(f"❌ Unexpected stats after failure: {stats}")
+        return False
+    print("✅ Failure propagated and counted")
+    return True
+
+
+async def test_handler_uses_worker_pool():
+    """handle_execute_junos_command goes through the shared worker pool"""
+    print("\n=== Testing Handler Integration ===")
+    original_devices, original_cli, original_workers = jmcp.devices, jmcp._run_junos_cli_command, jmcp.device_workers
+    jmcp.devices = {"router-1": {"ip": "192.168.1.1", "port": 22, "username": "admin",
+                                 "auth": {"type": "password", "password": "secret123"}}}
+    jmcp._run_junos_cli_command = lambda router, command, timeout: f"output of {command}"
+    jmcp.device_workers = DeviceWorkerPool(max_workers=2, per_device_limit=1)
+    context = MagicMock()
+    context.info = AsyncMock()
+    try:
+        result = await jmcp.handle_execute_junos_command(
+            {"router_name": "router-1", "command": "show version"}, context)
+        stats = jmcp.device_workers.stats()
+    finally:
+        jmcp.devices, jmcp._run_junos_cli_command, jmcp.device_workers = original_devices, original_cli, original_workers
+
+    if result[0].text != "output of show version" or stats["completed"] != 1:
+        print(f"❌ Expected pooled execution, got {result[0].text!r}, stats={stats}")
+        return False
+    print("✅ Handler ran through the worker pool")
+    return True
+
+
+class SlowDevice:
+    """Stand-in for jnpr.junos.Device whose open() blocks like a slow SSH login"""
+
+    def __init__(self, **kwargs):
+        self.connected = False
+        self.timeout = kwargs.get("timeout", 30)
+
+    def open(self):
+        time.sleep(0.2)
+        self.connected = True
+        return self
+
+    def close(self):
+        self.connected = False
+
+
+class FakeConfig:
+    """Stand-in for jnpr.junos.utils.config.Config that records the commit flow"""
+    calls = []
+
+    def __init__(self, dev, mode=None):
+        self.loaded = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def load(self, text, format=None):
+        self.loaded = text
+        FakeConfig.calls.append("load")
+
+    def diff(self):
+        return f"+ {self.loaded}" if self.loaded else None
+
+    def commit_check(self):
+        FakeConfig.calls.append("commit_check")
+        return True
+
+    def commit(self, comment=None):
+        FakeConfig.calls.append("commit")
+
+    def rollback(self):
+        self.loaded = None
+        FakeConfig.calls.append("rollback")
+
+
+def _template_context():
+    context = MagicMock()
+    for level in ("info", "debug", "warning", "error"):
+        setattr(context, level, AsyncMock())
+    return context
+
+
+async def _apply_template(arguments: dict, workers: DeviceWorkerPool = None):
+    """Run handle_render_and_apply_j2_template against SlowDevice/FakeConfig"""
+    saved = jmcp.devices, jmcp.session_pool, jmcp.device_workers, jmcp.Config
+    jmcp.devices = DEVICES
+    jmcp.session_pool = DeviceSessionPool(device_factory=SlowDevice)
+    jmcp.device_workers = workers or DeviceWorkerPool(max_workers=2, per_device_limit=1)
+    jmcp.Config = FakeConfig
+    FakeConfig.calls = []
+    context = _template_context()
+    try:
+        result = await jmcp.handle_render_and_apply_j2_template(
+            {"template_content": "set system host-name {{ name }}", "vars_content": "name: r1",
+             "router_name": "router-1", "apply_config": True, **arguments}, context)
+        stats = jmcp.device_workers.stats()
+    finally:
+        jmcp.devices, jmcp.session_pool, jmcp.device_workers, jmcp.Config = saved
+    messages = [call.args[0] for call in context.info.await_args_list]
+    return result[0].text, messages, stats
+
+
+async def test_template_apply_off_event_loop():
+    """render_and_apply_j2_template connects and commits without blocking the event loop"""
+    print("\n=== Testing Template Apply Off The Event Loop ===")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    tick_task = asyncio.create_task(ticker())
+    text, messages, stats = await _apply_template({})
+    tick_task.cancel()
+
+    if ticks < 5:
+        print(f"❌ Event loop looked blocked during the apply, only {ticks} ticks")
+        return False
+    if "✅ router-1: Configuration committed successfully" not in text or FakeConfig.calls != ["load", "commit_check", "commit"]:
+        print(f"❌ Unexpected apply result {text!r}, calls={FakeConfig.calls}")
+        return False
+    expected = ["Connected to router-1", "Committing configuration on router-1...",
+                "router-1: Configuration committed successfully"]
+    if any(m not in messages for m in expected) or stats["completed"] != 1:
+        print(f"❌ Progress messages not relayed: {messages}, stats={stats}")
+        return False
+    print(f"✅ Event loop ticked {ticks} times; {len(messages)} progress messages relayed")
+    return True
+
+
+async def test_template_apply_shares_device_limit():
+    """Template applies queue behind other calls to the same router on the worker pool"""
+    print("\n=== Testing Template Apply Per-Device Limit ===")
+    workers = DeviceWorkerPool(max_workers=4, per_device_limit=1)
+    probe = ConcurrencyProbe(delay=0.2)
+    busy = asyncio.create_task(workers.run("router-1", probe, "router-1"))
+    await asyncio.sleep(0.02)
+    text, messages, stats = await _apply_template({"dry_run": True}, workers)
+    await busy
+
+    if stats["completed"] != 2 or stats["max_queue_depth"] < 1:
+        print(f"❌ Template apply bypassed the per-device limit: {stats}")
+        return False
+    if "🔍 router-1: Configuration check successful" not in text or FakeConfig.calls[-1] != "rollback":
+        print(f"❌ Dry run should check and roll back, got {text!r}, calls={FakeConfig.calls}")
+        return False
+    if "router-1: Rollback verified successfully - no pending changes" not in messages:
+        print(f"❌ Rollback verification not relayed: {messages}")
+        return False
+    print(f"✅ Apply waited {stats['avg_wait']}s for router-1's slot and rolled back the dry run")
+    return True
+
+
+def run_async_test(test_func):
+    """Helper to run async test functions"""
+    return asyncio.run(test_func())
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("DeviceWorkerPool Unit Tests")
+    print("=" * 60)
+
+    tests = [
+        test_per_device_limit,
+        test_global_limit,
+        test_queue_depth_metrics,
+        test_event_loop_not_blocked,
+        test_failures_counted,
+        test_handler_uses_worker_pool,
+        test_template_apply_off_event_loop,
+        test_template_apply_shares_device_limit,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if run_async_test(test):
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Test Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
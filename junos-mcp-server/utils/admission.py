@@ -0,0 +1,256 @@
+"""
+Admission control for fan-out device operations
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+log = logging.getLogger('jmcp-server.admission')
+
+# Gateway key for devices reached without a jump host
+DIRECT = "direct"
+
+
+@lru_cache(maxsize=256)
+def _proxy_for(ssh_config: str, host: str) -> Optional[str]:
+    """ProxyJump/ProxyCommand used to reach ``host`` according to ``ssh_config``"""
+    try:
+        import paramiko
+        config = paramiko.SSHConfig.from_path(os.path.expanduser(ssh_config))
+        entry = config.lookup(host)
+    except Exception as e:
+        log.debug(f"Could not read ssh_config {ssh_config}: {e}")
+        return None
+    return entry.get('proxyjump') or entry.get('proxycommand')
+
+
+def gateway_for_device(device_info: Dict[str, Any]) -> str:
+    """Name of the jump host a device is reached through
+
+    Devices with an ``ssh_config`` are grouped by the ProxyJump/ProxyCommand
+    that config resolves to for the device IP (falling back to the config path
+    itself). Everything else shares the ``direct`` gateway.
+    """
+    ssh_config = device_info.get('ssh_config')
+    if not ssh_config:
+        return DIRECT
+    proxy = _proxy_for(ssh_config, str(device_info.get('ip', '')))
+    return f"proxy:{proxy}" if proxy else f"ssh_config:{ssh_config}"
+
+
+class TokenBucket:
+    """Token bucket pacing how often new operations may start
+
+    Args:
+        rate: Tokens added per second
+        burst: Maximum tokens held, i.e. how many operations may start back to back
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1.0
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class AIMDWindow:
+    """Concurrency window with additive increase and multiplicative decrease
+
+    Every successful operation grows the window by ``1 / limit`` (about one slot
+    per window's worth of successes). Connect errors count towards a spike score
+    that successes wear down; once it reaches ``spike_threshold`` the window is
+    multiplied by ``decrease_factor``. Errors from operations admitted before the
+    last decrease belong to the spike already handled and are ignored, so one
+    unreachable router never throttles its neighbours.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease_factor: float = 0.5,
+                 spike_threshold: int = 3):
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.spike_threshold = max(1, int(spike_threshold))
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.recent_errors = 0
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self.connect_errors = 0
+
+    def has_room(self) -> bool:
+        return self.in_flight < max(self.min_limit, int(self.limit))
+
+    def on_success(self) -> None:
+        self.recent_errors = max(0, self.recent_errors - 1)
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_connect_error(self, admitted_at: float) -> bool:
+        """Record a connect error; returns True if the window was reduced"""
+        self.connect_errors += 1
+        if admitted_at < self.last_decrease:
+            return False
+        self.recent_errors += 1
+        if self.recent_errors < self.spike_threshold:
+            return False
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self.recent_errors = 0
+        self.last_decrease = time.monotonic()
+        self.decreases += 1
+        return True
+
+
+class AdmissionTicket:
+    """Handed to the admitted caller, who reports the outcome before leaving"""
+
+    __slots__ = ("router_name", "gateway", "admitted_at", "outcome")
+
+    def __init__(self, router_name: str, gateway: str, admitted_at: float):
+        self.router_name = router_name
+        self.gateway = gateway
+        self.admitted_at = admitted_at
+        self.outcome: Optional[str] = None
+
+    def report(self, connect_error: bool) -> None:
+        self.outcome = "connect_error" if connect_error else "success"
+
+
+class AdmissionController:
+    """Paces fan-out operations across the whole server
+
+    An operation is admitted once there is room under the global cap and under
+    its gateway's AIMD window; it then waits for a token from its gateway and
+    device buckets before it starts. Connect errors shrink the gateway window
+    so a struggling jump host sees less load, and successes grow it back.
+
+    Args:
+        max_concurrency: Operations in flight across all gateways
+        gateway_concurrency: Upper bound of each jump host's AIMD window
+        gateway_rate: New operations per second through one jump host
+        device_rate: New operations per second against one device
+        device_burst: Operations that may start back to back on one device
+        decrease_factor: Window multiplier applied on a connect-error spike
+    """
+
+    def __init__(self, max_concurrency: int = 32, gateway_concurrency: int = 8,
+                 gateway_rate: float = 5.0, device_rate: float = 2.0, device_burst: int = 2,
+                 decrease_factor: float = 0.5):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.gateway_concurrency = max(1, int(gateway_concurrency))
+        self.gateway_rate = gateway_rate
+        self.device_rate = device_rate
+        self.device_burst = device_burst
+        self.decrease_factor = decrease_factor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cond: Optional[asyncio.Condition] = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._windows: Dict[str, AIMDWindow] = {}
+        self._gateway_buckets: Dict[str, TokenBucket] = {}
+        self._device_buckets: Dict[str, TokenBucket] = {}
+        self._stats = {"admitted": 0, "paced": 0, "total_wait": 0.0}
+
+    def _ensure_loop(self) -> None:
+        """(Re)build the condition variable for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._cond = asyncio.Condition()
+            self._in_flight = 0
+            self._waiting = 0
+            for window in self._windows.values():
+                window.in_flight = 0
+
+    def _window(self, gateway: str) -> AIMDWindow:
+        window = self._windows.get(gateway)
+        if window is None:
+            # Direct devices have no shared jump host; only the global cap applies
+            limit = self.max_concurrency if gateway == DIRECT else self.gateway_concurrency
+            window = AIMDWindow(limit, decrease_factor=self.decrease_factor)
+            self._windows[gateway] = window
+        return window
+
+    def _pacing_delay(self, router_name: str, gateway: str) -> float:
+        device_bucket = self._device_buckets.get(router_name)
+        if device_bucket is None:
+            device_bucket = TokenBucket(self.device_rate, self.device_burst)
+            self._device_buckets[router_name] = device_bucket
+        delay = device_bucket.reserve()
+        if gateway != DIRECT:
+            gateway_bucket = self._gateway_buckets.get(gateway)
+            if gateway_bucket is None:
+                gateway_bucket = TokenBucket(self.gateway_rate, self.gateway_concurrency)
+                self._gateway_buckets[gateway] = gateway_bucket
+            delay = max(delay, gateway_bucket.reserve())
+        return delay
+
+    @asynccontextmanager
+    async def admit(self, router_name: str, gateway: str = DIRECT):
+        """Wait until ``router_name`` may be contacted; yields an :class:`AdmissionTicket`"""
+        self._ensure_loop()
+        window = self._window(gateway)
+        queued_at = time.monotonic()
+        async with self._cond:
+            self._waiting += 1
+            try:
+                await self._cond.wait_for(
+                    lambda: self._in_flight < self.max_concurrency and window.has_room())
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+            window.in_flight += 1
+            delay = self._pacing_delay(router_name, gateway)
+        ticket = None
+        try:
+            if delay > 0:
+                self._stats["paced"] += 1
+                await asyncio.sleep(delay)
+            self._stats["admitted"] += 1
+            self._stats["total_wait"] += time.monotonic() - queued_at
+            ticket = AdmissionTicket(router_name, gateway, time.monotonic())
+            yield ticket
+        finally:
+            async with self._cond:
+                self._in_flight -= 1
+                window.in_flight -= 1
+                outcome = ticket.outcome if ticket is not None else None
+                if outcome == "success":
+                    window.on_success()
+                elif outcome == "connect_error" and window.on_connect_error(ticket.admitted_at):
+                    log.warning(f"Connect errors through {gateway}; window reduced to {int(window.limit)}")
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of in-flight work, waiters and per-gateway windows"""
+        admitted = self._stats["admitted"]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "admitted": admitted,
+            "paced": self._stats["paced"],
+            "avg_wait": round(self._stats["total_wait"] / admitted, 3) if admitted else 0.0,
+            "gateways": {
+                gateway: {
+                    "limit": int(window.limit),
+                    "max_limit": window.max_limit,
+                    "in_flight": window.in_flight,
+                    "connect_errors": window.connect_errors,
+                    "decreases": window.decreases,
+                }
+                for gateway, window in self._windows.items()
+            },
+        }
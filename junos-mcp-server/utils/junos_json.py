@@ -0,0 +1,54 @@
+"""
+Structured (| display json) command output
+"""
+import json
+import re
+from typing import Any, Optional, Tuple
+
+_JSON_PIPE = re.compile(r"\s*\|\s*display\s+json\s*$", re.IGNORECASE)
+
+
+def split_json_pipe(command: str) -> Tuple[str, bool]:
+    """Strip a trailing ``| display json`` from a CLI command
+
+    Returns:
+        (command without the pipe, True if the pipe was present)
+    """
+    stripped = _JSON_PIPE.sub("", command)
+    return stripped, stripped != command
+
+
+def compact_junos_json(node: Any) -> Any:
+    """Collapse Junos JSON into plain nested data
+
+    Junos wraps every leaf as ``[{"data": value, "attributes": {...}}]`` and
+    every container as a one-element list. Leaves become their value (a list
+    of values for leaf-lists), empty leaves become ``True`` and ``attributes``
+    are dropped. Containers keep their list form so repeated elements such as
+    ``bgp-peer`` always parse the same way whether one or many are present.
+    """
+    if isinstance(node, dict):
+        return {k: compact_junos_json(v) for k, v in node.items() if k != "attributes"}
+    if isinstance(node, list):
+        if node and all(isinstance(e, dict) and "data" in e for e in node):
+            values = [e["data"] for e in node]
+            return values[0] if len(values) == 1 else values
+        if node and all(e is None for e in node):
+            return True
+        return [compact_junos_json(e) for e in node]
+    return node
+
+
+def structured_cli(junos_device: Any, command: str) -> Optional[str]:
+    """Run a ``| display json`` command as a JSON RPC and return compact JSON text
+
+    Returns None when ``command`` does not ask for JSON, so callers fall back
+    to plain CLI text.
+    """
+    base_command, wants_json = split_json_pipe(command)
+    if not wants_json:
+        return None
+    reply = junos_device.cli(base_command, format="json", warning=False)
+    if isinstance(reply, str):
+        reply = json.loads(reply) if reply.strip() else {}
+    return json.dumps(compact_junos_json(reply), separators=(",", ":"))
@@ -0,0 +1,279 @@
+"""
+Persistent per-device NETCONF/SSH session pool
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from jnpr.junos import Device
+from jnpr.junos.exception import ConnectClosedError, ConnectError
+
+log = logging.getLogger('jmcp-server.pool')
+
+# Errors raised when a pooled transport has died underneath us. A session that
+# fails with one of these is discarded and the operation is retried once on a
+# freshly opened connection.
+try:
+    from ncclient.transport.errors import SessionCloseError, TransportError
+    TRANSPORT_ERRORS = (ConnectClosedError, SessionCloseError, TransportError, EOFError, OSError)
+except ImportError:  # pragma: no cover - ncclient is a hard dependency of PyEZ
+    TRANSPORT_ERRORS = (ConnectClosedError, EOFError, OSError)
+
+
+def _params_fingerprint(connect_params: Dict[str, Any]) -> str:
+    """Stable fingerprint of connection parameters, used to detect device edits"""
+    return hashlib.sha256(json.dumps(connect_params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class PooledSession:
+    """A connected Device plus the bookkeeping the pool needs"""
+
+    def __init__(self, device: Device, fingerprint: str):
+        self.device = device
+        self.fingerprint = fingerprint
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+        self.uses = 0
+
+
+class DeviceSessionPool:
+    """Long-lived PyEZ sessions keyed by router name
+
+    Sessions are opened lazily, handed out one caller at a time and returned to
+    an idle list when the caller is done. Each router gets at most
+    ``max_sessions_per_device`` concurrent sessions; extra callers wait for one
+    to be released. Idle sessions are health-checked before reuse and closed
+    once they have been idle for ``idle_timeout`` seconds.
+
+    Args:
+        max_sessions_per_device: Maximum open sessions per router
+        idle_timeout: Seconds a session may stay idle before it is closed
+        health_check_interval: Seconds of idleness after which a session is
+            re-validated before being handed out
+        acquire_timeout: Seconds to wait for a free session slot
+        device_factory: Callable used to build Device objects (tests inject fakes)
+    """
+
+    def __init__(self, max_sessions_per_device: int = 2, idle_timeout: float = 300.0,
+                 health_check_interval: float = 60.0, acquire_timeout: float = 360.0,
+                 device_factory: Callable[..., Any] = Device):
+        self.max_sessions_per_device = max(1, int(max_sessions_per_device))
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._device_factory = device_factory
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List[PooledSession]] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._in_use: Dict[str, int] = {}
+        self._stats = {"opened": 0, "reused": 0, "closed": 0, "evicted": 0,
+                       "health_failures": 0, "reconnects": 0}
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Low-level acquire/release
+    # ------------------------------------------------------------------
+    def _slot(self, router_name: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(router_name)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_sessions_per_device)
+                self._slots[router_name] = slot
+                self._in_use[router_name] = 0
+            return slot
+
+    def _is_healthy(self, session: PooledSession) -> bool:
+        """Cheap liveness check: PyEZ and the ncclient transport both report connected"""
+        dev = session.device
+        try:
+            if not dev.connected:
+                return False
+            conn = getattr(dev, '_conn', None)
+            if conn is not None and not getattr(conn, 'connected', True):
+                return False
+        except Exception:
+            return False
+        return True
+
+    def _close(self, session: PooledSession, router_name: str, reason: str) -> None:
+        log.debug(f"Closing pooled session to {router_name} ({reason})")
+        try:
+            session.device.close()
+        except Exception as e:
+            log.warning(f"Error while closing pooled session to {router_name}: {e}")
+        with self._lock:
+            self._stats["closed"] += 1
+
+    def _open(self, router_name: str, connect_params: Dict[str, Any], fingerprint: str) -> PooledSession:
+        log.debug(f"Opening pooled session to {router_name}")
+        dev = self._device_factory(**connect_params)
+        dev.open()
+        with self._lock:
+            self._stats["opened"] += 1
+        return PooledSession(dev, fingerprint)
+
+    def acquire(self, router_name: str, connect_params: Dict[str, Any]) -> PooledSession:
+        """Check out a connected session for ``router_name``
+
+        Raises:
+            ConnectError: If no slot frees up within ``acquire_timeout`` or the
+                device cannot be reached
+        """
+        self.evict_idle()
+        slot = self._slot(router_name)
+        if not slot.acquire(timeout=self.acquire_timeout):
+            target = SimpleNamespace(hostname=connect_params.get('host', router_name),
+                                     user=connect_params.get('user'), _port=connect_params.get('port'))
+            raise ConnectError(target, msg=f"Timed out waiting for a free session to {router_name}")
+        fingerprint = _params_fingerprint(connect_params)
+        try:
+            while True:
+                with self._lock:
+                    idle = self._idle.get(router_name, [])
+                    session = idle.pop() if idle else None
+                if session is None:
+                    session = self._open(router_name, connect_params, fingerprint)
+                    break
+                if session.fingerprint != fingerprint:
+                    self._close(session, router_name, "connection parameters changed")
+                    continue
+                now = time.monotonic()
+                if now - session.last_used >= self.health_check_interval:
+                    session.last_checked = now
+                    if not self._is_healthy(session):
+                        with self._lock:
+                            self._stats["health_failures"] += 1
+                        self._close(session, router_name, "failed health check")
+                        continue
+                with self._lock:
+                    self._stats["reused"] += 1
+                break
+        except BaseException:
+            slot.release()
+            raise
+        with self._lock:
+            self._in_use[router_name] += 1
+        session.uses += 1
+        return session
+
+    def release(self, router_name: str, session: PooledSession, discard: bool = False) -> None:
+        """Return a session to the pool, or close it when ``discard`` is set"""
+        session.last_used = time.monotonic()
+        if discard or not self._is_healthy(session):
+            self._close(session, router_name, "discarded after use")
+        else:
+            with self._lock:
+                self._idle.setdefault(router_name, []).append(session)
+        with self._lock:
+            self._in_use[router_name] = max(0, self._in_use.get(router_name, 1) - 1)
+        self._slot(router_name).release()
+
+    # ------------------------------------------------------------------
+    # Public helpers
+    # ------------------------------------------------------------------
+    @contextmanager
+    def session(self, router_name: str, connect_params: Dict[str, Any]):
+        """Context manager yielding a connected Device from the pool
+
+        A transport failure inside the block discards the session so the next
+        caller reconnects; any other exception leaves the session pooled.
+        """
+        pooled = self.acquire(router_name, connect_params)
+        discard = False
+        try:
+            yield pooled.device
+        except TRANSPORT_ERRORS:
+            discard = True
+            raise
+        finally:
+            self.release(router_name, pooled, discard=discard)
+
+    def run(self, router_name: str, connect_params: Dict[str, Any], func: Callable[[Any], Any]) -> Any:
+        """Run ``func(device)`` on a pooled session, reconnecting once on transport failure"""
+        pooled = self.acquire(router_name, connect_params)
+        reused = pooled.uses > 1
+        try:
+            result = func(pooled.device)
+        except TRANSPORT_ERRORS as e:
+            self.release(router_name, pooled, discard=True)
+            if not reused:
+                raise
+            log.info(f"Pooled session to {router_name} went stale ({e}); reconnecting")
+            with self._lock:
+                self._stats["reconnects"] += 1
+            with self.session(router_name, connect_params) as dev:
+                return func(dev)
+        except BaseException:
+            self.release(router_name, pooled)
+            raise
+        self.release(router_name, pooled)
+        return result
+
+    def evict_idle(self) -> int:
+        """Close sessions idle for longer than ``idle_timeout``; returns the count closed"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for router_name, idle in self._idle.items():
+                keep = []
+                for session in idle:
+                    if now - session.last_used >= self.idle_timeout:
+                        expired.append((router_name, session))
+                    else:
+                        keep.append(session)
+                self._idle[router_name] = keep
+            self._stats["evicted"] += len(expired)
+        for router_name, session in expired:
+            self._close(session, router_name, "idle timeout")
+        return len(expired)
+
+    def invalidate(self, router_name: Optional[str] = None) -> None:
+        """Close idle sessions for one router, or for every router when omitted"""
+        with self._lock:
+            if router_name is None:
+                victims = [(r, s) for r, idle in self._idle.items() for s in idle]
+                self._idle.clear()
+            else:
+                victims = [(router_name, s) for s in self._idle.pop(router_name, [])]
+        for name, session in victims:
+            self._close(session, name, "invalidated")
+
+    def close_all(self) -> None:
+        """Stop the reaper and close every idle session"""
+        self._reaper_stop.set()
+        self.invalidate()
+
+    def start_reaper(self, interval: Optional[float] = None) -> None:
+        """Start a daemon thread that periodically evicts idle sessions"""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        interval = interval or max(1.0, min(self.idle_timeout, self.health_check_interval) / 2)
+        self._reaper_stop.clear()
+
+        def _reap():
+            while not self._reaper_stop.wait(interval):
+                try:
+                    self.evict_idle()
+                except Exception as e:
+                    log.warning(f"Session reaper error: {e}")
+
+        self._reaper = threading.Thread(target=_reap, name="jmcp-session-reaper", daemon=True)
+        self._reaper.start()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters and per-router session usage"""
+        with self._lock:
+            return {
+                **self._stats,
+                "max_sessions_per_device": self.max_sessions_per_device,
+                "idle_timeout": self.idle_timeout,
+                "idle": {r: len(s) for r, s in self._idle.items() if s},
+                "in_use": {r: n for r, n in self._in_use.items() if n},
+            }
@@ -0,0 +1,111 @@
+"""
+Bounded worker pool for blocking device I/O
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+import anyio
+
+log = logging.getLogger('jmcp-server.workers')
+
+
+class DeviceWorkerPool:
+    """Runs synchronous PyEZ calls off the event loop with bounded concurrency
+
+    Every call is admitted through a per-device semaphore (so one router never
+    holds more than ``per_device_limit`` worker threads) and then executed on a
+    shared thread limiter of ``max_workers`` threads. Calls that are waiting for
+    either limit are counted as queued, which makes queue depth visible via
+    :meth:`stats`.
+
+    Args:
+        max_workers: Total worker threads available for device I/O
+        per_device_limit: Maximum concurrent calls to a single router
+    """
+
+    def __init__(self, max_workers: int = 32, per_device_limit: int = 2):
+        self.max_workers = max(1, int(max_workers))
+        self.per_device_limit = max(1, int(per_device_limit))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self._thread_limiter: Optional[anyio.CapacityLimiter] = None
+        self._device_slots: Dict[str, anyio.Semaphore] = {}
+        self._queued: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0,
+                       "max_queue_depth": 0, "total_wait": 0.0, "total_run": 0.0}
+
+    def _ensure_loop(self) -> None:
+        """(Re)build the async primitives for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._limiter = anyio.CapacityLimiter(self.max_workers)
+            # Thread cap for blocking device calls: max_workers instead of anyio's default of 40
+            self._thread_limiter = anyio.CapacityLimiter(self.max_workers)
+            self._device_slots = {}
+
+    def _device_slot(self, router_name: str) -> anyio.Semaphore:
+        slot = self._device_slots.get(router_name)
+        if slot is None:
+            slot = anyio.Semaphore(self.per_device_limit)
+            self._device_slots[router_name] = slot
+        return slot
+
+    @asynccontextmanager
+    async def _admit(self, router_name: str):
+        """Wait for a per-device slot and a worker, tracking queue depth while waiting"""
+        self._ensure_loop()
+        self._stats["submitted"] += 1
+        self._queued[router_name] = self._queued.get(router_name, 0) + 1
+        depth = sum(self._queued.values())
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        queued_at = time.monotonic()
+        dequeued = False
+        try:
+            async with self._device_slot(router_name), self._limiter:
+                self._queued[router_name] -= 1
+                dequeued = True
+                self._stats["total_wait"] += time.monotonic() - queued_at
+                yield
+        finally:
+            if not dequeued:
+                self._queued[router_name] -= 1
+
+    async def run(self, router_name: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` in a worker thread on behalf of ``router_name``"""
+        async with self._admit(router_name):
+            self._active[router_name] = self._active.get(router_name, 0) + 1
+            started = time.monotonic()
+            try:
+                result = await anyio.to_thread.run_sync(func, *args, limiter=self._thread_limiter)
+            except BaseException:
+                self._stats["failed"] += 1
+                raise
+            else:
+                self._stats["completed"] += 1
+                return result
+            finally:
+                self._stats["total_run"] += time.monotonic() - started
+                self._active[router_name] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, active workers and cumulative counters"""
+        finished = self._stats["completed"] + self._stats["failed"]
+        return {
+            "max_workers": self.max_workers,
+            "per_device_limit": self.per_device_limit,
+            "queue_depth": sum(self._queued.values()),
+            "active_workers": sum(self._active.values()),
+            "queued": {r: n for r, n in self._queued.items() if n},
+            "active": {r: n for r, n in self._active.items() if n},
+            "submitted": self._stats["submitted"],
+            "completed": self._stats["completed"],
+            "failed": self._stats["failed"],
+            "max_queue_depth": self._stats["max_queue_depth"],
+            "avg_wait": round(self._stats["total_wait"] / self._stats["submitted"], 3) if self._stats["submitted"] else 0.0,
+            "avg_run": round(self._stats["total_run"] / finished, 3) if finished else 0.0,
+        }
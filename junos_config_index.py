@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Junos Config Index — single-pass indexer for golden `set` configs
+
+The CLI and web UI topology builders, config search and other golden-config
+consumers all used to re-read every golden_configs/*.conf and try a list of
+regexes against every line. This module reads each config once, dispatches
+each line on its leading `set <stanza>` tokens, and keeps a compact
+per-router index of the statements those consumers need:
+
+  interfaces  — {name: {"description": str|None, "addresses": [inet prefix]}}
+  loopback    — lo0 unit 0 /32 address (without mask) or None
+  protocols   — {proto: {"interfaces": [base names], ...}}
+                bgp also has "neighbors" (IPv4, first-seen order) and "groups";
+                isis also has "metrics" {interface: metric}
+  instances   — [{"name": ..., "type": ...}] from routing-instances
+  lines       — the raw config lines (for line-numbered search)
+
+Indexes are cached per file against (mtime, size), so re-loading a
+directory only re-indexes configs that changed.
+
+ConfigSearchIndex layers a trigram -> routers inverted index on top, so
+substring, regex (pre-filtered by the pattern's literal trigrams) and
+stanza-scoped searches only scan the lines of routers that can match.
+
+Usage:
+  from junos_config_index import config_index, config_search
+  signature, indexes = config_index.snapshot(GOLDEN_CONFIG_DIR)
+  for router, idx in indexes.items():
+      idx["interfaces"], idx["protocols"].get("isis", {})
+  config_search.search(GOLDEN_CONFIG_DIR, "neighbor 10.255", stanza="protocols bgp")
+"""
+
+import re
+import threading
+from pathlib import Path
+
+try:
+    import re._parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+# Interfaces the topology builders treat as physical links
+PHYSICAL_INTERFACE = re.compile(r"ge-\d+/\d+/\d+")
+
+_IPV4 = re.compile(r"\d+\.\d+\.\d+\.\d+")
+_IPV4_PREFIX = re.compile(r"\d+\.\d+\.\d+\.\d+/\d+")
+
+
+def _new_index(lines: list) -> dict:
+    return {"interfaces": {}, "loopback": None, "protocols": {}, "instances": [], "lines": lines}
+
+
+def _append_unique(items: list, value):
+    if value not in items:
+        items.append(value)
+
+
+def _index_interface(index: dict, tokens: list, line: str):
+    """set interfaces <name> description <text> | unit <n> family inet address <prefix>"""
+    if len(tokens) < 4:
+        return
+    name = tokens[2]
+    intf = index["interfaces"].setdefault(name, {"description": None, "addresses": []})
+    if tokens[3] == "description" and len(tokens) > 4:
+        desc = line.split(None, 4)[4].rstrip()
+        desc = desc[1:] if desc.startswith('"') else desc
+        intf["description"] = desc[:-1] if desc.endswith('"') and len(desc) > 1 else desc
+    elif tokens[3] == "unit" and len(tokens) > 8 and tokens[5:8] == ["family", "inet", "address"]:
+        m = _IPV4_PREFIX.match(tokens[8])
+        if not m:
+            return
+        _append_unique(intf["addresses"], m.group(0))
+        if name == "lo0" and tokens[4] == "0" and m.group(0).endswith("/32"):
+            index["loopback"] = m.group(0)[:-3]
+
+
+def _index_protocol(index: dict, tokens: list, line: str):
+    """set protocols <proto> interface <name>[.unit] ... | bgp group <g> neighbor <ip>"""
+    if len(tokens) < 3:
+        return
+    proto = index["protocols"].setdefault(tokens[2], {"interfaces": []})
+    if len(tokens) > 4 and tokens[3] == "interface":
+        base = tokens[4].split(".", 1)[0]
+        _append_unique(proto["interfaces"], base)
+        # isis interface <name>.<unit> level <n> metric <m>
+        if (len(tokens) > 8 and tokens[2] == "isis" and tokens[5] == "level"
+                and tokens[7] == "metric" and tokens[8].isdigit()):
+            proto.setdefault("metrics", {})[base] = int(tokens[8])
+    elif len(tokens) > 6 and tokens[2] == "bgp" and tokens[3] == "group" and tokens[5] == "neighbor":
+        m = _IPV4.match(tokens[6])
+        if m:
+            _append_unique(proto.setdefault("neighbors", []), m.group(0))
+            _append_unique(proto.setdefault("groups", {}).setdefault(tokens[4], []), m.group(0))
+
+
+def _index_instance(index: dict, tokens: list, line: str):
+    """set routing-instances <name> instance-type <type>"""
+    if len(tokens) > 4 and tokens[3] == "instance-type":
+        instance = {"name": tokens[2], "type": tokens[4]}
+        if instance not in index["instances"]:
+            index["instances"].append(instance)
+
+
+# `set <stanza>` dispatch table — every other stanza is skipped after one dict lookup
+_STANZA_HANDLERS = {
+    "interfaces": _index_interface,
+    "protocols": _index_protocol,
+    "routing-instances": _index_instance,
+}
+
+
+def index_config(text) -> dict:
+    """Index one Junos `set`-format config (text or list of lines) in a single pass."""
+    lines = text.splitlines() if isinstance(text, str) else list(text)
+    index = _new_index(lines)
+    for raw in lines:
+        line = raw.strip()
+        if not line.startswith("set "):
+            continue
+        tokens = line.split()
+        handler = _STANZA_HANDLERS.get(tokens[1]) if len(tokens) > 1 else None
+        if handler:
+            handler(index, tokens, line)
+    return index
+
+
+def protocol_interfaces(index: dict, proto: str) -> list:
+    """Interfaces (base names) a protocol runs on."""
+    return index["protocols"].get(proto, {}).get("interfaces", [])
+
+
+class ConfigIndexCache:
+    """Per-file index cache, invalidated by (mtime, size)."""
+
+    def __init__(self):
+        self._entries = {}  # path -> ((mtime_ns, size), index)
+        self._lock = threading.Lock()
+
+    def snapshot(self, directory) -> tuple:
+        """Index every *.conf in directory, re-indexing only changed files.
+
+        Returns (signature, {router: index}) in router-name order, where the
+        signature changes whenever any config is added, removed or modified."""
+        directory = Path(directory)
+        stats = []
+        for path in sorted(directory.glob("*.conf")) if directory.is_dir() else []:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            stats.append((path, (st.st_mtime_ns, st.st_size)))
+
+        indexes = {}
+        with self._lock:
+            for path, key in stats:
+                cached = self._entries.get(str(path))
+                if cached and cached[0] == key:
+                    indexes[path.stem] = cached[1]
+                    continue
+                try:
+                    index = index_config(path.read_text())
+                except Exception:
+                    continue
+                self._entries[str(path)] = (key, index)
+                indexes[path.stem] = index
+            # Forget configs deleted from this directory
+            live = {str(path) for path, _ in stats}
+            for stale in [p for p in self._entries
+                          if Path(p).parent == directory and p not in live]:
+                del self._entries[stale]
+        signature = (str(directory), tuple((path.stem, key) for path, key in stats
+                                           if path.stem in indexes))
+        return signature, indexes
+
+    def load(self, directory) -> dict:
+        """{router: index} for every *.conf in directory."""
+        return self.snapshot(directory)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache shared by the CLI and web UI
+config_index = ConfigIndexCache()
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _regex_literals(pattern: str) -> list:
+    """Literal runs every match of pattern must contain (top-level sequence only)."""
+    runs, current = [], []
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except Exception:
+        return []
+    for op, arg in parsed:
+        if op is _sre_parse.LITERAL:
+            current.append(chr(arg))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return [run.lower() for run in runs]
+
+
+class ConfigSearchIndex:
+    """Trigram -> routers inverted index over the golden configs.
+
+    Built from the shared ConfigIndexCache, so a synced config is picked up
+    (and only that router re-indexed) on the next search. Lines are kept
+    lower-cased in memory; a query scans only the routers holding every
+    trigram of its literal text."""
+
+    def __init__(self, cache: ConfigIndexCache = None):
+        self.cache = cache or config_index
+        self._dirs = {}  # directory -> {"routers": {router: entry}, "postings": {trigram: set(router)}}
+        self._lock = threading.Lock()
+
+    def refresh(self, directory) -> dict:
+        """Bring the index up to date with directory, re-indexing changed routers."""
+        indexes = self.cache.load(directory)
+        with self._lock:
+            state = self._dirs.setdefault(str(directory), {"routers": {}, "postings": {}})
+            routers, postings = state["routers"], state["postings"]
+            for router in [r for r, entry in routers.items()
+                           if indexes.get(r) is not entry["index"]]:
+                for gram in routers.pop(router)["trigrams"]:
+                    holders = postings.get(gram)
+                    if holders:
+                        holders.discard(router)
+                        if not holders:
+                            del postings[gram]
+            for router, idx in indexes.items():
+                if router in routers:
+                    continue
+                lowered = [line.lower() for line in idx["lines"]]
+                grams = set()
+                for line in lowered:
+                    grams |= _trigrams(line)
+                routers[router] = {"index": idx, "lowered": lowered, "trigrams": grams}
+                for gram in grams:
+                    postings.setdefault(gram, set()).add(router)
+            return state
+
+    def _candidates(self, directory, literals: list) -> list:
+        """[(router, entry)] whose configs contain every trigram of literals."""
+        grams = set()
+        for literal in literals:
+            grams |= _trigrams(literal)
+        state = self.refresh(directory)
+        with self._lock:
+            routers = set(state["routers"])
+            for gram in sorted(grams, key=lambda g: len(state["postings"].get(g, ()))):
+                routers &= state["postings"].get(gram, set())
+                if not routers:
+                    break
+            return [(router, state["routers"][router]) for router in sorted(routers)]
+
+    def routers_containing(self, directory, text: str) -> list:
+        """Routers whose config contains text (case-insensitive)."""
+        needle = text.lower()
+        return [router for router, entry in self._candidates(directory, [needle])
+                if any(needle in low for low in entry["lowered"])]
+
+    def search(self, directory, pattern: str, regex: bool = False, stanza: str = None) -> list:
+        """Lines matching pattern (case-insensitive), as {"router", "line", "text"}.
+
+        stanza restricts matches to statements under it, e.g. "protocols bgp"."""
+        if regex:
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error:
+                return []
+            literals = _regex_literals(pattern)
+        else:
+            needle = pattern.lower()
+            literals = [needle]
+        prefix = ("set " + " ".join(stanza.lower().split())) if stanza else None
+
+        results = []
+        for router, entry in self._candidates(directory, literals):
+            lines = entry["index"]["lines"]
+            for i, low in enumerate(entry["lowered"]):
+                if prefix:
+                    stripped = low.lstrip()
+                    if not (stripped.startswith(prefix)
+                            and stripped[len(prefix):len(prefix) + 1] in ("", " ")):
+                        continue
+                if regex:
+                    if not compiled.search(lines[i]):
+                        continue
+                elif needle not in low:
+                    continue
+                results.append({"router": router, "line": i + 1, "text": lines[i].strip()})
+        return results
+
+
+# Process-wide search index over config_index
+config_search = ConfigSearchIndex()
@@ -3,8 +3,9 @@
 Knowledge Base Vector Store v2.0 — Enhanced RAG Engine for Junos AI Brain
 
 Chunks the KNOWLEDGE_BASE.md into semantic sections, embeds them using
-a local Ollama embedding model, stores vectors in a local pickle file,
-and provides semantic retrieval at query time.
+a local Ollama embedding model, stores unit-normalized vectors in a
+memory-mapped .npy file (metadata in a JSON sidecar), and provides
+semantic retrieval at query time.
 
 v2.0 Enhancements over v1.0:
   - Heading-anchored embeddings: each chunk is embedded with its section/heading
@@ -19,8 +20,16 @@ Architecture:
   1. CHUNK: Split KB into ~200-400 token chunks by section/subsection
   2. ANCHOR: Prepend section + heading context to each chunk before embedding
   3. EMBED: Use nomic-embed-text via Ollama API to vectorize each anchored chunk
-  4. STORE: Save embeddings + metadata to .pkl file (auto-rebuilds on KB change)
-  5. RETRIEVE: Multi-query embed → cosine similarity + keyword boost → threshold → top-K
+  4. STORE: Save unit-normalized embeddings to kb_vectors.<hash>.npy and chunk
+     metadata to kb_vectors.json (auto-rebuilds on KB change). The matrix is
+     opened with mmap_mode='r', so every web worker and CLI process shares
+     the same page-cached copy instead of unpickling its own. Each chunk
+     records a hash of its anchored text, so when the KB changes only new
+     or edited chunks are re-embedded; removed chunks drop out of the store.
+  5. RETRIEVE: Multi-query embed → dot product (cosine) + keyword boost → threshold → top-K
+     Query embeddings are kept in an LRU cache keyed by (model, anchored
+     text) and persisted to kb_query_cache.npz, so repeated and templated
+     queries (e.g. the audit specialists' fixed queries) skip Ollama.
 
 Usage:
   from kb_vectorstore import KBVectorStore
@@ -32,17 +41,38 @@ import os
 import re
 import json
 import time
+import glob
+import atexit
+import threading
+from collections import OrderedDict
 import pickle
 import hashlib
 import asyncio
 import numpy as np
 import httpx
 
+from http_clients import http_clients
+
 # ── Configuration ────────────────────────────────────────────
 OLLAMA_URL = "http://127.0.0.1:11434"
 EMBED_MODEL = "nomic-embed-text"           # 274MB, 768-dim, fast
 KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "KNOWLEDGE_BASE.md")
-VECTOR_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_vectors.pkl")
+VECTOR_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_vectors.json")
+LEGACY_VECTOR_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_vectors.pkl")
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_vectors.partial.npz")
+
+# Embedding pipeline (embed_batch)
+EMBED_CONCURRENCY = 4         # Batches in flight against the embedding server
+EMBED_BATCH_SIZE = 16         # Starting batch size; adapted to measured throughput
+EMBED_MAX_BATCH = 256         # Upper bound on texts per request
+EMBED_MAX_BATCH_CHARS = 64000 # Upper bound on request payload (sum of text lengths)
+EMBED_TARGET_SECONDS = 2.0    # Aim for requests of about this duration
+CHECKPOINT_INTERVAL = 5.0     # Seconds between build checkpoints
+
+# Query-embedding cache
+QUERY_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_query_cache.npz")
+QUERY_CACHE_SIZE = 2048           # Query vectors kept (LRU)
+QUERY_CACHE_SAVE_INTERVAL = 30.0  # Seconds between writes of new entries to disk
 
 # Chunking parameters
 MIN_CHUNK_CHARS = 100       # Skip chunks smaller than this
@@ -52,7 +82,7 @@ OVERLAP_CHARS = 150         # Overlap between split chunks for context continuit
 # v2.0 Retrieval parameters
 MIN_RELEVANCE_SCORE = 0.55  # Filter out chunks below this cosine similarity
 KEYWORD_BOOST = 0.12        # Score boost when query keyword matches section name
-STORE_VERSION = "2.0"       # Cache version — forces rebuild on version change
+STORE_VERSION = "3.0"       # Cache version — forces rebuild on version change
 
 # Protocol keyword map for section-aware boosting (Enhancement D)
 PROTOCOL_KEYWORDS = {
@@ -198,64 +228,241 @@ def _split_large_chunk(text: str, parent: dict, max_size: int, overlap: int) ->
     return sub_chunks
 
 
+def anchor_chunk(chunk: dict) -> str:
+    """Heading-anchored text embedded for a chunk (Enhancement A)."""
+    return f"Topic: {chunk['section']} | {chunk['heading']}\n\n{chunk['text']}"
+
+
+def chunk_hash(anchored: str, model: str | None = None) -> str:
+    """Content hash identifying a chunk's embedding: same text + model → same vector."""
+    return hashlib.sha256(f"{model or EMBED_MODEL}\0{anchored}".encode()).hexdigest()[:32]
+
+
 # ══════════════════════════════════════════════════════════════
 #  EMBEDDING ENGINE
 # ══════════════════════════════════════════════════════════════
 
-async def embed_text(text: str, _retries: int = 3) -> np.ndarray:
-    """Embed a single text using Ollama's embedding API (with retry + backoff)."""
-    last_exc = None
-    for attempt in range(1, _retries + 1):
-        try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                resp = await client.post(f"{OLLAMA_URL}/api/embed", json={
-                    "model": EMBED_MODEL,
-                    "input": text,
-                })
-                data = resp.json()
-                # Ollama returns {"embeddings": [[...]]}
-                return np.array(data["embeddings"][0], dtype=np.float32)
-        except (httpx.ReadTimeout, httpx.ConnectTimeout, httpx.TimeoutException) as exc:
-            last_exc = exc
-            if attempt < _retries:
-                wait = 2 ** attempt  # 2s, 4s
-                await asyncio.sleep(wait)
-    raise last_exc  # type: ignore[misc]
-
-
-async def embed_batch(texts: list[str], batch_size: int = 10, _retries: int = 3) -> list[np.ndarray]:
-    """Embed multiple texts in batches for efficiency (with retry + backoff)."""
-    all_embeddings = []
+class _AdaptiveBatcher:
+    """Hands out (indices, texts) batches sized to the embedding server's measured speed.
+    
+    A batch is cut at `size` texts or EMBED_MAX_BATCH_CHARS characters,
+    whichever comes first. After each request the per-text latency is
+    folded into a moving average and `size` is retargeted so a request
+    takes about EMBED_TARGET_SECONDS; a timeout halves it.
+    """
+    
+    def __init__(self, texts: list[str], size: int):
+        self.texts = texts
+        self.next = 0
+        self.size = max(1, min(size, EMBED_MAX_BATCH))
+        self.per_text: float | None = None  # EMA seconds per text
+    
+    def take(self) -> tuple[list[int], list[str]] | None:
+        if self.next >= len(self.texts):
+            return None
+        start, chars = self.next, 0
+        end = start
+        while end < len(self.texts) and end - start < self.size:
+            chars += len(self.texts[end])
+            if chars > EMBED_MAX_BATCH_CHARS and end > start:
+                break
+            end += 1
+        self.next = end
+        return list(range(start, end)), self.texts[start:end]
+    
+    def record(self, count: int, elapsed: float):
+        sample = elapsed / max(count, 1)
+        self.per_text = sample if self.per_text is None else 0.7 * self.per_text + 0.3 * sample
+        target = int(EMBED_TARGET_SECONDS / max(self.per_text, 1e-4))
+        # Move at most 2x per step so one outlier doesn't swing the size
+        self.size = max(1, min(EMBED_MAX_BATCH, self.size * 2, max(self.size // 2, target)))
+    
+    def timed_out(self):
+        self.size = max(1, self.size // 2)
+
+
+async def embed_batch(texts: list[str], batch_size: int = EMBED_BATCH_SIZE, _retries: int = 3,
+                      concurrency: int = EMBED_CONCURRENCY, on_batch=None) -> list[np.ndarray]:
+    """Embed many texts with a pipelined, adaptive batcher (with retry + backoff).
+    
+    Up to `concurrency` requests are in flight at once on the pooled
+    keep-alive "embed" client; batch_size is only the starting size (see
+    _AdaptiveBatcher). on_batch(indices, vectors) is called as each batch
+    completes, so callers can checkpoint partial progress. Results are
+    returned in input order. If a batch fails, no new batches are started
+    but those already in flight finish (and reach on_batch) before the
+    error is raised.
+    """
     total = len(texts)
+    results: list = [None] * total
+    batcher = _AdaptiveBatcher(texts, batch_size)
+    done = 0
+    failed = False
     
-    for i in range(0, total, batch_size):
-        batch = texts[i:i + batch_size]
+    async def post(batch: list[str]) -> list[np.ndarray]:
         last_exc = None
         for attempt in range(1, _retries + 1):
             try:
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    resp = await client.post(f"{OLLAMA_URL}/api/embed", json={
-                        "model": EMBED_MODEL,
-                        "input": batch,
-                    })
-                    data = resp.json()
-                    for emb in data["embeddings"]:
-                        all_embeddings.append(np.array(emb, dtype=np.float32))
-                    break  # success — exit retry loop
+                client = http_clients.get("embed")
+                started = time.monotonic()
+                resp = await client.post(f"{OLLAMA_URL}/api/embed", json={
+                    "model": EMBED_MODEL,
+                    "input": batch,
+                })
+                data = resp.json()
+                batcher.record(len(batch), time.monotonic() - started)
+                return [np.array(emb, dtype=np.float32) for emb in data["embeddings"]]
             except (httpx.ReadTimeout, httpx.ConnectTimeout, httpx.TimeoutException) as exc:
                 last_exc = exc
+                batcher.timed_out()
                 if attempt < _retries:
-                    wait = 2 ** attempt
+                    wait = 2 ** attempt  # 2s, 4s
                     await asyncio.sleep(wait)
-        else:
-            # All retries exhausted for this batch
-            raise last_exc  # type: ignore[misc]
-        
-        done = min(i + batch_size, total)
-        if total > batch_size:
-            print(f"      ▸ Embedded {done}/{total} chunks...")
+        # All retries exhausted for this batch
+        raise last_exc  # type: ignore[misc]
     
-    return all_embeddings
+    async def worker():
+        nonlocal done, failed
+        while not failed and (batch := batcher.take()) is not None:
+            indices, batch_texts = batch
+            try:
+                vectors = await post(batch_texts)
+            except Exception:
+                failed = True
+                raise
+            for i, vec in zip(indices, vectors):
+                results[i] = vec
+            done += len(indices)
+            if on_batch is not None:
+                on_batch(indices, vectors)
+            if total > batch_size:
+                print(f"      ▸ Embedded {done}/{total} chunks (batch {len(indices)})...")
+    
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, total)))]
+    try:
+        outcomes = await asyncio.gather(*workers, return_exceptions=True)
+    except BaseException:
+        # Cancelled from outside: abandon in-flight requests too
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    return results
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of query embeddings keyed by (model, anchored text), persisted to disk.
+    
+    The file records the model it was built with; a cache written under a
+    different EMBED_MODEL is discarded on load. New entries are flushed at
+    most every QUERY_CACHE_SAVE_INTERVAL seconds and at interpreter exit.
+    """
+    
+    def __init__(self, path: str | None = None, size: int = QUERY_CACHE_SIZE):
+        self.path = path
+        self.size = size
+        self._entries: OrderedDict = OrderedDict()  # (model, text) -> vector
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._last_saved = 0.0
+        self.hits = 0
+        self.misses = 0
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        path = self.path or QUERY_CACHE_PATH
+        if not os.path.exists(path):
+            return
+        try:
+            with np.load(path) as data:
+                if str(data['model']) != EMBED_MODEL:
+                    print(f"   ↻ Embedding model changed — discarding {os.path.basename(path)}")
+                    return
+                for text, vec in zip(data['texts'].tolist(), data['vectors']):
+                    self._entries[(EMBED_MODEL, text)] = vec
+        except Exception as e:
+            print(f"   ▲  Query cache unreadable ({e}) — starting empty")
+            self._entries.clear()
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+    
+    def get(self, text: str) -> np.ndarray | None:
+        with self._lock:
+            self._ensure_loaded()
+            vec = self._entries.get((EMBED_MODEL, text))
+            if vec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((EMBED_MODEL, text))
+            self.hits += 1
+            return vec
+    
+    def put(self, text: str, vec: np.ndarray):
+        with self._lock:
+            self._ensure_loaded()
+            self._entries[(EMBED_MODEL, text)] = vec
+            self._entries.move_to_end((EMBED_MODEL, text))
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+            self._dirty = True
+        if time.monotonic() - self._last_saved >= QUERY_CACHE_SAVE_INTERVAL:
+            self.save()
+    
+    def save(self):
+        """Write entries for the current model to disk (atomic rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            items = [(text, vec) for (model, text), vec in self._entries.items() if model == EMBED_MODEL]
+            self._dirty = False
+            self._last_saved = time.monotonic()
+        if not items:
+            return
+        path = self.path or QUERY_CACHE_PATH
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                np.savez(f, model=np.array(EMBED_MODEL),
+                         texts=np.array([text for text, _ in items]),
+                         vectors=np.stack([vec for _, vec in items]))
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"   ▲  Could not save query cache ({e})")
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = False
+            self.hits = self.misses = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            self._ensure_loaded()
+            return {'entries': len(self._entries), 'size': self.size,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+# Process-wide query cache shared by every KBVectorStore
+query_cache = QueryEmbeddingCache()
+atexit.register(query_cache.save)
+
+
+async def embed_queries(texts: list[str]) -> list[np.ndarray]:
+    """Embed anchored query texts, serving repeats from query_cache."""
+    vectors: list = [query_cache.get(t) for t in texts]
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if missing:
+        fresh = dict(zip(missing, await embed_batch(missing)))
+        for text, vec in fresh.items():
+            query_cache.put(text, vec)
+        vectors = [fresh[t] if v is None else v for t, v in zip(texts, vectors)]
+    return vectors
 
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
@@ -267,14 +474,9 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(dot / norm)
 
 
-def cosine_similarity_batch(query_vec: np.ndarray, matrix: np.ndarray) -> np.ndarray:
-    """Compute cosine similarity between query and all rows in matrix. Returns array of scores."""
-    # Normalize
-    query_norm = query_vec / (np.linalg.norm(query_vec) + 1e-10)
-    norms = np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-10
-    matrix_norm = matrix / norms
-    # Dot product = cosine similarity (both normalized)
-    return matrix_norm @ query_norm
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length (the store keeps embeddings this way)."""
+    return matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-10)
 
 
 def _keyword_in_text(keyword: str, text: str) -> bool:
@@ -291,6 +493,72 @@ def _keyword_in_text(keyword: str, text: str) -> bool:
     return bool(re.search(r'\b' + re.escape(keyword) + r'\b', text))
 
 
+_PROTOCOLS = list(PROTOCOL_KEYWORDS)
+_TOKEN_RE = re.compile(r'[a-z0-9\-]+')
+
+
+def _protocol_mask(text: str) -> np.ndarray:
+    """Boolean vector over PROTOCOL_KEYWORDS groups: which protocols text mentions."""
+    return np.array([any(_keyword_in_text(kw, text) for kw in PROTOCOL_KEYWORDS[p])
+                     for p in _PROTOCOLS], dtype=bool)
+
+
+class KeywordBoostIndex:
+    """Per-chunk keyword-boost features, precomputed once per store.
+
+    The section-aware boost only depends on each chunk's (immutable)
+    section/heading and on the query, so chunk-side work is done here:
+
+      context  — (N, P) protocol mentioned in "section heading"
+      both     — (N, P) protocol mentioned in the section AND the heading
+      tokens   — heading token IDs, flattened with their chunk row (sparse
+                 chunk × vocabulary incidence)
+
+    A query then costs a protocol match over P groups, two (N, P) @ (P,)
+    products and one bincount over the heading tokens.
+    """
+
+    def __init__(self, chunks: list[dict]):
+        n = len(chunks)
+        self.context = np.zeros((n, len(_PROTOCOLS)), dtype=np.float32)
+        self.both = np.zeros((n, len(_PROTOCOLS)), dtype=np.float32)
+        self.vocab: dict[str, int] = {}
+        rows, token_ids = [], []
+        for i, chunk in enumerate(chunks):
+            section = chunk.get('section', '').lower()
+            heading = chunk.get('heading', '').lower()
+            context = section + ' ' + heading
+            in_context = _protocol_mask(context)
+            self.context[i] = in_context
+            self.both[i] = in_context & _protocol_mask(section) & _protocol_mask(heading)
+            for word in set(_TOKEN_RE.findall(context)):
+                rows.append(i)
+                token_ids.append(self.vocab.setdefault(word, len(self.vocab)))
+        self.n = n
+        self.token_rows = np.array(rows, dtype=np.int64)
+        self.token_ids = np.array(token_ids, dtype=np.int64)
+
+    def boosts(self, query_text: str) -> np.ndarray:
+        """Keyword boost for every chunk, shape (N,)."""
+        query_lower = query_text.lower()
+        boost = np.zeros(self.n, dtype=np.float64)
+
+        # Protocol mentioned in both query and chunk section/heading
+        mentioned = _protocol_mask(query_lower).astype(np.float32)
+        if mentioned.any():
+            boost[self.context @ mentioned > 0] = KEYWORD_BOOST
+            boost[self.both @ mentioned > 0] = KEYWORD_BOOST * 1.5
+
+        # Direct word overlap between query and heading
+        query_ids = [self.vocab[w] for w in set(_TOKEN_RE.findall(query_lower)) if w in self.vocab]
+        if query_ids:
+            hits = np.isin(self.token_ids, query_ids)
+            overlap = np.bincount(self.token_rows[hits], minlength=self.n)
+            boost = np.maximum(boost, np.where(overlap >= 3, KEYWORD_BOOST,
+                                               np.where(overlap >= 2, KEYWORD_BOOST * 0.6, 0.0)))
+        return boost
+
+
 # ══════════════════════════════════════════════════════════════
 #  VECTOR STORE
 # ══════════════════════════════════════════════════════════════
@@ -305,12 +573,13 @@ class KBVectorStore:
     
     def __init__(self):
         self.chunks: list[dict] = []           # [{text, heading, section, chunk_id}, ...]
-        self.embeddings: np.ndarray = None     # (N, dim) matrix
+        self.embeddings: np.ndarray = None     # (N, dim) unit-normalized, read-only mmap
         self.kb_hash: str = ""                 # SHA256 of the KB file
         self.embed_model: str = EMBED_MODEL
         self.store_version: str = STORE_VERSION
         self.built_at: str = ""
         self.dim: int = 0
+        self._boost_index: KeywordBoostIndex | None = None  # Built lazily per chunk set
     
     @classmethod
     async def create(cls, force_rebuild: bool = False) -> 'KBVectorStore':
@@ -350,6 +619,14 @@ class KBVectorStore:
         current_hash = hashlib.sha256(kb_text.encode()).hexdigest()
         
         # Try loading cached store
+        reuse = False
+        if force_rebuild and os.path.exists(CHECKPOINT_PATH):
+            os.remove(CHECKPOINT_PATH)
+        if not force_rebuild and not os.path.exists(VECTOR_STORE_PATH) and os.path.exists(LEGACY_VECTOR_STORE_PATH):
+            try:
+                self._migrate_legacy_cache()
+            except Exception as e:
+                print(f"   ▲  Legacy cache unusable ({e}) — rebuilding...")
         if not force_rebuild and os.path.exists(VECTOR_STORE_PATH):
             try:
                 self._load_cache()
@@ -357,148 +634,237 @@ class KBVectorStore:
                     print(f"   ● Vector store loaded from cache: {len(self.chunks)} chunks, {self.dim}-dim")
                     return
                 else:
-                    print("   ↻ Knowledge Base changed — rebuilding vectors...")
+                    print("   ↻ Knowledge Base changed — re-embedding changed chunks...")
+                    reuse = True
             except Exception as e:
                 print(f"   ▲  Cache corrupted ({e}) — rebuilding...")
         else:
             print("   ▸ Building vector store for the first time...")
         
-        # Rebuild
-        await self._build(kb_text, current_hash)
+        # Rebuild (reusing the loaded store's vectors for unchanged chunks)
+        await self._build(kb_text, current_hash, reuse=reuse)
+    
+    @staticmethod
+    def _load_checkpoint() -> dict:
+        """{chunk hash: unit vector} embedded by an interrupted build, if any."""
+        if not os.path.exists(CHECKPOINT_PATH):
+            return {}
+        try:
+            with np.load(CHECKPOINT_PATH) as data:
+                return dict(zip(data['hashes'].tolist(), data['vectors']))
+        except Exception as e:
+            print(f"      ▲  Ignoring unreadable checkpoint ({e})")
+            return {}
+    
+    @staticmethod
+    def _save_checkpoint(vectors: dict):
+        """Persist vectors embedded so far, so an interrupted build can resume."""
+        if not vectors:
+            return
+        tmp = CHECKPOINT_PATH + ".tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, hashes=np.array(list(vectors)), vectors=np.stack(list(vectors.values())))
+        os.replace(tmp, CHECKPOINT_PATH)
+    
+    def _reusable_vectors(self) -> dict:
+        """{chunk hash: row} for the currently loaded store, if built with EMBED_MODEL."""
+        if self.embeddings is None or self.embed_model != EMBED_MODEL:
+            return {}
+        return {c['hash']: self.embeddings[i] for i, c in enumerate(self.chunks) if c.get('hash')}
     
-    async def _build(self, kb_text: str, kb_hash: str):
-        """Chunk the KB, embed all chunks with heading-anchored context, save to cache."""
+    async def _build(self, kb_text: str, kb_hash: str, reuse: bool = False):
+        """Chunk the KB, embed new/changed chunks with heading-anchored context, save to cache.
+        
+        With reuse=True, vectors of the currently loaded store are kept for
+        chunks whose content hash is unchanged; everything else is embedded.
+        Chunks no longer in the KB are simply not carried over. Embedded
+        vectors are checkpointed to CHECKPOINT_PATH as batches complete, and
+        a build interrupted part-way resumes from there.
+        """
         start_time = time.time()
+        stored = self._reusable_vectors() if reuse else {}
+        checkpoint = self._load_checkpoint()
+        if checkpoint:
+            print(f"      ↻ Resuming from checkpoint: {len(checkpoint)} vectors already embedded")
+        previous = {**checkpoint, **stored}
         
         # Step 1: Chunk
         print("      ◇ Chunking knowledge base...")
-        self.chunks = chunk_knowledge_base(kb_text)
-        print(f"      ● Created {len(self.chunks)} chunks")
+        chunks = chunk_knowledge_base(kb_text)
+        print(f"      ● Created {len(chunks)} chunks")
         
         # Step 2: Embed — ENHANCEMENT A: Heading-anchored embeddings
         # Prepend section + heading context to each chunk before embedding
         # so the embedding model knows WHAT the chunk is about, not just the raw text.
         # This dramatically improves retrieval for protocol-specific queries.
-        print(f"      ▸ Embedding with {EMBED_MODEL} (heading-anchored v2.0)...")
-        anchored_texts = []
-        for c in self.chunks:
-            anchor = f"Topic: {c['section']} | {c['heading']}\n\n{c['text']}"
-            anchored_texts.append(anchor)
+        anchored_texts = [anchor_chunk(c) for c in chunks]
+        for c, anchored in zip(chunks, anchored_texts):
+            c['hash'] = chunk_hash(anchored)
         
-        embeddings = await embed_batch(anchored_texts)
+        # Only chunks without a stored vector go to the embedding model
+        pending = [i for i, c in enumerate(chunks) if c['hash'] not in previous]
+        print(f"      ▸ Embedding {len(pending)}/{len(chunks)} chunks with {EMBED_MODEL} "
+              f"(heading-anchored, {len(chunks) - len(pending)} reused)...")
+        last_saved = time.monotonic()
         
-        self.embeddings = np.stack(embeddings)
-        self.dim = self.embeddings.shape[1]
+        def on_batch(indices: list[int], vectors: list[np.ndarray]):
+            nonlocal last_saved
+            for i, vec in zip(indices, normalize_rows(np.stack(vectors))):
+                checkpoint[chunks[pending[i]]['hash']] = vec
+            if time.monotonic() - last_saved >= CHECKPOINT_INTERVAL:
+                self._save_checkpoint(checkpoint)
+                last_saved = time.monotonic()
+        
+        try:
+            fresh = await embed_batch([anchored_texts[i] for i in pending], on_batch=on_batch) if pending else []
+        except BaseException:
+            self._save_checkpoint(checkpoint)
+            raise
+        
+        dim = fresh[0].shape[0] if fresh else next((v.shape[0] for v in previous.values()), self.dim)
+        matrix = np.empty((len(chunks), dim), dtype=np.float32)
+        if fresh:
+            matrix[pending] = normalize_rows(np.stack(fresh))
+        for i, c in enumerate(chunks):
+            if c['hash'] in previous:
+                matrix[i] = previous[c['hash']]
+        
+        removed = len(set(stored) - {c['hash'] for c in chunks})
+        if reuse:
+            print(f"      ● Reused {len(chunks) - len(pending)} vectors, embedded {len(pending)}, dropped {removed}")
+        
+        self.chunks = chunks
+        self.embeddings = matrix
+        self.embed_model = EMBED_MODEL
+        self.dim = dim
         self.kb_hash = kb_hash
         self.store_version = STORE_VERSION
         self.built_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._boost_index = KeywordBoostIndex(self.chunks)
         
         elapsed = time.time() - start_time
         print(f"      ● Vector store built: {len(self.chunks)} chunks × {self.dim}-dim in {elapsed:.1f}s")
         
         # Step 3: Save cache
         self._save_cache()
+        if os.path.exists(CHECKPOINT_PATH):
+            os.remove(CHECKPOINT_PATH)
     
     def _save_cache(self):
-        """Persist the vector store to disk."""
+        """Persist the vector store to disk.
+        
+        The matrix goes to kb_vectors.<hash>.npy and the metadata (which names
+        that file) to kb_vectors.json, each written to a temp file and renamed
+        into place. Readers see either the old or the new store, never a mix.
+        The previous matrix is kept until the next save, so a reader that
+        opened the old metadata just before the rename can still load it.
+        """
+        base = os.path.splitext(VECTOR_STORE_PATH)[0]
+        matrix_path = f"{base}.{self.kb_hash[:16] or 'empty'}.npy"
+        try:
+            previous_path = self._matrix_path()
+        except (OSError, ValueError):
+            previous_path = None
+        tmp_matrix = matrix_path + ".tmp"
+        with open(tmp_matrix, 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        os.replace(tmp_matrix, matrix_path)
+        
         data = {
-            'chunks': self.chunks,
-            'embeddings': self.embeddings,
+            'store_version': self.store_version,
             'kb_hash': self.kb_hash,
             'embed_model': self.embed_model,
             'built_at': self.built_at,
             'dim': self.dim,
-            'store_version': self.store_version,
+            'rows': len(self.chunks),
+            'matrix': os.path.basename(matrix_path),
+            'chunks': self.chunks,
         }
-        with open(VECTOR_STORE_PATH, 'wb') as f:
-            pickle.dump(data, f)
-        size_kb = os.path.getsize(VECTOR_STORE_PATH) / 1024
-        print(f"      ⊟ Cached to {VECTOR_STORE_PATH} ({size_kb:.0f} KB)")
-    
-    def _load_cache(self):
-        """Load the vector store from disk."""
-        with open(VECTOR_STORE_PATH, 'rb') as f:
-            data = pickle.load(f)
-        # v2.0: Check store version — force rebuild if version mismatch
+        tmp_meta = VECTOR_STORE_PATH + ".tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_meta, VECTOR_STORE_PATH)
+        
+        # Drop matrices older than the one the metadata pointed at until now
+        for stale in glob.glob(f"{base}.*.npy"):
+            if stale not in (matrix_path, previous_path):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        
+        # Serve queries from the shared page-cached file from now on
+        self.embeddings = np.load(matrix_path, mmap_mode='r')
+        size_kb = (os.path.getsize(matrix_path) + os.path.getsize(VECTOR_STORE_PATH)) / 1024
+        print(f"      ⊟ Cached to {VECTOR_STORE_PATH} + {os.path.basename(matrix_path)} ({size_kb:.0f} KB)")
+    
+    def _matrix_path(self) -> str | None:
+        """Path of the .npy matrix the on-disk metadata points at."""
+        if not os.path.exists(VECTOR_STORE_PATH):
+            return None
+        with open(VECTOR_STORE_PATH, 'r') as f:
+            name = json.load(f).get('matrix')
+        return os.path.join(os.path.dirname(VECTOR_STORE_PATH), name) if name else None
+    
+    def _load_cache(self, _retry: bool = True):
+        """Load the vector store from disk (matrix memory-mapped read-only)."""
+        with open(VECTOR_STORE_PATH, 'r') as f:
+            data = json.load(f)
+        # Check store version — force rebuild if version mismatch
         cached_version = data.get('store_version', '1.0')
         if cached_version != STORE_VERSION:
             raise ValueError(f"Store version mismatch: cached={cached_version}, current={STORE_VERSION}")
+        matrix_path = os.path.join(os.path.dirname(VECTOR_STORE_PATH), data['matrix'])
+        try:
+            embeddings = np.load(matrix_path, mmap_mode='r')
+        except FileNotFoundError:
+            if not _retry:
+                raise
+            # Saves in another process went by between reading the metadata and the matrix
+            return self._load_cache(_retry=False)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(data['chunks']) or embeddings.shape[1] != data['dim']:
+            raise ValueError(f"Matrix {data['matrix']} shape {embeddings.shape} does not match metadata")
         self.chunks = data['chunks']
-        self.embeddings = data['embeddings']
+        self.embeddings = embeddings
         self.kb_hash = data['kb_hash']
         self.embed_model = data.get('embed_model', EMBED_MODEL)
         self.built_at = data.get('built_at', 'unknown')
-        self.dim = data.get('dim', self.embeddings.shape[1] if self.embeddings is not None else 0)
+        self.dim = data['dim']
         self.store_version = cached_version
+        self._boost_index = KeywordBoostIndex(self.chunks)
     
-    async def retrieve(self, query: str, top_k: int = 6, min_score: float = MIN_RELEVANCE_SCORE) -> list[dict]:
-        """
-        Enhanced semantic retrieval with keyword boosting and score threshold.
-        
-        v2.0 Enhancements:
-          - ENHANCEMENT C: Min-score threshold filters out noise chunks
-          - ENHANCEMENT D: Section-aware keyword boost — if query contains protocol
-            keywords that match a chunk's section/heading, boost the cosine score
-        
-        Returns list of dicts: [{text, heading, section, score, chunk_id}, ...]
-        sorted by descending similarity score, filtered by min_score.
-        """
-        if self.embeddings is None or len(self.chunks) == 0:
-            return []
-        
-        # Embed the query with heading-anchor format to match how chunks were embedded
-        query_anchored = f"Topic: query\n\n{query}"
-        query_vec = await embed_text(query_anchored)
-        
-        # Compute cosine similarities
-        scores = cosine_similarity_batch(query_vec, self.embeddings)
+    def _migrate_legacy_cache(self):
+        """Convert a v2.0 kb_vectors.pkl into the .npy + JSON layout without re-embedding."""
+        with open(LEGACY_VECTOR_STORE_PATH, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('store_version', '1.0') != "2.0":
+            raise ValueError(f"unsupported legacy store version {data.get('store_version', '1.0')}")
+        self.chunks = data['chunks']
+        for c in self.chunks:
+            c['hash'] = chunk_hash(anchor_chunk(c), data.get('embed_model', EMBED_MODEL))
+        self.embeddings = normalize_rows(np.asarray(data['embeddings'], dtype=np.float32))
+        self.kb_hash = data['kb_hash']
+        self.embed_model = data.get('embed_model', EMBED_MODEL)
+        self.built_at = data.get('built_at', 'unknown')
+        self.dim = self.embeddings.shape[1]
+        self.store_version = STORE_VERSION
+        self._save_cache()
+        os.remove(LEGACY_VECTOR_STORE_PATH)
+        print(f"   ↻ Migrated {os.path.basename(LEGACY_VECTOR_STORE_PATH)} → {os.path.basename(VECTOR_STORE_PATH)}")
+    
+    def _rank(self, query_vec: np.ndarray, query_text: str, top_k: int, min_score: float) -> list[dict]:
+        """Cosine similarity + section-aware keyword boost → threshold → top-K."""
+        # Cosine similarity: stored rows are unit-length, so one dot product
+        query_unit = query_vec / (np.linalg.norm(query_vec) + 1e-10)
+        scores = self.embeddings @ query_unit
         
         # ── Enhancement D: Section-aware keyword boost ──
-        # Extract protocol keywords from query and boost chunks whose
-        # section/heading matches those keywords
-        query_lower = query.lower()
-        query_words = set(re.findall(r'[a-z0-9\-]+', query_lower))
-        
-        boosted_scores = scores.copy()
-        for idx, chunk in enumerate(self.chunks):
-            chunk_section_lower = chunk.get('section', '').lower()
-            chunk_heading_lower = chunk.get('heading', '').lower()
-            chunk_context = chunk_section_lower + ' ' + chunk_heading_lower
-            
-            boost = 0.0
-            # Check each protocol keyword group
-            for protocol, keywords in PROTOCOL_KEYWORDS.items():
-                # Does the query mention this protocol?
-                # Use word boundary or substring for multi-word keywords
-                query_mentions_protocol = any(
-                    _keyword_in_text(kw, query_lower) for kw in keywords
-                )
-                if query_mentions_protocol:
-                    # Does this chunk's section/heading also mention it?
-                    heading_matches = any(
-                        _keyword_in_text(kw, chunk_context) for kw in keywords
-                    )
-                    if heading_matches:
-                        boost = max(boost, KEYWORD_BOOST)
-                        # Extra boost if BOTH section AND heading match
-                        section_match = any(
-                            _keyword_in_text(kw, chunk_section_lower) for kw in keywords
-                        )
-                        heading_match = any(
-                            _keyword_in_text(kw, chunk_heading_lower) for kw in keywords
-                        )
-                        if section_match and heading_match:
-                            boost = max(boost, KEYWORD_BOOST * 1.5)
-            
-            # Direct word overlap between query and heading (at least 2 words)
-            heading_words = set(re.findall(r'[a-z0-9\-]+', chunk_context))
-            overlap = query_words & heading_words
-            if len(overlap) >= 3:
-                boost = max(boost, KEYWORD_BOOST)
-            elif len(overlap) >= 2:
-                boost = max(boost, KEYWORD_BOOST * 0.6)
-            
-            boosted_scores[idx] += boost
+        # Chunks whose section/heading mention a protocol the query mentions
+        # (or share 2+ heading words with it) get boosted; the per-chunk
+        # features are precomputed in KeywordBoostIndex.
+        if self._boost_index is None or self._boost_index.n != len(self.chunks):
+            self._boost_index = KeywordBoostIndex(self.chunks)
+        boosted_scores = scores + self._boost_index.boosts(query_text).astype(scores.dtype)
         
         # ── Get top candidates (more than top_k, then filter by threshold) ──
         candidate_count = min(top_k * 3, len(self.chunks))
@@ -519,6 +885,27 @@ class KBVectorStore:
         
         return results
     
+    async def retrieve(self, query: str, top_k: int = 6, min_score: float = MIN_RELEVANCE_SCORE) -> list[dict]:
+        """
+        Enhanced semantic retrieval with keyword boosting and score threshold.
+        
+        v2.0 Enhancements:
+          - ENHANCEMENT C: Min-score threshold filters out noise chunks
+          - ENHANCEMENT D: Section-aware keyword boost — if query contains protocol
+            keywords that match a chunk's section/heading, boost the cosine score
+        
+        Returns list of dicts: [{text, heading, section, score, chunk_id}, ...]
+        sorted by descending similarity score, filtered by min_score.
+        """
+        if self.embeddings is None or len(self.chunks) == 0:
+            return []
+        
+        # Embed the query with heading-anchor format to match how chunks were embedded
+        query_anchored = f"Topic: query\n\n{query}"
+        query_vec = (await embed_queries([query_anchored]))[0]
+        
+        return self._rank(query_vec, query, top_k, min_score)
+    
     async def retrieve_for_protocol(self, protocol: str, context: str = "", top_k: int = 5) -> str:
         """
         Enhanced multi-query retrieval for protocol-specific analysis.
@@ -591,7 +978,9 @@ class KBVectorStore:
         
         Instead of each specialist making 2-3 sequential embedding calls,
         all specialist queries are collected and embedded in one batch.
-        This reduces ~10-15 serial HTTP calls to 1 batch call.
+        This reduces ~10-15 serial HTTP calls to 1 batch call, and queries
+        already in query_cache (the fixed specialist queries, after the
+        first audit) are not sent at all.
         
         Returns list of query vectors in the same order as input queries.
         """
@@ -600,7 +989,7 @@ class KBVectorStore:
         
         # Anchor queries the same way retrieve() does
         anchored = [f"Topic: query\n\n{q}" for q in queries]
-        return await embed_batch(anchored)
+        return await embed_queries(anchored)
     
     async def retrieve_with_vector(self, query_vec: np.ndarray, query_text: str,
                                      top_k: int = 6, 
@@ -613,64 +1002,7 @@ class KBVectorStore:
         if self.embeddings is None or len(self.chunks) == 0:
             return []
         
-        # Compute cosine similarities
-        scores = cosine_similarity_batch(query_vec, self.embeddings)
-        
-        # Keyword boosting (same as retrieve())
-        query_lower = query_text.lower()
-        query_words = set(re.findall(r'[a-z0-9\-]+', query_lower))
-        
-        boosted_scores = scores.copy()
-        for idx, chunk in enumerate(self.chunks):
-            chunk_section_lower = chunk.get('section', '').lower()
-            chunk_heading_lower = chunk.get('heading', '').lower()
-            chunk_context = chunk_section_lower + ' ' + chunk_heading_lower
-            
-            boost = 0.0
-            for protocol, keywords in PROTOCOL_KEYWORDS.items():
-                query_mentions_protocol = any(
-                    _keyword_in_text(kw, query_lower) for kw in keywords
-                )
-                if query_mentions_protocol:
-                    heading_matches = any(
-                        _keyword_in_text(kw, chunk_context) for kw in keywords
-                    )
-                    if heading_matches:
-                        boost = max(boost, KEYWORD_BOOST)
-                        section_match = any(
-                            _keyword_in_text(kw, chunk_section_lower) for kw in keywords
-                        )
-                        heading_match = any(
-                            _keyword_in_text(kw, chunk_heading_lower) for kw in keywords
-                        )
-                        if section_match and heading_match:
-                            boost = max(boost, KEYWORD_BOOST * 1.5)
-            
-            heading_words = set(re.findall(r'[a-z0-9\-]+', chunk_context))
-            overlap = query_words & heading_words
-            if len(overlap) >= 3:
-                boost = max(boost, KEYWORD_BOOST)
-            elif len(overlap) >= 2:
-                boost = max(boost, KEYWORD_BOOST * 0.6)
-            
-            boosted_scores[idx] += boost
-        
-        candidate_count = min(top_k * 3, len(self.chunks))
-        top_indices = np.argsort(boosted_scores)[::-1][:candidate_count]
-        
-        results = []
-        for idx in top_indices:
-            score = float(boosted_scores[idx])
-            if score < min_score:
-                continue
-            chunk = self.chunks[idx].copy()
-            chunk['score'] = score
-            chunk['raw_cosine'] = float(scores[idx])
-            results.append(chunk)
-            if len(results) >= top_k:
-                break
-        
-        return results
+        return self._rank(query_vec, query_text, top_k, min_score)
     
     async def retrieve_for_protocol_with_vectors(
         self, protocol: str, query_vectors: dict[str, np.ndarray],
@@ -735,6 +1067,14 @@ class KBVectorStore:
         
         return combined
     
+    def _cache_size_kb(self) -> float:
+        try:
+            matrix_path = self._matrix_path()
+            paths = [VECTOR_STORE_PATH] + ([matrix_path] if matrix_path else [])
+            return sum(os.path.getsize(p) for p in paths if os.path.exists(p)) / 1024
+        except (OSError, ValueError):
+            return 0
+    
     def stats(self) -> dict:
         """Return stats about the vector store."""
         return {
@@ -745,11 +1085,13 @@ class KBVectorStore:
             'built_at': self.built_at,
             'kb_hash_short': self.kb_hash[:12] if self.kb_hash else 'none',
             'cache_exists': os.path.exists(VECTOR_STORE_PATH),
-            'cache_size_kb': os.path.getsize(VECTOR_STORE_PATH) / 1024 if os.path.exists(VECTOR_STORE_PATH) else 0,
+            'cache_size_kb': self._cache_size_kb(),
+            'memory_mapped': isinstance(self.embeddings, np.memmap),
             'min_relevance_score': MIN_RELEVANCE_SCORE,
             'keyword_boost': KEYWORD_BOOST,
             'heading_anchored': True,
             'multi_query': True,
+            'query_cache': query_cache.stats(),
         }
 
 
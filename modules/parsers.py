@@ -32,6 +32,13 @@ from ollama_mcp_client import (
     parse_route_summary,
     parse_commit_history,
     parse_batch_json,
+    junos_json,
+    parse_interfaces_terse_json,
+    parse_interface_detail_json,
+    parse_ospf_neighbor_json,
+    parse_bgp_summary_json,
+    parse_ldp_session_json,
+    parse_isis_adjacency_json,
 )
 
 __all__ = [
@@ -48,4 +55,8 @@ __all__ = [
     "find_alarm_issues", "find_storage_issues", "find_coredump_issues",
     "find_firewall_issues", "parse_route_summary", "parse_commit_history",
     "parse_batch_json",
+    # Structured (| display json) parsers
+    "junos_json", "parse_interfaces_terse_json", "parse_interface_detail_json",
+    "parse_ospf_neighbor_json", "parse_bgp_summary_json",
+    "parse_ldp_session_json", "parse_isis_adjacency_json",
 ]
@@ -322,7 +322,9 @@ import os
 import time
 import difflib
 import hashlib
+import inspect
 import sqlite3
+import uuid
 import yaml
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -1250,6 +1252,10 @@ logger = logging.getLogger("junos-bridge")
 
 # RAG Vector Store for semantic KB retrieval
 from kb_vectorstore import KBVectorStore
+from http_clients import http_clients
+from junos_config_index import PHYSICAL_INTERFACE, config_index
+
+http_clients.configure(**_config.get("http", {}))
 
 MCP_SERVER_URL = _config.get("mcp", {}).get("url", "http://127.0.0.1:30030/mcp/")
 OLLAMA_URL = _config.get("ai", {}).get("ollama_url", "http://127.0.0.1:11434")
@@ -1328,10 +1334,16 @@ collection_status: dict = {}  # {"command_label": "success"|"failed"|"timeout"}
 
 # ── Concurrency control for MCP batch commands ──────────────
 _mcp_cfg = _config.get("mcp", {})
-MCP_BATCH_CONCURRENCY = _mcp_cfg.get("batch_concurrency", 2)
+MCP_BATCH_CONCURRENCY = _mcp_cfg.get("batch_concurrency", 4)
+MCP_FACTS_CONCURRENCY = _mcp_cfg.get("facts_concurrency", 8)
 MCP_BATCH_RETRY = _mcp_cfg.get("batch_retry", 1)
 MCP_BATCH_RETRY_DELAY = _mcp_cfg.get("batch_retry_delay", 3.0)
 MCP_CALL_TIMEOUT = _mcp_cfg.get("call_timeout", 120.0)
+MCP_MATRIX_TIMEOUT = _mcp_cfg.get("matrix_timeout", 600.0)
+MCP_STRUCTURED_COLLECTION = _mcp_cfg.get("structured_collection", False)
+MCP_INCREMENTAL_AUDIT = _mcp_cfg.get("incremental_audit", False)
+MCP_INCREMENTAL_MAX_AGE = _mcp_cfg.get("incremental_max_age", 86400)
+MCP_MATRIX_MAX_RESPONSE_CHARS = _mcp_cfg.get("matrix_max_response_chars", 20_000_000)
 MCP_MAX_RESPONSE_CHARS = _mcp_cfg.get("max_response_chars", 500_000)
 AI_SELF_VERIFY = _config.get("ai", {}).get("self_verify", False)
 _mcp_semaphore: asyncio.Semaphore | None = None  # Initialized at runtime
@@ -1897,6 +1909,32 @@ def save_facts_cache(facts: dict):
     except Exception as e:
         logger.warning(f"Facts cache save failed: {e}")
 
+# ── Incremental Audit Cache ─────────────────────────────────
+# Raw per-device outputs of the last incremental audit, keyed by audit label,
+# plus the change signature each device had when they were collected.
+AUDIT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                _config.get("paths", {}).get("audit_cache", "audit_cache.json"))
+
+
+def load_audit_cache() -> dict:
+    """Load the incremental audit cache → {router: entry}. Empty on first run or error."""
+    try:
+        if os.path.exists(AUDIT_CACHE_PATH):
+            with open(AUDIT_CACHE_PATH, "r") as f:
+                return json.load(f).get("devices", {})
+    except Exception as e:
+        logger.warning(f"Audit cache load failed: {e}")
+    return {}
+
+
+def save_audit_cache(devices: dict):
+    """Persist the incremental audit cache ({router: entry})."""
+    try:
+        with open(AUDIT_CACHE_PATH, "w") as f:
+            json.dump({"_cached_at": datetime.now().isoformat(), "devices": devices}, f)
+    except Exception as e:
+        logger.warning(f"Audit cache save failed: {e}")
+
 # ── E53: Circuit Breaker Pattern ────────────────────────────
 _circuit_breaker: dict = {}  # {router_name: {"failures": count, "last_failure": time}}
 CIRCUIT_BREAKER_THRESHOLD = 3  # Mark unreachable after N failures
@@ -2105,16 +2143,27 @@ class NetworkDependencyGraph:
                         f"{dep_proto.upper()} depends on {proto.upper()} — will be affected"
                     )
         
-        # Check if any router becomes isolated
-        remaining_edges = [e for e in self.edges 
-                          if e["src"] != failed_router and e["dst"] != failed_router]
-        connected_routers = set()
-        for e in remaining_edges:
-            connected_routers.add(e["src"])
-            connected_routers.add(e["dst"])
-        
-        for r in self.nodes:
-            if r != failed_router and r not in connected_routers:
+        # Routers cut off from the rest of the network (not just left without links)
+        adj = {r: set() for r in self.nodes if r != failed_router}
+        for e in self.edges:
+            if failed_router not in (e["src"], e["dst"]) and e["src"] in adj and e["dst"] in adj:
+                adj[e["src"]].add(e["dst"])
+                adj[e["dst"]].add(e["src"])
+        components, seen = [], set()
+        for start in adj:
+            if start in seen:
+                continue
+            component, stack = {start}, [start]
+            seen.add(start)
+            while stack:
+                for nbr in adj[stack.pop()] - seen:
+                    seen.add(nbr)
+                    component.add(nbr)
+                    stack.append(nbr)
+            components.append(component)
+        main = max(components, key=len) if components else set()
+        for r in adj:
+            if r not in main:
                 impact["orphaned_routers"].append(self.nodes[r]["hostname"])
         
         # Service impact
@@ -2789,6 +2838,7 @@ def print_command_help():
     # ── Core Operations ──
     help_table.add_row(f"[bold #ff8700]{I.DASH*3} Core Operations {I.DASH*20}[/bold #ff8700]", "")
     help_table.add_row("audit", f"{I.TARGET} Full network health check with 12-specialist AI analysis")
+    help_table.add_row("audit incremental", f"{I.TARGET} Audit that only re-collects data from devices that changed since the last audit")
     help_table.add_row("check <deviceA> <deviceB>", f"{I.LINK} Check connectivity between two devices")
     help_table.add_row("configure <router> <desc>", f"{I.CONFIG} Push config with safety checks & dry-run")
     help_table.add_row("verify <router>", f"{I.OK} Run verification commands on a device")
@@ -3592,7 +3642,7 @@ def parse_sse_response(text: str) -> dict:
         return {}
 
 
-async def mcp_post(client, session_id, payload, timeout=30.0):
+async def mcp_post(client, session_id, payload, timeout=30.0, max_chars=None):
     headers = {"Accept": "application/json, text/event-stream"}
     if session_id:
         headers["mcp-session-id"] = session_id
@@ -3601,9 +3651,10 @@ async def mcp_post(client, session_id, payload, timeout=30.0):
     ct = resp.headers.get("content-type", "")
     raw_text = resp.text
     # Truncate extremely large responses to prevent memory/processing hangs
-    if len(raw_text) > MCP_MAX_RESPONSE_CHARS:
-        logger.warning(f"MCP response truncated: {len(raw_text)} → {MCP_MAX_RESPONSE_CHARS} chars")
-        raw_text = raw_text[:MCP_MAX_RESPONSE_CHARS]
+    max_chars = max_chars or MCP_MAX_RESPONSE_CHARS
+    if len(raw_text) > max_chars:
+        logger.warning(f"MCP response truncated: {len(raw_text)} → {max_chars} chars")
+        raw_text = raw_text[:max_chars]
     data = parse_sse_response(raw_text) if "text/event-stream" in ct else resp.json()
     return data, new_sid
 
@@ -3626,11 +3677,11 @@ async def mcp_list_tools(client, sid):
     return data.get("result", {}).get("tools", [])
 
 
-async def mcp_call_tool(client, sid, tool_name, arguments):
+async def mcp_call_tool(client, sid, tool_name, arguments, timeout=None, max_chars=None):
     data, _ = await mcp_post(client, sid, {
         "jsonrpc": "2.0", "id": 3, "method": "tools/call",
         "params": {"name": tool_name, "arguments": arguments}
-    }, timeout=MCP_CALL_TIMEOUT)
+    }, timeout=timeout or MCP_CALL_TIMEOUT, max_chars=max_chars)
     content = data.get("result", {}).get("content", [])
     text = "\n".join(c.get("text", "") for c in content if c.get("type") == "text")
     if not text and data:
@@ -3639,11 +3690,73 @@ async def mcp_call_tool(client, sid, tool_name, arguments):
     return text
 
 
+async def mcp_call_tool_stream(client, sid, tool_name, arguments, on_progress, timeout=None):
+    """Call an MCP tool and hand each progress notification to on_progress as it arrives.
+
+    The request carries a progressToken, so tools that stream partial results
+    (execute_junos_command_batch / execute_junos_commands_matrix, one notification
+    per router) deliver them over the same SSE response before the final result.
+    on_progress receives the notification params and may be sync or async.
+    Returns the final text result, like mcp_call_tool()."""
+    token = f"{tool_name}-{uuid.uuid4().hex[:12]}"
+    headers = {"Accept": "application/json, text/event-stream"}
+    if sid:
+        headers["mcp-session-id"] = sid
+    payload = {
+        "jsonrpc": "2.0", "id": 3, "method": "tools/call",
+        "params": {"name": tool_name, "arguments": arguments, "_meta": {"progressToken": token}}
+    }
+    data = {}
+    async with client.stream("POST", MCP_SERVER_URL, json=payload, headers=headers,
+                             timeout=timeout or MCP_CALL_TIMEOUT) as resp:
+        if "text/event-stream" not in resp.headers.get("content-type", ""):
+            await resp.aread()
+            data = resp.json()
+        else:
+            async for line in resp.aiter_lines():
+                line = line.strip()
+                if not line.startswith("data: "):
+                    continue
+                try:
+                    msg = json.loads(line[6:])
+                except json.JSONDecodeError:
+                    continue
+                if msg.get("method") == "notifications/progress":
+                    params = msg.get("params", {})
+                    if params.get("progressToken") == token:
+                        ret = on_progress(params)
+                        if inspect.isawaitable(ret):
+                            await ret
+                elif "result" in msg or "error" in msg:
+                    data = msg
+    content = data.get("result", {}).get("content", [])
+    text = "\n".join(c.get("text", "") for c in content if c.get("type") == "text")
+    if not text and data:
+        return json.dumps(data)
+    return text
+
+
+def _streamed_router_results(on_result):
+    """Adapt a per-router result callback to mcp_call_tool_stream's progress callback."""
+    def _forward(params):
+        try:
+            router_result = json.loads(params.get("message") or "")
+        except (json.JSONDecodeError, TypeError):
+            return
+        if isinstance(router_result, dict):
+            return on_result(router_result)
+    return _forward
+
+
 # ── Command runners ──────────────────────────────────────────
 
-async def run_batch(client, sid, command, router_names, label):
+async def run_batch(client, sid, command, router_names, label, on_result=None):
     """Run a batch command with concurrency throttling, retry logic, and circuit breaker.
-    Uses a semaphore to limit concurrent MCP requests and prevent server saturation."""
+    Uses a semaphore to limit concurrent MCP requests and prevent server saturation.
+
+    When on_result is given, each router's result dict ({"router_name", "status",
+    "output", ...}) is passed to it as soon as that router finishes, so parsing can
+    start before the slowest router returns. A retried batch may deliver a router twice."""
     global _mcp_semaphore
     if _mcp_semaphore is None:
         _mcp_semaphore = asyncio.Semaphore(MCP_BATCH_CONCURRENCY)
@@ -3661,11 +3774,13 @@ async def run_batch(client, sid, command, router_names, label):
         last_error = None
         for attempt in range(1, MCP_BATCH_RETRY + 2):  # +2 because range is exclusive and we want initial + retries
             try:
-                result = await asyncio.wait_for(
-                    mcp_call_tool(client, sid, "execute_junos_command_batch",
-                                  {"command": command, "router_names": router_names}),
-                    timeout=MCP_CALL_TIMEOUT
-                )
+                arguments = {"command": command, "router_names": router_names}
+                if on_result is None:
+                    call = mcp_call_tool(client, sid, "execute_junos_command_batch", arguments)
+                else:
+                    call = mcp_call_tool_stream(client, sid, "execute_junos_command_batch", arguments,
+                                                _streamed_router_results(on_result))
+                result = await asyncio.wait_for(call, timeout=MCP_CALL_TIMEOUT)
                 elapsed = round(time.time() - batch_start, 1)
                 result_len = len(result) if result else 0
                 console.print(f"      [success]● {result_len} chars ({elapsed}s)[/success]")
@@ -3702,6 +3817,99 @@ async def run_batch(client, sid, command, router_names, label):
         return ""  # Fallback (should not be reached)
 
 
+def matrix_to_batch_json(matrix: dict, command: str) -> str:
+    """Re-shape one command's column of a commands-matrix result into the
+    execute_junos_command_batch JSON format, so parse_batch_json() and every
+    downstream parser keep working unchanged."""
+    results = []
+    for router_name, per_cmd in matrix.get("results", {}).items():
+        entry = per_cmd.get(command)
+        if entry is None:
+            continue
+        results.append({
+            "router_name": router_name,
+            "status": entry.get("status", "failed"),
+            "output": entry.get("output", ""),
+            "execution_duration": entry.get("execution_duration", 0.0),
+        })
+    return results_to_batch_json(results, command)
+
+
+def results_to_batch_json(results: list, command: str) -> str:
+    """Wrap per-router result dicts in the execute_junos_command_batch JSON format."""
+    successful = sum(1 for r in results if r["status"] == "success")
+    return json.dumps({
+        "summary": {"command": command, "total_routers": len(results),
+                    "successful": successful, "failed": len(results) - successful},
+        "results": results,
+    })
+
+
+async def run_matrix(client, sid, commands: list, router_names: list, label: str,
+                     on_result=None) -> dict | None:
+    """Run many commands on many routers with ONE MCP call (execute_junos_commands_matrix).
+
+    `commands` is a list of (label, command) pairs. Returns {label: batch_json} in the
+    same format run_batch() returns, or None when the server does not offer the matrix
+    tool (older jmcp) or the call fails — callers then fall back to per-command run_batch().
+    When on_result is given, on_result(command_label, router_result) is called for each
+    command as soon as that router finishes all of its commands.
+    """
+    console.print(f"   [info]⊛ {label}:[/info] [command]{len(commands)} commands × {len(router_names)} routers (one session per router)[/command]")
+    logger.info(f"Matrix command: {label} → {len(commands)} commands on {len(router_names)} routers")
+    matrix_start = time.time()
+    raw = ""
+    try:
+        arguments = {"commands": [cmd for _, cmd in commands], "router_names": router_names}
+        if on_result is None:
+            call = mcp_call_tool(client, sid, "execute_junos_commands_matrix", arguments,
+                                 timeout=MCP_MATRIX_TIMEOUT, max_chars=MCP_MATRIX_MAX_RESPONSE_CHARS)
+        else:
+            def _per_command(router_result):
+                per_cmd = router_result.get("results") or {}
+                for cmd_label, command in commands:
+                    if command in per_cmd:
+                        on_result(cmd_label, {"router_name": router_result.get("router_name", "unknown"),
+                                              **per_cmd[command]})
+            call = mcp_call_tool_stream(client, sid, "execute_junos_commands_matrix", arguments,
+                                        _streamed_router_results(_per_command), timeout=MCP_MATRIX_TIMEOUT)
+        raw = await asyncio.wait_for(call, timeout=MCP_MATRIX_TIMEOUT)
+        matrix = json.loads(raw)
+    except asyncio.TimeoutError:
+        console.print(f"      [warning]▲  {label}: matrix call timed out after {MCP_MATRIX_TIMEOUT}s — falling back to batch commands[/warning]")
+        logger.warning(f"Matrix {label}: timeout after {MCP_MATRIX_TIMEOUT}s")
+        return None
+    except (json.JSONDecodeError, TypeError, ValueError):
+        # "Unknown tool: ..." from older servers, or an error string
+        console.print(f"      [dim]{label}: matrix tool unavailable — falling back to batch commands[/dim]")
+        logger.warning(f"Matrix {label}: non-JSON response, preview: {repr((raw or '')[:200])}")
+        return None
+    except Exception as e:
+        console.print(f"      [warning]▲  {label}: matrix call failed ({e}) — falling back to batch commands[/warning]")
+        logger.warning(f"Matrix {label}: failed ({e})")
+        return None
+
+    if not isinstance(matrix, dict) or "results" not in matrix:
+        return None
+
+    collected = {}
+    for cmd_label, command in commands:
+        batch_json = matrix_to_batch_json(matrix, command)
+        collected[cmd_label] = batch_json
+        statuses = [per_cmd.get(command, {}).get("status") for per_cmd in matrix["results"].values()]
+        if statuses and all(st != "success" for st in statuses):
+            collection_status[cmd_label] = "failed: no router returned output"
+        else:
+            collection_status[cmd_label] = "success"
+
+    elapsed = round(time.time() - matrix_start, 1)
+    summary = matrix.get("summary", {})
+    console.print(f"      [success]● {summary.get('total_commands', len(commands) * len(router_names)) - summary.get('failed_commands', 0)}"
+                  f"/{summary.get('total_commands', len(commands) * len(router_names))} command outputs ({elapsed}s)[/success]")
+    logger.info(f"Matrix {label}: success ({elapsed}s, {summary.get('failed_commands', 0)} failed commands)")
+    return collected
+
+
 async def run_single(client, sid, command, router_name, label):
     console.print(f"   [info]⊛ {label}:[/info] [command]{command} on {router_name}[/command]")
     logger.info(f"Single command: {label} → {command} on {router_name}")
@@ -3724,6 +3932,206 @@ async def run_single(client, sid, command, router_name, label):
         return ""
 
 
+async def fetch_config_checksums(client, sid, router_names: list) -> dict:
+    """Ask the MCP server for each router's config sha256 (get_junos_config_checksum).
+
+    Returns {router_name: sha256} for routers that answered; empty when the
+    server predates the tool or the call fails, so callers fetch full configs.
+    """
+    if not router_names:
+        return {}
+    try:
+        raw = await asyncio.wait_for(
+            mcp_call_tool(client, sid, "get_junos_config_checksum", {"router_names": router_names}),
+            timeout=MCP_CALL_TIMEOUT
+        )
+        results = json.loads(raw).get("results", {})
+    except asyncio.TimeoutError:
+        logger.warning(f"Config checksums: timeout after {MCP_CALL_TIMEOUT}s")
+        return {}
+    except (json.JSONDecodeError, TypeError, ValueError, AttributeError):
+        logger.info("Config checksums: tool unavailable on MCP server")
+        return {}
+    except Exception as e:
+        logger.warning(f"Config checksums: failed ({e})")
+        return {}
+    return {name: r["sha256"] for name, r in results.items()
+            if isinstance(r, dict) and r.get("status") == "success" and r.get("sha256")}
+
+
+# ── Incremental audit collection ─────────────────────────────
+# An incremental audit first runs one cheap probe per device: the live-health
+# labels below, which move without any local change and are always
+# re-collected, plus commit history, boot time and an interface
+# state/flap/error-counter digest. Devices whose signals are unchanged reuse
+# cached outputs for every other label; an interface signal change
+# re-collects the interface and protocol labels, and a new commit or a
+# reboot re-collects everything, including the running config.
+AUDIT_SIGNAL_LABEL = "Interface Signal"
+AUDIT_SIGNAL_COMMAND = 'show interfaces statistics | match "Physical interface|Last flapped|errors"'
+AUDIT_ALWAYS_LABELS = {
+    "Alarms", "Uptime", "Storage", "Core Dumps", "NTP", "BGP Summary", "BFD",
+    "Firewall", "Commits", "RE Stats", "Environment", "FPC Status",
+}
+AUDIT_INTERFACE_LABELS = {
+    "Interfaces", "Interface Detail", "LLDP", "OSPF Neighbors", "OSPF Interfaces",
+    "ISIS", "MPLS", "LDP Neighbors", "LDP Sessions", "MPLS LSP", "RSVP",
+    "Route Summary", "L3VPN Routes",
+}
+
+
+def _batch_results(raw: str) -> dict:
+    """Batch JSON → {router_name: output} for routers that returned successfully."""
+    results = {}
+    try:
+        for r in json.loads(raw).get("results", []):
+            if r.get("status") == "success":
+                results[r.get("router_name", "unknown")] = r.get("output", "")
+    except (json.JSONDecodeError, AttributeError, TypeError):
+        pass
+    return results
+
+
+def audit_change_signature(commit_output: str, uptime_output: str, signal_output: str) -> dict | None:
+    """Cheap change signals for one device, or None when a probe output is missing."""
+    if not (commit_output and uptime_output and signal_output):
+        return None
+    last_commit = re.search(r"^\s*0\s+(.+)$", commit_output, re.MULTILINE)
+    booted = re.findall(r"System booted:\s*([^(\n]+)", uptime_output)
+    # "Last flapped : 2026-10-01 10:00:00 UTC (2w0d 01:00 ago)" — drop the moving "ago" part
+    interfaces = re.sub(r"\s*\([^)]*ago\)", "", signal_output)
+    return {
+        "commit": last_commit.group(1).strip() if last_commit else hashlib.sha256(commit_output.encode()).hexdigest(),
+        "boot": " | ".join(b.strip() for b in booted),
+        "interfaces": hashlib.sha256(interfaces.encode()).hexdigest(),
+    }
+
+
+def audit_refresh_plan(cached: dict | None, signature: dict | None, commands: list) -> tuple:
+    """Decide what to re-collect for one device.
+
+    `commands` are the cacheable (label, command) pairs. Returns
+    (labels_to_collect, config_changed); everything is re-collected when the
+    device has no usable cache entry, its last full collection is older than
+    mcp.incremental_max_age, or its commit/boot signals moved.
+    """
+    everything = {lbl for lbl, _ in commands}
+    if not cached or signature is None or not cached.get("signature"):
+        return everything, True
+    try:
+        age = (datetime.now() - datetime.fromisoformat(cached.get("full_at", ""))).total_seconds()
+    except ValueError:
+        return everything, True
+    previous = cached["signature"]
+    if age > MCP_INCREMENTAL_MAX_AGE or signature["commit"] != previous.get("commit") \
+            or signature["boot"] != previous.get("boot"):
+        return everything, True
+    outputs = cached.get("outputs", {})
+    # Labels never cached, or cached for a different command (e.g. structured_collection toggled)
+    refresh = {lbl for lbl, cmd in commands if outputs.get(lbl, {}).get("command") != cmd}
+    if signature["interfaces"] != previous.get("interfaces"):
+        refresh |= everything & AUDIT_INTERFACE_LABELS
+    return refresh, False
+
+
+def cached_audit_config(router_name: str, cached: dict | None) -> str | None:
+    """Running config from the last incremental audit. Reads the golden baseline
+    instead when its .meta sha256 matches, so only drifted configs are cached."""
+    if not cached or not cached.get("config_sha256"):
+        return None
+    golden, meta = load_golden_config(router_name)
+    if golden is not None and (meta or {}).get("sha256") == cached["config_sha256"]:
+        return golden
+    return cached.get("config")
+
+
+async def collect_audit_incremental(client, sid, audit_commands: list, router_names: list, cache: dict) -> tuple | None:
+    """Collect audit_commands, reusing cached outputs wherever change signals allow.
+
+    Returns (batch_json per audit_commands entry, {router: new cache entry},
+    {router: config_changed}), or None when the matrix tool is unavailable —
+    the caller then runs a full collection.
+    """
+    probe = [(lbl, cmd) for lbl, cmd in audit_commands if lbl in AUDIT_ALWAYS_LABELS]
+    probe.append((AUDIT_SIGNAL_LABEL, AUDIT_SIGNAL_COMMAND))
+    probe_results = await run_matrix(client, sid, probe, router_names, "Change Probe")
+    if probe_results is None:
+        return None
+    collection_status.pop(AUDIT_SIGNAL_LABEL, None)
+
+    fresh = {router: {} for router in router_names}
+    for lbl, _ in probe:
+        for router, output in _batch_results(probe_results[lbl]).items():
+            fresh.setdefault(router, {})[lbl] = output
+
+    cacheable = [(lbl, cmd) for lbl, cmd in audit_commands if lbl not in AUDIT_ALWAYS_LABELS]
+    signatures, refresh, config_changed, groups = {}, {}, {}, {}
+    for router in router_names:
+        got = fresh[router]
+        signatures[router] = audit_change_signature(got.get("Commits"), got.get("Uptime"),
+                                                    got.pop(AUDIT_SIGNAL_LABEL, None))
+        refresh[router], config_changed[router] = audit_refresh_plan(cache.get(router), signatures[router], cacheable)
+        groups.setdefault(frozenset(refresh[router]), []).append(router)
+
+    reused = sum(len(cacheable) - len(refresh[r]) for r in router_names)
+    console.print(f"      [dim]Change signals: reusing {reused}/{len(cacheable) * len(router_names)} cached outputs, "
+                  f"{sum(not c for c in config_changed.values())}/{len(router_names)} configs unchanged[/dim]")
+
+    # Devices that need the same labels share one matrix call
+    for labels, routers in groups.items():
+        if not labels:
+            continue
+        commands = [(lbl, cmd) for lbl, cmd in cacheable if lbl in labels]
+        results = await run_matrix(client, sid, commands, routers, f"Changed Devices ({len(routers)})")
+        if results is None:
+            batches = await asyncio.gather(
+                *[run_batch(client, sid, cmd, routers, lbl) for lbl, cmd in commands],
+                return_exceptions=True,
+            )
+            results = {lbl: b if isinstance(b, str) else "" for (lbl, _), b in zip(commands, batches)}
+        for lbl, _ in commands:
+            for router, output in _batch_results(results[lbl]).items():
+                fresh.setdefault(router, {})[lbl] = output
+
+    now = datetime.now().isoformat()
+    gather_results = []
+    for lbl, cmd in audit_commands:
+        results = []
+        for router in router_names:
+            if lbl in fresh[router]:
+                status, output = "success", fresh[router][lbl]
+            elif lbl in AUDIT_ALWAYS_LABELS or lbl in refresh[router]:
+                status, output = "failed", ""
+            else:
+                status, output = "success", cache[router]["outputs"][lbl]["output"]
+            results.append({"router_name": router, "status": status, "output": output,
+                            "execution_duration": 0.0})
+        if lbl not in AUDIT_ALWAYS_LABELS and not any(lbl in refresh[r] for r in router_names):
+            collection_status[lbl] = "cached"
+        gather_results.append(results_to_batch_json(results, cmd))
+
+    entries = {}
+    for router in router_names:
+        if signatures[router] is None:
+            continue
+        previous = cache.get(router, {})
+        outputs = {lbl: {"command": cmd, "output": fresh[router][lbl]}
+                   for lbl, cmd in cacheable if lbl in fresh[router]}
+        for lbl, cmd in cacheable:
+            if lbl not in outputs and lbl not in refresh[router]:
+                outputs[lbl] = previous["outputs"][lbl]
+        full = len(refresh[router]) == len(cacheable)
+        entries[router] = {
+            "signature": signatures[router],
+            "full_at": now if full else previous.get("full_at", now),
+            "outputs": outputs,
+        }
+        if not config_changed[router]:
+            entries[router]["config_sha256"] = previous.get("config_sha256")
+            entries[router]["config"] = previous.get("config")
+    return gather_results, entries, config_changed
+
+
 # ── Data parsers ─────────────────────────────────────────────
 
 def parse_batch_json(raw: str) -> dict:
@@ -3738,20 +4146,180 @@ def parse_batch_json(raw: str) -> dict:
     return result
 
 
+class StreamedRouterAnalysis:
+    """Per-router audit parsing started while collection is still running.
+
+    analyzers maps a command label to fn(router, output). on_result(label,
+    router_result) runs it as each router's result streams in, so fast routers
+    are parsed while the slowest are still being collected. results() then
+    returns the per-router values in the batch's router order, reusing values
+    computed early (for the same output) and computing any that never streamed
+    (cached or non-streaming collection)."""
+
+    def __init__(self, analyzers: dict):
+        self.analyzers = analyzers
+        self._values = {}  # (label, router) -> (output, value)
+        self.streamed = 0
+
+    def on_result(self, label: str, router_result: dict):
+        fn = self.analyzers.get(label)
+        if fn is None:
+            return
+        router, output = router_result.get("router_name", "unknown"), router_result.get("output", "")
+        try:
+            self._values[(label, router)] = (output, fn(router, output))
+            self.streamed += 1
+        except Exception as e:
+            logger.debug(f"Early parse of {label} for {router} failed: {e}")
+
+    def results(self, label: str, outputs: dict) -> list:
+        fn = self.analyzers[label]
+        values = []
+        for router, output in outputs.items():
+            early = self._values.get((label, router))
+            values.append(early[1] if early is not None and early[0] == output else fn(router, output))
+        return values
+
+
+# ── Structured (| display json) parsers ─────────────────────
+# Audit labels collected as JSON when mcp.structured_collection is on. Only
+# outputs consumed solely by typed parsers are switched; terse/OSPF/BGP/LDP/
+# ISIS text also feeds topology building and AI prompts, so those stay CLI
+# text in the audit (the find_* parsers still accept JSON from other callers).
+STRUCTURED_AUDIT_COMMANDS = {
+    "Interface Detail": "show interfaces detail | display json",
+}
+
+# With mcp.structured_collection enabled, some audit commands are collected as
+# "<command> | display json". The MCP server runs them as JSON RPCs and returns
+# compact JSON (leaf [{"data": v}] wrappers collapsed to plain values); raw Junos
+# JSON is accepted too. Each typed parser yields the same rows the text parser
+# extracts, so find_*/parse_* produce identical dicts for either format and
+# routers can be mixed within one batch.
+
+def junos_json(output: str) -> dict | None:
+    """Return the parsed document if output is Junos JSON, else None (CLI text)."""
+    if not isinstance(output, str) or not output.lstrip().startswith("{"):
+        return None
+    try:
+        data = json.loads(output)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _jnodes(node, *path) -> list:
+    """Follow container keys from node and return every dict found at the end of path."""
+    current = [node]
+    for key in path:
+        found = []
+        for n in current:
+            value = n.get(key) if isinstance(n, dict) else None
+            if isinstance(value, list):
+                found.extend(v for v in value if isinstance(v, dict))
+            elif isinstance(value, dict):
+                found.append(value)
+        current = found
+    return current
+
+
+def _jval(node: dict, key: str) -> str:
+    """Leaf value as a stripped string, for compact or raw ([{"data": v}]) Junos JSON."""
+    value = node.get(key, "") if isinstance(node, dict) else ""
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if isinstance(value, dict):
+        value = value.get("data", "")
+    return "" if value is None or value is True else str(value).strip()
+
+
+def _jint(node: dict, key: str) -> int:
+    try:
+        return int(_jval(node, key) or 0)
+    except ValueError:
+        return 0
+
+
+def parse_interfaces_terse_json(data: dict) -> list:
+    """'show interfaces terse | display json' → [(interface, admin, link)] for physical and logical units."""
+    rows = []
+    for phys in _jnodes(data, "interface-information", "physical-interface"):
+        rows.append((_jval(phys, "name"), _jval(phys, "admin-status"), _jval(phys, "oper-status")))
+        for logical in _jnodes(phys, "logical-interface"):
+            rows.append((_jval(logical, "name"), _jval(logical, "admin-status"), _jval(logical, "oper-status")))
+    return rows
+
+
+def parse_interface_detail_json(data: dict) -> dict:
+    """'show interfaces detail | display json' → {intf_name: {...}} with the same keys as parse_interface_detail()."""
+    interfaces = {}
+    for phys in _jnodes(data, "interface-information", "physical-interface"):
+        name = _jval(phys, "name")
+        if not name:
+            continue
+        admin = "Enabled" if _jval(phys, "admin-status").lower() == "up" else "Administratively down"
+        oper = _jval(phys, "oper-status").capitalize()
+        input_errors = _jnodes(phys, "input-error-list")
+        output_errors = _jnodes(phys, "output-error-list")
+        mac_stats = _jnodes(phys, "ethernet-mac-statistics")
+        crc_sources = [(n, k) for n in output_errors for k in ("hs-link-crc-errors",)]
+        crc_sources += [(n, k) for n in mac_stats for k in ("input-crc-errors", "input-fcs-errors")]
+        interfaces[name] = {
+            "mtu": _jint(phys, "mtu"),
+            "speed": _jval(phys, "speed"),
+            "duplex": _jval(phys, "duplex"),
+            "input_errors": max([_jint(n, "input-errors") for n in input_errors] or [0]),
+            "output_errors": max([_jint(n, "output-errors") for n in output_errors] or [0]),
+            "crc_errors": max([_jint(n, k) for n, k in crc_sources] or [0]),
+            "carrier_transitions": max([_jint(n, "carrier-transitions") for n in output_errors] or [0]),
+            "link_state": f"{admin}, Physical link is {oper}",
+        }
+    return interfaces
+
+
+def parse_ospf_neighbor_json(data: dict) -> list:
+    """'show ospf neighbor | display json' → [{"address", "interface", "state"}]."""
+    return [{"address": _jval(n, "neighbor-address"),
+             "interface": _jval(n, "interface-name"),
+             "state": _jval(n, "ospf-neighbor-state")}
+            for n in _jnodes(data, "ospf-neighbor-information", "ospf-neighbor")]
+
+
+def parse_bgp_summary_json(data: dict) -> list:
+    """'show bgp summary | display json' → [(peer_address, state)]."""
+    return [(_jval(p, "peer-address").split("+")[0], _jval(p, "peer-state"))
+            for p in _jnodes(data, "bgp-information", "bgp-peer")]
+
+
+def parse_ldp_session_json(data: dict) -> list:
+    """'show ldp session | display json' → [(peer_address, "state connection-state")]."""
+    return [(_jval(sess, "ldp-neighbor-address"),
+             f"{_jval(sess, 'ldp-session-state')} {_jval(sess, 'ldp-connection-state')}")
+            for sess in _jnodes(data, "ldp-session-information", "ldp-session")]
+
+
+def parse_isis_adjacency_json(data: dict) -> list:
+    """'show isis adjacency | display json' → [(interface, neighbor, state)]."""
+    return [(_jval(adj, "interface-name"), _jval(adj, "system-name"), _jval(adj, "adjacency-state"))
+            for adj in _jnodes(data, "isis-adjacency-information", "isis-adjacency")]
+
+
 def find_down_interfaces(intf_outputs: dict) -> list:
     """Parse 'show interfaces terse' and find admin-up/link-down physical interfaces."""
     issues = []
     skip_pfx = ("pfe", "pfh", "pip", "bme", "jsrv", "lc-", "cb", "em", "irb",
                 "vtep", "dsc", "gre", "ipip", "tap", "lo0", "lsi", ".local.")
     for router, output in intf_outputs.items():
-        for line in output.split("\n"):
-            parts = line.split()
-            if len(parts) >= 3:
-                iface, admin, link = parts[0], parts[1], parts[2]
-                if any(iface.startswith(p) for p in skip_pfx):
-                    continue
-                if admin.lower() == "up" and link.lower() == "down":
-                    issues.append({"router": router, "interface": iface, "admin": admin, "link": link})
+        structured = junos_json(output)
+        if structured is not None:
+            rows = parse_interfaces_terse_json(structured)
+        else:
+            rows = [tuple(line.split()[:3]) for line in output.split("\n") if len(line.split()) >= 3]
+        for iface, admin, link in rows:
+            if any(iface.startswith(p) for p in skip_pfx):
+                continue
+            if admin.lower() == "up" and link.lower() == "down":
+                issues.append({"router": router, "interface": iface, "admin": admin, "link": link})
     return issues
 
 
@@ -3761,6 +4329,10 @@ def find_ospf_neighbors(ospf_nbr_outputs: dict, ospf_intf_outputs: dict, device_
 
     for router, output in ospf_nbr_outputs.items():
         neighbors = []
+        structured = junos_json(output)
+        if structured is not None:
+            neighbors = parse_ospf_neighbor_json(structured)
+            output = ""
         for line in output.split("\n"):
             parts = line.split()
             if len(parts) >= 4 and re.match(r"\d+\.\d+\.\d+\.\d+", parts[0]):
@@ -3794,11 +4366,14 @@ def find_bgp_issues(bgp_outputs: dict, device_map: dict) -> tuple:
         hostname = device_map.get(router, router)
         if not output.strip() or "not running" in output.lower():
             continue
-        for line in output.split("\n"):
-            parts = line.split()
-            if len(parts) >= 3 and re.match(r"\d+\.\d+\.\d+\.\d+", parts[0]):
-                peer_ip = parts[0]
-                state = parts[-1]
+        structured = junos_json(output)
+        if structured is not None:
+            peers = parse_bgp_summary_json(structured)
+        else:
+            peers = [(parts[0], parts[-1]) for parts in (line.split() for line in output.split("\n"))
+                     if len(parts) >= 3]
+        for peer_ip, state in peers:
+            if re.match(r"\d+\.\d+\.\d+\.\d+", peer_ip):
                 if state.lower() in ("active", "idle", "connect", "opensent", "openconfirm"):
                     issues.append({"severity": "CRITICAL", "router": router, "hostname": hostname,
                                    "peer": peer_ip, "state": state,
@@ -3814,7 +4389,12 @@ def find_ldp_issues(ldp_sess_outputs: dict, device_map: dict) -> tuple:
         hostname = device_map.get(router, router)
         if not output.strip() or "not running" in output.lower():
             continue
-        for line in output.split("\n"):
+        structured = junos_json(output)
+        if structured is not None:
+            lines = [f"{peer} {status}" for peer, status in parse_ldp_session_json(structured)]
+        else:
+            lines = output.split("\n")
+        for line in lines:
             if "nonexist" in line.lower() or "closed" in line.lower():
                 parts = line.split()
                 peer = parts[0] if parts and re.match(r"\d+\.\d+\.\d+\.\d+", parts[0]) else "unknown"
@@ -4169,6 +4749,10 @@ def find_isis_issues(isis_outputs: dict, device_map: dict) -> tuple:
         hostname = device_map.get(router, router)
         if not output.strip() or "not running" in output.lower():
             continue
+        structured = junos_json(output)
+        if structured is not None:
+            output = "\n".join(" ".join(row) for row in parse_isis_adjacency_json(structured)
+                               if all(row))
         # Check if this looks like actual adjacency output vs config dump
         has_adjacency_header = any(
             "system" in line.lower() and "state" in line.lower()
@@ -4341,6 +4925,10 @@ def parse_interface_detail(detail_outputs: dict, device_map: dict) -> dict:
                                    "crc_errors": int, "carrier_transitions": int}}}."""
     result = {}
     for router, output in detail_outputs.items():
+        structured = junos_json(output)
+        if structured is not None:
+            result[router] = parse_interface_detail_json(structured)
+            continue
         interfaces = {}
         current_intf = None
         current_data = {}
@@ -4516,15 +5104,16 @@ async def ollama_chat(messages, tools=None, retries=3):
     for attempt in range(1, retries + 1):
         try:
             timeout = 600.0 + (attempt - 1) * 300.0  # 600s, 900s, 1200s
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(f"{OLLAMA_URL}/api/chat", json=payload)
-                result = resp.json()
-                # Validate response structure
-                if "message" not in result:
-                    logger.warning(f"Ollama returned no 'message' key (attempt {attempt}): {list(result.keys())}")
-                    if attempt < retries:
-                        continue
-                return result
+            client = http_clients.get("ollama")
+            resp = await client.post(f"{OLLAMA_URL}/api/chat", json=payload,
+                                     timeout=httpx.Timeout(timeout, connect=http_clients.connect_timeout))
+            result = resp.json()
+            # Validate response structure
+            if "message" not in result:
+                logger.warning(f"Ollama returned no 'message' key (attempt {attempt}): {list(result.keys())}")
+                if attempt < retries:
+                    continue
+            return result
         except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
             last_err = e
             logger.warning(f"Ollama timeout attempt {attempt}/{retries}: {e}")
@@ -4607,18 +5196,7 @@ def build_topology_from_golden_configs() -> dict:
     if not os.path.exists(GOLDEN_CONFIG_DIR):
         return topology
     
-    for fname in sorted(os.listdir(GOLDEN_CONFIG_DIR)):
-        if not fname.endswith(".conf"):
-            continue
-        router = fname.replace(".conf", "")
-        config_path = os.path.join(GOLDEN_CONFIG_DIR, fname)
-        
-        try:
-            with open(config_path, "r") as f:
-                lines = f.readlines()
-        except Exception:
-            continue
-        
+    for router, idx in config_index.load(GOLDEN_CONFIG_DIR).items():
         # Determine role
         if router.startswith("PE"):
             topology["roles"][router] = "PE"
@@ -4627,28 +5205,19 @@ def build_topology_from_golden_configs() -> dict:
         else:
             topology["roles"][router] = "P"
         
-        # Parse interfaces
-        descriptions = {}  # intf -> description
-        addresses = {}     # intf -> ip/mask
+        if idx["loopback"]:
+            topology["loopbacks"][router] = idx["loopback"]
+        neighbors = idx["protocols"].get("bgp", {}).get("neighbors", [])
+        if neighbors:
+            topology["bgp_peers"][router] = list(neighbors)
         
-        for line in lines:
-            line = line.strip()
-            # Description: set interfaces ge-0/0/1 description PE1->P11
-            m = re.match(r'set interfaces (ge-\d+/\d+/\d+) description "?(\S+?)"?\s*$', line)
-            if m:
-                descriptions[m.group(1)] = m.group(2)
-            # IPv4 address: set interfaces ge-0/0/1 unit 0 family inet address 10.1.11.1/24
-            m = re.match(r'set interfaces (ge-\d+/\d+/\d+) unit \d+ family inet address (\d+\.\d+\.\d+\.\d+/\d+)', line)
-            if m:
-                addresses[m.group(1)] = m.group(2)
-            # Loopback: set interfaces lo0 unit 0 family inet address 10.255.255.1/32
-            m = re.match(r'set interfaces lo0 unit 0 family inet address (\d+\.\d+\.\d+\.\d+)/32', line)
-            if m:
-                topology["loopbacks"][router] = m.group(1)
-            # BGP neighbors: set protocols bgp group IBGP neighbor 10.255.255.12
-            m = re.match(r'set protocols bgp group \S+ neighbor (\d+\.\d+\.\d+\.\d+)', line)
-            if m:
-                topology["bgp_peers"].setdefault(router, []).append(m.group(1))
+        # Physical interfaces: intf -> description, intf -> ip/mask
+        physical = {name: intf for name, intf in idx["interfaces"].items()
+                    if PHYSICAL_INTERFACE.fullmatch(name)}
+        descriptions = {name: intf["description"] for name, intf in physical.items()
+                        if intf["description"] is not None}
+        addresses = {name: intf["addresses"][-1] for name, intf in physical.items()
+                     if intf["addresses"]}
         
         # Build links from descriptions
         for intf, desc in descriptions.items():
@@ -8820,20 +9389,25 @@ Reference the script template library for ready-to-use examples.
 #  FULL NETWORK AUDIT — Structured Report Builder
 # ══════════════════════════════════════════════════════════════
 
-async def run_full_audit(client, sid, device_map, device_facts):
+async def run_full_audit(client, sid, device_map, device_facts, incremental: bool | None = None):
     """Run the full network audit and generate a structured Markdown report.
     E29: Uses Rich Progress for visual phase tracking.
-    v18.1: Shows task plan upfront and updates live progress as each phase completes."""
+    v18.1: Shows task plan upfront and updates live progress as each phase completes.
+    incremental: reuse the previous audit's outputs for devices whose change signals
+    did not move (defaults to mcp.incremental_audit)."""
     from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
     from rich.table import Table
     all_mcp = list(device_map.keys())
     audit_start = time.time()
+    if incremental is None:
+        incremental = MCP_INCREMENTAL_AUDIT
 
     # ═══ v18.1: TASK PLAN & LIVE PROGRESS TRACKER ═══
     # Define all audit phases with descriptions and status tracking
     audit_plan = [
         {"name": "Device Facts",      "desc": f"Collect hardware model, version, hostname for {len(all_mcp)} devices",      "status": "pending", "time": None},
-        {"name": "Data Collection",   "desc": f"27 parallel show-commands across {len(all_mcp)} routers (batch MCP)",        "status": "pending", "time": None},
+        {"name": "Data Collection",   "desc": (f"Change probe + re-collect changed data across {len(all_mcp)} routers" if incremental else
+                                               f"27 show-commands across {len(all_mcp)} routers (one session per router)"),        "status": "pending", "time": None},
         {"name": "Config Drift",      "desc": "Compare live running-config against golden baselines",                        "status": "pending", "time": None},
         {"name": "Issue Detection",   "desc": "Programmatic parsing — OSPF/BGP/LDP/ISIS/BFD/NTP/storage/alarms",            "status": "pending", "time": None},
         {"name": "Deep Dive Audit",   "desc": "Fetch protocol configs + advanced data for root-cause analysis",              "status": "pending", "time": None},
@@ -8962,11 +9536,11 @@ async def run_full_audit(client, sid, device_map, device_facts):
 
     # Fetch uncached device facts in parallel with per-device timeout
     # gather_device_facts runs ~15 NETCONF RPCs per device (version, chassis,
-    # route-engine, virtual-chassis, hosts, resolv.conf, etc.).  When all 11
-    # devices share a single SSH gateway the gateway can throttle connections,
-    # so we limit concurrency to 3 and allow 90s per device.
+    # route-engine, virtual-chassis, hosts, resolv.conf, etc.).  The MCP server
+    # paces sessions per SSH gateway and backs off when connects fail, so this
+    # only bounds how many requests we keep outstanding; allow 90s per device.
     FACTS_TIMEOUT = 90.0   # seconds per device — 15 RPCs × ~2-6s each
-    FACTS_CONCURRENCY = 3  # max simultaneous SSH sessions to avoid gateway throttle
+    FACTS_CONCURRENCY = MCP_FACTS_CONCURRENCY
     _facts_sem = asyncio.Semaphore(FACTS_CONCURRENCY)
 
     async def _fetch_facts(name):
@@ -9087,41 +9661,73 @@ async def run_full_audit(client, sid, device_map, device_facts):
     collection_status.clear()  # Reset completeness tracking (#P4E)
     collect_start = time.time()
 
-    # Fire batch commands in parallel with semaphore throttling (max 2 concurrent)
-    # Each batch runs the command on all 11 routers simultaneously via MCP server
-    # return_exceptions=True prevents one hung command from blocking all others
-    gather_results = await asyncio.gather(
-        run_batch(client, sid, "show interfaces terse", all_mcp, "Interfaces"),
-        run_batch(client, sid, "show interfaces detail | no-more", all_mcp, "Interface Detail"),
-        run_batch(client, sid, "show chassis alarms", all_mcp, "Alarms"),
-        run_batch(client, sid, "show system uptime", all_mcp, "Uptime"),
-        run_batch(client, sid, "show system storage", all_mcp, "Storage"),
-        run_batch(client, sid, "show system core-dumps", all_mcp, "Core Dumps"),
-        run_batch(client, sid, "show ospf neighbor", all_mcp, "OSPF Neighbors"),
-        run_batch(client, sid, "show ospf interface", all_mcp, "OSPF Interfaces"),
-        run_batch(client, sid, "show bgp summary", all_mcp, "BGP Summary"),
-        run_batch(client, sid, "show isis adjacency", all_mcp, "ISIS"),
-        run_batch(client, sid, "show route summary", all_mcp, "Route Summary"),
-        run_batch(client, sid, "show mpls interface", all_mcp, "MPLS"),
-        run_batch(client, sid, "show ldp neighbor", all_mcp, "LDP Neighbors"),
-        run_batch(client, sid, "show ldp session", all_mcp, "LDP Sessions"),
-        run_batch(client, sid, "show lldp neighbors", all_mcp, "LLDP"),
-        run_batch(client, sid, "show ntp associations no-resolve", all_mcp, "NTP"),
+    # One matrix call runs every command over a single session per router
+    # (routers in parallel). Older MCP servers without the matrix tool fall
+    # back to one batch call per command, throttled by the batch semaphore.
+    audit_commands = [
+        ("Interfaces", "show interfaces terse"),
+        ("Interface Detail", "show interfaces detail | no-more"),
+        ("Alarms", "show chassis alarms"),
+        ("Uptime", "show system uptime"),
+        ("Storage", "show system storage"),
+        ("Core Dumps", "show system core-dumps"),
+        ("OSPF Neighbors", "show ospf neighbor"),
+        ("OSPF Interfaces", "show ospf interface"),
+        ("BGP Summary", "show bgp summary"),
+        ("ISIS", "show isis adjacency"),
+        ("Route Summary", "show route summary"),
+        ("MPLS", "show mpls interface"),
+        ("LDP Neighbors", "show ldp neighbor"),
+        ("LDP Sessions", "show ldp session"),
+        ("LLDP", "show lldp neighbors"),
+        ("NTP", "show ntp associations no-resolve"),
         # v6.0 new collections:
-        run_batch(client, sid, "show bfd session", all_mcp, "BFD"),
-        run_batch(client, sid, "show firewall", all_mcp, "Firewall"),
-        run_batch(client, sid, "show mpls lsp", all_mcp, "MPLS LSP"),
-        run_batch(client, sid, "show rsvp session", all_mcp, "RSVP"),
-        run_batch(client, sid, "show system commit", all_mcp, "Commits"),
-        run_batch(client, sid, "show route instance summary", all_mcp, "Route Instances"),
+        ("BFD", "show bfd session"),
+        ("Firewall", "show firewall"),
+        ("MPLS LSP", "show mpls lsp"),
+        ("RSVP", "show rsvp session"),
+        ("Commits", "show system commit"),
+        ("Route Instances", "show route instance summary"),
         # v11.0 new collections:
-        run_batch(client, sid, "show chassis routing-engine", all_mcp, "RE Stats"),
-        run_batch(client, sid, "show chassis environment", all_mcp, "Environment"),
-        run_batch(client, sid, "show chassis fpc", all_mcp, "FPC Status"),
-        run_batch(client, sid, "show configuration firewall", all_mcp, "FW Config"),
-        run_batch(client, sid, "show route table bgp.l3vpn.0 summary", all_mcp, "L3VPN Routes"),
-        return_exceptions=True,
-    )
+        ("RE Stats", "show chassis routing-engine"),
+        ("Environment", "show chassis environment"),
+        ("FPC Status", "show chassis fpc"),
+        ("FW Config", "show configuration firewall"),
+        ("L3VPN Routes", "show route table bgp.l3vpn.0 summary"),
+    ]
+    if MCP_STRUCTURED_COLLECTION:
+        audit_commands = [(lbl, STRUCTURED_AUDIT_COMMANDS.get(lbl, cmd)) for lbl, cmd in audit_commands]
+    # Per-router checks run as each router's output streams in, while slower
+    # routers are still being collected; Phase 4 only merges their results.
+    streamed = StreamedRouterAnalysis({
+        "Interfaces": lambda router, out: find_down_interfaces({router: out}),
+        "Interface Detail": lambda router, out: parse_interface_detail({router: out}, device_map),
+        "Alarms": lambda router, out: find_alarm_issues({router: out}, device_map),
+        "Storage": lambda router, out: find_storage_issues({router: out}, device_map),
+        "Core Dumps": lambda router, out: find_coredump_issues({router: out}, device_map),
+    })
+    # Incremental mode: probe change signals first and reuse cached outputs
+    # for devices that have not changed since the last audit.
+    audit_cache, audit_cache_entries, config_changed = {}, None, {}
+    incremental_results = None
+    if incremental:
+        audit_cache = load_audit_cache()
+        incremental_results = await collect_audit_incremental(client, sid, audit_commands, all_mcp, audit_cache)
+    if incremental_results is not None:
+        gather_results, audit_cache_entries, config_changed = incremental_results
+    else:
+        matrix_results = await run_matrix(client, sid, audit_commands, all_mcp, "Audit Collection",
+                                          on_result=streamed.on_result)
+        if matrix_results is not None:
+            gather_results = [matrix_results.get(lbl, "") for lbl, _ in audit_commands]
+        else:
+            # return_exceptions=True prevents one hung command from blocking all others
+            gather_results = await asyncio.gather(
+                *[run_batch(client, sid, cmd, all_mcp, lbl,
+                            on_result=lambda router_result, lbl=lbl: streamed.on_result(lbl, router_result))
+                  for lbl, cmd in audit_commands],
+                return_exceptions=True,
+            )
 
     # Unpack results — replace any exceptions with empty strings
     unpacked = []
@@ -9139,7 +9745,8 @@ async def run_full_audit(client, sid, device_map, device_facts):
      raw_bfd, raw_firewall, raw_mpls_lsp, raw_rsvp, raw_commits,
      raw_route_instances,
      raw_re_stats, raw_environment, raw_fpc, raw_fw_config, raw_l3vpn_routes) = unpacked
-    console.print(f"   [info]◷  Parallel collection done in {round(time.time() - collect_start, 1)}s[/info]")
+    console.print(f"   [info]◷  Parallel collection done in {round(time.time() - collect_start, 1)}s[/info]"
+                  + (f" [dim]({streamed.streamed} router outputs parsed while collecting)[/dim]" if streamed.streamed else ""))
     
     # Enhancement #P4E: Report data completeness
     failed_collections = {k: v for k, v in collection_status.items() if "failed" in str(v)}
@@ -9170,9 +9777,25 @@ async def run_full_audit(client, sid, device_map, device_facts):
         "ProbeError",
     )
 
+    # Routers whose config checksum matches their golden .meta sha256 are
+    # unchanged — use the baseline instead of transferring the full config.
+    # (Incremental audits already know which routers have not committed.)
+    config_checksums = await fetch_config_checksums(
+        client, sid, [m for m in all_mcp if config_changed.get(m, True)])
+
     # v9.0: Parallel config collection with semaphore (was serial — 11×30s = 5.5min)
     config_sem = asyncio.Semaphore(3)  # Max 3 concurrent config fetches
     async def _fetch_config(mcp_name):
+        if mcp_name in config_checksums:
+            golden, meta = load_golden_config(mcp_name)
+            if golden is not None and (meta or {}).get("sha256") == config_checksums[mcp_name]:
+                return mcp_name, golden, None
+        # Incremental audit: no commit or reboot since the last audit → reuse its config
+        if audit_cache_entries is not None and not config_changed.get(mcp_name, True):
+            cfg_cached = cached_audit_config(mcp_name, audit_cache.get(mcp_name))
+            if cfg_cached:
+                console.print(f"   [dim]{mcp_name}: no commit since last audit — reusing cached config[/dim]")
+                return mcp_name, cfg_cached, None
         async with config_sem:
             try:
                 cfg_raw = await asyncio.wait_for(
@@ -9230,6 +9853,8 @@ async def run_full_audit(client, sid, device_map, device_facts):
                 save_golden_config(mcp_name, cfg_text)
                 baselines_created.append(mcp_name)
                 console.print(f"   [info]✦ {mcp_name}: Golden baseline saved ({len(cfg_text.splitlines())} lines)[/info]")
+            elif (meta or {}).get("sha256") == hashlib.sha256(cfg_text.encode()).hexdigest():
+                console.print(f"   [success]● {mcp_name}: Config matches golden baseline ✓[/success] [dim](checksum)[/dim]")
             else:
                 # Compare current vs golden
                 d = diff_configs(golden, cfg_text, mcp_name)
@@ -9270,6 +9895,19 @@ async def run_full_audit(client, sid, device_map, device_facts):
         console.print(f"   [info]▪ First run: Golden baselines created for {len(baselines_created)} device(s): {', '.join(baselines_created)}[/info]")
         console.print(f"      [dim]Future audits will detect config drift against these baselines.[/dim]")
 
+    if audit_cache_entries is not None:
+        for mcp_name, entry in audit_cache_entries.items():
+            cfg_text = current_configs.get(mcp_name)
+            if cfg_text is None:
+                entry.pop("config_sha256", None)
+                entry.pop("config", None)
+                continue
+            _, meta = load_golden_config(mcp_name)
+            entry["config_sha256"] = hashlib.sha256(cfg_text.encode()).hexdigest()
+            # Configs matching the golden baseline are read back from golden_configs/
+            entry["config"] = None if (meta or {}).get("sha256") == entry["config_sha256"] else cfg_text
+        save_audit_cache(audit_cache_entries)
+
     # ═══ PARSE ALL DATA ═══
     _phase_status("◇ Phase 4: Issue Detection")
 
@@ -9303,7 +9941,7 @@ async def run_full_audit(client, sid, device_map, device_facts):
     l3vpn_route_outputs = parse_batch_json(raw_l3vpn_routes)
 
     # ═══ DETECT ISSUES PROGRAMMATICALLY ═══
-    down_intfs     = find_down_interfaces(intf_outputs)
+    down_intfs     = [i for found in streamed.results("Interfaces", intf_outputs) for i in found]
     ospf_info      = find_ospf_neighbors(ospf_nbr_out, ospf_intf_out, device_map)
     bgp_issues, bgp_established = find_bgp_issues(bgp_outputs, device_map)
     ldp_issues, ldp_healthy     = find_ldp_issues(ldp_sess_out, device_map)
@@ -9316,11 +9954,12 @@ async def run_full_audit(client, sid, device_map, device_facts):
         if lldp_links:
             console.print(f"   [info]▲  No LLDP data — built topology from {topology_source} ({len(lldp_links)} links)[/info]")
     isis_issues, isis_healthy   = find_isis_issues(isis_outputs, device_map)
-    chassis_alarms  = find_alarm_issues(alarm_outputs, device_map)
-    storage_issues  = find_storage_issues(storage_outputs, device_map)
-    coredump_issues = find_coredump_issues(coredump_outputs, device_map)
+    chassis_alarms  = [a for found in streamed.results("Alarms", alarm_outputs) for a in found]
+    storage_issues  = [s for found in streamed.results("Storage", storage_outputs) for s in found]
+    coredump_issues = [c for found in streamed.results("Core Dumps", coredump_outputs) for c in found]
     route_summary   = parse_route_summary(route_outputs, device_map)
-    intf_details    = parse_interface_detail(intf_detail_outputs, device_map)
+    intf_details    = {r: d for parsed in streamed.results("Interface Detail", intf_detail_outputs)
+                       for r, d in parsed.items()}
     mtu_mismatches  = find_mtu_mismatches(intf_details, lldp_links, device_map)
     intf_errors     = find_interface_errors(intf_details, device_map)
     # v6.0 new detections
@@ -11486,6 +12125,8 @@ async def main():
     parser = argparse.ArgumentParser(description="Ollama <-> Junos MCP Bridge v7.0")
     parser.add_argument("--audit-only", action="store_true",
                         help="Run a full audit, save the report, and exit (non-interactive)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Incremental audit: only re-collect data from devices whose change signals moved")
     parser.add_argument("--no-history", action="store_true",
                         help="Don't load or save session history")
     args = parser.parse_args()
@@ -11534,10 +12175,8 @@ async def main():
         console.print(f"   ▲  RAG Vector Store failed ({e}) — falling back to keyword matching", style="yellow")
         vector_kb = None
 
-    async with httpx.AsyncClient(
-        timeout=httpx.Timeout(600.0, connect=30.0),
-        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
-    ) as mcp_client:
+    # The shared pooled clients live as long as the bridge; closed on exit
+    async with http_clients.lifespan("mcp") as mcp_client:
         
         # ── STARTUP PHASE ──
         console.print("\n◷ Connecting to MCP server...", style="dim")
@@ -11699,7 +12338,8 @@ async def main():
         # ── Enhancement #10: Audit-only mode ──
         if args.audit_only:
             console.print(f"\n{Icons.SEARCH} [bold]AUDIT-ONLY MODE[/bold] — Starting full network audit...")
-            report = await run_full_audit(mcp_client, session_id, device_map, device_facts)
+            report = await run_full_audit(mcp_client, session_id, device_map, device_facts,
+                                          incremental=True if args.incremental else None)
             ts = datetime.now().strftime("%Y-%m-%d_%H%M%S")
             fname = f"NETWORK_AUDIT_{ts}.md"
             with open(fname, "w") as f:
@@ -12400,7 +13040,9 @@ async def main():
             lower = user_input.lower().strip()
             
             # Audit mode
-            if lower in ("audit", "health check", "run audit", "network audit"):
+            if lower in ("audit", "health check", "run audit", "network audit",
+                         "audit incremental", "incremental audit"):
+                audit_incremental = True if "incremental" in lower or args.incremental else None
                 console.print("\n⊕ Starting full network audit...", style="bold cyan")
                 
                 # v19.0: Show active todos before audit
@@ -12420,7 +13062,8 @@ async def main():
                     _action_tracker.start_step(0)
                 
                 try:
-                    report = await run_full_audit(mcp_client, session_id, device_map, device_facts)
+                    report = await run_full_audit(mcp_client, session_id, device_map, device_facts,
+                                                  incremental=audit_incremental)
                     if _action_tracker:
                         for i in range(5):
                             _action_tracker.complete_step(i)
@@ -12428,7 +13071,8 @@ async def main():
                     console.print(f"   ↻ MCP connection lost during audit ({e}), reconnecting...", style="yellow")
                     try:
                         session_id = await mcp_reconnect(mcp_client)
-                        report = await run_full_audit(mcp_client, session_id, device_map, device_facts)
+                        report = await run_full_audit(mcp_client, session_id, device_map, device_facts,
+                                                      incremental=audit_incremental)
                     except Exception as reconn_err:
                         console.print(f"   ✗ Audit failed after reconnect: {reconn_err}", style="bold red")
                         continue
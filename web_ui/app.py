@@ -23,6 +23,7 @@ import re
 import difflib
 import hashlib
 import sqlite3
+import atexit
 import asyncio
 import threading
 import glob
@@ -44,7 +45,9 @@ from flask_cors import CORS
 
 # Quantum-Inspired Network Optimization Engine
 from quantum_engine import (
-    calculate_network_stats_v2,
+    CompactGraph,
+    TopologyStats,
+    STATS_PARTS,
     TarjanSPOF,
     fast_diameter_approx,
     QuantumAnnealingOptimizer,
@@ -55,6 +58,7 @@ from quantum_engine import (
     detect_anomalies,
     benchmark as quantum_benchmark
 )
+from path_engine import FailureSimulator, PathEngine, start_n1_pool
 
 try:
     from jinja2 import Template, Environment, BaseLoader, UndefinedError
@@ -65,6 +69,9 @@ except ImportError:
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+from http_clients import http_clients
+from junos_config_index import PHYSICAL_INTERFACE, config_index, config_search, protocol_interfaces
+
 GOLDEN_CONFIG_DIR = BASE_DIR / "golden_configs"
 DEVICES_JSON = BASE_DIR / "junos-mcp-server" / "devices.json"
 CONFIG_YAML = BASE_DIR / "config.yaml"
@@ -128,9 +135,15 @@ app.before_request(_check_api_key)
 # ── Prevent ALL API response caching ──
 @app.after_request
 def _no_cache(response):
-    """Ensure no API responses are cached by the browser."""
+    """Ensure no API responses are cached by the browser.
+
+    Responses carrying an ETag may be stored but must be revalidated on
+    every use, so conditional requests can be answered with 304."""
     if request.path.startswith("/api/"):
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+        if response.headers.get("ETag"):
+            response.headers["Cache-Control"] = "no-cache, must-revalidate, max-age=0"
+        else:
+            response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
         response.headers["Pragma"] = "no-cache"
         response.headers["Expires"] = "0"
     return response
@@ -147,6 +160,7 @@ def load_config():
         return {}
 
 _cfg = load_config()
+http_clients.configure(**_cfg.get("http", {}))
 MCP_SERVER_URL = _cfg.get("mcp", {}).get("url", "http://127.0.0.1:30030/mcp/")
 MCP_CALL_TIMEOUT = _cfg.get("mcp", {}).get("call_timeout", 120.0)
 OLLAMA_URL = _cfg.get("ai", {}).get("ollama_url", "http://127.0.0.1:11434")
@@ -190,6 +204,7 @@ for _dir in [GOLDEN_CONFIG_DIR, WORKFLOWS_DIR, RESULTS_DIR, GIT_EXPORT_DIR,
 # ══════════════════════════════════════════════════════════════
 
 _mcp_session_id = None  # Cached session ID
+_mcp_session_client = None  # Pooled client the session was opened on
 
 def parse_sse_response(text: str) -> dict:
     """Parse SSE event stream and extract the final JSON-RPC result."""
@@ -245,30 +260,71 @@ async def mcp_call_tool(client, sid, tool_name, arguments):
     return text if text else json.dumps(data)
 
 
+async def mcp_call_tool_stream(client, sid, tool_name, arguments, on_progress):
+    """Call an MCP tool, handing each progress notification to on_progress as it arrives."""
+    token = f"{tool_name}-{hashlib.sha1(os.urandom(8)).hexdigest()[:12]}"
+    headers = {"Accept": "application/json, text/event-stream"}
+    if sid:
+        headers["mcp-session-id"] = sid
+    payload = {
+        "jsonrpc": "2.0", "id": 3, "method": "tools/call",
+        "params": {"name": tool_name, "arguments": arguments, "_meta": {"progressToken": token}}
+    }
+    data = {}
+    async with client.stream("POST", MCP_SERVER_URL, json=payload, headers=headers,
+                             timeout=MCP_CALL_TIMEOUT) as resp:
+        if "text/event-stream" not in resp.headers.get("content-type", ""):
+            await resp.aread()
+            data = resp.json()
+        else:
+            async for line in resp.aiter_lines():
+                line = line.strip()
+                if not line.startswith("data: "):
+                    continue
+                try:
+                    msg = json.loads(line[6:])
+                except json.JSONDecodeError:
+                    continue
+                if msg.get("method") == "notifications/progress":
+                    params = msg.get("params", {})
+                    if params.get("progressToken") == token:
+                        on_progress(params)
+                elif "result" in msg or "error" in msg:
+                    data = msg
+    content = data.get("result", {}).get("content", [])
+    text = "\n".join(c.get("text", "") for c in content if c.get("type") == "text")
+    return text if text else json.dumps(data)
+
+
 async def mcp_get_session(client):
-    """Get or create MCP session. Clears stale sessions on failure."""
-    global _mcp_session_id
-    if _mcp_session_id is None:
+    """Get or create MCP session. Clears stale sessions on failure.
+
+    The session is bound to the client it was opened on, so a new pooled
+    client (e.g. after the background loop restarts) re-initializes."""
+    global _mcp_session_id, _mcp_session_client
+    if _mcp_session_id is None or _mcp_session_client is not client:
         _mcp_session_id = await mcp_initialize(client)
+        _mcp_session_client = client
     return _mcp_session_id
 
 
 def mcp_clear_session():
     """Clear cached MCP session so the next call re-initializes."""
-    global _mcp_session_id
+    global _mcp_session_id, _mcp_session_client
     _mcp_session_id = None
+    _mcp_session_client = None
 
 
 async def mcp_execute_command(router_name: str, command: str) -> str:
     """Execute a single Junos command on a router via MCP. Retries on stale session."""
     for attempt in range(2):
         try:
-            async with httpx.AsyncClient(timeout=MCP_CALL_TIMEOUT + 10) as client:
-                sid = await mcp_get_session(client)
-                result = await mcp_call_tool(client, sid, "execute_junos_command", {
-                    "router_name": router_name, "command": command
-                })
-                return result
+            client = http_clients.get("mcp")
+            sid = await mcp_get_session(client)
+            result = await mcp_call_tool(client, sid, "execute_junos_command", {
+                "router_name": router_name, "command": command
+            })
+            return result
         except Exception as e:
             if attempt == 0:
                 logger.warning(f"MCP execute_command failed (attempt 1), clearing session: {e}")
@@ -279,15 +335,28 @@ async def mcp_execute_command(router_name: str, command: str) -> str:
     return "Error: MCP command failed after retries"
 
 
-async def mcp_execute_batch(command: str, router_names: list) -> str:
-    """Execute a command on multiple routers via MCP batch."""
+async def mcp_execute_batch(command: str, router_names: list, on_result=None) -> str:
+    """Execute a command on multiple routers via MCP batch.
+
+    on_result, if given, is called with each router's result dict (plus the
+    batch progress) as soon as that router finishes.
+    """
     try:
-        async with httpx.AsyncClient(timeout=MCP_CALL_TIMEOUT + 30) as client:
-            sid = await mcp_get_session(client)
-            result = await mcp_call_tool(client, sid, "execute_junos_command_batch", {
-                "command": command, "router_names": router_names
-            })
-            return result
+        client = http_clients.get("mcp")
+        sid = await mcp_get_session(client)
+        arguments = {"command": command, "router_names": router_names}
+        if on_result is None:
+            return await mcp_call_tool(client, sid, "execute_junos_command_batch", arguments)
+
+        def _on_progress(params):
+            try:
+                router_result = json.loads(params.get("message") or "")
+            except (json.JSONDecodeError, TypeError):
+                return
+            on_result(router_result, params.get("progress"), params.get("total"))
+
+        return await mcp_call_tool_stream(client, sid, "execute_junos_command_batch",
+                                          arguments, _on_progress)
     except Exception as e:
         logger.error(f"MCP batch failed: {e}")
         return f"Error: {e}"
@@ -296,26 +365,43 @@ async def mcp_execute_batch(command: str, router_names: list) -> str:
 async def mcp_get_config(router_name: str) -> str:
     """Get running config from a router via MCP."""
     try:
-        async with httpx.AsyncClient(timeout=MCP_CALL_TIMEOUT + 10) as client:
-            sid = await mcp_get_session(client)
-            result = await mcp_call_tool(client, sid, "get_junos_config", {
-                "router_name": router_name
-            })
-            return result
+        client = http_clients.get("mcp")
+        sid = await mcp_get_session(client)
+        result = await mcp_call_tool(client, sid, "get_junos_config", {
+            "router_name": router_name
+        })
+        return result
     except Exception as e:
         logger.error(f"MCP get_config failed: {e}")
         return f"Error: {e}"
 
 
+async def mcp_get_config_checksums(router_names: list) -> dict:
+    """Get {router: config sha256} via MCP without transferring configs.
+    Empty when the MCP server does not offer get_junos_config_checksum."""
+    try:
+        client = http_clients.get("mcp")
+        sid = await mcp_get_session(client)
+        result = await mcp_call_tool(client, sid, "get_junos_config_checksum", {
+            "router_names": router_names
+        })
+        results = json.loads(result).get("results", {})
+    except Exception as e:
+        logger.warning(f"MCP config checksums unavailable: {e}")
+        return {}
+    return {name: r["sha256"] for name, r in results.items()
+            if isinstance(r, dict) and r.get("status") == "success" and r.get("sha256")}
+
+
 async def mcp_get_facts(router_name: str) -> str:
     """Get device facts from a router via MCP."""
     try:
-        async with httpx.AsyncClient(timeout=MCP_CALL_TIMEOUT + 10) as client:
-            sid = await mcp_get_session(client)
-            result = await mcp_call_tool(client, sid, "gather_device_facts", {
-                "router_name": router_name
-            })
-            return result
+        client = http_clients.get("mcp")
+        sid = await mcp_get_session(client)
+        result = await mcp_call_tool(client, sid, "gather_device_facts", {
+            "router_name": router_name
+        })
+        return result
     except Exception as e:
         logger.error(f"MCP get_facts failed: {e}")
         return f"Error: {e}"
@@ -324,14 +410,14 @@ async def mcp_get_facts(router_name: str) -> str:
 async def mcp_load_config(router_name: str, config_text: str, commit_comment: str = "NOC WebUI") -> str:
     """Load and commit configuration on a router via MCP."""
     try:
-        async with httpx.AsyncClient(timeout=MCP_CALL_TIMEOUT + 30) as client:
-            sid = await mcp_get_session(client)
-            result = await mcp_call_tool(client, sid, "load_and_commit_config", {
-                "router_name": router_name,
-                "config_text": config_text,
-                "commit_comment": commit_comment
-            })
-            return result
+        client = http_clients.get("mcp")
+        sid = await mcp_get_session(client)
+        result = await mcp_call_tool(client, sid, "load_and_commit_config", {
+            "router_name": router_name,
+            "config_text": config_text,
+            "commit_comment": commit_comment
+        })
+        return result
     except Exception as e:
         logger.error(f"MCP load_config failed: {e}")
         return f"Error: {e}"
@@ -340,22 +426,67 @@ async def mcp_load_config(router_name: str, config_text: str, commit_comment: st
 async def mcp_get_router_list() -> str:
     """Get list of routers from MCP server."""
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            sid = await mcp_get_session(client)
-            result = await mcp_call_tool(client, sid, "get_router_list", {})
-            return result
+        client = http_clients.get("mcp")
+        sid = await mcp_get_session(client)
+        result = await mcp_call_tool(client, sid, "get_router_list", {})
+        return result
     except Exception as e:
         logger.error(f"MCP get_router_list failed: {e}")
         return f"Error: {e}"
 
 
-def run_async(coro):
-    """Run an async coroutine from sync Flask context."""
-    loop = asyncio.new_event_loop()
+# ── Background event loop ──
+# One long-lived loop owns the pooled HTTP clients and the MCP session.
+# Flask routes submit coroutines to it instead of building a loop per call.
+_bg_loop = None
+_bg_loop_lock = threading.Lock()
+
+
+def background_loop():
+    """Return the shared background event loop, starting it on first use."""
+    global _bg_loop
+    with _bg_loop_lock:
+        if _bg_loop is None or _bg_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="noc-async-loop", daemon=True).start()
+            _bg_loop = loop
+        return _bg_loop
+
+
+def submit_async(coro):
+    """Schedule a coroutine on the background loop and return its concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, background_loop())
+
+
+def run_async(coro, timeout=None):
+    """Run an async coroutine from sync Flask context on the background loop."""
+    loop = background_loop()
     try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_async called from the background loop — await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+def shutdown_background_loop():
+    """Close the pooled clients and stop the background loop (atexit)."""
+    global _bg_loop
+    with _bg_loop_lock:
+        loop, _bg_loop = _bg_loop, None
+    if loop is None or loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(http_clients.aclose(), loop).result(5)
+    except Exception as e:
+        logger.debug(f"Closing pooled clients failed: {e}")
+    loop.call_soon_threadsafe(loop.stop)
+    mcp_clear_session()
+
+
+atexit.register(shutdown_background_loop)
 
 
 # ══════════════════════════════════════════════════════════════
@@ -401,13 +532,13 @@ async def ollama_chat_async(messages: list, stream: bool = False, model: str = "
         }
     }
     try:
-        async with httpx.AsyncClient(timeout=600.0) as client:
-            resp = await client.post(f"{OLLAMA_URL}/api/chat", json=payload)
-            if resp.status_code != 200:
-                error_text = resp.text[:500]
-                logger.error(f"Ollama returned {resp.status_code}: {error_text}")
-                return {"message": {"content": f"AI Error (HTTP {resp.status_code}): {error_text}"}}
-            return resp.json()
+        client = http_clients.get("ollama")
+        resp = await client.post(f"{OLLAMA_URL}/api/chat", json=payload)
+        if resp.status_code != 200:
+            error_text = resp.text[:500]
+            logger.error(f"Ollama returned {resp.status_code}: {error_text}")
+            return {"message": {"content": f"AI Error (HTTP {resp.status_code}): {error_text}"}}
+        return resp.json()
     except httpx.ConnectError:
         return {"message": {"content": "⚠ Cannot connect to Ollama. Please ensure it is running at " + OLLAMA_URL}}
     except httpx.ReadTimeout:
@@ -439,22 +570,22 @@ async def ollama_stream_async(messages: list):
         }
     }
     try:
-        async with httpx.AsyncClient(timeout=600.0) as client:
-            async with client.stream("POST", f"{OLLAMA_URL}/api/chat", json=payload) as resp:
-                if resp.status_code != 200:
-                    yield f"⚠ Ollama returned HTTP {resp.status_code}. Please check model availability."
-                    return
-                async for line in resp.aiter_lines():
-                    if line.strip():
-                        try:
-                            chunk = json.loads(line)
-                            token = chunk.get("message", {}).get("content", "")
-                            if token:
-                                yield token
-                            if chunk.get("done"):
-                                break
-                        except json.JSONDecodeError:
-                            continue
+        client = http_clients.get("ollama")
+        async with client.stream("POST", f"{OLLAMA_URL}/api/chat", json=payload) as resp:
+            if resp.status_code != 200:
+                yield f"⚠ Ollama returned HTTP {resp.status_code}. Please check model availability."
+                return
+            async for line in resp.aiter_lines():
+                if line.strip():
+                    try:
+                        chunk = json.loads(line)
+                        token = chunk.get("message", {}).get("content", "")
+                        if token:
+                            yield token
+                        if chunk.get("done"):
+                            break
+                    except json.JSONDecodeError:
+                        continue
     except httpx.ConnectError:
         yield "⚠ Cannot connect to Ollama. Please ensure it is running at " + OLLAMA_URL
     except httpx.ReadTimeout:
@@ -724,8 +855,30 @@ async def execute_workflow(workflow: dict) -> list:
     return results
 
 # ── Topology Engine ────────────────────────────────────────────
-def build_topology_from_golden_configs():
-    """Parse golden configs to build topology graph for web visualization."""
+# Golden configs are indexed once per (mtime, size) by the shared
+# junos_config_index cache; the assembled topology is cached against the
+# signature of the whole directory. A dashboard refresh with no config
+# changes is a stat() per file, and a changed config re-indexes only that
+# router.
+_topology_lock = threading.Lock()
+_topology_cache = {"signature": None, "topology": None, "etag": None}
+
+
+def _router_role(router):
+    """Role from the router naming convention."""
+    if router.startswith("PE"):
+        return "PE"
+    if router in ("P12", "P22"):
+        return "RR"
+    return "P"
+
+
+def _physical(interfaces):
+    return [i for i in interfaces if PHYSICAL_INTERFACE.fullmatch(i)]
+
+
+def _assemble_topology(indexes):
+    """Build the topology graph from {router: config index}, in router order."""
     topology = {
         "nodes": [],
         "links": [],
@@ -738,102 +891,28 @@ def build_topology_from_golden_configs():
         "vpn_instances": {}
     }
     seen_links = set()
-    
-    if not GOLDEN_CONFIG_DIR.exists():
-        GOLDEN_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    
-    conf_files = sorted(GOLDEN_CONFIG_DIR.glob("*.conf"))
-    
-    # Fallback: if no golden configs exist, build minimal topology from devices.json
-    if not conf_files:
-        devices = load_devices()
-        for name, info in devices.items():
-            role = "PE" if name.upper().startswith("PE") else ("RR" if name in ("P12","P22") else "P")
-            topology["nodes"].append({
-                "id": name, "role": role, "loopback": info.get("ip", ""),
-                "interfaces": [], "isis_interfaces": [],
-                "bgp_neighbors": [], "ldp": False, "vpn": False,
-                "descriptions": {}, "addresses": {}
-            })
-            topology["roles"][name] = role
-            if info.get("ip"):
-                topology["loopbacks"][name] = info["ip"]
-        return topology
-    
-    for fname in conf_files:
-        router = fname.stem
-        
-        try:
-            lines = fname.read_text().splitlines()
-        except Exception:
-            continue
-        
-        # Determine role
-        if router.startswith("PE"):
-            role = "PE"
-        elif router in ("P12", "P22"):
-            role = "RR"
-        else:
-            role = "P"
+
+    for router, idx in indexes.items():
+        role = _router_role(router)
         topology["roles"][router] = role
-        
-        descriptions = {}
-        addresses = {}
-        isis_intfs = []
-        ldp_intfs = []
-        mpls_intfs = []
-        bgp_neighbors = []
-        vpn_instances = []
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Interface descriptions
-            m = re.match(r'set interfaces (ge-\d+/\d+/\d+) description "?(.+?)"?\s*$', line)
-            if m:
-                descriptions[m.group(1)] = m.group(2)
-            
-            # IPv4 addresses
-            m = re.match(r'set interfaces (ge-\d+/\d+/\d+) unit \d+ family inet address (\d+\.\d+\.\d+\.\d+/\d+)', line)
-            if m:
-                addresses[m.group(1)] = m.group(2)
-            
-            # Loopback
-            m = re.match(r'set interfaces lo0 unit 0 family inet address (\d+\.\d+\.\d+\.\d+)/32', line)
-            if m:
-                topology["loopbacks"][router] = m.group(1)
-            
-            # BGP neighbors
-            m = re.match(r'set protocols bgp group \S+ neighbor (\d+\.\d+\.\d+\.\d+)', line)
-            if m:
-                bgp_neighbors.append(m.group(1))
-            
-            # IS-IS interfaces
-            m = re.match(r'set protocols isis interface (ge-\d+/\d+/\d+)\.\d+', line)
-            if m:
-                if m.group(1) not in isis_intfs:
-                    isis_intfs.append(m.group(1))
-            
-            # IS-IS metrics
-            m = re.match(r'set protocols isis interface (ge-\d+/\d+/\d+)\.\d+ level \d+ metric (\d+)', line)
-            if m:
-                topology["isis_metrics"].setdefault(router, {})[m.group(1)] = int(m.group(2))
-            
-            # LDP interfaces
-            m = re.match(r'set protocols ldp interface (ge-\d+/\d+/\d+)', line)
-            if m:
-                ldp_intfs.append(m.group(1))
-            
-            # MPLS interfaces
-            m = re.match(r'set protocols mpls interface (ge-\d+/\d+/\d+)', line)
-            if m:
-                mpls_intfs.append(m.group(1))
-            
-            # VPN instances
-            m = re.match(r'set routing-instances (\S+) instance-type (\S+)', line)
-            if m:
-                vpn_instances.append({"name": m.group(1), "type": m.group(2)})
-        
+        if idx["loopback"]:
+            topology["loopbacks"][router] = idx["loopback"]
+        isis_metrics = idx["protocols"].get("isis", {}).get("metrics", {})
+        if isis_metrics:
+            topology["isis_metrics"][router] = isis_metrics
+
+        physical = {name: intf for name, intf in idx["interfaces"].items()
+                    if PHYSICAL_INTERFACE.fullmatch(name)}
+        descriptions = {name: intf["description"] for name, intf in physical.items()
+                        if intf["description"] is not None}
+        addresses = {name: intf["addresses"][-1] for name, intf in physical.items()
+                     if intf["addresses"]}
+        isis_intfs = _physical(protocol_interfaces(idx, "isis"))
+        ldp_intfs = _physical(protocol_interfaces(idx, "ldp"))
+        mpls_intfs = _physical(protocol_interfaces(idx, "mpls"))
+        bgp_neighbors = idx["protocols"].get("bgp", {}).get("neighbors", [])
+        vpn_instances = idx["instances"]
+
         topology["bgp_peers"][router] = bgp_neighbors
         topology["interfaces"][router] = {
             "physical": list(descriptions.keys()),
@@ -843,7 +922,7 @@ def build_topology_from_golden_configs():
         }
         if vpn_instances:
             topology["vpn_instances"][router] = vpn_instances
-        
+
         # Build node (fields match frontend JS expectations)
         topology["nodes"].append({
             "id": router,
@@ -859,7 +938,7 @@ def build_topology_from_golden_configs():
             "vpn": vpn_instances[0]["name"] if vpn_instances else None,
             "status": "up"
         })
-        
+
         # Build links
         for intf, desc in descriptions.items():
             m = re.match(r'(\w+)->(\w+)', desc)
@@ -870,7 +949,7 @@ def build_topology_from_golden_configs():
                 if link_key not in seen_links:
                     seen_links.add(link_key)
                     subnet = addresses.get(intf, "")
-                    metric = topology["isis_metrics"].get(router, {}).get(intf, 10)
+                    metric = isis_metrics.get(intf, 10)
                     topology["links"].append({
                         "source": local_name,
                         "target": remote_name,
@@ -884,7 +963,7 @@ def build_topology_from_golden_configs():
                         },
                         "status": "up"
                     })
-    
+
     # Build iBGP session links
     ip_to_name = {ip: name for name, ip in topology["loopbacks"].items()}
     bgp_links = []
@@ -902,10 +981,80 @@ def build_topology_from_golden_configs():
                     "status": "established"
                 })
     topology["bgp_links"] = bgp_links
-    
+
+    return topology
+
+
+def _build_fallback_topology():
+    """Minimal topology from devices.json when no golden configs exist."""
+    topology = _assemble_topology({})
+    for name, info in load_devices().items():
+        role = "PE" if name.upper().startswith("PE") else ("RR" if name in ("P12","P22") else "P")
+        topology["nodes"].append({
+            "id": name, "role": role, "loopback": info.get("ip", ""),
+            "interfaces": [], "isis_interfaces": [],
+            "bgp_neighbors": [], "ldp": False, "vpn": False,
+            "descriptions": {}, "addresses": {}
+        })
+        topology["roles"][name] = role
+        if info.get("ip"):
+            topology["loopbacks"][name] = info["ip"]
     return topology
 
 
+def _refresh_topology_cache():
+    """Rebuild the cached topology if any golden config changed. Returns the cache."""
+    if not GOLDEN_CONFIG_DIR.exists():
+        GOLDEN_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+
+    signature, indexes = config_index.snapshot(GOLDEN_CONFIG_DIR)
+
+    with _topology_lock:
+        if _topology_cache["signature"] == signature and _topology_cache["topology"] is not None:
+            return _topology_cache
+
+        # Fallback: if no golden configs exist, build minimal topology from devices.json
+        # (not cached — the inventory can change without touching golden_configs/)
+        if not indexes:
+            return {"signature": None, "topology": _build_fallback_topology(),
+                    "etag": None}
+
+        _topology_cache["topology"] = _assemble_topology(indexes)
+        _topology_cache["signature"] = signature
+        _topology_cache["etag"] = hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+        return _topology_cache
+
+
+def build_topology_from_golden_configs():
+    """Parse golden configs to build topology graph for web visualization.
+
+    Served from a process-wide cache invalidated by golden config mtimes
+    and sizes. The returned graph is shared between callers — treat it as
+    read-only."""
+    return _refresh_topology_cache()["topology"]
+
+
+def topology_etag():
+    """ETag of the current topology, or None when it is not cacheable."""
+    return _refresh_topology_cache()["etag"]
+
+
+def invalidate_topology_cache():
+    """Drop the cached topology so the next call re-parses every config."""
+    with _topology_lock:
+        _topology_cache.update(signature=None, topology=None, etag=None)
+    config_index.clear()
+
+
+def _topology_not_modified(etag):
+    """304 response if the client already holds etag, else None."""
+    if etag and etag in request.if_none_match:
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        return resp
+    return None
+
+
 # ── Config Diff Engine ─────────────────────────────────────────
 def get_config_diff(router_name, config_text=None):
     """Compare running config against golden config."""
@@ -953,91 +1102,127 @@ def get_config_diff(router_name, config_text=None):
 
 
 # ── Shortest Path Analysis ────────────────────────────────────
-def find_shortest_path(source, target, topology=None):
-    """Dijkstra's shortest path using IS-IS metrics from topology."""
+# One PathEngine per topology version: shortest-path trees are memoized
+# inside it and thrown away with it when the golden configs change.
+_path_engine_lock = threading.Lock()
+_path_engine_cache = {"etag": None, "engine": None}
+
+
+def get_path_engine(topology=None):
+    """Path engine for topology, reused while the golden-config topology is unchanged."""
     if topology is None:
         topology = build_topology_from_golden_configs()
-    
-    # Build adjacency graph with weights
-    graph = {}
-    for link in topology["links"]:
-        src, dst = link["source"], link["target"]
-        weight = link.get("metric", 10)
-        graph.setdefault(src, []).append((dst, weight, link))
-        graph.setdefault(dst, []).append((src, weight, link))
-    
-    if source not in graph or target not in graph:
+    etag = _topology_cache["etag"] if topology is _topology_cache["topology"] else None
+    if not etag:
+        return PathEngine(topology.get("links", []))
+    with _path_engine_lock:
+        if _path_engine_cache["etag"] != etag:
+            _path_engine_cache["engine"] = PathEngine(topology.get("links", []), version=etag)
+            _path_engine_cache["etag"] = etag
+        return _path_engine_cache["engine"]
+
+
+# One CompactGraph (CSR adjacency) per topology version, shared by the
+# quantum engine's SPOF, diameter, community and anomaly algorithms.
+_compact_graph_lock = threading.Lock()
+_compact_graph_cache = {"etag": None, "graph": None}
+
+
+def get_compact_graph(topology=None):
+    """Compact graph for topology, reused while the golden-config topology is unchanged."""
+    if topology is None:
+        topology = build_topology_from_golden_configs()
+    etag = _topology_cache["etag"] if topology is _topology_cache["topology"] else None
+    if not etag:
+        return CompactGraph.from_topology(topology)
+    with _compact_graph_lock:
+        if _compact_graph_cache["etag"] != etag:
+            _compact_graph_cache["graph"] = CompactGraph.from_topology(topology, version=etag)
+            _compact_graph_cache["etag"] = etag
+        return _compact_graph_cache["graph"]
+
+
+# ── Network Stats Cache ───────────────────────────────────────
+# TopologyStats per topology content, computed part by part: chat prompts
+# that only print router counts never run Tarjan, diameter or Louvain.
+# A new topology version gets its heavy parts warmed in the background.
+_STATS_CACHE_SIZE = 8
+_stats_lock = threading.Lock()
+_stats_cache = OrderedDict()  # topology key -> TopologyStats
+
+
+def _topology_key(topology):
+    """Version of topology: its ETag when it is the cached golden topology,
+    otherwise a hash of its nodes and links."""
+    if topology is _topology_cache["topology"] and _topology_cache["etag"]:
+        return _topology_cache["etag"]
+    content = json.dumps([topology.get("nodes", []), topology.get("links", [])],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def get_topology_stats(topology=None):
+    """Memoized TopologyStats for topology (default: the golden-config topology)."""
+    if topology is None:
+        topology = build_topology_from_golden_configs()
+    key = _topology_key(topology)
+    with _stats_lock:
+        stats = _stats_cache.get(key)
+        if stats is not None:
+            _stats_cache.move_to_end(key)
+            return stats
+        stats = TopologyStats(topology, get_compact_graph(topology), version=key)
+        _stats_cache[key] = stats
+        while len(_stats_cache) > _STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+    if topology is _topology_cache["topology"]:
+        _executor.submit(_warm_topology_stats, stats)
+    return stats
+
+
+def _warm_topology_stats(stats):
+    try:
+        stats.full()
+    except Exception as e:
+        logger.debug(f"Background stats refresh failed: {e}")
+
+
+def network_stats(topology=None, *parts):
+    """Network stats dict for topology, computing only the requested parts
+    (see STATS_PARTS; default counts). Pass "all" for every part."""
+    stats = get_topology_stats(topology)
+    if parts == ("all",):
+        return stats.full()
+    return stats.get(*parts)
+
+
+def find_shortest_path(source, target, topology=None):
+    """Dijkstra's shortest path using IS-IS metrics from topology."""
+    engine = get_path_engine(topology)
+    if source not in engine or target not in engine:
         return {"error": f"Unknown node(s): {source}, {target}", "path": [], "cost": -1}
-    
-    # Dijkstra
-    import heapq
-    dist = {source: 0}
-    prev = {source: None}
-    prev_link = {source: None}
-    pq = [(0, source)]
-    visited = set()
-    
-    while pq:
-        d, u = heapq.heappop(pq)
-        if u in visited:
-            continue
-        visited.add(u)
-        if u == target:
-            break
-        for v, w, link in graph.get(u, []):
-            if v not in visited:
-                new_dist = d + w
-                if new_dist < dist.get(v, float("inf")):
-                    dist[v] = new_dist
-                    prev[v] = u
-                    prev_link[v] = link
-                    heapq.heappush(pq, (new_dist, v))
-    
-    if target not in prev:
+
+    result = engine.shortest_path(source, target)
+    if result is None:
         return {"error": f"No path from {source} to {target}", "path": [], "cost": -1}
-    
-    # Reconstruct
-    path = []
-    links_used = []
-    node = target
-    while node is not None:
-        path.append(node)
-        if prev_link.get(node):
-            links_used.append(prev_link[node])
-        node = prev.get(node)
-    path.reverse()
-    links_used.reverse()
-    
+
     return {
-        "path": path,
-        "links": links_used,
-        "cost": dist[target],
-        "hops": len(path) - 1,
+        "path": result["path"],
+        "links": result["links"],
+        "cost": result["cost"],
+        "hops": result["hops"],
         "source": source,
         "target": target
     }
 
 
 # ── Config Search Engine ──────────────────────────────────────
-def search_configs(pattern, regex=False):
-    """Search across all golden configs for a pattern."""
-    results = []
-    for fname in sorted(GOLDEN_CONFIG_DIR.iterdir()):
-        if not fname.name.endswith(".conf"):
-            continue
-        router = fname.stem
-        lines = fname.read_text().splitlines()
-        for i, line in enumerate(lines, 1):
-            try:
-                if regex:
-                    if re.search(pattern, line, re.IGNORECASE):
-                        results.append({"router": router, "line": i, "text": line.strip()})
-                else:
-                    if pattern.lower() in line.lower():
-                        results.append({"router": router, "line": i, "text": line.strip()})
-            except re.error:
-                pass
-    return results
+def search_configs(pattern, regex=False, stanza=None):
+    """Search across all golden configs for a pattern.
+
+    Served from the trigram index in junos_config_index; stanza limits
+    matches to statements under it (e.g. "protocols bgp")."""
+    return config_search.search(GOLDEN_CONFIG_DIR, pattern, regex=regex, stanza=stanza)
 
 
 # ── Audit History ─────────────────────────────────────────────
@@ -1071,77 +1256,6 @@ def get_conversations():
         return []
 
 
-# ── Network Stats Calculator ─────────────────────────────────
-def calculate_network_stats(topology):
-    """Compute network topology statistics similar to OSMnx."""
-    nodes = topology["nodes"]
-    links = topology["links"]
-    
-    if not nodes or not links:
-        return {}
-    
-    # Build adjacency for analysis
-    adj = {}
-    for link in links:
-        adj.setdefault(link["source"], set()).add(link["target"])
-        adj.setdefault(link["target"], set()).add(link["source"])
-    
-    degrees = [len(adj.get(n["id"], set())) for n in nodes]
-    
-    # Simple graph diameter (BFS from each node)
-    def bfs_max_dist(start):
-        visited = {start: 0}
-        queue = [start]
-        while queue:
-            node = queue.pop(0)
-            for neighbor in adj.get(node, set()):
-                if neighbor not in visited:
-                    visited[neighbor] = visited[node] + 1
-                    queue.append(neighbor)
-        return max(visited.values()) if visited else 0
-    
-    node_ids = [n["id"] for n in nodes]
-    max_dists = [bfs_max_dist(n) for n in node_ids]
-    
-    # Single points of failure
-    spof = []
-    for node in node_ids:
-        # Remove node and check connectivity
-        remaining = [n for n in node_ids if n != node]
-        if not remaining:
-            continue
-        visited = {remaining[0]}
-        queue = [remaining[0]]
-        while queue:
-            current = queue.pop(0)
-            for neighbor in adj.get(current, set()):
-                if neighbor not in visited and neighbor in remaining:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        if len(visited) < len(remaining):
-            spof.append(node)
-    
-    return {
-        "total_nodes": len(nodes),
-        "total_links": len(links),
-        "pe_count": sum(1 for n in nodes if n["role"] == "PE"),
-        "p_count": sum(1 for n in nodes if n["role"] == "P"),
-        "rr_count": sum(1 for n in nodes if n["role"] == "Route Reflector"),
-        "avg_degree": round(sum(degrees) / len(degrees), 1) if degrees else 0,
-        "max_degree": max(degrees) if degrees else 0,
-        "min_degree": min(degrees) if degrees else 0,
-        "graph_diameter": max(max_dists) if max_dists else 0,
-        "avg_path_length": round(sum(max_dists) / len(max_dists), 1) if max_dists else 0,
-        "total_bgp_sessions": sum(len(n.get("bgp_neighbors", [])) for n in nodes),
-        "total_isis_adjacencies": sum(len(n.get("isis_interfaces", [])) for n in nodes),
-        "total_ldp_sessions": sum(1 for n in nodes if n.get("ldp")),
-        "total_vpn_instances": sum(1 for n in nodes if n.get("vpn")),
-        "single_points_of_failure": spof,
-        "redundancy_score": round((1 - len(spof) / len(nodes)) * 100, 1) if nodes else 0,
-        "connectivity": "full-mesh" if not spof else "partial-mesh"
-    }
-
-
 # ══════════════════════════════════════════════════════════════
 #  API ROUTES
 # ══════════════════════════════════════════════════════════════
@@ -1177,6 +1291,30 @@ def api_bootstrap_status():
         "golden_config_dir": str(GOLDEN_CONFIG_DIR)
     })
 
+def _golden_meta(router: str) -> dict:
+    """Read golden_configs/<router>.meta, or {} if missing/unreadable."""
+    try:
+        return json.loads((GOLDEN_CONFIG_DIR / f"{router}.meta").read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_synced_config(router: str, config: str) -> int:
+    """Save a live-synced config as the golden baseline. Returns its line count.
+    The .meta sha256 covers the stripped text, matching get_junos_config_checksum."""
+    config = config.strip()
+    (GOLDEN_CONFIG_DIR / f"{router}.conf").write_text(config)
+    meta = {
+        "synced_at": datetime.now().isoformat(),
+        "source": "mcp_live_sync",
+        "lines": len(config.splitlines()),
+        "size_bytes": len(config),
+        "sha256": hashlib.sha256(config.encode()).hexdigest(),
+    }
+    (GOLDEN_CONFIG_DIR / f"{router}.meta").write_text(json.dumps(meta, indent=2))
+    return meta["lines"]
+
+
 @app.route("/api/bootstrap/sync", methods=["POST"])
 def api_bootstrap_sync():
     """Pull live configs from all MCP devices and save as golden configs.
@@ -1191,23 +1329,22 @@ def api_bootstrap_sync():
 
     results = {}
     synced = 0
+    unchanged = 0
     failed = 0
+    # Routers whose config checksum still matches the saved .meta are skipped
+    checksums = run_async(mcp_get_config_checksums(routers))
     for router in routers:
         try:
+            meta = _golden_meta(router)
+            if router in checksums and meta.get("sha256") == checksums[router]:
+                results[router] = {"status": "unchanged", "lines": meta.get("lines", 0)}
+                unchanged += 1
+                synced += 1
+                continue
             config = run_async(mcp_get_config(router))
             if config and not config.startswith("Error:") and len(config) > 50:
-                config_path = GOLDEN_CONFIG_DIR / f"{router}.conf"
-                config_path.write_text(config)
-                # Write metadata
-                meta_path = GOLDEN_CONFIG_DIR / f"{router}.meta"
-                meta = {
-                    "synced_at": datetime.now().isoformat(),
-                    "source": "mcp_live_sync",
-                    "lines": len(config.splitlines()),
-                    "size_bytes": len(config)
-                }
-                meta_path.write_text(json.dumps(meta, indent=2))
-                results[router] = {"status": "synced", "lines": len(config.splitlines())}
+                lines = _save_synced_config(router, config)
+                results[router] = {"status": "synced", "lines": lines}
                 synced += 1
             else:
                 results[router] = {"status": "failed", "error": config[:200] if config else "Empty config"}
@@ -1215,11 +1352,13 @@ def api_bootstrap_sync():
         except Exception as e:
             results[router] = {"status": "failed", "error": str(e)}
             failed += 1
+    if synced > unchanged:
+        config_search.refresh(GOLDEN_CONFIG_DIR)
 
     return jsonify({
-        "results": results, "synced": synced, "failed": failed,
+        "results": results, "synced": synced, "unchanged": unchanged, "failed": failed,
         "total": len(routers), "timestamp": datetime.now().isoformat(),
-        "message": f"Synced {synced}/{len(routers)} device configs. " +
+        "message": f"Synced {synced}/{len(routers)} device configs ({unchanged} unchanged). " +
                    ("All ready!" if failed == 0 else f"{failed} failed — check MCP connectivity.")
     })
 
@@ -1229,18 +1368,9 @@ def api_bootstrap_sync_one(router):
     try:
         config = run_async(mcp_get_config(router))
         if config and not config.startswith("Error:") and len(config) > 50:
-            config_path = GOLDEN_CONFIG_DIR / f"{router}.conf"
-            config_path.write_text(config)
-            meta_path = GOLDEN_CONFIG_DIR / f"{router}.meta"
-            meta = {
-                "synced_at": datetime.now().isoformat(),
-                "source": "mcp_live_sync",
-                "lines": len(config.splitlines()),
-                "size_bytes": len(config)
-            }
-            meta_path.write_text(json.dumps(meta, indent=2))
-            return jsonify({"status": "synced", "router": router,
-                            "lines": len(config.splitlines())})
+            lines = _save_synced_config(router, config)
+            config_search.refresh(GOLDEN_CONFIG_DIR)
+            return jsonify({"status": "synced", "router": router, "lines": lines})
         else:
             return jsonify({"status": "failed", "error": config[:200] if config else "Empty"}), 500
     except Exception as e:
@@ -1248,26 +1378,42 @@ def api_bootstrap_sync_one(router):
 
 @app.route("/api/topology")
 def api_topology():
-    topo = build_topology_from_golden_configs()
     clustered = request.args.get("clustered", "auto")
     max_visible = int(request.args.get("max_visible", 200))
+    topo_tag = topology_etag()
+    etag = f"{topo_tag}-{clustered}-{max_visible}" if topo_tag else None
+    not_modified = _topology_not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    topo = build_topology_from_golden_configs()
 
     if clustered == "true" or (clustered == "auto" and len(topo["nodes"]) > max_visible):
-        topo = get_clustered_topology(topo, max_visible)
+        topo = get_clustered_topology(topo, max_visible, graph=get_compact_graph(topo))
 
-    return jsonify({
+    resp = jsonify({
         "nodes": topo["nodes"],
         "links": topo["links"],
         "bgp_links": topo.get("bgp_links", []),
         "clustered": topo.get("clustered", False),
         "original_node_count": topo.get("original_node_count", len(topo["nodes"])),
     })
+    if etag:
+        resp.set_etag(etag)
+    return resp
 
 @app.route("/api/topology/stats")
 def api_topology_stats():
+    etag = topology_etag()
+    not_modified = _topology_not_modified(etag and f"{etag}-stats")
+    if not_modified:
+        return not_modified
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
-    return jsonify(stats)
+    stats = network_stats(topo, "all")
+    resp = jsonify(stats)
+    if etag:
+        resp.set_etag(f"{etag}-stats")
+    return resp
 
 @app.route("/api/devices")
 def api_devices():
@@ -1346,11 +1492,24 @@ def api_config_diff(router):
 def api_config_search():
     pattern = request.args.get("q", "")
     regex = request.args.get("regex", "false").lower() == "true"
+    stanza = request.args.get("stanza", "").strip() or None
+    try:
+        offset = max(int(request.args.get("offset", 0)), 0)
+        limit = max(int(request.args.get("limit", 500)), 1)
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
     if not pattern:
-        return jsonify({"results": []})
-    raw = search_configs(pattern, regex)
-    results = [{"router": r["router"], "line_number": r["line"], "line": r["text"]} for r in raw]
-    return jsonify({"results": results})
+        return jsonify({"results": [], "total": 0, "routers": []})
+    raw = search_configs(pattern, regex, stanza)
+    results = [{"router": r["router"], "line_number": r["line"], "line": r["text"]}
+               for r in raw[offset:offset + limit]]
+    return jsonify({
+        "results": results,
+        "total": len(raw),
+        "offset": offset,
+        "limit": limit,
+        "routers": sorted({r["router"] for r in raw}),
+    })
 
 @app.route("/api/shortest-path")
 def api_shortest_path():
@@ -1378,13 +1537,8 @@ def api_quantum_optimize():
     data = request.json or {}
     max_links = data.get("max_new_links", 5)
     topo = build_topology_from_golden_configs()
-    from collections import defaultdict
-    adj = defaultdict(set)
-    for link in topo["links"]:
-        adj[link["source"]].add(link["target"])
-        adj[link["target"]].add(link["source"])
     try:
-        result = optimize_topology(dict(adj), topo["nodes"], max_links)
+        result = optimize_topology(get_compact_graph(topo), topo["nodes"], max_links)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1393,14 +1547,9 @@ def api_quantum_optimize():
 def api_quantum_anomalies():
     """Quantum Walk anomaly detection across the network graph."""
     topo = build_topology_from_golden_configs()
-    from collections import defaultdict
-    adj = defaultdict(set)
-    for link in topo["links"]:
-        adj[link["source"]].add(link["target"])
-        adj[link["target"]].add(link["source"])
     roles = {n["id"]: n.get("role", "unknown") for n in topo["nodes"]}
     try:
-        result = detect_anomalies(dict(adj), roles)
+        result = detect_anomalies(get_compact_graph(topo), roles)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1409,13 +1558,8 @@ def api_quantum_anomalies():
 def api_quantum_communities():
     """Louvain community detection for topology clustering."""
     topo = build_topology_from_golden_configs()
-    from collections import defaultdict
-    adj = defaultdict(set)
-    for link in topo["links"]:
-        adj[link["source"]].add(link["target"])
-        adj[link["target"]].add(link["source"])
     try:
-        result = LouvainCommunityDetector(dict(adj)).detect()
+        result = LouvainCommunityDetector(get_compact_graph(topo)).detect()
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1424,13 +1568,8 @@ def api_quantum_communities():
 def api_quantum_spof():
     """Tarjan's O(V+E) articulation point + bridge detection."""
     topo = build_topology_from_golden_configs()
-    from collections import defaultdict
-    adj = defaultdict(set)
-    for link in topo["links"]:
-        adj[link["source"]].add(link["target"])
-        adj[link["target"]].add(link["source"])
     try:
-        spof, bridges = TarjanSPOF(dict(adj)).find_all()
+        spof, bridges = TarjanSPOF(get_compact_graph(topo)).find_all()
         return jsonify({
             "single_points_of_failure": spof,
             "critical_links": [{"source": u, "target": v} for u, v in bridges],
@@ -1501,7 +1640,7 @@ def api_logs():
 @app.route("/api/network-stats")
 def api_network_stats():
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo, "all")
     return jsonify({
         "total_nodes": stats.get("total_nodes", 0),
         "total_links": stats.get("total_links", 0),
@@ -1549,6 +1688,44 @@ def api_mcp_batch():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/mcp/batch/stream", methods=["POST"])
+def api_mcp_batch_stream():
+    """Execute a command on multiple routers, streaming each router's result as SSE."""
+    import queue
+    data = request.json or {}
+    routers = data.get("routers", [])
+    command = data.get("command", "")
+    if not routers or not command:
+        return jsonify({"error": "routers and command required"}), 400
+
+    event_queue = queue.Queue()
+
+    def _on_result(router_result, progress, total):
+        event_queue.put(json.dumps({"router_result": router_result, "progress": progress, "total": total}))
+
+    async def _producer():
+        """Run the batch on the background loop, pushing results into the queue."""
+        try:
+            output = await mcp_execute_batch(command, routers, on_result=_on_result)
+            event_queue.put(json.dumps({"done": True, "command": command, "output": output,
+                                        "timestamp": datetime.now().isoformat()}))
+        except Exception as e:
+            event_queue.put(json.dumps({"error": str(e)}))
+        finally:
+            event_queue.put(None)  # sentinel
+
+    submit_async(_producer())
+
+    def generate():
+        while True:
+            item = event_queue.get()
+            if item is None:
+                break
+            yield f"data: {item}\n\n"
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route("/api/mcp/facts/<router>")
 def api_mcp_facts(router):
     """Get device facts from a router via MCP."""
@@ -1906,7 +2083,7 @@ def api_ai_chat():
     
     # Build system prompt
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo, "counts", "resilience", "diameter")
     system_prompt = f"""You are the Junos AI Network Operations Center assistant.
 You have access to a network with {stats.get('total_nodes', 0)} Junos routers:
 - PE Routers: {stats.get('pe_count', 0)} (Provider Edge — customer-facing)
@@ -1956,7 +2133,7 @@ def api_ai_stream():
     history = data.get("history", [])
     
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo)
     system_prompt = f"""You are the Junos AI NOC assistant — a Principal Juniper Network Engineer (JNCIE-SP level).
 Network: {stats.get('total_nodes',0)} routers ({stats.get('pe_count',0)} PE, {stats.get('p_count',0)} P, {stats.get('rr_count',0)} RR).
 Topology: Dual-plane IS-IS L2, full-mesh iBGP with route reflectors (P12, P22), LDP, RSVP-TE, MPLS, L3VPN.
@@ -1970,41 +2147,37 @@ Answer concisely in Markdown. Use technical precision."""
     
     token_queue = queue.Queue()
     
-    def _async_producer():
-        """Run in a background thread — streams tokens into queue."""
-        loop = asyncio.new_event_loop()
+    payload = {
+        "model": OLLAMA_MODEL,
+        "messages": messages,
+        "stream": True,
+        "options": {"num_ctx": OLLAMA_NUM_CTX, "temperature": OLLAMA_TEMPERATURE}
+    }
+
+    async def _async_producer():
+        """Run on the background loop — streams tokens into queue."""
         try:
-            payload = {
-                "model": OLLAMA_MODEL,
-                "messages": messages,
-                "stream": True,
-                "options": {"num_ctx": OLLAMA_NUM_CTX, "temperature": OLLAMA_TEMPERATURE}
-            }
-            async def _run():
-                async with httpx.AsyncClient(timeout=600.0) as client:
-                    async with client.stream("POST", f"{OLLAMA_URL}/api/chat", json=payload) as resp:
-                        async for line in resp.aiter_lines():
-                            if line.strip():
-                                try:
-                                    chunk = json.loads(line)
-                                    token = chunk.get("message", {}).get("content", "")
-                                    done = chunk.get("done", False)
-                                    if token:
-                                        token_queue.put(json.dumps({"token": token}))
-                                    if done:
-                                        token_queue.put(json.dumps({"done": True}))
-                                        return
-                                except json.JSONDecodeError:
-                                    continue
-            loop.run_until_complete(_run())
+            client = http_clients.get("ollama")
+            async with client.stream("POST", f"{OLLAMA_URL}/api/chat", json=payload) as resp:
+                async for line in resp.aiter_lines():
+                    if line.strip():
+                        try:
+                            chunk = json.loads(line)
+                            token = chunk.get("message", {}).get("content", "")
+                            done = chunk.get("done", False)
+                            if token:
+                                token_queue.put(json.dumps({"token": token}))
+                            if done:
+                                token_queue.put(json.dumps({"done": True}))
+                                return
+                        except json.JSONDecodeError:
+                            continue
         except Exception as e:
             token_queue.put(json.dumps({"error": str(e)}))
         finally:
             token_queue.put(None)  # sentinel
-            loop.close()
-    
-    # Start async producer in background thread
-    threading.Thread(target=_async_producer, daemon=True).start()
+
+    submit_async(_async_producer())
     
     def generate():
         """Synchronous generator — yields SSE events from queue in real-time."""
@@ -2495,7 +2668,7 @@ def api_ai_chat_agentic():
                 response_data["devices_checked"] = devices
             else:
                 topo = build_topology_from_golden_configs()
-                stats = calculate_network_stats_v2(topo)
+                stats = network_stats(topo)
                 system_prompt = f"You are a Junos AI NOC assistant. Network has {stats.get('total_nodes', 0)} routers. Answer concisely."
                 messages = [{"role": "system", "content": system_prompt}]
                 for h in history[-8:]:
@@ -2537,7 +2710,7 @@ def api_ai_chat_agentic():
                 except Exception:
                     pass
             topo = build_topology_from_golden_configs()
-            stats = calculate_network_stats_v2(topo)
+            stats = network_stats(topo)
             system_prompt = f"""You are the Junos AI NOC assistant — JNCIE-SP level.
 Network: {stats.get('total_nodes',0)} routers. Devices: {', '.join(n['id'] for n in topo.get('nodes', []))}.
 Answer concisely in Markdown."""
@@ -2565,7 +2738,7 @@ def api_ai_quick_actions():
     view = data.get("view", "dashboard")
     device = data.get("device", "")
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo, "resilience")
     device_list = [n["id"] for n in topo.get("nodes", [])]
 
     actions = []
@@ -2607,7 +2780,7 @@ def api_copilot_suggest():
     context = data.get("context", {})
 
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo, "resilience")
     suggestions = []
 
     # Always-relevant suggestions
@@ -3025,8 +3198,8 @@ def api_ai_ensemble():
     available_models = []
     try:
         async def _list_models():
-            async with httpx.AsyncClient(timeout=5) as client:
-                return await client.get(f"{OLLAMA_URL}/api/tags")
+            client = http_clients.get("health")
+            return await client.get(f"{OLLAMA_URL}/api/tags")
         resp = run_async(_list_models())
         if resp.status_code == 200:
             models_data = resp.json().get("models", [])
@@ -3115,7 +3288,7 @@ def api_brain_predict():
 
     # Current topology state
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo, "counts", "resilience")
     spofs = stats.get("single_points_of_failure", [])
     nodes_summary = ", ".join(
         f"{n['id']}({n['role']}, BGP:{len(n.get('bgp_neighbors',[]))}, "
@@ -3223,7 +3396,7 @@ def handle_chat(data):
     
     # Build context-aware system prompt
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo)
     system_prompt = f"""You are the Junos AI NOC assistant. Network: {stats.get('total_nodes',0)} routers. Protocols: IS-IS L2, iBGP, LDP, MPLS, L3VPN. Respond concisely in Markdown."""
     
     messages = [{"role": "system", "content": system_prompt}]
@@ -3380,7 +3553,7 @@ def api_delete_pool(pool_id):
 def api_pools_ai_recommend():
     """AI recommends optimal device groupings based on topology analysis."""
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    stats = network_stats(topo, "resilience")
     nodes_summary = json.dumps([{"id": n["id"], "role": n["role"], "loopback": n.get("loopback", ""),
                                   "bgp_peers": len(n.get("bgp_neighbors", [])),
                                   "isis": len(n.get("isis_interfaces", [])),
@@ -4726,63 +4899,15 @@ def api_path_multi_algorithm():
     if not source or not target:
         return jsonify({"error": "source and target required"}), 400
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
-    # Build adjacency with costs
-    adj = {}
-    for link in topo.get("links", []):
-        s, t = link["source"], link["target"]
-        cost = link.get("metric", 10)
-        adj.setdefault(s, []).append((t, cost))
-        adj.setdefault(t, []).append((s, cost))
-    # Dijkstra shortest path
-    import heapq
-    def dijkstra(src, dst):
-        dist = {src: 0}
-        prev = {src: None}
-        heap = [(0, src)]
-        while heap:
-            d, u = heapq.heappop(heap)
-            if u == dst:
-                break
-            if d > dist.get(u, float('inf')):
-                continue
-            for v, w in adj.get(u, []):
-                nd = d + w
-                if nd < dist.get(v, float('inf')):
-                    dist[v] = nd
-                    prev[v] = u
-                    heapq.heappush(heap, (nd, v))
-        path = []
-        node = dst
-        while node is not None:
-            path.append(node)
-            node = prev.get(node)
-        return list(reversed(path)), dist.get(dst, float('inf'))
-    # K-shortest paths (Yen's algorithm simplified)
-    def k_shortest(src, dst, k=3):
-        paths = []
-        first_path, first_cost = dijkstra(src, dst)
-        if first_path and first_path[0] == src:
-            paths.append({"path": first_path, "cost": first_cost})
-        # Simple alternative: find paths avoiding intermediate nodes
-        for i in range(1, min(k, len(first_path) - 1)):
-            spur_node = first_path[i]
-            # Remove edges used by existing paths
-            temp_adj = {k: list(v) for k, v in adj.items()}
-            for p in paths:
-                for j in range(len(p["path"]) - 1):
-                    ns, nt = p["path"][j], p["path"][j+1]
-                    temp_adj[ns] = [(n, c) for n, c in temp_adj.get(ns, []) if n != nt]
-            # Find path avoiding the spur
-            alt_path, alt_cost = dijkstra(src, dst)
-            if alt_path and alt_path not in [p["path"] for p in paths]:
-                paths.append({"path": alt_path, "cost": alt_cost})
-        return paths
-    paths = k_shortest(source, target, k=3)
+    stats = network_stats(topo, "resilience")
+    engine = get_path_engine(topo)
+    paths = engine.k_shortest_paths(source, target, k=3) if source in engine else []
+    ecmp = engine.ecmp_paths(source, target) if paths else []
     return jsonify({
         "source": source, "target": target,
         "algorithms": {
             "dijkstra": {"path": paths[0]["path"] if paths else [], "cost": paths[0]["cost"] if paths else 0},
+            "ecmp": {"paths": ecmp, "cost": paths[0]["cost"] if paths else 0},
             "k_shortest": paths,
         },
         "topology_stats": {
@@ -4793,45 +4918,47 @@ def api_path_multi_algorithm():
         "timestamp": datetime.now().isoformat()
     })
 
+def _failure_simulator(topo):
+    """FailureSimulator over the cached path engine, with PEs from topology roles."""
+    pe_nodes = [n["id"] for n in topo.get("nodes", []) if n.get("role") == "PE"]
+    return FailureSimulator(get_path_engine(topo), pe_nodes=pe_nodes)
+
+
 @app.route("/api/path/what-if", methods=["POST"])
 def api_path_what_if():
-    """What-if failure analysis — simulate node or link failure and compute impact."""
+    """What-if failure analysis — simulate node, link or SRLG failure and compute impact."""
     data = request.json or {}
     failed_node = data.get("failed_node", "")
     failed_link = data.get("failed_link", {})  # {"source": "X", "target": "Y"}
-    if not failed_node and not failed_link:
+    raw_nodes = data.get("failed_nodes", [])
+    if not isinstance(raw_nodes, list):
+        return jsonify({"error": "failed_nodes must be a list"}), 400
+    failed_nodes = raw_nodes + ([failed_node] if failed_node else [])
+    if not all(isinstance(n, str) and n for n in failed_nodes):
+        return jsonify({"error": "each failed node must be a non-empty string"}), 400
+    raw_links = data.get("failed_links", [])  # SRLG: [["X", "Y"], ...] or [{"source": "X", "target": "Y"}, ...]
+    if not isinstance(raw_links, list):
+        return jsonify({"error": "failed_links must be a list"}), 400
+    failed_links = []
+    for l in raw_links + ([failed_link] if failed_link else []):
+        if isinstance(l, dict):
+            l = [l.get("source"), l.get("target")]
+        if not isinstance(l, list) or len(l) != 2 or not all(isinstance(n, str) and n for n in l):
+            return jsonify({"error": "each failed link must be [source, target] or {source, target}"}), 400
+        failed_links.append(tuple(l))
+    if not failed_nodes and not failed_links:
         return jsonify({"error": "failed_node or failed_link required"}), 400
     topo = build_topology_from_golden_configs()
-    nodes = [n for n in topo.get("nodes", []) if n["id"] != failed_node]
-    links = topo.get("links", [])
-    if failed_node:
-        links = [l for l in links if l["source"] != failed_node and l["target"] != failed_node]
-    if failed_link:
-        links = [l for l in links if not (
-            (l["source"] == failed_link.get("source") and l["target"] == failed_link.get("target")) or
-            (l["source"] == failed_link.get("target") and l["target"] == failed_link.get("source"))
-        )]
-    # Check connectivity after failure
-    adj = {}
-    for l in links:
-        adj.setdefault(l["source"], set()).add(l["target"])
-        adj.setdefault(l["target"], set()).add(l["source"])
-    node_ids = [n["id"] for n in nodes]
-    # BFS from first node
-    if node_ids:
-        visited = {node_ids[0]}
-        queue = [node_ids[0]]
-        while queue:
-            current = queue.pop(0)
-            for neighbor in adj.get(current, set()):
-                if neighbor not in visited and neighbor in node_ids:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        connected = len(visited) == len(node_ids)
-        isolated = [n for n in node_ids if n not in visited]
-    else:
-        connected = False
-        isolated = []
+    nodes = [n for n in topo.get("nodes", []) if n["id"] not in failed_nodes]
+    failed_pairs = {frozenset(l) for l in failed_links}
+    links = [l for l in topo.get("links", [])
+             if l["source"] not in failed_nodes and l["target"] not in failed_nodes
+             and frozenset((l["source"], l["target"])) not in failed_pairs]
+    # Only the SPF trees routed through the failure are recomputed
+    simulator = _failure_simulator(topo)
+    sim = simulator.simulate(nodes=failed_nodes, links=failed_links)
+    isolated = sim["isolated_nodes"] + [n["id"] for n in nodes if n["id"] not in simulator.engine]
+    connected = bool(nodes) and not isolated
     # AI impact analysis
     try:
         impact = run_async(ollama_analyze_async(
@@ -4840,6 +4967,9 @@ def api_path_what_if():
                 "failed": failed_node or failed_link,
                 "remaining_nodes": len(nodes), "remaining_links": len(links),
                 "network_connected": connected, "isolated_nodes": isolated,
+                "stranded_pes": sim["stranded_pes"],
+                "affected_paths": sim["affected_pairs"],
+                "unreachable_paths": sim["unreachable_pairs"],
                 "original_nodes": len(topo.get("nodes", [])),
                 "original_links": len(topo.get("links", []))
             }),
@@ -4854,22 +4984,51 @@ def api_path_what_if():
     except Exception:
         impact = "AI analysis unavailable"
     return jsonify({
-        "failure": {"node": failed_node, "link": failed_link},
+        "failure": {"node": failed_node, "link": failed_link,
+                    "nodes": sim["failed_nodes"], "links": sim["failed_links"]},
         "impact": {
             "network_connected": connected, "isolated_nodes": isolated,
             "nodes_remaining": len(nodes), "links_remaining": len(links),
             "nodes_lost": len(topo.get("nodes", [])) - len(nodes),
-            "links_lost": len(topo.get("links", [])) - len(links)
+            "links_lost": len(topo.get("links", [])) - len(links),
+            "stranded_pes": sim["stranded_pes"],
+            "affected_pairs": sim["affected_pairs"],
+            "unreachable_pairs": sim["unreachable_pairs"],
+            "affected_paths": sim["affected_paths"],
+            "trees_recomputed": sim["trees_recomputed"]
         },
         "ai_analysis": impact,
         "timestamp": datetime.now().isoformat()
     })
 
+@app.route("/api/path/n-minus-1", methods=["POST"])
+def api_path_n_minus_1():
+    """Evaluate every single node/link failure (N-1) plus selected double failures."""
+    data = request.json or {}
+    try:
+        top = int(data.get("top", 50))
+    except (TypeError, ValueError):
+        return jsonify({"error": "top must be an integer"}), 400
+    topo = build_topology_from_golden_configs()
+    simulator = _failure_simulator(topo)
+    start = time.time()
+    result = simulator.n_minus_1(top=top)
+    scenarios = data.get("double_failures", [])  # [{"nodes": [...], "links": [[a, b]]}, ...]
+    if scenarios:
+        result["double_failures"] = simulator.evaluate(scenarios)
+    result["computation_time_ms"] = round((time.time() - start) * 1000, 1)
+    result["timestamp"] = datetime.now().isoformat()
+    return jsonify(result)
+
 @app.route("/api/path/capacity-plan", methods=["POST"])
 def api_path_capacity_plan():
     """AI-powered capacity planning — analyze topology and recommend where to add capacity."""
     topo = build_topology_from_golden_configs()
-    stats = calculate_network_stats_v2(topo)
+    # The response returns the full stats dict; the prompt only needs resilience and diameter
+    stats = network_stats(topo, "all")
+    # Nodes carrying the most shortest paths are the bottleneck candidates
+    load = get_path_engine(topo).transit_load()
+    transit = [{"node": n, "paths": c} for n, c in sorted(load.items(), key=lambda x: -x[1]) if c][:10]
     try:
         analysis = run_async(ollama_analyze_async(
             "You are a network capacity planning engineer for an SP/ISP network.",
@@ -4882,7 +5041,8 @@ def api_path_capacity_plan():
                 "link_count": len(topo.get("links", [])),
                 "spof": stats.get("single_points_of_failure", []),
                 "redundancy": stats.get("redundancy_score", 0),
-                "diameter": stats.get("diameter", 0)
+                "diameter": stats.get("graph_diameter", 0),
+                "transit_load": transit
             }),
             "Provide a capacity planning analysis:\n"
             "1. Current capacity utilization assessment per node\n"
@@ -4893,7 +5053,7 @@ def api_path_capacity_plan():
             "6. Cost-benefit analysis of proposed changes\n"
             "7. Priority ranking of improvements"
         ))
-        return jsonify({"capacity_plan": analysis, "stats": stats,
+        return jsonify({"capacity_plan": analysis, "stats": stats, "transit_load": transit,
                         "timestamp": datetime.now().isoformat()})
     except Exception as e:
         return jsonify({"error": str(e)}), 503
@@ -4979,6 +5139,8 @@ def api_monitor_ai_incident():
 # ══════════════════════════════════════════════════════════════
 if __name__ == "__main__":
     port = int(os.environ.get("NOC_PORT", 5555))
+    # Fork the N-1 workers while this is still the only thread
+    start_n1_pool()
     # Start the background scheduler
     start_scheduler()
     print(f"""
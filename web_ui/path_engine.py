@@ -0,0 +1,487 @@
+"""
+Topology-Versioned Path Engine — v1.0
+═════════════════════════════════════
+
+Purpose: Answer path queries (shortest path, ECMP sets, k-shortest) by
+lookup instead of re-running Dijkstra over a freshly built adjacency on
+every API request.
+
+  - Shortest-path trees are computed once per source with IS-IS metrics
+    and memoized for the lifetime of the engine; each tree keeps every
+    equal-cost predecessor, so full ECMP sets come from the same tree.
+  - k-shortest loopless paths use Yen's algorithm, with the first path
+    taken from the cached tree.
+  - The engine is built for one topology version — callers keep one per
+    version and drop it when the golden configs change.
+  - FailureSimulator reuses the cached trees for what-if analysis: a
+    failed node, link or SRLG only re-runs Dijkstra for the sources whose
+    tree actually routes through it. N-1 sweeps split the per-source
+    trees across a pool of worker processes forked at startup (at most
+    one per CPU) and rank every single failure.
+
+Author: Junos AI NOC
+"""
+
+import heapq
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from quantum_engine import TarjanSPOF
+
+DEFAULT_METRIC = 10
+
+
+def _dijkstra(adj: Dict[str, list], source: str, target: Optional[str] = None,
+              banned_nodes: frozenset = frozenset(), banned_edges: frozenset = frozenset()):
+    """Dijkstra from source keeping all equal-cost predecessors.
+
+    Returns (dist, preds, order) where preds[v] is [(u, link)] in discovery
+    order (preds[v][0] is the classic single-path predecessor) and order is
+    the settle order. Stops early once target is settled."""
+    dist = {source: 0}
+    preds = {source: []}
+    order = []
+    settled = set()
+    pq = [(0, source)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if u in settled:
+            continue
+        settled.add(u)
+        order.append(u)
+        if u == target:
+            break
+        for v, w, link in adj.get(u, ()):
+            if v in settled or v in banned_nodes or (u, v) in banned_edges:
+                continue
+            nd = d + w
+            best = dist.get(v)
+            if best is None or nd < best:
+                dist[v] = nd
+                preds[v] = [(u, link)]
+                heapq.heappush(pq, (nd, v))
+            elif nd == best:
+                preds[v].append((u, link))
+    return dist, preds, order
+
+
+def _walk_back(preds: dict, target: str):
+    """Primary path (nodes, links) to target following first predecessors."""
+    path, links = [target], []
+    node = target
+    while preds.get(node):
+        node, link = preds[node][0]
+        path.append(node)
+        links.append(link)
+    path.reverse()
+    links.reverse()
+    return path, links
+
+
+class PathEngine:
+    """Shortest-path, ECMP and k-shortest queries over one topology version."""
+
+    def __init__(self, links: List[dict], version: Optional[str] = None):
+        self.version = version
+        self.adj: Dict[str, list] = {}
+        for link in links:
+            src, dst = link["source"], link["target"]
+            weight = link.get("metric", DEFAULT_METRIC)
+            self.adj.setdefault(src, []).append((dst, weight, link))
+            self.adj.setdefault(dst, []).append((src, weight, link))
+        self._trees: Dict[str, tuple] = {}
+        self._shapes: Dict[str, tuple] = {}
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.adj
+
+    def tree(self, source: str) -> tuple:
+        """(dist, preds, order) shortest-path tree from source, memoized."""
+        tree = self._trees.get(source)
+        if tree is None:
+            tree = _dijkstra(self.adj, source)
+            self._trees[source] = tree
+        return tree
+
+    def precompute(self):
+        """Build the shortest-path tree from every node."""
+        for node in self.adj:
+            self.tree(node)
+
+    def shortest_path(self, source: str, target: str) -> Optional[dict]:
+        """Primary shortest path as {path, links, cost, hops}, or None if unreachable."""
+        dist, preds, _ = self.tree(source)
+        if target not in dist:
+            return None
+        path, links = _walk_back(preds, target)
+        return {"path": path, "links": links, "cost": dist[target], "hops": len(path) - 1}
+
+    def ecmp_paths(self, source: str, target: str, limit: int = 16) -> List[List[str]]:
+        """Every equal-cost shortest path (as node lists), up to limit."""
+        dist, preds, _ = self.tree(source)
+        if target not in dist:
+            return []
+        paths, seen = [], set()
+        stack = [(target, [target])]
+        while stack and len(paths) < limit:
+            node, suffix = stack.pop()
+            if node == source:
+                path = tuple(reversed(suffix))
+                if path not in seen:
+                    seen.add(path)
+                    paths.append(list(path))
+                continue
+            for pred, _ in reversed(preds.get(node, [])):
+                stack.append((pred, suffix + [pred]))
+        return paths
+
+    def _path_cost(self, path: List[str]) -> int:
+        cost = 0
+        for u, v in zip(path, path[1:]):
+            cost += min(w for n, w, _ in self.adj[u] if n == v)
+        return cost
+
+    def k_shortest_paths(self, source: str, target: str, k: int = 3) -> List[dict]:
+        """Yen's k loopless shortest paths as [{path, cost}], cheapest first."""
+        first = self.shortest_path(source, target)
+        if first is None:
+            return []
+        accepted = [{"path": first["path"], "cost": first["cost"]}]
+        candidates, seen = [], {tuple(first["path"])}
+        while len(accepted) < k:
+            last = accepted[-1]["path"]
+            for i in range(len(last) - 1):
+                spur, root = last[i], last[:i + 1]
+                banned_edges = {(p["path"][i], p["path"][i + 1]) for p in accepted
+                                if len(p["path"]) > i + 1 and p["path"][:i + 1] == root}
+                dist, preds, _ = _dijkstra(self.adj, spur, target,
+                                           banned_nodes=frozenset(root[:-1]),
+                                           banned_edges=frozenset(banned_edges))
+                if target not in dist:
+                    continue
+                spur_path, _ = _walk_back(preds, target)
+                path = root[:-1] + spur_path
+                if tuple(path) in seen:
+                    continue
+                seen.add(tuple(path))
+                heapq.heappush(candidates, (self._path_cost(path), len(path), path))
+            if not candidates:
+                break
+            cost, _, path = heapq.heappop(candidates)
+            accepted.append({"path": path, "cost": cost})
+        return accepted
+
+    def shape(self, source: str) -> tuple:
+        """(parent, children, below) of the primary tree from source, memoized.
+
+        below[n] counts the destinations whose primary path transits n."""
+        shape = self._shapes.get(source)
+        if shape is None:
+            dist, preds, order = self.tree(source)
+            parent = {node: preds[node][0][0] for node in order if preds.get(node)}
+            children: Dict[str, list] = {}
+            below = {node: 0 for node in order}
+            for node in reversed(order):
+                if node in parent:
+                    children.setdefault(parent[node], []).append(node)
+                    below[parent[node]] += below[node] + 1
+            shape = (parent, children, below)
+            self._shapes[source] = shape
+        return shape
+
+    def transit_load(self) -> Dict[str, int]:
+        """Number of source/destination primary paths transiting each node."""
+        load = {node: 0 for node in self.adj}
+        for source in self.adj:
+            _, _, below = self.shape(source)
+            for node, count in below.items():
+                if node != source:
+                    load[node] += count
+        return load
+
+
+# ═══════════════════════════════════════════════════════════════
+#  FAILURE SIMULATION — incremental what-if over cached SPF trees
+# ═══════════════════════════════════════════════════════════════
+
+N1_MAX_WORKERS = min(os.cpu_count() or 1, 8)
+N1_TIMEOUT = 120.0  # Seconds a pooled N-1 sweep may take before it reruns in-process
+
+_n1_pool: Optional[ProcessPoolExecutor] = None
+_n1_pool_lock = threading.Lock()
+
+
+def start_n1_pool() -> Optional[ProcessPoolExecutor]:
+    """Fork the process pool shared by every N-1 sweep.
+
+    Call once at startup, before any other thread runs: forking a
+    multithreaded process can leave the children stuck on locks other
+    threads held. Workers are forked because spawn and forkserver children
+    re-run the parent's __main__ (app.py and its startup probes). None
+    where fork is unavailable — sweeps then run in-process."""
+    global _n1_pool
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    with _n1_pool_lock:
+        if _n1_pool is None:
+            pool = ProcessPoolExecutor(max_workers=N1_MAX_WORKERS,
+                                       mp_context=multiprocessing.get_context("fork"))
+            # A fork-context pool starts all of its workers on the first submit
+            pool.submit(int).result()
+            _n1_pool = pool
+        return _n1_pool
+
+
+def _n1_executor() -> Optional[ProcessPoolExecutor]:
+    """The pool from start_n1_pool(), if it was started and is still usable."""
+    return _n1_pool
+
+
+def _discard_n1_executor(pool: ProcessPoolExecutor):
+    """Drop a broken or hung pool; later sweeps run in-process.
+
+    The pool is not re-forked here — by now the process has other threads."""
+    global _n1_pool
+    with _n1_pool_lock:
+        if _n1_pool is pool:
+            _n1_pool = None
+    # shutdown() alone would leave a hung worker running
+    for proc in list((getattr(pool, "_processes", None) or {}).values()):
+        proc.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _pair(a: str, b: str) -> Tuple[str, str]:
+    return (a, b) if a <= b else (b, a)
+
+
+def _n1_worker(adj: List[list], sources: List[int]) -> tuple:
+    """Worker process: per-node and per-link primary-path load for sources.
+
+    adj is the integer-indexed graph ([(neighbor, metric)] per node, nodes
+    numbered in name order so heap ties break exactly like _dijkstra)."""
+    n = len(adj)
+    node_load = [0] * n
+    link_load: Dict[Tuple[int, int], int] = {}
+    pop, push = heapq.heappop, heapq.heappush
+    for source in sources:
+        dist = [None] * n
+        parent = [-1] * n
+        done = [False] * n
+        dist[source] = 0
+        order, pq = [], [(0, source)]
+        while pq:
+            d, u = pop(pq)
+            if done[u]:
+                continue
+            done[u] = True
+            order.append(u)
+            for v, w in adj[u]:
+                if done[v]:
+                    continue
+                nd = d + w
+                best = dist[v]
+                if best is None or nd < best:
+                    dist[v] = nd
+                    parent[v] = u
+                    push(pq, (nd, v))
+        below = [0] * n
+        for v in reversed(order):
+            p = parent[v]
+            if p >= 0:
+                below[p] += below[v] + 1
+                key = (p, v) if p < v else (v, p)
+                link_load[key] = link_load.get(key, 0) + below[v] + 1
+        below[source] = 0
+        for v in order:
+            node_load[v] += below[v]
+    return node_load, link_load
+
+
+class FailureSimulator:
+    """What-if failure analysis on top of a PathEngine's cached trees."""
+
+    def __init__(self, engine: PathEngine, pe_nodes: Iterable[str] = ()):
+        self.engine = engine
+        self.pe_nodes = [n for n in pe_nodes if n in engine]
+        self.pairs = {}  # (a, b) -> parallel link count
+        for u, edges in engine.adj.items():
+            for v, _, _ in edges:
+                if u < v:
+                    self.pairs[(u, v)] = self.pairs.get((u, v), 0) + 1
+
+    def _components(self, failed_nodes: set, failed_pairs: set) -> List[set]:
+        """Connected components of the graph with the failed elements removed."""
+        seen, components = set(failed_nodes), []
+        for start in self.engine.adj:
+            if start in seen:
+                continue
+            component = {start}
+            seen.add(start)
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                for v, _, _ in self.engine.adj[u]:
+                    if v in seen or _pair(u, v) in failed_pairs:
+                        continue
+                    seen.add(v)
+                    component.add(v)
+                    queue.append(v)
+            components.append(component)
+        return components
+
+    def _stranded(self, components: List[set], failed_nodes: set) -> tuple:
+        """(isolated nodes, stranded PEs) relative to the main component."""
+        if not components:
+            return [], []
+        main = max(components, key=lambda c: (sum(1 for pe in self.pe_nodes if pe in c), len(c)))
+        isolated = sorted(n for c in components if c is not main for n in c)
+        stranded = sorted(pe for pe in self.pe_nodes if pe not in main and pe not in failed_nodes)
+        return isolated, stranded
+
+    def simulate(self, nodes: Iterable[str] = (), links: Iterable[Tuple[str, str]] = (),
+                 max_paths: int = 50) -> dict:
+        """Fail a set of nodes and/or links (an SRLG is a set of links).
+
+        Only the trees whose primary paths cross a failed element are
+        recomputed; every other tree is known to be unchanged."""
+        failed_nodes = {n for n in nodes if n in self.engine}
+        failed_pairs = {_pair(a, b) for a, b in links if _pair(a, b) in self.pairs}
+        banned_edges = frozenset(e for a, b in failed_pairs for e in ((a, b), (b, a)))
+        banned_nodes = frozenset(failed_nodes)
+
+        affected, unreachable, recomputed = [], 0, 0
+        affected_count = 0
+        for source in self.engine.adj:
+            if source in failed_nodes:
+                continue
+            parent, children, _ = self.engine.shape(source)
+            # Roots of the primary subtrees that lose their path
+            roots = [c for n in failed_nodes for c in children.get(n, [])]
+            roots += [child for a, b in failed_pairs for child in (a, b)
+                      if parent.get(child) == (b if child == a else a)]
+            if not roots:
+                continue
+            hit = set()
+            queue = deque(r for r in roots if r not in failed_nodes)
+            while queue:
+                node = queue.popleft()
+                if node in hit:
+                    continue
+                hit.add(node)
+                queue.extend(c for c in children.get(node, []) if c not in failed_nodes)
+            if not hit:
+                continue
+            recomputed += 1
+            new_dist, new_preds, _ = _dijkstra(self.engine.adj, source,
+                                               banned_nodes=banned_nodes,
+                                               banned_edges=banned_edges)
+            old_dist = self.engine.tree(source)[0]
+            for dest in sorted(hit):
+                affected_count += 1
+                if dest not in new_dist:
+                    unreachable += 1
+                if len(affected) < max_paths:
+                    old_path = self.engine.shortest_path(source, dest)["path"]
+                    new_path = _walk_back(new_preds, dest)[0] if dest in new_dist else []
+                    affected.append({
+                        "source": source, "target": dest,
+                        "old_cost": old_dist[dest], "new_cost": new_dist.get(dest),
+                        "old_path": old_path, "new_path": new_path,
+                    })
+
+        isolated, stranded = self._stranded(self._components(failed_nodes, failed_pairs), failed_nodes)
+        return {
+            "failed_nodes": sorted(failed_nodes),
+            "failed_links": [list(p) for p in sorted(failed_pairs)],
+            "connected": not isolated,
+            "isolated_nodes": isolated,
+            "stranded_pes": stranded,
+            "affected_pairs": affected_count,
+            "unreachable_pairs": unreachable,
+            "affected_paths": affected,
+            "trees_recomputed": recomputed,
+        }
+
+    def evaluate(self, scenarios: List[dict], max_paths: int = 10) -> List[dict]:
+        """Simulate selected multi-element failures (e.g. double failures or
+        SRLGs), each {"nodes": [...], "links": [[a, b], ...]}, against the
+        shared cached trees. Sorted worst first."""
+        results = []
+        for scenario in scenarios:
+            result = self.simulate(nodes=scenario.get("nodes", ()),
+                                   links=[tuple(l) for l in scenario.get("links", ())],
+                                   max_paths=max_paths)
+            if scenario.get("name"):
+                result["name"] = scenario["name"]
+            results.append(result)
+        results.sort(key=lambda r: (-len(r["stranded_pes"]), -r["unreachable_pairs"], -r["affected_pairs"]))
+        return results
+
+    def n_minus_1(self, workers: Optional[int] = None, top: int = 50) -> dict:
+        """Rank every single node and link failure by the number of primary
+        paths it breaks, with the isolated nodes and stranded PEs of each.
+
+        workers is capped at N1_MAX_WORKERS (CPU count, at most 8). The
+        sweep runs in-process unless start_n1_pool() was called, and falls
+        back to in-process if the pool breaks or exceeds N1_TIMEOUT."""
+        sources = sorted(self.engine.adj)
+        index = {name: i for i, name in enumerate(sources)}
+        adj = [[(index[v], w) for v, w, _ in self.engine.adj[name]] for name in sources]
+        workers = max(1, min(workers or N1_MAX_WORKERS, N1_MAX_WORKERS))
+        pool = _n1_executor() if workers > 1 and len(sources) >= 200 else None
+        parts = None
+        if pool is not None:
+            chunks = [list(range(i, len(sources), workers)) for i in range(workers)]
+            try:
+                parts = list(pool.map(_n1_worker, [adj] * len(chunks), chunks, timeout=N1_TIMEOUT))
+            except (BrokenProcessPool, FuturesTimeoutError):
+                _discard_n1_executor(pool)
+                parts = None
+        if parts is None:
+            parts = [_n1_worker(adj, list(range(len(sources))))] if sources else []
+        node_load: Dict[str, int] = {}
+        link_load: Dict[Tuple[str, str], int] = {}
+        for nl, ll in parts:
+            for i, count in enumerate(nl):
+                if count:
+                    node_load[sources[i]] = node_load.get(sources[i], 0) + count
+            for (i, j), count in ll.items():
+                key = (sources[i], sources[j])
+                link_load[key] = link_load.get(key, 0) + count
+
+        # Only articulation points / bridges can strand anything
+        neighbor_sets = {u: {v for v, _, _ in edges} for u, edges in self.engine.adj.items()}
+        cut_nodes, bridges = TarjanSPOF(neighbor_sets).find_all()
+        bridge_pairs = {_pair(a, b) for a, b in bridges if self.pairs.get(_pair(a, b)) == 1}
+
+        scenarios = []
+        for node in sources:
+            isolated, stranded = ([], [])
+            if node in cut_nodes:
+                isolated, stranded = self._stranded(self._components({node}, set()), {node})
+            scenarios.append({"type": "node", "failed": node,
+                              "affected_pairs": node_load.get(node, 0),
+                              "isolated_nodes": isolated, "stranded_pes": stranded})
+        for pair in self.pairs:
+            isolated, stranded = ([], [])
+            if pair in bridge_pairs:
+                isolated, stranded = self._stranded(self._components(set(), {pair}), set())
+            scenarios.append({"type": "link", "failed": list(pair),
+                              "affected_pairs": link_load.get(pair, 0),
+                              "isolated_nodes": isolated, "stranded_pes": stranded})
+        scenarios.sort(key=lambda s: (-len(s["stranded_pes"]), -len(s["isolated_nodes"]),
+                                      -s["affected_pairs"]))
+        return {
+            "nodes": len(sources),
+            "links": len(self.pairs),
+            "scenarios_evaluated": len(scenarios),
+            "cut_nodes": cut_nodes,
+            "bridges": [list(p) for p in sorted(bridge_pairs)],
+            "worst": scenarios[:top],
+        }
@@ -16,6 +16,12 @@ Scale targets:
   - 5,000 – 50,000 links
   - Sub-second SPOF detection (was O(N²) → now O(N+E) with Tarjan's)
   - Sub-second diameter approximation (was O(N²) → now O(N+E) with double-BFS)
+  - Exact diameter/radius/center via eccentricity bounds + bit-parallel BFS
+
+Optional acceleration:
+  - NumPy:  vectorized sparse Laplacian for the quantum walk
+  - SciPy:  CSR Laplacian + exact expm_multiply evolution
+  Without them every algorithm falls back to pure Python.
 
 Author: Junos AI NOC
 """
@@ -23,10 +29,106 @@ Author: Junos AI NOC
 import math
 import random
 import time
+import bisect
 import heapq
+import threading
+from array import array
 from collections import defaultdict, deque
 from typing import Dict, List, Set, Tuple, Optional, Any
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.linalg import expm_multiply
+except ImportError:  # pragma: no cover
+    csr_matrix = expm_multiply = None
+
+# Best available quantum walk backend: "scipy" > "numpy" > "python"
+WALK_BACKEND = "scipy" if (np is not None and csr_matrix is not None) else (
+    "numpy" if np is not None else "python")
+
+
+# ═══════════════════════════════════════════════════════════════
+#  0. COMPACT GRAPH — CSR adjacency shared by every algorithm
+#     Built once per topology version instead of per call
+# ═══════════════════════════════════════════════════════════════
+
+class CompactGraph:
+    """
+    Array-backed adjacency (CSR): integer node IDs, an offsets array and a
+    flat neighbors array, with degrees cached.
+
+    Row i holds the neighbors of ids[i] in neighbors[offsets[i]:offsets[i+1]],
+    in the same order the source adjacency sets iterate, so algorithms
+    running on it visit nodes exactly as they did on Dict[str, Set[str]].
+
+    At 10,000 nodes / 50,000 links this is two int arrays (~0.5 MB) instead
+    of 10,000 Python sets, and each algorithm skips rebuilding adjacency.
+    Every algorithm here also still accepts a plain adjacency dict.
+    """
+
+    def __init__(self, ids: List[str], rows: List[List[int]], version: Any = None):
+        self.ids = ids
+        self.index = {node: i for i, node in enumerate(ids)}
+        self.n = len(ids)
+        self.offsets = array("l", [0]) * (self.n + 1)
+        self.neighbors = array("l")
+        for i, row in enumerate(rows):
+            self.neighbors.extend(row)
+            self.offsets[i + 1] = len(self.neighbors)
+        self.degree = array("l", (len(row) for row in rows))
+        self.m = len(self.neighbors) / 2  # Undirected edges
+        self.version = version
+        self._adjacency = None
+
+    @classmethod
+    def from_adjacency(cls, adj: Dict[str, Set[str]], version: Any = None) -> "CompactGraph":
+        """Build from {node: neighbors}; neighbor-only nodes are appended after the keys."""
+        ids = list(adj.keys())
+        index = {node: i for i, node in enumerate(ids)}
+        for neighbors in list(adj.values()):
+            for v in neighbors:
+                if v not in index:
+                    index[v] = len(ids)
+                    ids.append(v)
+        rows = [[index[v] for v in adj.get(node, ())] for node in ids]
+        return cls(ids, rows, version)
+
+    @classmethod
+    def from_topology(cls, topology: dict, version: Any = None) -> "CompactGraph":
+        """Build from a topology's links, keeping isolated nodes."""
+        adj: Dict[str, Set[str]] = defaultdict(set)
+        for link in topology.get("links", []):
+            adj[link["source"]].add(link["target"])
+            adj[link["target"]].add(link["source"])
+        for n in topology.get("nodes", []):
+            if n["id"] not in adj:
+                adj[n["id"]] = set()
+        return cls.from_adjacency(adj, version)
+
+    @classmethod
+    def of(cls, graph) -> "CompactGraph":
+        """graph itself if already compact, else built from an adjacency dict."""
+        return graph if isinstance(graph, cls) else cls.from_adjacency(graph)
+
+    def neighbors_of(self, i: int) -> array:
+        return self.neighbors[self.offsets[i]:self.offsets[i + 1]]
+
+    def adjacency(self) -> Dict[str, Set[str]]:
+        """Dict[str, Set[str]] view for algorithms that work on node names (cached)."""
+        if self._adjacency is None:
+            ids, nbrs, off = self.ids, self.neighbors, self.offsets
+            self._adjacency = {ids[i]: {ids[j] for j in nbrs[off[i]:off[i + 1]]}
+                               for i in range(self.n)}
+        return self._adjacency
+
+    def __len__(self) -> int:
+        return self.n
+
 
 # ═══════════════════════════════════════════════════════════════
 #  1. TARJAN'S BRIDGE/ARTICULATION POINT DETECTION — O(N+E)
@@ -43,75 +145,75 @@ class TarjanSPOF:
       - This method: O(N+E) ≈ 6,000 operations (1000x faster)
     """
 
-    def __init__(self, adj: Dict[str, Set[str]]):
-        self.adj = adj
-        self.nodes = list(adj.keys())
+    def __init__(self, adj):
+        self.graph = CompactGraph.of(adj)
+        self.nodes = self.graph.ids
 
     def find_all(self) -> Tuple[List[str], List[Tuple[str, str]]]:
         """Returns (articulation_points, bridge_links). Iterative DFS."""
-        disc = {}
-        low = {}
-        parent = {}
+        g = self.graph
+        offsets, neighbors = g.offsets, g.neighbors
+        disc = [-1] * g.n
+        low = [0] * g.n
+        parent = [-1] * g.n
+        next_edge = list(offsets[:-1])  # Per-node cursor into its neighbor row
         ap = set()
         bridges = []
         timer = 0
-        visited = set()
 
-        for start in self.nodes:
-            if start in visited:
+        for start in range(g.n):
+            if disc[start] != -1:
                 continue
 
-            # Iterative DFS using explicit stack
-            # Stack entries: (node, neighbor_iterator, is_returning)
+            # Iterative DFS using explicit stack of node IDs
             disc[start] = low[start] = timer
             timer += 1
-            visited.add(start)
-            parent[start] = None
-            children_count = {start: 0}
-
-            stack = [(start, iter(self.adj.get(start, set())))]
+            root_children = 0
+            stack = [start]
 
             while stack:
-                u, neighbors = stack[-1]
-                try:
-                    v = next(neighbors)
-                    if v not in visited:
-                        visited.add(v)
+                u = stack[-1]
+                if next_edge[u] < offsets[u + 1]:
+                    v = neighbors[next_edge[u]]
+                    next_edge[u] += 1
+                    if disc[v] == -1:
                         parent[v] = u
                         disc[v] = low[v] = timer
                         timer += 1
-                        children_count[v] = 0
-                        children_count[u] = children_count.get(u, 0) + 1
-                        stack.append((v, iter(self.adj.get(v, set()))))
-                    elif v != parent.get(u):
-                        low[u] = min(low[u], disc[v])
-                except StopIteration:
+                        if u == start:
+                            root_children += 1
+                        stack.append(v)
+                    elif v != parent[u] and disc[v] < low[u]:
+                        low[u] = disc[v]
+                else:
                     stack.pop()
                     if stack:
-                        # Returning from v=u to its parent
-                        u_child = u
-                        u_parent = stack[-1][0]
-                        low[u_parent] = min(low[u_parent], low[u_child])
+                        # Returning from u to its parent
+                        p = stack[-1]
+                        if low[u] < low[p]:
+                            low[p] = low[u]
 
-                        # Articulation point check
-                        if parent[u_parent] is None and children_count.get(u_parent, 0) > 1:
-                            ap.add(u_parent)
-                        if parent[u_parent] is not None and low[u_child] >= disc[u_parent]:
-                            ap.add(u_parent)
+                        # Articulation point check (non-root)
+                        if p != start and low[u] >= disc[p]:
+                            ap.add(p)
 
                         # Bridge check
-                        if low[u_child] > disc[u_parent]:
-                            bridges.append((u_parent, u_child))
+                        if low[u] > disc[p]:
+                            bridges.append((g.ids[p], g.ids[u]))
 
-        return sorted(ap), bridges
+            # Root is an articulation point iff it has 2+ DFS children
+            if root_children > 1:
+                ap.add(start)
+
+        return sorted(g.ids[i] for i in ap), bridges
 
 
 # ═══════════════════════════════════════════════════════════════
-#  2. FAST GRAPH DIAMETER — Double-BFS Approximation O(N+E)
-#     Replaces O(N² + NE) all-pairs BFS
+#  2. GRAPH DIAMETER — Double-BFS approximation O(N+E) and an exact
+#     eccentricity engine; both replace O(N² + NE) all-pairs BFS
 # ═══════════════════════════════════════════════════════════════
 
-def fast_diameter_approx(adj: Dict[str, Set[str]], samples: int = 5) -> dict:
+def fast_diameter_approx(adj, samples: int = 5) -> dict:
     """
     Approximate graph diameter using double-BFS heuristic + random sampling.
 
@@ -121,36 +223,39 @@ def fast_diameter_approx(adj: Dict[str, Set[str]], samples: int = 5) -> dict:
 
     Returns exact diameter for trees, tight approximation for general graphs.
     The approximation is within factor 2 of exact, and usually exact.
+    Accepts a CompactGraph or an adjacency dict.
     """
     if not adj:
         return {"diameter": 0, "avg_path_length": 0, "periphery": [], "center": []}
 
-    nodes = list(adj.keys())
+    g = CompactGraph.of(adj)
+    offsets, neighbors = g.offsets, g.neighbors
 
-    def bfs_farthest(start: str) -> Tuple[str, int, Dict[str, int]]:
-        """BFS from start, return (farthest_node, max_dist, all_distances)."""
-        dist = {start: 0}
+    def bfs_farthest(start: int) -> Tuple[int, int, List[int]]:
+        """BFS from start, return (farthest_node, max_dist, all_distances; -1 = unreached)."""
+        dist = [-1] * g.n
+        dist[start] = 0
         queue = deque([start])
         farthest = start
         max_dist = 0
         while queue:
             u = queue.popleft()
-            for v in adj.get(u, set()):
-                if v not in dist:
-                    dist[v] = dist[u] + 1
+            d = dist[u] + 1
+            for v in neighbors[offsets[u]:offsets[u + 1]]:
+                if dist[v] == -1:
+                    dist[v] = d
                     queue.append(v)
-                    if dist[v] > max_dist:
-                        max_dist = dist[v]
+                    if d > max_dist:
+                        max_dist = d
                         farthest = v
         return farthest, max_dist, dist
 
     # Double-BFS: pick random node → BFS to farthest → BFS again from farthest
     best_diameter = 0
-    all_eccentricities = {}
-    best_dist_map = {}
+    eccentricities = [0] * g.n
 
     # Use multiple starting points for better accuracy
-    start_nodes = random.sample(nodes, min(samples, len(nodes)))
+    start_nodes = random.sample(range(g.n), min(samples, g.n))
 
     for start in start_nodes:
         far1, _, _ = bfs_farthest(start)
@@ -158,22 +263,21 @@ def fast_diameter_approx(adj: Dict[str, Set[str]], samples: int = 5) -> dict:
 
         if diam > best_diameter:
             best_diameter = diam
-            best_dist_map = dist_map
 
         # Also BFS from far2 for eccentricity data
         _, _, dist_map2 = bfs_farthest(far2)
 
-        for n in nodes:
-            ecc = max(dist_map.get(n, 0), dist_map2.get(n, 0))
-            all_eccentricities[n] = max(all_eccentricities.get(n, 0), ecc)
+        for i in range(g.n):
+            ecc = max(dist_map[i], dist_map2[i], 0)
+            if ecc > eccentricities[i]:
+                eccentricities[i] = ecc
 
     # Compute statistics from sampled eccentricities
-    ecc_values = list(all_eccentricities.values())
-    avg_ecc = sum(ecc_values) / len(ecc_values) if ecc_values else 0
+    avg_ecc = sum(eccentricities) / g.n if g.n else 0
 
-    periphery = [n for n, e in all_eccentricities.items() if e == best_diameter]
-    min_ecc = min(ecc_values) if ecc_values else 0
-    center = [n for n, e in all_eccentricities.items() if e == min_ecc]
+    periphery = [g.ids[i] for i, e in enumerate(eccentricities) if e == best_diameter]
+    min_ecc = min(eccentricities) if eccentricities else 0
+    center = [g.ids[i] for i, e in enumerate(eccentricities) if e == min_ecc]
 
     return {
         "diameter": best_diameter,
@@ -185,11 +289,347 @@ def fast_diameter_approx(adj: Dict[str, Set[str]], samples: int = 5) -> dict:
     }
 
 
+class EccentricityEngine:
+    """
+    Exact eccentricity of every node — and from it the exact diameter,
+    radius, center and periphery — without an all-pairs BFS.
+
+    Per connected component:
+      1. Bounding (Takes & Kosters, the iFUB family): each BFS from v tightens
+         max(d, ecc(v) - d) ≤ ecc(w) ≤ ecc(v) + d for every w; nodes whose
+         bounds meet are settled. Sources alternate between the largest upper
+         and the smallest lower bound, so a handful of BFS usually settles
+         SP/MPLS topologies.
+      2. Bit-parallel multi-source BFS for whatever is left after
+         `bfs_budget` runs: each node carries a bitset (Python int) of the
+         sources that reached it, so one sweep of the edges per level
+         advances every remaining source at once.
+
+    Radius and center are taken over the largest component (where RRs
+    belong); diameter and periphery over all of them.
+    """
+
+    def __init__(self, adj, bfs_budget: int = 32, batch: int = 4096):
+        self.graph = CompactGraph.of(adj)
+        self.bfs_budget = bfs_budget
+        self.batch = batch
+        self.bfs_runs = 0
+        self.batched_sources = 0
+        self._ecc: Optional[List[int]] = None
+
+    def _bfs(self, source: int, dist: List[int]) -> int:
+        """Fill dist (pre-set to -1 on the component) from source; returns ecc(source)."""
+        g = self.graph
+        offsets, neighbors = g.offsets, g.neighbors
+        dist[source] = 0
+        frontier = [source]
+        level = 0
+        while frontier:
+            nxt = []
+            for u in frontier:
+                for v in neighbors[offsets[u]:offsets[u + 1]]:
+                    if dist[v] == -1:
+                        dist[v] = level + 1
+                        nxt.append(v)
+            if nxt:
+                level += 1
+            frontier = nxt
+        self.bfs_runs += 1
+        return level
+
+    def _multi_source(self, sources: List[int], ecc: List[int]):
+        """Bit-parallel BFS from every source at once; writes ecc[source]."""
+        g = self.graph
+        offsets, neighbors = g.offsets, g.neighbors
+        seen: Dict[int, int] = {}
+        frontier: Dict[int, int] = {}
+        for bit, s in enumerate(sources):
+            seen[s] = seen.get(s, 0) | (1 << bit)
+            frontier[s] = frontier.get(s, 0) | (1 << bit)
+        level_masks = []
+        while frontier:
+            reached: Dict[int, int] = defaultdict(int)
+            for u, bits in frontier.items():
+                for v in neighbors[offsets[u]:offsets[u + 1]]:
+                    reached[v] |= bits
+            frontier = {}
+            advanced = 0
+            for v, bits in reached.items():
+                new = bits & ~seen.get(v, 0)
+                if new:
+                    seen[v] = seen.get(v, 0) | new
+                    frontier[v] = new
+                    advanced |= new
+            if advanced:
+                level_masks.append(advanced)
+        # A source's eccentricity is the last level at which it still reached new nodes
+        settled = 0
+        for level in range(len(level_masks), 0, -1):
+            mask = level_masks[level - 1] & ~settled
+            settled |= mask
+            while mask:
+                low = mask & -mask
+                ecc[sources[low.bit_length() - 1]] = level
+                mask ^= low
+        for bit, s in enumerate(sources):
+            if not (settled >> bit) & 1:
+                ecc[s] = 0
+        self.batched_sources += len(sources)
+
+    def _component_eccentricities(self, component: List[int], ecc: List[int]):
+        g = self.graph
+        if len(component) == 1:
+            ecc[component[0]] = 0
+            return
+        lower = {v: 0 for v in component}
+        upper = {v: len(component) for v in component}
+        dist = [-1] * g.n
+        pending = set(component)
+        pick_upper = True
+        runs = 0
+        source = max(component, key=lambda v: g.degree[v])
+        while pending and runs < self.bfs_budget:
+            for v in component:
+                dist[v] = -1
+            e = self._bfs(source, dist)
+            runs += 1
+            ecc[source] = e
+            pending.discard(source)
+            for w in list(pending):
+                d = dist[w]
+                lo = max(lower[w], d, e - d)
+                hi = min(upper[w], e + d)
+                lower[w], upper[w] = lo, hi
+                if lo == hi:
+                    ecc[w] = lo
+                    pending.discard(w)
+            if not pending:
+                return
+            # Alternate between the widest upper and the tightest lower bound
+            if pick_upper:
+                source = max(pending, key=lambda v: (upper[v], g.degree[v]))
+            else:
+                source = min(pending, key=lambda v: (lower[v], -g.degree[v]))
+            pick_upper = not pick_upper
+        remaining = sorted(pending)
+        for i in range(0, len(remaining), self.batch):
+            self._multi_source(remaining[i:i + self.batch], ecc)
+
+    def eccentricities(self) -> List[int]:
+        """Eccentricity of every node (within its component), by node ID. Cached."""
+        if self._ecc is None:
+            ecc = [0] * self.graph.n
+            for component in self.components():
+                self._component_eccentricities(component, ecc)
+            self._ecc = ecc
+        return self._ecc
+
+    def components(self) -> List[List[int]]:
+        """Connected components as node-ID lists, largest first."""
+        g = self.graph
+        offsets, neighbors = g.offsets, g.neighbors
+        label = [-1] * g.n
+        components = []
+        for start in range(g.n):
+            if label[start] != -1:
+                continue
+            label[start] = len(components)
+            members = [start]
+            for u in members:
+                for v in neighbors[offsets[u]:offsets[u + 1]]:
+                    if label[v] == -1:
+                        label[v] = label[start]
+                        members.append(v)
+            components.append(members)
+        components.sort(key=len, reverse=True)
+        return components
+
+    def summary(self, limit: int = 20) -> dict:
+        """Diameter, radius, average eccentricity, center and periphery."""
+        g = self.graph
+        if not g.n:
+            return {"diameter": 0, "avg_path_length": 0, "radius": 0, "periphery": [], "center": []}
+        ecc = self.eccentricities()
+        main = self.components()[0]
+        diameter = max(ecc)
+        radius = min(ecc[v] for v in main)
+        return {
+            "diameter": diameter,
+            "avg_path_length": round(sum(ecc) / g.n, 2),
+            "radius": radius,
+            "periphery": [g.ids[v] for v in range(g.n) if ecc[v] == diameter][:limit],
+            "center": [g.ids[v] for v in main if ecc[v] == radius][:limit],
+            "bfs_runs": self.bfs_runs,
+            "batched_sources": self.batched_sources,
+        }
+
+
+def exact_diameter(adj) -> dict:
+    """Exact diameter/radius/center/periphery; same shape as fast_diameter_approx()."""
+    return EccentricityEngine(adj).summary()
+
+
 # ═══════════════════════════════════════════════════════════════
 #  3. SIMULATED QUANTUM ANNEALING — Topology Optimization
 #     Where to add redundant links to eliminate SPOFs
 # ═══════════════════════════════════════════════════════════════
 
+def _blocks(n: int, adj: List[List[int]]) -> List[List[int]]:
+    """Biconnected components (blocks) of a simple graph on 0..n-1. Iterative."""
+    disc = [-1] * n
+    low = [0] * n
+    blocks = []
+    timer = 0
+    for root in range(n):
+        if disc[root] != -1:
+            continue
+        disc[root] = low[root] = timer
+        timer += 1
+        stack = [(root, -1, iter(adj[root]))]
+        vstack = [root]
+        while stack:
+            u, p, neighbors = stack[-1]
+            for v in neighbors:
+                if disc[v] == -1:
+                    disc[v] = low[v] = timer
+                    timer += 1
+                    stack.append((v, u, iter(adj[v])))
+                    vstack.append(v)
+                    break
+                if v != p:
+                    low[u] = min(low[u], disc[v])
+            else:
+                stack.pop()
+                if p == -1:
+                    continue
+                low[p] = min(low[p], low[u])
+                if low[u] >= disc[p]:
+                    # p separates u's subtree — pop it off as one block
+                    block = [p]
+                    while True:
+                        w = vstack.pop()
+                        block.append(w)
+                        if w == u:
+                            break
+                    blocks.append(block)
+    return blocks
+
+
+def _small_cuts(edges: List[Tuple[int, int]]) -> Tuple[Set[int], Set[int]]:
+    """(articulation nodes, bridge edge indices) of a small multigraph. Iterative."""
+    adj = defaultdict(list)
+    for i, (a, b) in enumerate(edges):
+        adj[a].append((b, i))
+        adj[b].append((a, i))
+    disc, low = {}, {}
+    aps, bridges = set(), set()
+    for root in adj:
+        if root in disc:
+            continue
+        disc[root] = low[root] = len(disc)
+        root_children = 0
+        stack = [(root, -1, iter(adj[root]))]
+        while stack:
+            u, via, neighbors = stack[-1]
+            for v, i in neighbors:
+                if i == via:
+                    continue
+                if v in disc:
+                    low[u] = min(low[u], disc[v])
+                    continue
+                disc[v] = low[v] = len(disc)
+                stack.append((v, i, iter(adj[v])))
+                break
+            else:
+                stack.pop()
+                if not stack:
+                    continue
+                p = stack[-1][0]
+                low[p] = min(low[p], low[u])
+                if low[u] > disc[p]:
+                    bridges.add(via)
+                if p == root:
+                    root_children += 1
+                elif low[u] >= disc[p]:
+                    aps.add(p)
+        if root_children > 1:
+            aps.add(root)
+    return aps, bridges
+
+
+class _RootedForest:
+    """Forest with Euler times and binary-lifting LCA, for virtual-tree queries."""
+
+    def __init__(self, adj: List[List[int]], weight: List[int] = None):
+        n = len(adj)
+        self.parent = list(range(n))
+        self.depth = [0] * n
+        self.tin = [0] * n
+        self.tout = [0] * n
+        self.tree = [-1] * n
+        # prefix[v] = sum of weight over the root..v path (inclusive)
+        self.prefix = [0] * n
+        timer = 0
+        for root in range(n):
+            if self.tree[root] != -1:
+                continue
+            self.tree[root] = root
+            self.prefix[root] = weight[root] if weight else 0
+            self.tin[root] = timer
+            timer += 1
+            stack = [(root, iter(adj[root]))]
+            while stack:
+                u, children = stack[-1]
+                for v in children:
+                    if self.tree[v] == -1:
+                        self.tree[v] = root
+                        self.parent[v] = u
+                        self.depth[v] = self.depth[u] + 1
+                        self.prefix[v] = self.prefix[u] + (weight[v] if weight else 0)
+                        self.tin[v] = timer
+                        timer += 1
+                        stack.append((v, iter(adj[v])))
+                        break
+                else:
+                    self.tout[u] = timer
+                    stack.pop()
+        self.up = [self.parent]
+        for _ in range(max(1, max(self.depth, default=0).bit_length()) - 1):
+            prev = self.up[-1]
+            self.up.append([prev[prev[v]] for v in range(n)])
+
+    def is_ancestor(self, a: int, b: int) -> bool:
+        return self.tin[a] <= self.tin[b] and self.tout[b] <= self.tout[a]
+
+    def lca(self, a: int, b: int) -> int:
+        if self.is_ancestor(a, b):
+            return a
+        if self.is_ancestor(b, a):
+            return b
+        for level in reversed(self.up):
+            if not self.is_ancestor(level[a], b):
+                a = level[a]
+        return self.parent[a]
+
+    def virtual_tree(self, keys) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """Keys closed under LCA, and the (child, ancestor) edges compressing
+        the forest paths between them."""
+        ordered = sorted(set(keys), key=self.tin.__getitem__)
+        nodes = set(ordered)
+        for a, b in zip(ordered, ordered[1:]):
+            if self.tree[a] == self.tree[b]:
+                nodes.add(self.lca(a, b))
+        ordered = sorted(nodes, key=self.tin.__getitem__)
+        edges, stack = [], []
+        for v in ordered:
+            while stack and not self.is_ancestor(stack[-1], v):
+                stack.pop()
+            if stack:
+                edges.append((v, stack[-1]))
+            stack.append(v)
+        return ordered, edges
+
+
 class QuantumAnnealingOptimizer:
     """
     Simulated Quantum Annealing (SQA) for network topology optimization.
@@ -202,10 +642,18 @@ class QuantumAnnealingOptimizer:
 
     This is NP-hard (variant of network design problem), making it a genuine
     candidate for quantum-inspired optimization.
+
+    Energies are evaluated incrementally: the base graph's block-vertex tree
+    (for SPOFs) and bridge tree (for bridges) are built once, and a candidate
+    solution is scored on the small virtual tree spanning its link endpoints —
+    O(k log N) per move instead of a full Tarjan pass on a copied graph.
+    Energies of visited solutions are memoized.
     """
 
-    def __init__(self, adj: Dict[str, Set[str]], nodes: List[dict],
+    def __init__(self, adj, nodes: List[dict],
                  max_new_links: int = 5, num_replicas: int = 8):
+        if isinstance(adj, CompactGraph):
+            adj = adj.adjacency()
         self.adj = {k: set(v) for k, v in adj.items()}
         self.nodes = nodes
         self.node_ids = [n["id"] for n in nodes]
@@ -218,23 +666,100 @@ class QuantumAnnealingOptimizer:
             for v in neighbors:
                 self.existing.add((min(u, v), max(u, v)))
 
-        self.candidates = []
-        for i, u in enumerate(self.node_ids):
-            for v in self.node_ids[i + 1:]:
+        self._build_energy_model()
+        self._energy_cache: Dict[Tuple[int, ...], float] = {}
+        self.candidates = self._candidate_links()
+
+    def _candidate_links(self, limit: int = 5000, sample: int = 3000) -> List[Tuple[str, str]]:
+        """Non-existing links; past `limit`, every link touching a SPOF plus
+        `sample` random others (drawn without enumerating all N² pairs)."""
+        ids = self.node_ids
+        if len(ids) * (len(ids) - 1) // 2 <= 10 * limit:
+            candidates = [(min(u, v), max(u, v)) for i, u in enumerate(ids) for v in ids[i + 1:]
+                          if (min(u, v), max(u, v)) not in self.existing]
+            if len(candidates) <= limit:
+                return candidates
+        spof_set = {v for v, i in self.vertex_idx.items() if self._star_degree[i] >= 2}
+
+        # Prioritize candidates near SPOFs
+        spof_positions = [i for i, u in enumerate(ids) if u in spof_set]
+        candidates = []
+        for i, u in enumerate(ids):
+            later = ids[i + 1:] if u in spof_set else (
+                ids[j] for j in spof_positions[bisect.bisect_right(spof_positions, i):])
+            for v in later:
                 edge = (min(u, v), max(u, v))
                 if edge not in self.existing:
-                    self.candidates.append(edge)
-
-        # Limit candidate pool for very large networks
-        if len(self.candidates) > 5000:
-            # Prioritize candidates near SPOFs
-            spof_set = set(TarjanSPOF(self.adj).find_all()[0])
-            spof_candidates = [c for c in self.candidates
-                               if c[0] in spof_set or c[1] in spof_set]
-            other = [c for c in self.candidates
-                     if c[0] not in spof_set and c[1] not in spof_set]
-            random.shuffle(other)
-            self.candidates = spof_candidates + other[:3000]
+                    candidates.append(edge)
+
+        others = [u for u in ids if u not in spof_set]
+        if len(others) * (len(others) - 1) // 2 <= 4 * sample:
+            pool = [(min(u, v), max(u, v)) for i, u in enumerate(others) for v in others[i + 1:]
+                    if (min(u, v), max(u, v)) not in self.existing]
+            random.shuffle(pool)
+            return candidates + pool[:sample]
+        # Rejection-sample, bounded: a near-complete mesh may not have `sample` free pairs
+        chosen = set()
+        for _ in range(20 * sample):
+            if len(chosen) >= sample:
+                break
+            u, v = random.sample(others, 2)
+            edge = (min(u, v), max(u, v))
+            if edge not in self.existing:
+                chosen.add(edge)
+        return candidates + list(chosen)
+
+    def _build_energy_model(self):
+        """Block-vertex tree and bridge tree of the base graph."""
+        vertices = set(self.node_ids) | set(self.adj)
+        for neighbors in self.adj.values():
+            vertices |= neighbors
+        self.vertex_idx = {v: i for i, v in enumerate(sorted(vertices))}
+        n = len(self.vertex_idx)
+        graph = [set() for _ in range(n)]
+        for u, neighbors in self.adj.items():
+            for v in neighbors:
+                if u != v:
+                    graph[self.vertex_idx[u]].add(self.vertex_idx[v])
+                    graph[self.vertex_idx[v]].add(self.vertex_idx[u])
+        blocks = _blocks(n, [list(g) for g in graph])
+
+        # Block-vertex tree: vertices 0..n-1, one star centre per block.
+        # A vertex is a SPOF iff it lies in 2+ blocks.
+        star = [[] for _ in range(n + len(blocks))]
+        for b, block in enumerate(blocks):
+            for v in block:
+                star[n + b].append(v)
+                star[v].append(n + b)
+        self._star_degree = [len(star[v]) for v in range(n)]
+        self._base_spofs = sum(1 for d in self._star_degree if d >= 2)
+        # Path vertices in exactly two blocks stop being SPOFs once a cycle covers them
+        self._star = _RootedForest(star, [1 if v < n and len(star[v]) == 2 else 0
+                                          for v in range(len(star))])
+
+        # Bridge tree: 2-edge-connected components joined by bridges
+        comp = list(range(n))
+
+        def find(x):
+            while comp[x] != x:
+                comp[x] = comp[comp[x]]
+                x = comp[x]
+            return x
+
+        bridges = [block for block in blocks if len(block) == 2]
+        for block in blocks:
+            if len(block) > 2:
+                for v in block[1:]:
+                    comp[find(v)] = find(block[0])
+        roots = {find(v) for v in range(n)}
+        comp_idx = {r: i for i, r in enumerate(sorted(roots))}
+        self._comp = [comp_idx[find(v)] for v in range(n)]
+        bridge_tree = [[] for _ in range(len(comp_idx))]
+        for a, b in bridges:
+            bridge_tree[self._comp[a]].append(self._comp[b])
+            bridge_tree[self._comp[b]].append(self._comp[a])
+        self._base_bridges = len(bridges)
+        self._bridge_tree = _RootedForest(bridge_tree)
 
     def _energy(self, solution: List[int]) -> float:
         """
@@ -244,20 +769,58 @@ class QuantumAnnealingOptimizer:
           - Number of remaining bridges (secondary)
           - Cost = number of links added (constraint)
         """
-        # Build augmented adjacency
-        aug_adj = {k: set(v) for k, v in self.adj.items()}
-        links_added = 0
-        for idx in solution:
-            u, v = self.candidates[idx]
-            aug_adj.setdefault(u, set()).add(v)
-            aug_adj.setdefault(v, set()).add(u)
-            links_added += 1
-
-        # Count SPOFs in augmented graph
-        spofs, bridges = TarjanSPOF(aug_adj).find_all()
-
-        # Energy: heavily penalize SPOFs, mildly penalize link count
-        return (len(spofs) * 100) + (len(bridges) * 10) + (links_added * 1)
+        key = tuple(solution)
+        energy = self._energy_cache.get(key)
+        if energy is None:
+            spofs, bridges = self._count_cuts(solution)
+            # Energy: heavily penalize SPOFs, mildly penalize link count
+            energy = (spofs * 100) + (bridges * 10) + (len(solution) * 1)
+            self._energy_cache[key] = energy
+        return energy
+
+    def _count_cuts(self, solution: List[int]) -> Tuple[int, int]:
+        """(SPOFs, bridges) of the base graph plus the solution's links.
+
+        Only the forest paths between the new links' endpoints can change:
+        a compressed path that ends up on a cycle loses its bridges and its
+        two-block SPOFs, and endpoints are re-checked on the virtual tree."""
+        links = [(self.vertex_idx[u], self.vertex_idx[v])
+                 for u, v in (self.candidates[idx] for idx in solution)]
+        if not links:
+            return self._base_spofs, self._base_bridges
+
+        # SPOFs on the block-vertex tree
+        star = self._star
+        keys, tree_edges = star.virtual_tree([v for link in links for v in link])
+        aps, bridge_ids = _small_cuts(tree_edges + links)
+        spofs = self._base_spofs
+        tree_degree = defaultdict(int)
+        for i, (child, ancestor) in enumerate(tree_edges):
+            tree_degree[child] += 1
+            tree_degree[ancestor] += 1
+            if i not in bridge_ids:
+                spofs -= star.prefix[star.parent[child]] - star.prefix[ancestor]
+        for v in keys:
+            if v < len(self._star_degree):
+                degree = self._star_degree[v]
+                spofs += (v in aps or degree > tree_degree[v]) - (degree >= 2)
+
+        # Bridges on the bridge tree — links inside a 2-edge-connected
+        # component change nothing
+        comp = self._comp
+        comp_links = [(comp[u], comp[v]) for u, v in links if comp[u] != comp[v]]
+        if not comp_links:
+            return spofs, self._base_bridges
+        bridge_tree = self._bridge_tree
+        _, tree_edges = bridge_tree.virtual_tree([c for link in comp_links for c in link])
+        _, bridge_ids = _small_cuts(tree_edges + comp_links)
+        bridges = self._base_bridges
+        for i, (child, ancestor) in enumerate(tree_edges):
+            if i not in bridge_ids:
+                bridges -= bridge_tree.depth[child] - bridge_tree.depth[ancestor]
+        bridges += sum(1 for i in range(len(tree_edges), len(tree_edges) + len(comp_links))
+                       if i in bridge_ids)
+        return spofs, bridges
 
     def optimize(self, iterations: int = 500, verbose: bool = False) -> dict:
         """
@@ -370,14 +933,39 @@ class QuantumWalkAnomalyDetector:
 
     This is genuinely faster than classical random walks for detecting structural
     anomalies in large sparse graphs — O(N × steps) vs O(N² × steps).
+
+    Backends (see WALK_BACKEND):
+      scipy  — CSR Laplacian, exact |ψ(t)⟩ = exp(-iLt)|ψ(0)⟩ via expm_multiply
+      numpy  — vectorized sparse matvec, Euler steps
+      python — dict-of-rows Laplacian, Euler steps
     """
 
-    def __init__(self, adj: Dict[str, Set[str]], node_roles: Dict[str, str] = None):
+    def __init__(self, adj, node_roles: Dict[str, str] = None,
+                 backend: str = None):
+        if isinstance(adj, CompactGraph):
+            adj = adj.adjacency()
         self.adj = adj
         self.nodes = sorted(adj.keys())
         self.n = len(self.nodes)
         self.node_idx = {n: i for i, n in enumerate(self.nodes)}
         self.node_roles = node_roles or {}
+        self.backend = backend or WALK_BACKEND
+        if self.backend == "scipy" and csr_matrix is None or self.backend == "numpy" and np is None:
+            raise ValueError(f"Quantum walk backend '{self.backend}' is not installed")
+
+    def _laplacian_coo(self) -> Tuple[List[int], List[int], List[float]]:
+        """Graph Laplacian L = D - A as (rows, cols, values) triplets."""
+        rows, cols, vals = [], [], []
+        for i, u in enumerate(self.nodes):
+            neighbors = self.adj.get(u, set())
+            rows.append(i)
+            cols.append(i)
+            vals.append(float(len(neighbors)))
+            for v in neighbors:
+                rows.append(i)
+                cols.append(self.node_idx[v])
+                vals.append(-1.0)
+        return rows, cols, vals
 
     def _build_laplacian_sparse(self) -> List[Dict[int, float]]:
         """Build sparse graph Laplacian L = D - A."""
@@ -399,28 +987,14 @@ class QuantumWalkAnomalyDetector:
                 result[i] += val * vec[j]
         return result
 
-    def detect_anomalies(self, walk_steps: int = 50, threshold: float = 2.0) -> dict:
-        """
-        Run quantum walk simulation and detect anomalous nodes.
-
-        Simulates the quantum walk using Euler approximation of the
-        Schrödinger equation: |ψ(t+dt)⟩ ≈ (I - i·dt·L)|ψ(t)⟩
-
-        Anomalous = nodes where quantum probability deviates > threshold
-        standard deviations from the expected classical stationary distribution.
-        """
-        if self.n == 0:
-            return {"anomalies": [], "scores": {}}
-
-        start_time = time.time()
+    def _evolve_python(self, walk_steps: int, dt: float) -> List[float]:
+        """Euler steps |ψ(t+dt)⟩ ≈ (I - i·dt·L)|ψ(t)⟩ in pure Python; returns |ψ|²."""
         L = self._build_laplacian_sparse()
 
         # Initialize uniform superposition |ψ⟩ = 1/√N |+⟩
         amp_real = [1.0 / math.sqrt(self.n)] * self.n
         amp_imag = [0.0] * self.n
 
-        dt = 0.05  # Time step
-
         for _ in range(walk_steps):
             # |ψ(t+dt)⟩ ≈ |ψ(t)⟩ - i·dt·L·|ψ(t)⟩
             Lr = self._sparse_matvec(L, amp_real)
@@ -435,8 +1009,53 @@ class QuantumWalkAnomalyDetector:
                 amp_real = [r / norm for r in new_real]
                 amp_imag = [im / norm for im in new_imag]
 
-        # Compute probability distribution |ψ|²
-        probs = [amp_real[k] ** 2 + amp_imag[k] ** 2 for k in range(self.n)]
+        return [amp_real[k] ** 2 + amp_imag[k] ** 2 for k in range(self.n)]
+
+    def _evolve_numpy(self, walk_steps: int, dt: float) -> List[float]:
+        """Same Euler steps as _evolve_python with a vectorized sparse matvec."""
+        rows, cols, vals = (np.asarray(a) for a in self._laplacian_coo())
+
+        def matvec(vec):
+            return np.bincount(rows, weights=vals * vec[cols], minlength=self.n)
+
+        real = np.full(self.n, 1.0 / math.sqrt(self.n))
+        imag = np.zeros(self.n)
+        for _ in range(walk_steps):
+            real, imag = real + dt * matvec(imag), imag - dt * matvec(real)
+            norm = math.sqrt(float(real @ real + imag @ imag))
+            if norm > 0:
+                real /= norm
+                imag /= norm
+        return (real * real + imag * imag).tolist()
+
+    def _evolve_scipy(self, walk_steps: int, dt: float) -> List[float]:
+        """Exact evolution |ψ(t)⟩ = exp(-iLt)|ψ(0)⟩ at t = walk_steps·dt on a CSR Laplacian."""
+        rows, cols, vals = self._laplacian_coo()
+        L = csr_matrix((vals, (rows, cols)), shape=(self.n, self.n), dtype=complex)
+        psi = np.full(self.n, 1.0 / math.sqrt(self.n), dtype=complex)
+        psi = expm_multiply(-1j * (walk_steps * dt) * L, psi)
+        probs = np.abs(psi) ** 2
+        return (probs / (probs.sum() or 1.0)).tolist()
+
+    def detect_anomalies(self, walk_steps: int = 50, threshold: float = 2.0) -> dict:
+        """
+        Run quantum walk simulation and detect anomalous nodes.
+
+        Evolves the Schrödinger equation with the graph Laplacian as Hamiltonian
+        for walk_steps × dt time, exactly (scipy) or by Euler approximation
+        |ψ(t+dt)⟩ ≈ (I - i·dt·L)|ψ(t)⟩ (numpy / pure Python).
+
+        Anomalous = nodes where quantum probability deviates > threshold
+        standard deviations from the expected classical stationary distribution.
+        """
+        if self.n == 0:
+            return {"anomalies": [], "scores": {}}
+
+        start_time = time.time()
+        dt = 0.05  # Time step
+        evolve = {"scipy": self._evolve_scipy, "numpy": self._evolve_numpy}.get(
+            self.backend, self._evolve_python)
+        probs = evolve(walk_steps, dt)
 
         # Expected uniform distribution
         expected = 1.0 / self.n
@@ -448,7 +1067,10 @@ class QuantumWalkAnomalyDetector:
 
         # Z-score anomaly detection
         mean_prob = sum(probs) / len(probs)
-        std_prob = math.sqrt(sum((p - mean_prob) ** 2 for p in probs) / len(probs)) or 1e-10
+        std_prob = math.sqrt(sum((p - mean_prob) ** 2 for p in probs) / len(probs))
+        # Spread at round-off level is backend noise, not structure
+        if std_prob < 1e-9 * mean_prob:
+            std_prob = float("inf")
 
         anomalies = []
         scores = {}
@@ -481,6 +1103,7 @@ class QuantumWalkAnomalyDetector:
             "threshold": threshold,
             "elapsed_sec": round(time.time() - start_time, 3),
             "algorithm": "Continuous-Time Quantum Walk (CTQW) Anomaly Detection",
+            "backend": self.backend,
             "scores": {k: v for k, v in sorted(scores.items(), key=lambda x: -x[1])[:100]}
         }
 
@@ -512,24 +1135,29 @@ class LouvainCommunityDetector:
     with expand-on-click.
     """
 
-    def __init__(self, adj: Dict[str, Set[str]]):
-        self.adj = adj
-        self.nodes = list(adj.keys())
-        self.m = sum(len(v) for v in adj.values()) / 2  # Total edges
+    def __init__(self, adj):
+        self.graph = CompactGraph.of(adj)
+        self.nodes = self.graph.ids
+        self.m = self.graph.m  # Total edges
 
     def detect(self, resolution: float = 1.0) -> dict:
         """
         Run Louvain community detection.
         Returns node → community_id mapping and modularity score.
+
+        Community degree totals are kept up to date as nodes move, so each
+        move is evaluated in O(degree) instead of rescanning every node.
         """
         if not self.nodes or self.m == 0:
             return {"communities": {}, "modularity": 0, "num_communities": 0}
 
         start_time = time.time()
+        g = self.graph
+        offsets, neighbors, degrees = g.offsets, g.neighbors, g.degree
 
         # Initialize: each node in its own community
-        community = {n: i for i, n in enumerate(self.nodes)}
-        degrees = {n: len(self.adj.get(n, set())) for n in self.nodes}
+        community = list(range(g.n))
+        sum_tot = list(degrees)  # Σ degree of each community's members
 
         improved = True
         iteration = 0
@@ -539,15 +1167,16 @@ class LouvainCommunityDetector:
             improved = False
             iteration += 1
 
-            for node in self.nodes:
+            for node in range(g.n):
                 current_comm = community[node]
                 best_comm = current_comm
                 best_delta = 0
 
                 # Calculate communities of neighbors
-                neighbor_comms = defaultdict(float)
-                for neighbor in self.adj.get(node, set()):
-                    neighbor_comms[community[neighbor]] += 1
+                neighbor_comms: Dict[int, int] = {}
+                for neighbor in neighbors[offsets[node]:offsets[node + 1]]:
+                    comm = community[neighbor]
+                    neighbor_comms[comm] = neighbor_comms.get(comm, 0) + 1
 
                 ki = degrees[node]
 
@@ -556,51 +1185,53 @@ class LouvainCommunityDetector:
                         continue
 
                     # Modularity gain of moving node to comm
-                    sum_in = sum(1 for n in self.nodes if community[n] == comm
-                                 for nb in self.adj.get(n, set()) if community[nb] == comm) / 2
-                    sum_tot = sum(degrees[n] for n in self.nodes if community[n] == comm)
-
-                    delta = resolution * (ki_in - (sum_tot * ki) / (2 * self.m + 1e-10))
+                    delta = resolution * (ki_in - (sum_tot[comm] * ki) / (2 * self.m + 1e-10))
 
                     if delta > best_delta:
                         best_delta = delta
                         best_comm = comm
 
                 if best_comm != current_comm:
+                    sum_tot[current_comm] -= ki
+                    sum_tot[best_comm] += ki
                     community[node] = best_comm
                     improved = True
 
         # Renumber communities to 0, 1, 2, ...
-        unique_comms = sorted(set(community.values()))
+        unique_comms = sorted(set(community))
         remap = {old: new for new, old in enumerate(unique_comms)}
-        community = {n: remap[c] for n, c in community.items()}
+        community = [remap[c] for c in community]
 
         # Calculate modularity
         modularity = self._modularity(community)
 
         # Build community summaries
         comm_nodes = defaultdict(list)
-        for n, c in community.items():
-            comm_nodes[c].append(n)
+        for i, c in enumerate(community):
+            comm_nodes[c].append(i)
 
         summaries = []
         for c_id in sorted(comm_nodes.keys()):
             members = comm_nodes[c_id]
-            inter_links = sum(1 for n in members for nb in self.adj.get(n, set())
-                              if nb not in members) // 2
+            internal = external = 0
+            for i in members:
+                for nb in neighbors[offsets[i]:offsets[i + 1]]:
+                    if community[nb] == c_id:
+                        internal += 1
+                    else:
+                        external += 1
             summaries.append({
                 "id": c_id,
                 "size": len(members),
-                "members": members[:50],  # Limit for API
+                "members": [g.ids[i] for i in members[:50]],  # Limit for API
                 "internal_density": round(
-                    sum(1 for n in members for nb in self.adj.get(n, set()) if nb in set(members))
-                    / (len(members) * (len(members) - 1) + 1e-10), 3
+                    internal / (len(members) * (len(members) - 1) + 1e-10), 3
                 ),
-                "external_links": inter_links
+                "external_links": external // 2
             })
 
         return {
-            "communities": community,
+            "communities": {g.ids[i]: c for i, c in enumerate(community)},
             "num_communities": len(unique_comms),
             "modularity": round(modularity, 4),
             "iterations": iteration,
@@ -609,15 +1240,16 @@ class LouvainCommunityDetector:
             "algorithm": "Louvain Community Detection"
         }
 
-    def _modularity(self, community: Dict[str, int]) -> float:
+    def _modularity(self, community: List[int]) -> float:
         """Calculate Newman-Girvan modularity Q."""
         if self.m == 0:
             return 0
+        g = self.graph
         Q = 0.0
-        for u in self.nodes:
-            for v in self.adj.get(u, set()):
+        for u in range(g.n):
+            for v in g.neighbors[g.offsets[u]:g.offsets[u + 1]]:
                 if community[u] == community[v]:
-                    Q += 1 - (len(self.adj.get(u, set())) * len(self.adj.get(v, set()))) / (2 * self.m)
+                    Q += 1 - (g.degree[u] * g.degree[v]) / (2 * self.m)
         return Q / (2 * self.m)
 
 
@@ -625,119 +1257,187 @@ class LouvainCommunityDetector:
 #  6. SCALABLE NETWORK STATS — Replaces calculate_network_stats()
 # ═══════════════════════════════════════════════════════════════
 
-def calculate_network_stats_v2(topology: dict) -> dict:
+STATS_PARTS = ("counts", "resilience", "diameter", "communities")
+
+
+class TopologyStats:
     """
-    Production-grade network statistics for 2000+ nodes.
+    Network statistics for one topology version, computed lazily by part:
 
-    Complexity improvements:
-      - SPOF detection: O(N²) → O(N+E) via Tarjan's
-      - Diameter:        O(N²) → O(N+E) via double-BFS
-      - Community:       NEW — Louvain O(N·log(N))
-      - Anomaly:         NEW — Quantum walk O(N·steps)
+      counts       — node/link/role/protocol counts, degrees     O(N+E)
+      resilience   — SPOFs, bridges, redundancy, high-risk nodes  O(N+E) Tarjan
+      diameter     — exact diameter, radius, center/periphery      O(k × (N+E))
+      communities  — Louvain communities and modularity            heaviest
+
+    Each part is computed at most once (thread-safe), so callers that only
+    need counts never pay for SPOF, diameter or community detection.
     """
-    nodes = topology.get("nodes", [])
-    links = topology.get("links", [])
 
-    if not nodes or not links:
-        return {}
+    def __init__(self, topology: dict, graph: CompactGraph = None, version: Any = None):
+        self.topology = topology
+        self.version = version
+        self.nodes = topology.get("nodes", [])
+        self.links = topology.get("links", [])
+        self._graph = graph
+        self._parts: Dict[str, dict] = {}
+        self._elapsed: Dict[str, float] = {}
+        self._locks = {name: threading.Lock() for name in STATS_PARTS}
+        self._graph_lock = threading.Lock()
+
+    @property
+    def empty(self) -> bool:
+        return not self.nodes or not self.links
+
+    @property
+    def graph(self) -> CompactGraph:
+        with self._graph_lock:
+            if self._graph is None:
+                self._graph = CompactGraph.from_topology(self.topology)
+            return self._graph
+
+    def part(self, name: str) -> dict:
+        """One stats part, computed on first use."""
+        if name not in self._locks:
+            raise ValueError(f"Unknown stats part '{name}' (expected one of {STATS_PARTS})")
+        if self.empty:
+            return {}
+        with self._locks[name]:
+            if name not in self._parts:
+                start_time = time.time()
+                self._parts[name] = getattr(self, f"_compute_{name}")()
+                self._elapsed[name] = time.time() - start_time
+            return self._parts[name]
+
+    def get(self, *parts: str) -> dict:
+        """Merged dict of the requested parts (default: counts)."""
+        merged = {}
+        for name in parts or ("counts",):
+            merged.update(self.part(name))
+        return merged
+
+    def full(self) -> dict:
+        """Every part — the calculate_network_stats_v2() result."""
+        stats = self.get(*STATS_PARTS)
+        if not stats:
+            return {}
+        stats["computation_time_ms"] = round(sum(self._elapsed.values()) * 1000, 1)
+        stats["algorithm_versions"] = {
+            "spof": "Tarjan O(V+E)",
+            "diameter": "Exact eccentricity bounds + bit-parallel BFS",
+            "communities": "Louvain O(V·log(V))"
+        }
+        return stats
 
-    start_time = time.time()
+    def computed(self) -> List[str]:
+        """Parts already computed."""
+        return [name for name in STATS_PARTS if name in self._parts]
 
-    # Build adjacency
-    adj: Dict[str, Set[str]] = defaultdict(set)
-    for link in links:
-        adj[link["source"]].add(link["target"])
-        adj[link["target"]].add(link["source"])
+    def _degrees(self) -> Dict[str, int]:
+        graph = self.graph
+        return {node: graph.degree[i] for i, node in enumerate(graph.ids)}
 
-    # Ensure all nodes are in adj even if isolated
-    for n in nodes:
-        if n["id"] not in adj:
-            adj[n["id"]] = set()
-
-    node_ids = [n["id"] for n in nodes]
-    degrees = [len(adj.get(n["id"], set())) for n in nodes]
-
-    # 1. Tarjan's SPOF detection — O(V+E)
-    tarjan = TarjanSPOF(dict(adj))
-    spof, bridges = tarjan.find_all()
-
-    # 2. Fast diameter — O(samples × (V+E))
-    diameter_info = fast_diameter_approx(dict(adj), samples=min(10, len(node_ids)))
-
-    # 3. Community detection — O(V·log(V))
-    communities = LouvainCommunityDetector(dict(adj)).detect()
-
-    # 4. Risk scoring per node
-    node_risk = {}
-    for n in node_ids:
-        risk = 0
-        if n in spof:
-            risk += 50
-        if len(adj.get(n, set())) <= 1:
-            risk += 30
-        if len(adj.get(n, set())) <= 2:
-            risk += 10
-        # Nodes that are bridges endpoints get extra risk
-        for u, v in bridges:
-            if n in (u, v):
+    def _compute_counts(self) -> dict:
+        nodes = self.nodes
+        degree = self._degrees()
+        degrees = [degree.get(n["id"], 0) for n in nodes]
+        return {
+            "total_nodes": len(nodes),
+            "total_links": len(self.links),
+            "pe_count": sum(1 for n in nodes if n.get("role") == "PE"),
+            "p_count": sum(1 for n in nodes if n.get("role") == "P"),
+            "rr_count": sum(1 for n in nodes if n.get("role") == "Route Reflector"),
+            "avg_degree": round(sum(degrees) / len(degrees), 1) if degrees else 0,
+            "max_degree": max(degrees) if degrees else 0,
+            "min_degree": min(degrees) if degrees else 0,
+            "total_bgp_sessions": sum(len(n.get("bgp_neighbors", [])) for n in nodes),
+            "total_isis_adjacencies": sum(len(n.get("isis_interfaces", [])) for n in nodes),
+            "total_ldp_sessions": sum(1 for n in nodes if n.get("ldp")),
+            "total_vpn_instances": sum(1 for n in nodes if n.get("vpn")),
+        }
+
+    def _compute_resilience(self) -> dict:
+        nodes = self.nodes
+        degree = self._degrees()
+
+        # Tarjan's SPOF detection — O(V+E)
+        spof, bridges = TarjanSPOF(self.graph).find_all()
+
+        # Risk scoring per node
+        spof_set = set(spof)
+        bridge_ends = {n for link in bridges for n in link}
+        node_risk = {}
+        for n in (node["id"] for node in nodes):
+            risk = 0
+            if n in spof_set:
+                risk += 50
+            if degree.get(n, 0) <= 1:
+                risk += 30
+            if degree.get(n, 0) <= 2:
+                risk += 10
+            # Nodes that are bridges endpoints get extra risk
+            if n in bridge_ends:
                 risk += 20
-                break
-        node_risk[n] = min(risk, 100)
+            node_risk[n] = min(risk, 100)
 
-    high_risk = [{"node": n, "risk": r, "reason": _risk_reason(n, r, spof, bridges, adj)}
-                 for n, r in sorted(node_risk.items(), key=lambda x: -x[1])
-                 if r >= 30]
+        high_risk = [{"node": n, "risk": r,
+                      "reason": _risk_reason(n, r, spof_set, bridge_ends, degree.get(n, 0))}
+                     for n, r in sorted(node_risk.items(), key=lambda x: -x[1])
+                     if r >= 30]
+        return {
+            "single_points_of_failure": spof,
+            "critical_links": [{"source": u, "target": v} for u, v in bridges],
+            "redundancy_score": round((1 - len(spof) / len(nodes)) * 100, 1) if nodes else 0,
+            "connectivity": "full-mesh" if not spof else "partial-mesh",
+            "high_risk_nodes": high_risk[:50],
+        }
 
-    elapsed = time.time() - start_time
+    def _compute_diameter(self) -> dict:
+        # Exact eccentricities — bounded BFS + bit-parallel multi-source BFS
+        info = EccentricityEngine(self.graph).summary()
+        return {
+            "graph_diameter": info["diameter"],
+            "avg_path_length": info["avg_path_length"],
+            "graph_radius": info.get("radius", 0),
+            "periphery_nodes": info.get("periphery", []),
+            "center_nodes": info.get("center", []),
+        }
 
-    return {
-        "total_nodes": len(nodes),
-        "total_links": len(links),
-        "pe_count": sum(1 for n in nodes if n.get("role") == "PE"),
-        "p_count": sum(1 for n in nodes if n.get("role") == "P"),
-        "rr_count": sum(1 for n in nodes if n.get("role") == "Route Reflector"),
-        "avg_degree": round(sum(degrees) / len(degrees), 1) if degrees else 0,
-        "max_degree": max(degrees) if degrees else 0,
-        "min_degree": min(degrees) if degrees else 0,
-        "graph_diameter": diameter_info["diameter"],
-        "avg_path_length": diameter_info["avg_path_length"],
-        "graph_radius": diameter_info.get("radius", 0),
-        "periphery_nodes": diameter_info.get("periphery", []),
-        "center_nodes": diameter_info.get("center", []),
-        "total_bgp_sessions": sum(len(n.get("bgp_neighbors", [])) for n in nodes),
-        "total_isis_adjacencies": sum(len(n.get("isis_interfaces", [])) for n in nodes),
-        "total_ldp_sessions": sum(1 for n in nodes if n.get("ldp")),
-        "total_vpn_instances": sum(1 for n in nodes if n.get("vpn")),
-        "single_points_of_failure": spof,
-        "critical_links": [{"source": u, "target": v} for u, v in bridges],
-        "redundancy_score": round((1 - len(spof) / len(nodes)) * 100, 1) if nodes else 0,
-        "connectivity": "full-mesh" if not spof else "partial-mesh",
-        "communities": communities["num_communities"],
-        "modularity": communities["modularity"],
-        "community_summaries": communities.get("summaries", []),
-        "high_risk_nodes": high_risk[:50],
-        "computation_time_ms": round(elapsed * 1000, 1),
-        "algorithm_versions": {
-            "spof": "Tarjan O(V+E)",
-            "diameter": "Double-BFS O(V+E)",
-            "communities": "Louvain O(V·log(V))"
+    def _compute_communities(self) -> dict:
+        # Community detection — O(V·log(V))
+        communities = LouvainCommunityDetector(self.graph).detect()
+        return {
+            "communities": communities["num_communities"],
+            "modularity": communities["modularity"],
+            "community_summaries": communities.get("summaries", []),
         }
-    }
 
 
-def _risk_reason(node: str, risk: int, spof: list, bridges: list, adj: dict) -> str:
+def calculate_network_stats_v2(topology: dict, graph: CompactGraph = None) -> dict:
+    """
+    Production-grade network statistics for 2000+ nodes.
+
+    Complexity improvements:
+      - SPOF detection: O(N²) → O(N+E) via Tarjan's
+      - Diameter:        O(N²·E) → exact via eccentricity bounds, O(k·(N+E))
+      - Community:       NEW — Louvain O(N·log(N))
+      - Anomaly:         NEW — Quantum walk O(N·steps)
+
+    Pass the topology's CompactGraph (CompactGraph.from_topology) to reuse it.
+    Use TopologyStats directly to compute only some of the parts.
+    """
+    return TopologyStats(topology, graph).full()
+
+
+def _risk_reason(node: str, risk: int, spof: set, bridge_ends: set, degree: int) -> str:
     reasons = []
     if node in spof:
         reasons.append("single point of failure")
-    degree = len(adj.get(node, set()))
     if degree <= 1:
         reasons.append(f"leaf node (degree={degree})")
     elif degree <= 2:
         reasons.append(f"low connectivity (degree={degree})")
-    for u, v in bridges:
-        if node in (u, v):
-            reasons.append("endpoint of critical bridge link")
-            break
+    if node in bridge_ends:
+        reasons.append("endpoint of critical bridge link")
     return "; ".join(reasons) if reasons else "moderate risk"
 
 
@@ -745,7 +1445,8 @@ def _risk_reason(node: str, risk: int, spof: list, bridges: list, adj: dict) ->
 #  7. SCALABLE TOPOLOGY API HELPERS
 # ═══════════════════════════════════════════════════════════════
 
-def get_clustered_topology(topology: dict, max_visible: int = 200) -> dict:
+def get_clustered_topology(topology: dict, max_visible: int = 200,
+                           graph: CompactGraph = None) -> dict:
     """
     For 2000+ nodes: return a clustered view where communities are
     collapsed into super-nodes. D3.js can render 200 super-nodes
@@ -757,13 +1458,11 @@ def get_clustered_topology(topology: dict, max_visible: int = 200) -> dict:
     if len(nodes) <= max_visible:
         return topology  # Small enough to render directly
 
-    adj: Dict[str, Set[str]] = defaultdict(set)
-    for link in links:
-        adj[link["source"]].add(link["target"])
-        adj[link["target"]].add(link["source"])
+    if graph is None:
+        graph = CompactGraph.from_topology(topology)
 
     # Detect communities
-    community_map = LouvainCommunityDetector(dict(adj)).detect()["communities"]
+    community_map = LouvainCommunityDetector(graph).detect()["communities"]
 
     # Build super-nodes
     comm_nodes = defaultdict(list)
@@ -823,20 +1522,19 @@ def get_clustered_topology(topology: dict, max_visible: int = 200) -> dict:
 #  8. PUBLIC API — Main entry points for app.py integration
 # ═══════════════════════════════════════════════════════════════
 
-def optimize_topology(adj: Dict[str, Set[str]], nodes: List[dict],
-                      max_new_links: int = 5) -> dict:
+def optimize_topology(adj, nodes: List[dict], max_new_links: int = 5) -> dict:
     """
     Run quantum annealing to find optimal new links.
-    Public API for app.py route.
+    Public API for app.py route; adj is an adjacency dict or CompactGraph.
     """
     optimizer = QuantumAnnealingOptimizer(adj, nodes, max_new_links)
     return optimizer.optimize()
 
 
-def detect_anomalies(adj: Dict[str, Set[str]], node_roles: Dict[str, str] = None) -> dict:
+def detect_anomalies(adj, node_roles: Dict[str, str] = None) -> dict:
     """
     Run quantum walk anomaly detection.
-    Public API for app.py route.
+    Public API for app.py route; adj is an adjacency dict or CompactGraph.
     """
     detector = QuantumWalkAnomalyDetector(adj, node_roles)
     return detector.detect_anomalies()
@@ -860,9 +1558,14 @@ def benchmark(node_count: int = 2000, avg_degree: int = 3) -> dict:
 
     results = {}
 
+    # Compact graph, shared by every algorithm below
+    t0 = time.time()
+    graph = CompactGraph.from_adjacency(dict(adj))
+    results["compact_graph"] = {"time_ms": round((time.time() - t0) * 1000, 1)}
+
     # Tarjan
     t0 = time.time()
-    spof, bridges = TarjanSPOF(dict(adj)).find_all()
+    spof, bridges = TarjanSPOF(graph).find_all()
     results["tarjan_spof"] = {
         "time_ms": round((time.time() - t0) * 1000, 1),
         "spof_count": len(spof),
@@ -871,33 +1574,47 @@ def benchmark(node_count: int = 2000, avg_degree: int = 3) -> dict:
 
     # Diameter
     t0 = time.time()
-    diam = fast_diameter_approx(dict(adj))
+    diam = fast_diameter_approx(graph)
     results["diameter"] = {
         "time_ms": round((time.time() - t0) * 1000, 1),
         "diameter": diam["diameter"]
     }
 
+    # Exact eccentricities
+    t0 = time.time()
+    exact = EccentricityEngine(graph)
+    exact_info = exact.summary()
+    results["exact_diameter"] = {
+        "time_ms": round((time.time() - t0) * 1000, 1),
+        "diameter": exact_info["diameter"],
+        "radius": exact_info["radius"],
+        "bfs_runs": exact.bfs_runs
+    }
+
     # Community
     t0 = time.time()
-    comm = LouvainCommunityDetector(dict(adj)).detect()
+    comm = LouvainCommunityDetector(graph).detect()
     results["louvain"] = {
         "time_ms": round((time.time() - t0) * 1000, 1),
         "communities": comm["num_communities"],
         "modularity": comm["modularity"]
     }
 
-    # Quantum walk (on smaller induced subgraph for speed)
-    sample_nodes = set(list(adj.keys())[:min(500, node_count)])
-    sample_adj = {
-        k: v & sample_nodes  # Only keep edges within the sample
-        for k, v in adj.items() if k in sample_nodes
-    }
+    # Quantum walk (pure Python only keeps up on a smaller induced subgraph)
+    walk_adj = graph.adjacency()
+    if WALK_BACKEND == "python":
+        sample_nodes = set(list(adj.keys())[:min(500, node_count)])
+        walk_adj = {
+            k: v & sample_nodes  # Only keep edges within the sample
+            for k, v in adj.items() if k in sample_nodes
+        }
     t0 = time.time()
-    qw = QuantumWalkAnomalyDetector(sample_adj).detect_anomalies(walk_steps=20)
+    qw = QuantumWalkAnomalyDetector(walk_adj).detect_anomalies(walk_steps=20)
     results["quantum_walk"] = {
         "time_ms": round((time.time() - t0) * 1000, 1),
         "anomalies_found": qw["anomaly_count"],
-        "nodes_analyzed": len(sample_adj)
+        "nodes_analyzed": len(walk_adj),
+        "backend": WALK_BACKEND
     }
 
     results["graph_size"] = {"nodes": node_count, "edges": sum(len(v) for v in adj.values()) // 2}
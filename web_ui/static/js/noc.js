@@ -1752,6 +1752,9 @@ async function searchConfigs() {
                     <div class="search-match-context">${escapeHtml(r.line)}</div>
                 </div>`
             ).join('');
+            if (data.total > data.results.length) {
+                body.innerHTML += `<div class="empty-state"><p>Showing ${data.results.length} of ${data.total} matches across ${data.routers.length} routers</p></div>`;
+            }
         } else {
             body.innerHTML = '<div class="empty-state"><p>No matches found</p></div>';
         }
@@ -2826,6 +2829,39 @@ async function executeMCPCommand(router, command) {
     } catch (e) { return { error: e.message }; }
 }
 
+async function executeMCPBatchStream(routers, command, onResult) {
+    // Streams each router's result as it finishes; resolves with the final batch output
+    try {
+        const resp = await fetch('/api/mcp/batch/stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ routers, command })
+        });
+        if (!resp.ok) return { error: `HTTP ${resp.status}` };
+        const reader = resp.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let final = { error: 'Stream ended without a result' };
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            for (const line of lines) {
+                const trimmed = line.trim();
+                if (!trimmed.startsWith('data:')) continue;
+                try {
+                    const parsed = JSON.parse(trimmed.slice(5).trim());
+                    if (parsed.router_result) { if (onResult) onResult(parsed.router_result, parsed.progress, parsed.total); }
+                    else if (parsed.done || parsed.error) final = parsed;
+                } catch (_) {}
+            }
+        }
+        return final;
+    } catch (e) { return { error: e.message }; }
+}
+
 async function fetchLiveConfig(router) {
     try {
         const data = await api(`mcp/live-config/${router}`);
@@ -3164,6 +3200,15 @@ async function runValidation() {
     } catch (e) { if (body) body.innerHTML = `<p style="color:var(--hpe-rose)">${e.message}</p>`; }
 }
 
+function validationPassed(output, pattern, matchType) {
+    // Mirrors the server-side match rules of /api/validate
+    if (matchType === 'regex') {
+        try { return new RegExp(pattern, 'im').test(output); } catch (_) { return false; }
+    }
+    if (matchType === 'not_contains') return !output.toLowerCase().includes(pattern.toLowerCase());
+    return output.toLowerCase().includes(pattern.toLowerCase());
+}
+
 async function runBatchValidation() {
     const command = document.getElementById('valCommand')?.value.trim();
     const pattern = document.getElementById('valPattern')?.value.trim();
@@ -3174,22 +3219,31 @@ async function runBatchValidation() {
     const el = document.getElementById('validationResults');
     const body = document.getElementById('validationResultsBody');
     if (el) el.style.display = '';
-    if (body) body.innerHTML = '<div class="loading" style="height:120px"></div>';
-    try {
-        const data = await apiPost('validate/batch', { routers, command, pattern, match_type: matchType });
-        if (body) body.innerHTML = `
-            <div style="margin-bottom:12px">
-                <span class="badge badge-yes">${data.passed || 0} passed</span>
-                <span class="badge badge-no">${data.failed || 0} failed</span>
-                <span style="font-size:0.85rem;color:var(--text-secondary);margin-left:8px">out of ${data.total || 0}</span>
-            </div>
-            <table class="data-table"><thead><tr><th>Router</th><th>Status</th><th>Output</th></tr></thead>
-            <tbody>${(data.results || []).map(r => `<tr>
-                <td><strong>${escapeHtml(r.router)}</strong></td>
-                <td><span class="badge ${r.passed ? 'badge-yes' : 'badge-no'}">${r.passed ? 'PASS' : 'FAIL'}</span></td>
-                <td style="font-size:0.75rem;font-family:var(--font-mono)">${escapeHtml((r.output || r.error || '').substring(0, 200))}</td>
-            </tr>`).join('')}</tbody></table>`;
-    } catch (e) { if (body) body.innerHTML = `<p style="color:var(--hpe-rose)">${e.message}</p>`; }
+    if (!body) return;
+    body.innerHTML = `
+        <div style="margin-bottom:12px">
+            <span class="badge badge-yes" id="valBatchPassed">0 passed</span>
+            <span class="badge badge-no" id="valBatchFailed">0 failed</span>
+            <span style="font-size:0.85rem;color:var(--text-secondary);margin-left:8px" id="valBatchProgress">0 of ${routers.length}</span>
+        </div>
+        <table class="data-table"><thead><tr><th>Router</th><th>Status</th><th>Output</th></tr></thead>
+        <tbody id="valBatchRows"></tbody></table>`;
+    let passed = 0, failed = 0;
+    // Rows are appended as each router finishes instead of after the slowest one
+    const data = await executeMCPBatchStream(routers, command, (r, progress, total) => {
+        const output = r.output || '';
+        const ok = r.status === 'success' && validationPassed(output, pattern, matchType);
+        if (ok) passed++; else failed++;
+        document.getElementById('valBatchPassed').textContent = `${passed} passed`;
+        document.getElementById('valBatchFailed').textContent = `${failed} failed`;
+        document.getElementById('valBatchProgress').textContent = `${progress || passed + failed} of ${total || routers.length}`;
+        document.getElementById('valBatchRows').insertAdjacentHTML('beforeend', `<tr>
+            <td><strong>${escapeHtml(r.router_name || '')}</strong></td>
+            <td><span class="badge ${ok ? 'badge-yes' : 'badge-no'}">${ok ? 'PASS' : 'FAIL'}</span></td>
+            <td style="font-size:0.75rem;font-family:var(--font-mono)">${escapeHtml(output.substring(0, 200))}</td>
+        </tr>`);
+    });
+    if (data.error) body.insertAdjacentHTML('beforeend', `<p style="color:var(--hpe-rose)">${escapeHtml(data.error)}</p>`);
 }
 
 async function runAICompliance() {
@@ -3994,6 +4048,12 @@ async function runMultiPath() {
     try {
         const data = await apiPost('path/multi-algorithm', { source: src, target: dst });
         let text = `Dijkstra Shortest Path:\n  Path: ${(data.algorithms?.dijkstra?.path || []).join(' -> ')}\n  Cost: ${data.algorithms?.dijkstra?.cost || 'N/A'}\n\n`;
+        const ecmp = data.algorithms?.ecmp?.paths || [];
+        if (ecmp.length > 1) {
+            text += `ECMP Paths (${ecmp.length}):\n`;
+            ecmp.forEach(p => { text += `  ${p.join(' -> ')}\n`; });
+            text += `\n`;
+        }
         text += `K-Shortest Paths:\n`;
         (data.algorithms?.k_shortest || []).forEach((p, i) => {
             text += `  [${i+1}] ${p.path.join(' -> ')}  (cost: ${p.cost})\n`;
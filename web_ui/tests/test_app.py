@@ -12,10 +12,13 @@ Usage:
 import os
 import sys
 import json
+import random
+import hashlib
 import time
 import asyncio
 import sqlite3
 import tempfile
+import importlib.util
 import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock, AsyncMock
@@ -27,12 +30,16 @@ import pytest
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Patch optional imports BEFORE importing app
+_MOCK_STATS = {
+    "total_nodes": 3, "pe_count": 1, "p_count": 2, "rr_count": 0,
+    "total_links": 2, "graph_diameter": 2, "redundancy_score": 75,
+    "single_points_of_failure": []
+}
 sys.modules.setdefault("quantum_engine", MagicMock(
-    calculate_network_stats_v2=MagicMock(return_value={
-        "total_nodes": 3, "pe_count": 1, "p_count": 2, "rr_count": 0,
-        "total_links": 2, "graph_diameter": 2, "redundancy_score": 75,
-        "single_points_of_failure": []
-    }),
+    calculate_network_stats_v2=MagicMock(return_value=_MOCK_STATS),
+    TopologyStats=MagicMock(return_value=MagicMock(
+        get=MagicMock(return_value=_MOCK_STATS), full=MagicMock(return_value=_MOCK_STATS))),
+    STATS_PARTS=("counts", "resilience", "diameter", "communities"),
     TarjanSPOF=MagicMock(), fast_diameter_approx=MagicMock(),
     QuantumAnnealingOptimizer=MagicMock(), QuantumWalkAnomalyDetector=MagicMock(),
     LouvainCommunityDetector=MagicMock(), get_clustered_topology=MagicMock(),
@@ -56,6 +63,16 @@ def client():
         yield c
 
 
+@pytest.fixture
+def real_quantum():
+    """The real quantum_engine module (the import above is mocked for app)."""
+    spec = importlib.util.spec_from_file_location(
+        "quantum_engine_real", Path(noc_app.__file__).with_name("quantum_engine.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
 @pytest.fixture
 def sample_topology():
     """Minimal topology fixture."""
@@ -134,9 +151,22 @@ class TestNoCacheHeaders:
         assert resp.headers.get("Cache-Control") == "no-store, no-cache, must-revalidate, max-age=0"
         assert resp.headers.get("Pragma") == "no-cache"
 
-    def test_topology_no_cache(self, client):
-        """UC: Topology must always reflect real-time state."""
-        resp = client.get("/api/topology")
+    def test_topology_from_golden_configs_revalidates(self, client, tmp_path):
+        """UC: Golden-config topology carries an ETag and must be revalidated."""
+        (tmp_path / "PE1.conf").write_text(
+            "set interfaces lo0 unit 0 family inet address 10.255.255.1/32\n")
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path):
+            resp = client.get("/api/topology")
+        assert resp.headers.get("ETag")
+        assert resp.headers.get("Cache-Control") == "no-cache, must-revalidate, max-age=0"
+
+    def test_topology_fallback_no_store(self, client, tmp_path):
+        """UC: Fallback topology (no golden configs) has no ETag and is never stored."""
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path), \
+             patch.object(noc_app, 'load_devices', return_value={"PE1": {"ip": "10.0.0.1"}}):
+            resp = client.get("/api/topology")
+        assert [n["id"] for n in resp.get_json()["nodes"]] == ["PE1"]
+        assert resp.headers.get("ETag") is None
         assert "no-store" in resp.headers.get("Cache-Control", "")
 
     def test_devices_no_cache(self, client):
@@ -184,8 +214,9 @@ class TestMCPSession:
 
     def test_get_session_returns_cached(self):
         """UC: Subsequent calls return cached session without re-init."""
-        noc_app._mcp_session_id = "existing-session"
         mock_client = AsyncMock()
+        noc_app._mcp_session_id = "existing-session"
+        noc_app._mcp_session_client = mock_client
         with patch.object(noc_app, 'mcp_initialize', new_callable=AsyncMock) as mock_init:
             loop = asyncio.new_event_loop()
             result = loop.run_until_complete(noc_app.mcp_get_session(mock_client))
@@ -193,8 +224,43 @@ class TestMCPSession:
         assert result == "existing-session"
         mock_init.assert_not_called()
 
+    def test_session_reinitialized_for_new_client(self):
+        """UC: A session cached on another client is not reused."""
+        noc_app._mcp_session_id = "old-client-session"
+        noc_app._mcp_session_client = AsyncMock()
+        with patch.object(noc_app, 'mcp_initialize', new_callable=AsyncMock, return_value="fresh-session"):
+            loop = asyncio.new_event_loop()
+            result = loop.run_until_complete(noc_app.mcp_get_session(AsyncMock()))
+            loop.close()
+        assert result == "fresh-session"
+
+    def test_pooled_client_shared_across_requests(self):
+        """UC: run_async calls share the background loop and its pooled clients."""
+        async def _clients():
+            return (asyncio.get_running_loop(), noc_app.http_clients.get("mcp"),
+                    noc_app.http_clients.get("ollama"))
+
+        loop_a, mcp_a, ollama = noc_app.run_async(_clients())
+        loop_b, mcp_b, _ = noc_app.run_async(_clients())
+        assert loop_a is loop_b
+        assert mcp_a is mcp_b
+        assert ollama is not mcp_a
+        assert not mcp_a.is_closed
+
+    def test_run_async_rejects_background_loop(self):
+        """UC: run_async from the background loop raises instead of deadlocking."""
+        async def _inner():
+            return 1
+
+        async def _outer():
+            return noc_app.run_async(_inner())
+
+        with pytest.raises(RuntimeError):
+            noc_app.run_async(_outer())
+
     def teardown_method(self):
         noc_app._mcp_session_id = None
+        noc_app._mcp_session_client = None
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -644,12 +710,144 @@ class TestTopology:
         assert isinstance(data["nodes"], list)
 
     def test_topology_not_cached_between_requests(self, client):
-        """UC: Topology is rebuilt on each request (no stale cache)."""
+        """UC: Repeated requests succeed and return the same graph."""
         resp1 = client.get("/api/topology")
         resp2 = client.get("/api/topology")
-        # Both should succeed (rebuilt each time from golden configs)
         assert resp1.status_code == 200
         assert resp2.status_code == 200
+        assert resp1.get_json() == resp2.get_json()
+
+    def test_topology_rebuilt_when_config_changes(self, tmp_path):
+        """UC: Editing a golden config invalidates the cached topology."""
+        conf = tmp_path / "PE1.conf"
+        conf.write_text('set interfaces ge-0/0/0 description "PE1->P11"\n')
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path):
+            first = noc_app.build_topology_from_golden_configs()
+            assert noc_app.build_topology_from_golden_configs() is first
+            conf.write_text('set interfaces ge-0/0/0 description "PE1->P11"\n'
+                            'set interfaces ge-0/0/1 description "PE1->P12"\n')
+            second = noc_app.build_topology_from_golden_configs()
+        assert len(first["links"]) == 1
+        assert len(second["links"]) == 2
+
+    def test_topology_etag_not_modified(self, client, tmp_path):
+        """UC: A matching If-None-Match is answered with 304."""
+        (tmp_path / "PE1.conf").write_text('set interfaces ge-0/0/0 description "PE1->P11"\n')
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path):
+            resp = client.get("/api/topology")
+            etag = resp.headers.get("ETag")
+            assert etag
+            cached = client.get("/api/topology", headers={"If-None-Match": etag})
+            stats = client.get("/api/topology/stats")
+            stats_cached = client.get("/api/topology/stats",
+                                      headers={"If-None-Match": stats.headers["ETag"]})
+        assert cached.status_code == 304
+        assert stats_cached.status_code == 304
+
+    def test_network_stats_computed_per_part_and_memoized(self, real_quantum, sample_topology):
+        """UC: Counts never run the heavy algorithms; stats are cached per topology content."""
+        noc_app._stats_cache.clear()
+        with patch.object(noc_app, "TopologyStats", real_quantum.TopologyStats), \
+             patch.object(noc_app, "get_compact_graph", real_quantum.CompactGraph.from_topology):
+            counts = noc_app.network_stats(sample_topology)
+            stats = noc_app.get_topology_stats(sample_topology)
+            assert stats.computed() == ["counts"]
+            assert counts["total_nodes"] == 3 and "communities" not in counts
+            resilience = noc_app.network_stats(dict(sample_topology), "resilience")
+            assert noc_app.get_topology_stats(dict(sample_topology)) is stats
+        assert resilience["single_points_of_failure"] == ["P11"]
+        assert stats.computed() == ["counts", "resilience"]
+
+    def test_network_stats_exact_diameter(self, real_quantum, sample_topology):
+        """UC: Diameter, radius and center come from exact eccentricities."""
+        stats = real_quantum.TopologyStats(sample_topology).part("diameter")
+        assert stats["graph_diameter"] == 2
+        assert stats["graph_radius"] == 1
+        assert stats["center_nodes"] == ["P11"]
+        assert stats["periphery_nodes"] == ["PE1", "P12"]
+
+
+class TestConfigIndex:
+    """Test the shared single-pass golden config index."""
+
+    CONFIG = (
+        '## generated\n'
+        'set interfaces ge-0/0/0 description "PE1->P11 core"\n'
+        'set interfaces ge-0/0/0 unit 0 family inet address 10.1.11.1/24\n'
+        'set interfaces lo0 unit 0 family inet address 10.255.255.1/32\n'
+        'set protocols isis interface ge-0/0/0.0 level 2 metric 20\n'
+        'set protocols ldp interface ge-0/0/0.0\n'
+        'set protocols bgp group IBGP neighbor 10.255.255.12\n'
+        'set protocols bgp group IBGP neighbor 10.255.255.12 description RR\n'
+        'set routing-instances CUST-A instance-type vrf\n'
+    )
+
+    def test_index_extracts_stanzas(self):
+        """UC: One pass yields interfaces, loopback, protocols and instances."""
+        from junos_config_index import index_config
+        idx = index_config(self.CONFIG)
+        assert idx["interfaces"]["ge-0/0/0"] == {"description": "PE1->P11 core",
+                                                 "addresses": ["10.1.11.1/24"]}
+        assert idx["loopback"] == "10.255.255.1"
+        assert idx["protocols"]["isis"] == {"interfaces": ["ge-0/0/0"], "metrics": {"ge-0/0/0": 20}}
+        assert idx["protocols"]["bgp"]["neighbors"] == ["10.255.255.12"]
+        assert idx["protocols"]["bgp"]["groups"] == {"IBGP": ["10.255.255.12"]}
+        assert idx["instances"] == [{"name": "CUST-A", "type": "vrf"}]
+
+    def test_topology_and_search_share_index(self, tmp_path):
+        """UC: Topology and config search read the same indexed configs."""
+        (tmp_path / "PE1.conf").write_text(self.CONFIG)
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path):
+            topo = noc_app.build_topology_from_golden_configs()
+            hits = noc_app.search_configs("neighbor 10.255.255.12")
+        assert topo["links"][0]["metric"] == 20
+        assert topo["nodes"][0]["ldp"] is True
+        assert topo["nodes"][0]["vpn"] == "CUST-A"
+        assert [h["line"] for h in hits] == [7, 8]
+
+
+class TestConfigSearch:
+    """Test /api/config-search over the trigram index."""
+
+    def _write(self, path):
+        (path / "PE1.conf").write_text(
+            "set system host-name PE1\n"
+            "set protocols bgp group IBGP neighbor 10.255.255.12\n"
+            "set protocols bgp group IBGP neighbor 10.255.255.22\n")
+        (path / "P11.conf").write_text(
+            "set system host-name P11\n"
+            "set protocols isis interface ge-0/0/0.0\n"
+            "set system syslog host 10.255.255.12 any any\n")
+
+    def test_substring_and_regex(self, tmp_path):
+        """UC: Substring and trigram-prefiltered regex find the same lines as a scan."""
+        self._write(tmp_path)
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path):
+            plain = noc_app.search_configs("10.255.255.12")
+            regex = noc_app.search_configs(r"NEIGHBOR 10\.255\.255\.(12|22)$", regex=True)
+            bad = noc_app.search_configs("[", regex=True)
+        assert [(r["router"], r["line"]) for r in plain] == [("P11", 3), ("PE1", 2)]
+        assert [r["line"] for r in regex] == [2, 3]
+        assert bad == []
+
+    def test_stanza_scope_and_pagination(self, client, tmp_path):
+        """UC: Stanza-scoped queries and offset/limit pagination."""
+        self._write(tmp_path)
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path):
+            scoped = client.get("/api/config-search?q=10.255.255.12&stanza=protocols%20bgp").get_json()
+            page = client.get("/api/config-search?q=host-name&limit=1&offset=1").get_json()
+        assert scoped["routers"] == ["PE1"]
+        assert page["total"] == 2
+        assert [r["router"] for r in page["results"]] == ["PE1"]
+
+    def test_index_follows_config_changes(self, tmp_path):
+        """UC: A rewritten config is re-indexed on the next search."""
+        self._write(tmp_path)
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path):
+            assert noc_app.search_configs("ge-0/0/7") == []
+            (tmp_path / "P11.conf").write_text("set protocols isis interface ge-0/0/7.0\n")
+            hits = noc_app.search_configs("ge-0/0/7")
+        assert [r["router"] for r in hits] == ["P11"]
 
 
 class TestNetworkStats:
@@ -1113,6 +1311,69 @@ class TestMCPExecute:
         # Response should be JSON, not HTML
         assert resp.content_type.startswith("application/json")
 
+    def test_batch_stream_missing_routers(self, client):
+        """Corner: Streaming batch without routers."""
+        resp = client.post("/api/mcp/batch/stream",
+            data=json.dumps({"command": "show version"}),
+            content_type="application/json")
+        assert resp.status_code == 400
+
+    def test_batch_stream_emits_router_results(self, client):
+        """UC: Each router's result is streamed before the final batch output."""
+        async def fake_batch(command, routers, on_result=None):
+            for i, r in enumerate(routers, start=1):
+                on_result({"router_name": r, "status": "success", "output": "ok"}, i, len(routers))
+            return '{"summary": {}, "results": []}'
+
+        with patch.object(noc_app, 'mcp_execute_batch', side_effect=fake_batch):
+            resp = client.post("/api/mcp/batch/stream",
+                data=json.dumps({"routers": ["PE1", "P11"], "command": "show version"}),
+                content_type="application/json")
+            events = [json.loads(line[6:]) for line in resp.get_data(as_text=True).splitlines()
+                      if line.startswith("data: ")]
+        assert "no-cache" in resp.headers.get("Cache-Control", "")
+        assert [e["router_result"]["router_name"] for e in events[:-1]] == ["PE1", "P11"]
+        assert events[1]["progress"] == 2 and events[1]["total"] == 2
+        assert events[-1]["done"] is True
+
+    def test_call_tool_stream_forwards_progress(self):
+        """UC: mcp_call_tool_stream passes matching progress notifications through."""
+        captured = {}
+
+        class FakeStreamResponse:
+            headers = {"content-type": "text/event-stream"}
+
+            async def aiter_lines(self):
+                token = captured["payload"]["params"]["_meta"]["progressToken"]
+                yield 'data: ' + json.dumps({"jsonrpc": "2.0", "method": "notifications/progress",
+                                             "params": {"progressToken": token, "progress": 1,
+                                                        "total": 1, "message": "{}"}})
+                yield 'data: ' + json.dumps({"jsonrpc": "2.0", "method": "notifications/progress",
+                                             "params": {"progressToken": "other", "progress": 1}})
+                yield 'data: ' + json.dumps({"jsonrpc": "2.0", "id": 3,
+                                             "result": {"content": [{"type": "text", "text": "final"}]}})
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        class FakeClient:
+            def stream(self, method, url, json=None, headers=None, timeout=None):
+                captured["payload"] = json
+                return FakeStreamResponse()
+
+        progress = []
+        loop = asyncio.new_event_loop()
+        try:
+            text = loop.run_until_complete(noc_app.mcp_call_tool_stream(
+                FakeClient(), "sid", "execute_junos_command_batch", {}, progress.append))
+        finally:
+            loop.close()
+        assert text == "final"
+        assert len(progress) == 1 and progress[0]["progress"] == 1
+
 
 # ═══════════════════════════════════════════════════════════════
 #  22. STREAMING — No data caching
@@ -1420,7 +1681,7 @@ class TestPredictiveAnalysis:
         with patch.object(noc_app, 'build_topology_from_golden_configs', return_value={
             "nodes": [{"id": "PE1", "role": "PE", "bgp_neighbors": [], "isis_interfaces": [],
                         "ldp": True, "mpls": True}], "links": []}):
-            with patch.object(noc_app, 'calculate_network_stats_v2', return_value={
+            with patch.object(noc_app, 'network_stats', return_value={
                 "total_nodes": 1, "single_points_of_failure": [], "redundancy_score": 80}):
                 with patch.object(noc_app, 'run_async', return_value="Risk: P11 SPOF"):
                     resp = client.post("/api/brain/predict",
@@ -1434,7 +1695,7 @@ class TestPredictiveAnalysis:
         """Corner: Ollama down → 503."""
         with patch.object(noc_app, 'build_topology_from_golden_configs', return_value={
             "nodes": [], "links": []}):
-            with patch.object(noc_app, 'calculate_network_stats_v2', return_value={
+            with patch.object(noc_app, 'network_stats', return_value={
                 "total_nodes": 0, "single_points_of_failure": [], "redundancy_score": 0}):
                 with patch.object(noc_app, 'run_async', side_effect=Exception("timeout")):
                     resp = client.post("/api/brain/predict",
@@ -1696,6 +1957,28 @@ class TestPathAnalysis:
                 content_type="application/json")
         assert resp.status_code == 200
 
+    def test_multi_algorithm_ecmp_and_yen(self, client):
+        """UC: ECMP set and Yen k-shortest paths come from the path engine."""
+        with patch.object(noc_app, 'build_topology_from_golden_configs', return_value={
+            "nodes": [{"id": n} for n in ("PE1", "P11", "P12", "PE2")],
+            "links": [{"source": "PE1", "target": "P11", "metric": 10},
+                      {"source": "P11", "target": "PE2", "metric": 10},
+                      {"source": "PE1", "target": "P12", "metric": 10},
+                      {"source": "P12", "target": "PE2", "metric": 10},
+                      {"source": "PE1", "target": "PE2", "metric": 30}]}):
+            resp = client.post("/api/path/multi-algorithm",
+                data=json.dumps({"source": "PE1", "target": "PE2"}),
+                content_type="application/json")
+        algos = resp.get_json()["algorithms"]
+        assert algos["ecmp"]["paths"] == [["PE1", "P11", "PE2"], ["PE1", "P12", "PE2"]]
+        assert [p["cost"] for p in algos["k_shortest"]] == [20, 20, 30]
+        assert algos["k_shortest"][2]["path"] == ["PE1", "PE2"]
+
+    def test_path_engine_reused_per_topology_version(self):
+        """UC: The path engine is rebuilt only when the topology changes."""
+        topo = noc_app.build_topology_from_golden_configs()
+        assert noc_app.get_path_engine(topo) is noc_app.get_path_engine()
+
     def test_what_if_analysis(self, client):
         """UC: What-if failure simulation."""
         with patch.object(noc_app, 'build_topology_from_golden_configs', return_value={
@@ -1706,6 +1989,143 @@ class TestPathAnalysis:
                 content_type="application/json")
         assert resp.status_code == 200
 
+    def test_what_if_srlg_strands_pe(self, client):
+        """UC: An SRLG failure reports stranded PEs and rerouted paths."""
+        with patch.object(noc_app, 'build_topology_from_golden_configs', return_value={
+            "nodes": [{"id": "PE1", "role": "PE"}, {"id": "P11", "role": "P"},
+                      {"id": "P12", "role": "P"}, {"id": "PE2", "role": "PE"},
+                      {"id": "PE3", "role": "PE"}],
+            "links": [{"source": "PE1", "target": "P11"}, {"source": "PE1", "target": "P12"},
+                      {"source": "P11", "target": "PE2"}, {"source": "P12", "target": "PE2"},
+                      {"source": "P11", "target": "PE3"}]}):
+            with patch.object(noc_app, 'run_async', return_value="ok"):
+                resp = client.post("/api/path/what-if",
+                    data=json.dumps({"failed_links": [["P11", "PE3"], ["PE1", "P11"]]}),
+                    content_type="application/json")
+        impact = resp.get_json()["impact"]
+        assert impact["stranded_pes"] == ["PE3"]
+        assert impact["network_connected"] is False
+        assert impact["affected_pairs"] > 0
+
+    def test_n_minus_1_ranks_worst_failures(self, client, real_quantum):
+        """UC: N-1 sweep ranks the single failures that strand the most PEs."""
+        with patch("path_engine.TarjanSPOF", real_quantum.TarjanSPOF), \
+             patch.object(noc_app, 'build_topology_from_golden_configs', return_value={
+            "nodes": [{"id": "PE1", "role": "PE"}, {"id": "P11", "role": "P"},
+                      {"id": "P12", "role": "P"}, {"id": "PE2", "role": "PE"}],
+            "links": [{"source": "PE1", "target": "P11"}, {"source": "P11", "target": "P12"},
+                      {"source": "P12", "target": "PE2"}]}):
+            resp = client.post("/api/path/n-minus-1",
+                data=json.dumps({"double_failures": [{"nodes": ["P11", "P12"]}]}),
+                content_type="application/json")
+        result = resp.get_json()
+        assert result["scenarios_evaluated"] == 7
+        assert set(result["cut_nodes"]) == {"P11", "P12"}
+        assert result["worst"][0]["stranded_pes"]
+        assert result["double_failures"][0]["connected"] is False
+
+    def test_n_minus_1_ignores_client_workers(self, client):
+        """Corner: Worker count is not taken from the request."""
+        simulator = MagicMock()
+        simulator.n_minus_1.return_value = {"worst": []}
+        with patch.object(noc_app, '_failure_simulator', return_value=simulator):
+            resp = client.post("/api/path/n-minus-1",
+                data=json.dumps({"workers": 4096, "top": 5}),
+                content_type="application/json")
+        assert resp.status_code == 200
+        simulator.n_minus_1.assert_called_once_with(top=5)
+
+    @staticmethod
+    def _n1_ring(real_quantum):
+        import path_engine
+        links = [{"source": f"R{i}", "target": f"R{(i + 1) % 240}", "metric": 10 + i % 7} for i in range(240)]
+        links += [{"source": f"R{i}", "target": f"R{i + 120}"} for i in range(0, 120, 15)]
+        links.append({"source": "R0", "target": "PE-STUB"})
+        with patch("path_engine.TarjanSPOF", real_quantum.TarjanSPOF):
+            return path_engine.FailureSimulator(path_engine.PathEngine(links), pe_nodes=["PE-STUB", "R100"])
+
+    def test_n_minus_1_shared_pool_matches_inline(self, real_quantum):
+        """UC: The startup pool is reused, capped at N1_MAX_WORKERS and matches an in-process sweep."""
+        import path_engine
+        simulator = self._n1_ring(real_quantum)
+        with patch("path_engine.TarjanSPOF", real_quantum.TarjanSPOF), \
+             patch.object(path_engine, "N1_MAX_WORKERS", 2), \
+             patch.object(path_engine, "_n1_pool", None):
+            inline = simulator.n_minus_1(workers=1)
+            pool = path_engine.start_n1_pool()
+            try:
+                assert pool is not None and pool is path_engine.start_n1_pool() is path_engine._n1_executor()
+                assert pool._max_workers == 2 and len(pool._processes) == 2
+                with patch.object(pool, "map", wraps=pool.map) as pool_map:
+                    pooled = simulator.n_minus_1(workers=4096)
+                assert len(pool_map.call_args[0][2]) == 2
+            finally:
+                path_engine._discard_n1_executor(pool)
+        assert pooled == inline
+        assert inline["worst"][0]["stranded_pes"] == ["PE-STUB"]
+
+    def test_n_minus_1_without_pool_runs_inline(self, real_quantum):
+        """Corner: With no startup pool a sweep never forks on demand."""
+        import path_engine
+        simulator = self._n1_ring(real_quantum)
+        with patch("path_engine.TarjanSPOF", real_quantum.TarjanSPOF), \
+             patch.object(path_engine, "_n1_pool", None), \
+             patch.object(path_engine, "ProcessPoolExecutor") as executor:
+            result = simulator.n_minus_1(workers=4)
+        executor.assert_not_called()
+        assert result["worst"][0]["stranded_pes"] == ["PE-STUB"]
+
+    @pytest.mark.parametrize("error", ["timeout", "broken"])
+    def test_n_minus_1_pool_failure_falls_back(self, real_quantum, error):
+        """Corner: A hung or broken pool is discarded and the sweep reruns in-process."""
+        import concurrent.futures
+        import path_engine
+        simulator = self._n1_ring(real_quantum)
+        pool = MagicMock(_processes={1: MagicMock()})
+        pool.map.side_effect = (concurrent.futures.TimeoutError() if error == "timeout"
+                                else path_engine.BrokenProcessPool())
+        with patch("path_engine.TarjanSPOF", real_quantum.TarjanSPOF), \
+             patch.object(path_engine, "N1_MAX_WORKERS", 2), \
+             patch.object(path_engine, "_n1_pool", pool):
+            result = simulator.n_minus_1(workers=2)
+            assert path_engine._n1_executor() is None
+            assert simulator.n_minus_1(workers=1) == result
+        assert pool.map.call_args.kwargs["timeout"] == path_engine.N1_TIMEOUT
+        pool._processes[1].terminate.assert_called_once()
+        pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+    def test_what_if_accepts_link_dicts(self, client):
+        """UC: failed_links may mix [source, target] lists and {source, target} dicts."""
+        topo = {"nodes": [{"id": n, "role": "PE" if n.startswith("PE") else "P"} for n in ("PE1", "P11", "PE2")],
+                "links": [{"source": "PE1", "target": "P11"}, {"source": "P11", "target": "PE2"}]}
+        with patch.object(noc_app, 'build_topology_from_golden_configs', return_value=topo), \
+             patch.object(noc_app, 'run_async', return_value="ok"):
+            resp = client.post("/api/path/what-if",
+                data=json.dumps({"failed_links": [{"source": "PE1", "target": "P11"}, ["P11", "PE2"]]}),
+                content_type="application/json")
+        assert resp.status_code == 200
+        assert sorted(map(sorted, resp.get_json()["failure"]["links"])) == [["P11", "PE1"], ["P11", "PE2"]]
+
+    @pytest.mark.parametrize("bad", [{"failed_links": [["PE1"]]}, {"failed_links": [["PE1", "P11", "PE2"]]},
+                                     {"failed_links": ["PE1P11"]}, {"failed_links": {"source": "PE1"}},
+                                     {"failed_links": [{"source": "PE1"}]}, {"failed_link": {"source": "PE1"}}])
+    def test_what_if_rejects_malformed_links(self, client, bad):
+        """Corner: Anything other than a 2-element link is a 400."""
+        with patch.object(noc_app, 'build_topology_from_golden_configs') as build:
+            resp = client.post("/api/path/what-if", data=json.dumps(bad), content_type="application/json")
+        assert resp.status_code == 400
+        build.assert_not_called()
+
+    @pytest.mark.parametrize("bad", [{"failed_nodes": "R1"}, {"failed_nodes": 5}, {"failed_nodes": {"R1": 1}},
+                                     {"failed_nodes": ["R1", 5]}, {"failed_nodes": [""]},
+                                     {"failed_nodes": [["R1"]]}, {"failed_node": 5}])
+    def test_what_if_rejects_malformed_nodes(self, client, bad):
+        """Corner: failed_nodes must be a list of non-empty node names, else 400."""
+        with patch.object(noc_app, 'build_topology_from_golden_configs') as build:
+            resp = client.post("/api/path/what-if", data=json.dumps(bad), content_type="application/json")
+        assert resp.status_code == 400
+        build.assert_not_called()
+
     def test_capacity_plan(self, client):
         """UC: AI capacity planning."""
         with patch.object(noc_app, 'build_topology_from_golden_configs', return_value={
@@ -1715,6 +2135,18 @@ class TestPathAnalysis:
                     data=json.dumps({}), content_type="application/json")
         assert resp.status_code == 200
 
+    def test_capacity_plan_returns_full_stats(self, client, sample_topology):
+        """Corner: stats keeps the full network-stats shape (counts and communities too)."""
+        full = {"total_nodes": 3, "single_points_of_failure": ["P1"], "redundancy_score": 66.7,
+                "graph_diameter": 2, "modularity": 0.1, "communities": {}}
+        with patch.object(noc_app, 'build_topology_from_golden_configs', return_value=sample_topology), \
+             patch.object(noc_app, 'network_stats', return_value=full) as network_stats, \
+             patch.object(noc_app, 'run_async', return_value="plan"):
+            resp = client.post("/api/path/capacity-plan", data=json.dumps({}), content_type="application/json")
+        assert resp.status_code == 200
+        network_stats.assert_called_once_with(sample_topology, "all")
+        assert resp.get_json()["stats"] == full
+
 
 # ═══════════════════════════════════════════════════════════════
 #  38. QUANTUM-INSPIRED ENDPOINTS
@@ -1750,6 +2182,134 @@ class TestQuantumEndpoints:
         resp = client.get("/api/quantum/benchmark")
         assert resp.status_code in (200, 500)
 
+    def test_compact_graph_built_once_per_topology(self, client):
+        """UC: Quantum endpoints share one compact graph per topology version."""
+        noc_app._compact_graph_cache.update(etag=None, graph=None)
+        with patch.object(noc_app, "CompactGraph") as compact:
+            client.get("/api/quantum/spof")
+            client.get("/api/quantum/communities")
+        assert compact.from_topology.call_count == 1
+
+
+class TestQuantumWalkBackends:
+    """QuantumWalkAnomalyDetector gives the same answer on every installed backend."""
+
+    GRAPHS = {
+        "ring_with_spur": {**{f"R{i}": {f"R{(i - 1) % 12}", f"R{(i + 1) % 12}"} for i in range(12)},
+                           "R0": {"R11", "R1", "STUB"}, "STUB": {"R0"}},
+        "star": {"HUB": {f"L{i}" for i in range(8)}, **{f"L{i}": {"HUB"} for i in range(8)}},
+        "chain": {f"N{i}": {f"N{j}" for j in (i - 1, i + 1) if 0 <= j < 6} for i in range(6)},
+    }
+
+    @staticmethod
+    def _backends(qe):
+        installed = ["python"]
+        if qe.np is not None:
+            installed.append("numpy")
+        if qe.np is not None and qe.csr_matrix is not None:
+            installed.append("scipy")
+        return installed
+
+    @pytest.mark.parametrize("graph", sorted(GRAPHS))
+    def test_backends_agree(self, real_quantum, graph):
+        """UC: Anomalies and scores are identical across python/numpy/scipy."""
+        adj = self.GRAPHS[graph]
+        results = {}
+        for backend in self._backends(real_quantum):
+            result = real_quantum.QuantumWalkAnomalyDetector(adj, backend=backend).detect_anomalies()
+            assert result["backend"] == backend
+            results[backend] = (result["anomalies"], result["scores"])
+        reference = results.pop("python")
+        for backend, found in results.items():
+            assert found == reference, backend
+        assert reference[1]
+
+    def test_missing_backend_rejected(self, real_quantum):
+        """Corner: Asking for an uninstalled backend fails loudly."""
+        with patch.object(real_quantum, "csr_matrix", None):
+            with pytest.raises(ValueError):
+                real_quantum.QuantumWalkAnomalyDetector(self.GRAPHS["star"], backend="scipy")
+
+    def test_round_off_spread_has_no_z_score(self, real_quantum):
+        """Corner: A spread below 1e-9 of the mean is treated as none (z-score 0)."""
+        adj = self.GRAPHS["chain"]
+        detector = real_quantum.QuantumWalkAnomalyDetector(adj, backend="python")
+        n = len(adj)
+        noisy = [1.0 / n + (1e-17 if k % 2 else -1e-17) for k in range(n)]
+        degrees = [len(adj[node]) for node in detector.nodes]
+        with patch.object(detector, "_evolve_python", return_value=noisy):
+            scores = detector.detect_anomalies()["scores"]
+        for node, degree in zip(detector.nodes, degrees):
+            classical = degree / sum(degrees)
+            assert scores[node] == round((abs(noisy[0] - classical) / (classical + 1e-10)) / 2, 3)
+
+    def test_real_spread_scores_z(self, real_quantum):
+        """UC: A genuine spread still contributes its z-score."""
+        adj = self.GRAPHS["chain"]
+        detector = real_quantum.QuantumWalkAnomalyDetector(adj, backend="python")
+        skewed = [0.5] + [0.1] * (len(adj) - 1)
+        with patch.object(detector, "_evolve_python", return_value=skewed):
+            with_z = detector.detect_anomalies(threshold=100)["scores"]
+        with patch.object(detector, "_evolve_python", return_value=[0.5] + [0.5 + 1e-12] * (len(adj) - 1)):
+            without_z = detector.detect_anomalies(threshold=100)["scores"]
+        assert with_z["N0"] > without_z["N0"] + 0.5
+
+
+class TestAnnealingCutCounts:
+    """Incremental SPOF/bridge counting in QuantumAnnealingOptimizer vs a full Tarjan pass."""
+
+    @staticmethod
+    def _random_graph(rng, n):
+        """Random forest with a few extra edges — plenty of cut vertices and bridges."""
+        adj = {f"N{i}": set() for i in range(n)}
+        for i in range(1, n):
+            if rng.random() < 0.9:  # occasionally start a new component
+                j = rng.randrange(i)
+                adj[f"N{i}"].add(f"N{j}")
+                adj[f"N{j}"].add(f"N{i}")
+        for _ in range(rng.randrange(n // 4 + 1)):
+            u, v = rng.sample(sorted(adj), 2)
+            adj[u].add(v)
+            adj[v].add(u)
+        return adj
+
+    def test_count_cuts_matches_tarjan(self, real_quantum):
+        """UC: _count_cuts(solution) equals TarjanSPOF on the augmented graph (seeded, randomized)."""
+        rng = random.Random(20261016)
+        random.seed(20261016)
+        checked = 0
+        for _ in range(60):
+            adj = self._random_graph(rng, rng.randrange(4, 40))
+            opt = real_quantum.QuantumAnnealingOptimizer(
+                adj, [{"id": node} for node in sorted(adj)], max_new_links=5)
+            if not opt.candidates:
+                continue
+            for _ in range(10):
+                solution = sorted(rng.sample(range(len(opt.candidates)),
+                                             rng.randrange(0, min(6, len(opt.candidates)) + 1)))
+                augmented = {u: set(vs) for u, vs in adj.items()}
+                for idx in solution:
+                    u, v = opt.candidates[idx]
+                    augmented[u].add(v)
+                    augmented[v].add(u)
+                aps, bridges = real_quantum.TarjanSPOF(augmented).find_all()
+                assert opt._count_cuts(solution) == (len(aps), len(bridges)), (adj, solution)
+                checked += 1
+        assert checked > 400
+
+    def test_candidate_sampling_terminates_on_dense_mesh(self, real_quantum):
+        """Corner: Fewer free pairs than `sample` returns what exists instead of looping forever."""
+        ids = [f"N{i:02d}" for i in range(40)]
+        adj = {u: {v for v in ids if v != u} for u in ids}
+        missing = [("N00", "N01"), ("N05", "N17"), ("N20", "N39")]
+        for u, v in missing:
+            adj[u].discard(v)
+            adj[v].discard(u)
+        opt = real_quantum.QuantumAnnealingOptimizer(adj, [{"id": n} for n in ids])
+        random.seed(7)
+        # 780 pairs > 4 × sample skips the enumeration shortcut
+        assert sorted(opt._candidate_links(limit=1, sample=100)) == missing
+
 
 # ═══════════════════════════════════════════════════════════════
 #  39. CONFIDENCE SCORING — AI Response Quality
@@ -1825,6 +2385,34 @@ class TestBootstrap:
         # 200 on success, 500 if MCP not available
         assert resp.status_code in (200, 500)
 
+    def test_bootstrap_sync_skips_unchanged(self, client, tmp_path):
+        """UC: Routers whose config checksum matches the saved .meta are not re-fetched."""
+        config = "set system host-name PE1\nset interfaces lo0 unit 0 family inet address 10.0.0.1/32"
+        sha = hashlib.sha256(config.encode()).hexdigest()
+        (tmp_path / "PE1.conf").write_text(config)
+        (tmp_path / "PE1.meta").write_text(json.dumps({"sha256": sha, "lines": 2}))
+        fetched = []
+
+        async def fake_checksums(routers):
+            return {"PE1": sha, "P11": "0" * 64}
+
+        async def fake_config(router):
+            fetched.append(router)
+            return config.replace("PE1", router) + "\n"
+
+        with patch.object(noc_app, 'GOLDEN_CONFIG_DIR', tmp_path), \
+             patch.object(noc_app, 'mcp_get_config_checksums', fake_checksums), \
+             patch.object(noc_app, 'mcp_get_config', fake_config):
+            resp = client.post("/api/bootstrap/sync",
+                data=json.dumps({"routers": ["PE1", "P11"]}),
+                content_type="application/json")
+        data = resp.get_json()
+        assert fetched == ["P11"]
+        assert data["results"]["PE1"]["status"] == "unchanged"
+        assert data["synced"] == 2 and data["unchanged"] == 1
+        meta = json.loads((tmp_path / "P11.meta").read_text())
+        assert meta["sha256"] == hashlib.sha256((tmp_path / "P11.conf").read_text().encode()).hexdigest()
+
 
 # ═══════════════════════════════════════════════════════════════
 #  42. NOTIFICATION CHANNELS — CRUD + Send + History
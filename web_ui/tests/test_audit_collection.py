@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Tests for audit collection — ollama_mcp_client.py
+=================================================
+Streamed per-router parsing during run_batch/run_matrix, and the incremental
+audit cache (change signatures, refresh plans, cached outputs and configs).
+The MCP server is replaced by fake clients, so no router is contacted.
+
+Usage:
+    cd web_ui && python -m pytest tests/test_audit_collection.py -v --tb=short
+"""
+
+import sys
+import json
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch, AsyncMock
+
+import pytest
+
+# ── Setup path so the repo-root modules import ──
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import ollama_mcp_client as omc
+
+
+# ═══════════════════════════════════════════════════════════════
+#  STREAMED PER-ROUTER PARSING
+# ═══════════════════════════════════════════════════════════════
+
+class TestAuditStreaming:
+    """ollama_mcp_client parses router results while a batch is still running."""
+
+    TERSE = {
+        "PE1": "ge-0/0/0 up up\nge-0/0/1 up down\n",
+        "P11": "ge-0/0/2 up down\nlo0 up up\n",
+        "P12": "ge-0/0/3 down down\n",
+    }
+
+    def _batch_json(self, outputs):
+        return json.dumps({"results": [{"router_name": r, "status": "success", "output": o}
+                                       for r, o in outputs.items()]})
+
+    def _stream_client(self, outputs, seen_before_final):
+        """Fake httpx client that streams one progress notification per router."""
+        batch_json = self._batch_json(outputs)
+
+        class FakeStreamResponse:
+            headers = {"content-type": "text/event-stream"}
+
+            def __init__(self, payload):
+                self.token = payload["params"]["_meta"]["progressToken"]
+
+            async def aiter_lines(self):
+                for i, (router, output) in enumerate(outputs.items(), start=1):
+                    message = json.dumps({"router_name": router, "status": "success", "output": output})
+                    yield "data: " + json.dumps({"jsonrpc": "2.0", "method": "notifications/progress",
+                                                 "params": {"progressToken": self.token, "progress": i,
+                                                            "total": len(outputs), "message": message}})
+                seen_before_final.append(True)
+                yield "data: " + json.dumps({"jsonrpc": "2.0", "id": 3,
+                                             "result": {"content": [{"type": "text", "text": batch_json}]}})
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        class FakeClient:
+            def stream(self, method, url, json=None, headers=None, timeout=None):
+                return FakeStreamResponse(json)
+
+        return FakeClient()
+
+    def test_run_batch_streams_into_analysis(self):
+        """UC: Streamed results are parsed before the batch returns and match a batch parse."""
+        final_sent = []
+        parsed_early = []
+        streamed = omc.StreamedRouterAnalysis({
+            "Interfaces": lambda router, out: parsed_early.append(not final_sent)
+                          or omc.find_down_interfaces({router: out}),
+        })
+        loop = asyncio.new_event_loop()
+        try:
+            raw = loop.run_until_complete(omc.run_batch(
+                self._stream_client(self.TERSE, final_sent), "sid", "show interfaces terse",
+                list(self.TERSE), "Interfaces",
+                on_result=lambda router_result: streamed.on_result("Interfaces", router_result)))
+        finally:
+            loop.close()
+        outputs = omc.parse_batch_json(raw)
+        merged = [i for found in streamed.results("Interfaces", outputs) for i in found]
+        assert parsed_early == [True, True, True]
+        assert streamed.streamed == 3
+        assert merged == omc.find_down_interfaces(outputs)
+        assert [i["router"] for i in merged] == ["PE1", "P11"]
+
+    def test_results_recompute_when_not_streamed(self):
+        """Corner: Routers that never streamed, or whose output changed, are parsed at merge time."""
+        calls = []
+
+        def analyze(router, out):
+            calls.append(router)
+            return omc.find_down_interfaces({router: out})
+
+        streamed = omc.StreamedRouterAnalysis({"Interfaces": analyze})
+        streamed.on_result("Interfaces", {"router_name": "PE1", "output": self.TERSE["PE1"]})
+        streamed.on_result("Interfaces", {"router_name": "P11", "output": "stale"})
+        streamed.on_result("Alarms", {"router_name": "PE1", "output": "ignored"})
+        merged = [i for found in streamed.results("Interfaces", self.TERSE) for i in found]
+        assert merged == omc.find_down_interfaces(self.TERSE)
+        assert calls == ["PE1", "P11", "P11", "P12"]
+
+    def test_matrix_streams_per_command(self):
+        """UC: run_matrix splits each router's streamed result into per-command callbacks."""
+        commands = [("Interfaces", "show interfaces terse"), ("Alarms", "show chassis alarms")]
+        per_router = {r: {"results": {"show interfaces terse": {"status": "success", "output": o},
+                                      "show chassis alarms": {"status": "success", "output": "No alarms"}}}
+                      for r, o in self.TERSE.items()}
+        matrix = {"results": {r: v["results"] for r, v in per_router.items()}}
+        seen = []
+
+        async def fake_stream(client, sid, tool_name, arguments, on_progress, timeout=None):
+            for router, value in per_router.items():
+                on_progress({"message": json.dumps({"router_name": router, **value})})
+            return json.dumps(matrix)
+
+        loop = asyncio.new_event_loop()
+        try:
+            with patch.object(omc, "mcp_call_tool_stream", side_effect=fake_stream):
+                results = loop.run_until_complete(omc.run_matrix(
+                    None, "sid", commands, list(self.TERSE), "Audit Collection",
+                    on_result=lambda label, rr: seen.append((label, rr["router_name"], rr["output"]))))
+        finally:
+            loop.close()
+        assert seen[:2] == [("Interfaces", "PE1", self.TERSE["PE1"]), ("Alarms", "PE1", "No alarms")]
+        assert len(seen) == 6
+        assert set(results) == {"Interfaces", "Alarms"}
+
+
+# ═══════════════════════════════════════════════════════════════
+#  INCREMENTAL AUDIT CACHE — change signals decide what is re-collected
+# ═══════════════════════════════════════════════════════════════
+
+COMMITS = ("0   2026-10-01 10:00:00 UTC by admin via cli\n"
+           "1   2026-09-30 09:00:00 UTC by admin via netconf\n")
+UPTIME = "Current time: 2026-10-16 12:00:00 UTC\nSystem booted: 2026-09-01 08:00:00 UTC (6w3d 04:00 ago)\n"
+SIGNAL = ("Physical interface: ge-0/0/0, Enabled, Physical link is Up\n"
+          "  Last flapped   : 2026-10-01 10:00:00 UTC (2w0d 02:00 ago)\n"
+          "    Input errors: 0, Output errors: 0\n")
+
+AUDIT_COMMANDS = [
+    ("Alarms", "show chassis alarms"),
+    ("Uptime", "show system uptime"),
+    ("Commits", "show system commit"),
+    ("Interfaces", "show interfaces terse"),
+    ("Interface Detail", "show interfaces detail | no-more"),
+    ("BGP Summary", "show bgp summary"),
+    ("Route Instances", "show route instance summary"),
+    ("FW Config", "show configuration firewall"),
+]
+CACHEABLE = [(lbl, cmd) for lbl, cmd in AUDIT_COMMANDS if lbl not in omc.AUDIT_ALWAYS_LABELS]
+
+
+class FakeDevices:
+    """Stands in for run_matrix: answers from per-router probe outputs, records each call."""
+
+    def __init__(self, routers, commits=COMMITS, uptime=UPTIME, signal=SIGNAL, fail=()):
+        self.probe = {r: {"Commits": commits, "Uptime": uptime, omc.AUDIT_SIGNAL_LABEL: signal} for r in routers}
+        self.generation = 1
+        self.fail = set(fail)  # (router, label) pairs whose collection fails
+        self.calls = []        # (title, labels, routers)
+
+    def output(self, router, label):
+        return self.probe[router].get(label, f"{label} on {router} #{self.generation}")
+
+    async def run_matrix(self, client, sid, commands, routers, title, on_result=None):
+        self.calls.append((title, [lbl for lbl, _ in commands], list(routers)))
+        return {lbl: json.dumps({"results": [
+            {"router_name": r, "status": "failed" if (r, lbl) in self.fail else "success",
+             "output": "" if (r, lbl) in self.fail else self.output(r, lbl)} for r in routers]})
+            for lbl, _ in commands}
+
+    def collect(self, cache, routers=None, commands=AUDIT_COMMANDS):
+        routers = routers or list(self.probe)
+        with patch.object(omc, "run_matrix", side_effect=self.run_matrix), \
+             patch.dict(omc.collection_status, clear=True), \
+             patch.object(omc, "console"):
+            batches, entries, config_changed = asyncio.run(
+                omc.collect_audit_incremental(None, "sid", commands, routers, cache))
+            status = dict(omc.collection_status)
+        outputs = {lbl: {r["router_name"]: (r["status"], r["output"]) for r in json.loads(b)["results"]}
+                   for (lbl, _), b in zip(commands, batches)}
+        return outputs, entries, config_changed, status
+
+    def refreshed(self):
+        """Labels collected by the calls after the change probe, per router."""
+        got = {}
+        for title, labels, routers in self.calls[1:]:
+            for r in routers:
+                got.setdefault(r, set()).update(labels)
+        return got
+
+
+def _signature(commits=COMMITS, uptime=UPTIME, signal=SIGNAL):
+    return omc.audit_change_signature(commits, uptime, signal)
+
+
+def _cached(signature=None, full_at=None, commands=CACHEABLE):
+    return {"signature": signature or _signature(),
+            "full_at": (full_at or datetime.now()).isoformat(),
+            "outputs": {lbl: {"command": cmd, "output": f"cached {lbl}"} for lbl, cmd in commands}}
+
+
+class TestAuditChangeSignature:
+    """audit_change_signature(): last commit, boot time and an interface digest."""
+
+    def test_fields(self):
+        """UC: Commit 0 line and boot time are read out of the probe outputs."""
+        sig = _signature()
+        assert sig["commit"] == "2026-10-01 10:00:00 UTC by admin via cli"
+        assert sig["boot"] == "2026-09-01 08:00:00 UTC"
+
+    def test_ago_suffix_ignored(self):
+        """Corner: The moving "(… ago)" part of flap times doesn't change the signature."""
+        later = SIGNAL.replace("2w0d 02:00 ago", "2w0d 03:15 ago")
+        assert _signature(signal=later) == _signature()
+        flapped = SIGNAL.replace("2026-10-01 10:00:00", "2026-10-16 11:59:00")
+        assert _signature(signal=flapped)["interfaces"] != _signature()["interfaces"]
+
+    @pytest.mark.parametrize("missing", ["commits", "uptime", "signal"])
+    def test_missing_probe(self, missing):
+        """Corner: Any missing probe output gives no signature (forces a full refresh)."""
+        assert _signature(**{missing: ""}) is None
+
+
+class TestAuditRefreshPlan:
+    """audit_refresh_plan(): which cacheable labels to re-collect for one device."""
+
+    EVERYTHING = {lbl for lbl, _ in CACHEABLE}
+
+    def test_unchanged_reuses_everything(self):
+        """UC: Same signals, fresh full collection → nothing to re-collect."""
+        assert omc.audit_refresh_plan(_cached(), _signature(), CACHEABLE) == (set(), False)
+
+    @pytest.mark.parametrize("change", [
+        {"commits": COMMITS.replace("10:00:00 UTC by admin via cli", "11:30:00 UTC by ops via cli")},
+        {"uptime": UPTIME.replace("2026-09-01 08:00:00", "2026-10-16 11:00:00")},
+    ])
+    def test_commit_or_boot_change_is_full(self, change):
+        """UC: A new commit or a reboot re-collects every label and the config."""
+        assert omc.audit_refresh_plan(_cached(), _signature(**change), CACHEABLE) == (self.EVERYTHING, True)
+
+    def test_interface_change_refreshes_interface_labels(self):
+        """UC: An interface signal change re-collects only AUDIT_INTERFACE_LABELS."""
+        signature = _signature(signal=SIGNAL.replace("Input errors: 0", "Input errors: 12"))
+        refresh, config_changed = omc.audit_refresh_plan(_cached(), signature, CACHEABLE)
+        assert refresh == self.EVERYTHING & omc.AUDIT_INTERFACE_LABELS == {"Interfaces", "Interface Detail"}
+        assert config_changed is False
+
+    def test_max_age_expiry(self):
+        """UC: A full collection older than mcp.incremental_max_age forces a full refresh."""
+        with patch.object(omc, "MCP_INCREMENTAL_MAX_AGE", 3600):
+            fresh = _cached(full_at=datetime.now() - timedelta(seconds=3000))
+            stale = _cached(full_at=datetime.now() - timedelta(seconds=4000))
+            assert omc.audit_refresh_plan(fresh, _signature(), CACHEABLE) == (set(), False)
+            assert omc.audit_refresh_plan(stale, _signature(), CACHEABLE) == (self.EVERYTHING, True)
+
+    def test_changed_command_invalidates_label(self):
+        """UC: A label cached for another command string (structured_collection toggled) is re-collected."""
+        structured = [(lbl, omc.STRUCTURED_AUDIT_COMMANDS.get(lbl, cmd)) for lbl, cmd in CACHEABLE]
+        assert omc.audit_refresh_plan(_cached(), _signature(), structured) == ({"Interface Detail"}, False)
+        partial = _cached(commands=[c for c in CACHEABLE if c[0] != "FW Config"])
+        assert omc.audit_refresh_plan(partial, _signature(), CACHEABLE) == ({"FW Config"}, False)
+
+    @pytest.mark.parametrize("cached, signature", [
+        (None, _signature()), ({}, _signature()), (_cached(), None),
+        ({**_cached(), "signature": {}}, _signature()), ({**_cached(), "full_at": "garbage"}, _signature()),
+    ])
+    def test_unusable_cache_is_full(self, cached, signature):
+        """Corner: No entry, no signature or an unreadable full_at → full refresh."""
+        assert omc.audit_refresh_plan(cached, signature, CACHEABLE) == (self.EVERYTHING, True)
+
+
+class TestCollectAuditIncremental:
+    """collect_audit_incremental(): probe, grouped re-collection and cache entries."""
+
+    ROUTERS = ["PE1", "PE2"]
+
+    def _first_run(self, devices):
+        outputs, entries, config_changed, _ = devices.collect({})
+        assert config_changed == {"PE1": True, "PE2": True}
+        for entry in entries.values():
+            entry["config_sha256"], entry["config"] = "abc", "cached config"
+        devices.calls.clear()
+        devices.generation += 1
+        return entries
+
+    def test_unchanged_devices_served_from_cache(self):
+        """UC: Only the probe runs; cacheable labels come from the cache and report "cached"."""
+        devices = FakeDevices(self.ROUTERS)
+        cache = self._first_run(devices)
+        outputs, entries, config_changed, status = devices.collect(cache)
+        assert [title for title, _, _ in devices.calls] == ["Change Probe"]
+        assert outputs["FW Config"]["PE1"] == ("success", "FW Config on PE1 #1")
+        assert outputs["Alarms"]["PE1"] == ("success", "Alarms on PE1 #2")   # always re-collected
+        assert all(status[lbl] == "cached" for lbl, _ in CACHEABLE)
+        assert config_changed == {"PE1": False, "PE2": False}
+        assert entries["PE1"]["config"] == "cached config" and entries["PE1"]["config_sha256"] == "abc"
+        assert entries["PE1"]["full_at"] == cache["PE1"]["full_at"]
+
+    def test_commit_change_recollects_everything(self):
+        """UC: A commit on one device re-collects all of its labels and drops its cached config."""
+        devices = FakeDevices(self.ROUTERS)
+        cache = self._first_run(devices)
+        devices.probe["PE2"]["Commits"] = "0   2026-10-16 11:59:00 UTC by ops via cli\n" + COMMITS
+        outputs, entries, config_changed, _ = devices.collect(cache)
+        assert devices.refreshed() == {"PE2": {lbl for lbl, _ in CACHEABLE}}
+        assert outputs["FW Config"] == {"PE1": ("success", "FW Config on PE1 #1"),
+                                        "PE2": ("success", "FW Config on PE2 #2")}
+        assert config_changed == {"PE1": False, "PE2": True}
+        assert "config" not in entries["PE2"] and entries["PE2"]["full_at"] != cache["PE2"]["full_at"]
+
+    def test_interface_change_recollects_interface_labels(self):
+        """UC: An interface signal change re-collects only the interface/protocol labels."""
+        devices = FakeDevices(self.ROUTERS)
+        cache = self._first_run(devices)
+        devices.probe["PE1"][omc.AUDIT_SIGNAL_LABEL] = SIGNAL.replace("Input errors: 0", "Input errors: 7")
+        outputs, entries, config_changed, status = devices.collect(cache)
+        assert devices.refreshed() == {"PE1": {"Interfaces", "Interface Detail"}}
+        assert outputs["Interfaces"]["PE1"] == ("success", "Interfaces on PE1 #2")
+        assert outputs["Interfaces"]["PE2"] == ("success", "Interfaces on PE2 #1")
+        assert "Interfaces" not in status and status["FW Config"] == "cached"
+        assert config_changed == {"PE1": False, "PE2": False}
+
+    def test_failed_recollect_reports_failed(self):
+        """Corner: A label that had to be re-collected but failed is "failed", never the stale cached output."""
+        devices = FakeDevices(self.ROUTERS)
+        cache = self._first_run(devices)
+        devices.probe["PE1"][omc.AUDIT_SIGNAL_LABEL] = SIGNAL.replace("Input errors: 0", "Input errors: 7")
+        devices.fail = {("PE1", "Interfaces")}
+        outputs, entries, _, _ = devices.collect(cache)
+        assert outputs["Interfaces"]["PE1"] == ("failed", "")
+        assert outputs["Interface Detail"]["PE1"] == ("success", "Interface Detail on PE1 #2")
+        assert "Interfaces" not in entries["PE1"]["outputs"]
+        # Next run: the missing label is re-collected even though signals are unchanged again
+        devices.fail, devices.calls = set(), []
+        outputs, _, _, _ = devices.collect(entries)
+        assert devices.refreshed() == {"PE1": {"Interfaces"}}
+        assert outputs["Interfaces"]["PE1"] == ("success", "Interfaces on PE1 #2")
+
+    def test_failed_probe_forces_full(self):
+        """Corner: A device whose probe failed gets a full re-collection and no cache entry."""
+        devices = FakeDevices(self.ROUTERS)
+        cache = self._first_run(devices)
+        devices.fail = {("PE2", "Uptime")}
+        outputs, entries, config_changed, _ = devices.collect(cache)
+        assert outputs["Uptime"]["PE2"] == ("failed", "")
+        assert devices.refreshed() == {"PE2": {lbl for lbl, _ in CACHEABLE}}
+        assert config_changed["PE2"] is True and "PE2" not in entries
+
+    def test_matrix_unavailable(self):
+        """Corner: Without the matrix tool the caller falls back to a full collection."""
+        with patch.object(omc, "run_matrix", new=AsyncMock(return_value=None)), \
+             patch.object(omc, "console"):
+            assert asyncio.run(omc.collect_audit_incremental(None, "sid", AUDIT_COMMANDS, ["PE1"], {})) is None
+
+
+class TestCachedAuditConfig:
+    """cached_audit_config(): golden baseline when its .meta sha256 matches, else the cached copy."""
+
+    def test_golden_meta_match(self):
+        """UC: Matching golden .meta sha256 → the golden config, not the cached copy."""
+        with patch.object(omc, "load_golden_config", return_value=("golden config", {"sha256": "abc"})):
+            assert omc.cached_audit_config("PE1", {"config_sha256": "abc", "config": None}) == "golden config"
+
+    @pytest.mark.parametrize("golden", [("golden config", {"sha256": "old"}), ("golden config", {}),
+                                        ("golden config", None), (None, None)])
+    def test_drifted_uses_cached_copy(self, golden):
+        """UC: Drifted, meta-less or missing golden config → the config cached with the audit."""
+        with patch.object(omc, "load_golden_config", return_value=golden):
+            assert omc.cached_audit_config("PE1", {"config_sha256": "abc", "config": "drifted"}) == "drifted"
+
+    @pytest.mark.parametrize("cached", [None, {}, {"config": "x"}, {"config_sha256": None, "config": "x"}])
+    def test_no_checksum(self, cached):
+        """Corner: No recorded config_sha256 → nothing cached; the config is fetched."""
+        with patch.object(omc, "load_golden_config") as load:
+            assert omc.cached_audit_config("PE1", cached) is None
+        load.assert_not_called()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  RUN
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short", "-x"])
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Tests for the KB vector store — kb_vectorstore.py
+=================================================
+Keyword boosting, the .npy + JSON store, incremental rebuilds, the embedding
+pipeline and the query-embedding cache. Embeddings come from a stub client,
+and every on-disk path is redirected to a temp dir, so Ollama is never contacted.
+
+Usage:
+    cd web_ui && python -m pytest tests/test_kb_vectorstore.py -v --tb=short
+"""
+
+import sys
+import json
+import re
+import random
+import hashlib
+import asyncio
+import pickle
+from pathlib import Path
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import httpx
+import numpy as np
+import pytest
+
+# ── Setup path so the repo-root modules import ──
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import kb_vectorstore as kbv
+
+
+# ═══════════════════════════════════════════════════════════════
+#  KEYWORD BOOST
+# ═══════════════════════════════════════════════════════════════
+
+def _reference_keyword_boost(chunks, query):
+    """The original per-chunk keyword-boost loop KeywordBoostIndex replaced."""
+    query_lower = query.lower()
+    query_words = set(re.findall(r'[a-z0-9\-]+', query_lower))
+    boosts = []
+    for chunk in chunks:
+        section = chunk.get('section', '').lower()
+        heading = chunk.get('heading', '').lower()
+        context = section + ' ' + heading
+        boost = 0.0
+        for keywords in kbv.PROTOCOL_KEYWORDS.values():
+            if any(kbv._keyword_in_text(kw, query_lower) for kw in keywords):
+                if any(kbv._keyword_in_text(kw, context) for kw in keywords):
+                    boost = max(boost, kbv.KEYWORD_BOOST)
+                    if (any(kbv._keyword_in_text(kw, section) for kw in keywords)
+                            and any(kbv._keyword_in_text(kw, heading) for kw in keywords)):
+                        boost = max(boost, kbv.KEYWORD_BOOST * 1.5)
+        overlap = query_words & set(re.findall(r'[a-z0-9\-]+', context))
+        if len(overlap) >= 3:
+            boost = max(boost, kbv.KEYWORD_BOOST)
+        elif len(overlap) >= 2:
+            boost = max(boost, kbv.KEYWORD_BOOST * 0.6)
+        boosts.append(boost)
+    return boosts
+
+
+class TestKeywordBoostIndex:
+    """KeywordBoostIndex.boosts() reproduces the per-chunk loop exactly."""
+
+    CHUNKS = [
+        {"section": "BGP Troubleshooting", "heading": "Session states"},            # protocol in section only
+        {"section": "BGP Troubleshooting", "heading": "iBGP route reflection"},     # section AND heading
+        {"section": "Interfaces", "heading": "Physical link flap damping"},         # heading words only
+        {"section": "Interfaces", "heading": "Link flap damping hold timers"},      # 3-word heading overlap
+        {"section": "OSPF", "heading": "Area types"},
+        {"section": "", "heading": ""},
+    ]
+
+    @pytest.mark.parametrize("query, expected", [
+        ("why is bgp down", [1.0, 1.5, 0, 0, 0, 0]),                 # section only / section and heading
+        ("link flap on ge-0/0/0", [0, 0, 0.6, 0.6, 0, 0]),           # 2-word heading overlap
+        ("link flap damping timers", [0, 0, 1.0, 1.0, 0, 0]),        # 3-word heading overlap
+        ("ospf area 0 neighbors", [0, 0, 0, 0, 1.5, 0]),
+        ("show version", [0, 0, 0, 0, 0, 0]),
+    ])
+    def test_boost_cases(self, query, expected):
+        """UC: Section-only, section+heading and 2-/3-word overlap boosts."""
+        boosts = kbv.KeywordBoostIndex(self.CHUNKS).boosts(query)
+        assert boosts.tolist() == pytest.approx([e * kbv.KEYWORD_BOOST for e in expected])
+        assert boosts.tolist() == _reference_keyword_boost(self.CHUNKS, query)
+
+    def test_matches_reference_on_random_chunks(self):
+        """UC: Identical boosts to the old loop on seeded synthetic chunks and queries."""
+        rng = random.Random(21)
+        words = sorted({kw for kws in kbv.PROTOCOL_KEYWORDS.values() for kw in kws}
+                       | {"troubleshooting", "config", "timers", "link", "flap", "design", "states", "area"})
+        phrase = lambda n: " ".join(rng.choice(words) for _ in range(n))
+        chunks = [{"section": phrase(rng.randrange(0, 4)), "heading": phrase(rng.randrange(0, 5))}
+                  for _ in range(150)]
+        index = kbv.KeywordBoostIndex(chunks)
+        for _ in range(40):
+            query = phrase(rng.randrange(1, 7))
+            assert index.boosts(query).tolist() == _reference_keyword_boost(chunks, query), query
+
+
+# ═══════════════════════════════════════════════════════════════
+#  STORAGE, REBUILDS, EMBEDDING PIPELINE
+# ═══════════════════════════════════════════════════════════════
+
+def _kb_text(sections=3, headings=4, edits=None):
+    """Synthetic KNOWLEDGE_BASE.md: sections × headings chunks of ~150+ chars each.
+    edits maps (section, heading) to replacement body text."""
+    edits = edits or {}
+    parts = []
+    for s in range(sections):
+        parts.append(f"# SECTION {s + 1}: Topic {s}\n")
+        for h in range(headings):
+            body = edits.get((s, h), f"Body of section {s} heading {h}. " * 6)
+            parts.append(f"## Heading {s}.{h}\n\n{body}\n")
+    return "\n".join(parts)
+
+
+class _StubEmbedClient:
+    """Stands in for http_clients.get("embed"): deterministic vectors, records every input."""
+
+    DIM = 8
+
+    def __init__(self, delay=None, fail=None):
+        self.requests = []  # list of input batches, in call order
+        self.delay = delay  # batch -> seconds to wait before answering
+        self.fail = fail    # batch -> exception to raise instead, or None
+
+    @classmethod
+    def vector(cls, text):
+        digest = hashlib.sha256(text.encode()).digest()
+        return [b - 127.5 for b in digest[:cls.DIM]]
+
+    @property
+    def embedded(self):
+        return [t for batch in self.requests for t in batch]
+
+    async def post(self, url, json=None):
+        batch = json["input"] if isinstance(json["input"], list) else [json["input"]]
+        self.requests.append(list(batch))
+        if self.delay:
+            await asyncio.sleep(self.delay(batch))
+        if self.fail and (exc := self.fail(batch)):
+            raise exc
+        return MagicMock(json=MagicMock(return_value={"embeddings": [self.vector(t) for t in batch]}))
+
+
+@pytest.fixture
+def kb_store(tmp_path):
+    """kb_vectorstore with every on-disk path in tmp_path and a stub embedding client."""
+    stub = _StubEmbedClient()
+    with patch.object(kbv, "VECTOR_STORE_PATH", str(tmp_path / "kb_vectors.json")), \
+         patch.object(kbv, "LEGACY_VECTOR_STORE_PATH", str(tmp_path / "kb_vectors.pkl")), \
+         patch.object(kbv, "CHECKPOINT_PATH", str(tmp_path / "kb_vectors.partial.npz")), \
+         patch.object(kbv, "QUERY_CACHE_PATH", str(tmp_path / "kb_query_cache.npz")), \
+         patch.object(kbv, "query_cache", kbv.QueryEmbeddingCache()), \
+         patch.object(kbv.http_clients, "get", return_value=stub):
+        yield kbv, stub
+
+
+def _build_store(kbv, kb_text, store=None, reuse=False):
+    store = store or kbv.KBVectorStore()
+    asyncio.run(store._build(kb_text, hashlib.sha256(kb_text.encode()).hexdigest(), reuse=reuse))
+    return store
+
+
+class TestKBVectorStorage:
+    """Matrix in kb_vectors.<hash>.npy (mmap), metadata in kb_vectors.json."""
+
+    def test_save_layout(self, kb_store, tmp_path):
+        """UC: Build writes unit-normalized float32 .npy plus JSON metadata naming it."""
+        kbv, stub = kb_store
+        kb_text = _kb_text()
+        store = _build_store(kbv, kb_text)
+        meta = json.loads((tmp_path / "kb_vectors.json").read_text())
+        assert meta["matrix"] == f"kb_vectors.{store.kb_hash[:16]}.npy"
+        assert meta["rows"] == len(meta["chunks"]) == len(store.chunks) == 12
+        assert meta["dim"] == stub.DIM and meta["store_version"] == kbv.STORE_VERSION
+        assert all(c["hash"] == kbv.chunk_hash(kbv.anchor_chunk(c)) for c in meta["chunks"])
+        matrix = np.load(tmp_path / meta["matrix"])
+        assert matrix.dtype == np.float32 and matrix.shape == (12, stub.DIM)
+        assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0, atol=1e-5)
+        assert isinstance(store.embeddings, np.memmap)
+
+    def test_load_is_mmap(self, kb_store):
+        """UC: A fresh store maps the saved matrix read-only and ranks from it."""
+        kbv, stub = kb_store
+        built = _build_store(kbv, _kb_text())
+        loaded = kbv.KBVectorStore()
+        loaded._load_cache()
+        assert isinstance(loaded.embeddings, np.memmap) and not loaded.embeddings.flags.writeable
+        assert np.array_equal(loaded.embeddings, built.embeddings)
+        assert loaded.chunks == built.chunks and loaded.kb_hash == built.kb_hash
+        query = np.asarray(stub.vector(kbv.anchor_chunk(built.chunks[5])), dtype=np.float32)
+        assert loaded._rank(query, "", top_k=1, min_score=0.0)[0]["chunk_id"] == 5
+
+    @pytest.mark.parametrize("field, value", [("dim", 4), ("rows", None), ("store_version", "2.0")])
+    def test_load_rejects_mismatch(self, kb_store, tmp_path, field, value):
+        """Corner: Wrong dim, row count or store version is refused, not half-loaded."""
+        kbv, _ = kb_store
+        _build_store(kbv, _kb_text())
+        meta_path = tmp_path / "kb_vectors.json"
+        meta = json.loads(meta_path.read_text())
+        if field == "rows":
+            meta["chunks"] = meta["chunks"][:-1]
+        else:
+            meta[field] = value
+        meta_path.write_text(json.dumps(meta))
+        with pytest.raises(ValueError):
+            kbv.KBVectorStore()._load_cache()
+
+    def test_previous_matrix_kept_until_next_save(self, kb_store, tmp_path):
+        """UC: A reader holding the previous metadata can still load its matrix."""
+        kbv, _ = kb_store
+        first = _build_store(kbv, _kb_text())
+        stale_meta = (tmp_path / "kb_vectors.json").read_text()
+        second = _build_store(kbv, _kb_text(edits={(0, 0): "Edited body text. " * 10}), reuse=True)
+        assert sorted(p.name for p in tmp_path.glob("kb_vectors.*.npy")) == sorted(
+            [f"kb_vectors.{first.kb_hash[:16]}.npy", f"kb_vectors.{second.kb_hash[:16]}.npy"])
+        fresh_meta = (tmp_path / "kb_vectors.json").read_text()
+        (tmp_path / "kb_vectors.json").write_text(stale_meta)
+        reader = kbv.KBVectorStore()
+        reader._load_cache()
+        assert reader.kb_hash == first.kb_hash
+        (tmp_path / "kb_vectors.json").write_text(fresh_meta)
+        third = _build_store(kbv, _kb_text(edits={(0, 1): "Another edit. " * 10}), reuse=True)
+        assert sorted(p.name for p in tmp_path.glob("kb_vectors.*.npy")) == sorted(
+            [f"kb_vectors.{second.kb_hash[:16]}.npy", f"kb_vectors.{third.kb_hash[:16]}.npy"])
+
+    def test_load_retries_after_concurrent_save(self, kb_store):
+        """Corner: A matrix removed between reading metadata and mapping it is retried once."""
+        kbv, _ = kb_store
+        built = _build_store(kbv, _kb_text())
+        real_load = np.load
+        calls = []
+
+        def flaky_load(path, *args, **kwargs):
+            calls.append(path)
+            if len(calls) == 1:
+                raise FileNotFoundError(path)
+            return real_load(path, *args, **kwargs)
+
+        with patch.object(kbv.np, "load", side_effect=flaky_load):
+            store = kbv.KBVectorStore()
+            store._load_cache()
+        assert len(calls) == 2 and store.kb_hash == built.kb_hash
+
+    def test_migrates_v2_pickle_without_reembedding(self, kb_store, tmp_path):
+        """UC: A v2.0 kb_vectors.pkl becomes .npy + JSON; unchanged chunks are not re-embedded."""
+        kbv, stub = kb_store
+        kb_text = _kb_text()
+        chunks = kbv.chunk_knowledge_base(kb_text)
+        raw = np.array([stub.vector(kbv.anchor_chunk(c)) for c in chunks], dtype=np.float32) * 3.0
+        with open(tmp_path / "kb_vectors.pkl", "wb") as f:
+            pickle.dump({"store_version": "2.0", "kb_hash": "old-hash", "embed_model": kbv.EMBED_MODEL,
+                         "built_at": "2025-01-01", "chunks": chunks, "embeddings": raw}, f)
+        store = kbv.KBVectorStore()
+        store._migrate_legacy_cache()
+        assert not (tmp_path / "kb_vectors.pkl").exists()
+        assert (tmp_path / "kb_vectors.json").exists()
+        assert np.allclose(np.linalg.norm(store.embeddings, axis=1), 1.0, atol=1e-5)
+        assert all(c["hash"] == kbv.chunk_hash(kbv.anchor_chunk(c)) for c in store.chunks)
+        loaded = kbv.KBVectorStore()
+        loaded._load_cache()
+        _build_store(kbv, kb_text, store=loaded, reuse=True)
+        assert stub.requests == []
+
+    def test_unsupported_legacy_version(self, kb_store, tmp_path):
+        """Corner: Only v2.0 pickles are migrated."""
+        kbv, _ = kb_store
+        with open(tmp_path / "kb_vectors.pkl", "wb") as f:
+            pickle.dump({"store_version": "1.0", "chunks": [], "embeddings": []}, f)
+        with pytest.raises(ValueError):
+            kbv.KBVectorStore()._migrate_legacy_cache()
+        assert (tmp_path / "kb_vectors.pkl").exists()
+
+
+class TestKBIncrementalRebuild:
+    """Rebuild after a KB edit embeds only new/changed chunks."""
+
+    def test_edit_add_remove(self, kb_store):
+        """UC: Edited/added chunks are embedded, unchanged reused, removed dropped."""
+        kbv, stub = kb_store
+        first = _build_store(kbv, _kb_text(sections=2, headings=4))
+        old_rows = {c["hash"]: first.embeddings[i].copy() for i, c in enumerate(first.chunks)}
+        assert len(stub.embedded) == 8
+        stub.requests.clear()
+
+        edited = "Rewritten paragraph about MPLS LDP label distribution. " * 3
+        kb_text = _kb_text(sections=2, headings=4, edits={(0, 1): edited})
+        kb_text = kb_text.replace("## Heading 1.3\n", "## Heading 1.9\n")   # rename → new chunk
+        kb_text = kb_text.replace("## Heading 1.2\n\n" + "Body of section 1 heading 2. " * 6 + "\n", "")
+        second = _build_store(kbv, kb_text, store=first, reuse=True)
+
+        assert len(second.chunks) == 7
+        assert sorted(stub.embedded) == sorted(
+            kbv.anchor_chunk(c) for c in second.chunks if c["heading"] in ("Heading 0.1", "Heading 1.9"))
+        assert "Heading 1.2" not in {c["heading"] for c in second.chunks}
+        for i, c in enumerate(second.chunks):
+            if c["heading"] in ("Heading 0.1", "Heading 1.9"):
+                assert c["hash"] not in old_rows
+            else:
+                assert np.array_equal(second.embeddings[i], old_rows[c["hash"]])
+        assert len(np.load(kbv.VECTOR_STORE_PATH.replace(".json", f".{second.kb_hash[:16]}.npy"))) == 7
+
+    def test_unchanged_rebuild_embeds_nothing(self, kb_store):
+        """Corner: Rebuilding identical text reuses every vector."""
+        kbv, stub = kb_store
+        store = _build_store(kbv, _kb_text())
+        stub.requests.clear()
+        _build_store(kbv, _kb_text(), store=store, reuse=True)
+        assert stub.requests == []
+
+    def test_model_change_forces_full_embed(self, kb_store):
+        """Corner: A store built with another embedding model is never reused."""
+        kbv, stub = kb_store
+        store = _build_store(kbv, _kb_text())
+        old_hashes = {c["hash"] for c in store.chunks}
+        stub.requests.clear()
+        with patch.object(kbv, "EMBED_MODEL", "other-embed-model"):
+            rebuilt = _build_store(kbv, _kb_text(), store=store, reuse=True)
+        assert len(stub.embedded) == len(rebuilt.chunks) == 12
+        assert rebuilt.embed_model == "other-embed-model"
+        assert {c["hash"] for c in rebuilt.chunks}.isdisjoint(old_hashes)
+
+
+class TestKBEmbedPipeline:
+    """_AdaptiveBatcher sizing and embed_batch ordering, retries and checkpoints."""
+
+    def test_batcher_cuts_at_char_cap(self):
+        """UC: A batch stops before EMBED_MAX_BATCH_CHARS; an oversized text goes alone."""
+        texts = ["a" * 400, "b" * 400, "c" * 300, "d" * 1500, "e" * 10]
+        with patch.object(kbv, "EMBED_MAX_BATCH_CHARS", 1000):
+            batcher = kbv._AdaptiveBatcher(texts, 16)
+            cuts = []
+            while (batch := batcher.take()) is not None:
+                cuts.append(batch[0])
+        assert cuts == [[0, 1], [2], [3], [4]]
+
+    def test_batcher_cuts_at_size(self):
+        """UC: Without the char cap, batches are `size` texts."""
+        batcher = kbv._AdaptiveBatcher(["x"] * 10, 4)
+        assert [len(batcher.take()[0]) for _ in range(3)] == [4, 4, 2]
+        assert batcher.take() is None
+
+    def test_batcher_timeout_halves(self):
+        """UC: Each timeout halves the batch size, down to 1."""
+        batcher = kbv._AdaptiveBatcher(["x"] * 100, 16)
+        sizes = []
+        for _ in range(6):
+            batcher.timed_out()
+            sizes.append(batcher.size)
+        assert sizes == [8, 4, 2, 1, 1, 1]
+
+    def test_batcher_retargets_by_latency(self):
+        """Corner: Size moves toward EMBED_TARGET_SECONDS but at most 2x per step."""
+        batcher = kbv._AdaptiveBatcher(["x"] * 100, 16)
+        batcher.record(16, 0.016)          # fast server → double
+        assert batcher.size == 32
+        slow = kbv._AdaptiveBatcher(["x"] * 100, 16)
+        slow.record(16, 16 * kbv.EMBED_TARGET_SECONDS)  # 2s per text → halve
+        assert slow.size == 8
+
+    def test_results_in_input_order(self, kb_store):
+        """UC: Batches completing out of order still yield vectors in input order."""
+        kbv, stub = kb_store
+        texts = [f"text number {i}" for i in range(23)]
+        stub.delay = lambda batch: 0.1 if batch[0] == texts[0] else random.random() * 0.01
+        seen = []
+        vectors = asyncio.run(kbv.embed_batch(texts, batch_size=3, concurrency=4,
+                                              on_batch=lambda idx, vecs: seen.extend(idx)))
+        assert [v.tolist() for v in vectors] == [np.float32(stub.vector(t)).tolist() for t in texts]
+        assert sorted(seen) == list(range(23)) and seen[-3:] == [0, 1, 2]
+
+    def test_timeout_retries_and_halves(self, kb_store):
+        """UC: A timed-out batch is retried after backoff and the batch size halved."""
+        kbv, stub = kb_store
+        texts = [f"text {i}" for i in range(8)]
+        stub.fail = lambda batch: httpx.ReadTimeout("slow") if len(stub.requests) == 1 else None
+        with patch.object(kbv.asyncio, "sleep", new=AsyncMock()) as backoff, \
+             patch.object(kbv._AdaptiveBatcher, "timed_out", autospec=True,
+                          side_effect=kbv._AdaptiveBatcher.timed_out) as timed_out:
+            vectors = asyncio.run(kbv.embed_batch(texts, batch_size=8, concurrency=1))
+        assert timed_out.call_count == 1 and backoff.await_args.args == (2,)
+        assert stub.requests[0] == stub.requests[1] == texts
+        assert [v.tolist() for v in vectors] == [np.float32(stub.vector(t)).tolist() for t in texts]
+
+    def test_failure_lets_inflight_batches_finish(self, kb_store):
+        """Corner: A fast failure doesn't cancel sibling batches; they reach on_batch."""
+        kbv, stub = kb_store
+        texts = [f"text {i}" for i in range(40)]
+        stub.delay = lambda batch: 0.0 if texts[0] in batch else 0.05
+        stub.fail = lambda batch: RuntimeError("embed server 500") if texts[0] in batch else None
+        seen = []
+        with pytest.raises(RuntimeError):
+            asyncio.run(kbv.embed_batch(texts, batch_size=10, concurrency=4,
+                                        on_batch=lambda idx, vecs: seen.extend(idx)))
+        assert sorted(seen) == list(range(10, 40))
+        assert len(stub.requests) == 4
+
+    def test_checkpoint_and_resume(self, kb_store, tmp_path):
+        """UC: An interrupted build checkpoints finished batches; the next build embeds only the rest."""
+        kbv, stub = kb_store
+        kb_text = _kb_text(sections=4, headings=16)   # 64 chunks → 4 concurrent batches of 16
+        first_chunk = kbv.anchor_chunk(kbv.chunk_knowledge_base(kb_text)[0])
+        stub.delay = lambda batch: 0.0 if first_chunk in batch else 0.05
+        stub.fail = lambda batch: RuntimeError("embed server 500") if first_chunk in batch else None
+        with pytest.raises(RuntimeError):
+            _build_store(kbv, kb_text)
+        failed_batch = next(b for b in stub.requests if first_chunk in b)
+        with np.load(tmp_path / "kb_vectors.partial.npz") as data:
+            assert len(data["hashes"]) == 64 - len(failed_batch) == 48
+        assert not (tmp_path / "kb_vectors.json").exists()
+
+        stub.requests.clear()
+        stub.delay = stub.fail = None
+        store = _build_store(kbv, kb_text)
+        assert sorted(stub.embedded) == sorted(failed_batch)
+        assert len(store.chunks) == 64 and not (tmp_path / "kb_vectors.partial.npz").exists()
+        for i, c in enumerate(store.chunks):
+            expected = np.float32(stub.vector(kbv.anchor_chunk(c)))
+            assert np.allclose(store.embeddings[i], expected / np.linalg.norm(expected), atol=1e-6)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  QUERY EMBEDDING CACHE
+# ═══════════════════════════════════════════════════════════════
+
+class TestQueryEmbeddingCache:
+    """LRU of query vectors keyed by (model, text), persisted as .npz."""
+
+    @staticmethod
+    def _vec(seed):
+        return np.full(_StubEmbedClient.DIM, float(seed), dtype=np.float32)
+
+    def test_lru_eviction(self, tmp_path):
+        """UC: Beyond `size` entries the least recently used one is evicted."""
+        cache = kbv.QueryEmbeddingCache(path=str(tmp_path / "q.npz"), size=3)
+        for i, text in enumerate("abc"):
+            cache.put(text, self._vec(i))
+        assert cache.get("a") is not None        # a is now most recent
+        cache.put("d", self._vec(3))
+        assert cache.get("b") is None
+        assert all(cache.get(t) is not None for t in "acd")
+        assert cache.stats() == {"entries": 3, "size": 3, "hits": 4, "misses": 1}
+
+    def test_persistence_round_trip(self, tmp_path):
+        """UC: Saved entries load back in a new cache, in LRU order."""
+        path = str(tmp_path / "q.npz")
+        cache = kbv.QueryEmbeddingCache(path=path, size=2)
+        for i, text in enumerate(["q1", "q2"]):
+            cache.put(text, self._vec(i))
+        cache.get("q1")
+        cache.save()
+        reloaded = kbv.QueryEmbeddingCache(path=path, size=2)
+        assert np.array_equal(reloaded.get("q2"), self._vec(1))
+        reloaded.put("q3", self._vec(2))           # q1 is now the oldest → evicted
+        assert reloaded.get("q1") is None and np.array_equal(reloaded.get("q3"), self._vec(2))
+
+    def test_model_mismatch_discarded(self, tmp_path):
+        """Corner: A cache file written under another embedding model is ignored."""
+        path = str(tmp_path / "q.npz")
+        cache = kbv.QueryEmbeddingCache(path=path)
+        cache.put("q1", self._vec(1))
+        cache.save()
+        with patch.object(kbv, "EMBED_MODEL", "other-embed-model"):
+            other = kbv.QueryEmbeddingCache(path=path)
+            assert other.get("q1") is None and other.stats()["entries"] == 0
+        assert np.array_equal(kbv.QueryEmbeddingCache(path=path).get("q1"), self._vec(1))
+
+    def test_embed_queries_collapses_duplicates(self, kb_store):
+        """UC: Repeated queries are embedded once; later calls are served from the cache."""
+        kbv, stub = kb_store
+        vectors = asyncio.run(kbv.embed_queries(["q1", "q2", "q1"]))
+        assert stub.requests == [["q1", "q2"]]
+        assert np.array_equal(vectors[0], vectors[2])
+        assert np.array_equal(vectors[1], np.float32(stub.vector("q2")))
+        again = asyncio.run(kbv.embed_queries(["q2", "q1", "q3"]))
+        assert stub.requests[1:] == [["q3"]]
+        assert np.array_equal(again[1], vectors[0])
+
+
+# ═══════════════════════════════════════════════════════════════
+#  RUN
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short", "-x"])
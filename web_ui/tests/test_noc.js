@@ -308,6 +308,23 @@ describe('Validation UI Functions', () => {
         const options = topology ? topology.nodes.map(n => n.id) : [];
         expect(options).toHaveLength(0);
     });
+
+    test('UC: runBatchValidation streams per-router rows', () => {
+        const body = NOC_SOURCE.slice(NOC_SOURCE.indexOf('async function runBatchValidation'),
+                                      NOC_SOURCE.indexOf('async function runAICompliance'));
+        expect(body).toContain('executeMCPBatchStream(routers, command');
+        expect(body).toContain("insertAdjacentHTML('beforeend'");
+    });
+
+    test('UC: validationPassed matches like the server', () => {
+        const src = NOC_SOURCE.slice(NOC_SOURCE.indexOf('function validationPassed'),
+                                     NOC_SOURCE.indexOf('async function runBatchValidation'));
+        const validationPassed = new Function(`${src}; return validationPassed;`)();
+        expect(validationPassed('BGP Established', 'established', 'contains')).toBe(true);
+        expect(validationPassed('BGP Active', 'established', 'not_contains')).toBe(true);
+        expect(validationPassed('line1\nState: Full', '^state:\\s+full$', 'regex')).toBe(true);
+        expect(validationPassed('anything', '([', 'regex')).toBe(false);
+    });
 });
 
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the audit output parsers — ollama_mcp_client.py
+=========================================================
+Every find_*/parse_* must give the same result for CLI text, raw
+`| display json` and the compacted JSON jmcp returns. Paired outputs
+live in tests/fixtures/junos/.
+
+Usage:
+    cd web_ui && python -m pytest tests/test_parsers.py -v --tb=short
+"""
+
+import sys
+import json
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# ── Setup path so the repo-root modules import ──
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import ollama_mcp_client as omc
+
+JUNOS_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "junos"
+
+
+def _junos_fixture(name, fmt):
+    """Paired fixture: 'text' (CLI), 'raw' (Junos JSON) or 'compact' (as jmcp returns it)."""
+    if fmt == "text":
+        return (JUNOS_FIXTURES / f"{name}.txt").read_text()
+    raw = (JUNOS_FIXTURES / f"{name}.json").read_text()
+    if fmt == "raw":
+        return raw
+    spec = importlib.util.spec_from_file_location(
+        "jmcp_junos_json", Path(__file__).resolve().parents[2] / "junos-mcp-server" / "utils" / "junos_json.py")
+    junos_json_mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(junos_json_mod)
+    return json.dumps(junos_json_mod.compact_junos_json(json.loads(raw)), separators=(",", ":"))
+
+
+class TestStructuredParsers:
+    """Each find_*/parse_* gives identical results for CLI text and | display json."""
+
+    DEVICE_MAP = {"PE1": "pe1.lab"}
+
+    def _parity(self, name, analyze):
+        """Run analyze({router: output}) over every format; all must match the text result."""
+        results = {fmt: analyze({"PE1": _junos_fixture(name, fmt)}) for fmt in ("text", "raw", "compact")}
+        assert results["raw"] == results["text"]
+        assert results["compact"] == results["text"]
+        return results["text"]
+
+    @pytest.mark.parametrize("fmt", ["raw", "compact"])
+    def test_json_parsers_rows(self, fmt):
+        """UC: parse_*_json extract the rows the text parsers read."""
+        doc = lambda name: omc.junos_json(_junos_fixture(name, fmt))
+        assert omc.parse_interfaces_terse_json(doc("interfaces_terse"))[:3] == [
+            ("ge-0/0/0", "up", "up"), ("ge-0/0/0.0", "up", "up"), ("ge-0/0/1", "up", "down")]
+        assert omc.parse_interface_detail_json(doc("interfaces_detail"))["ge-0/0/0"]["crc_errors"] == 5
+        assert [n["state"] for n in omc.parse_ospf_neighbor_json(doc("ospf_neighbor"))] == ["Full", "Init"]
+        assert omc.parse_bgp_summary_json(doc("bgp_summary")) == [
+            ("10.255.255.12", "Established"), ("10.255.255.13", "Active"), ("10.255.255.14", "Idle")]
+        assert omc.parse_ldp_session_json(doc("ldp_session")) == [
+            ("10.255.255.12", "Operational Open"), ("10.255.255.13", "Nonexistent Closed")]
+        assert omc.parse_isis_adjacency_json(doc("isis_adjacency")) == [
+            ("ge-0/0/0.0", "P11", "Up"), ("ge-0/0/1.0", "P12", "Initializing")]
+
+    def test_junos_json_rejects_text(self):
+        """Corner: CLI text, JSON arrays and broken JSON are not treated as structured."""
+        assert omc.junos_json(_junos_fixture("bgp_summary", "text")) is None
+        assert omc.junos_json("[1, 2]") is None
+        assert omc.junos_json("{not json") is None
+
+    def test_down_interfaces_parity(self):
+        """UC: Terse: admin-up/link-down physical and logical units."""
+        down = self._parity("interfaces_terse", omc.find_down_interfaces)
+        assert [d["interface"] for d in down] == ["ge-0/0/1", "ge-0/0/1.0"]
+
+    def test_interface_detail_parity(self):
+        """UC: Interface detail: MTU, speed, counters and link state."""
+        detail = self._parity("interfaces_detail",
+                              lambda out: omc.parse_interface_detail(out, self.DEVICE_MAP))["PE1"]
+        assert detail["ge-0/0/0"] == {"mtu": 9192, "speed": "1000mbps", "duplex": "",
+                                      "input_errors": 2, "output_errors": 0, "crc_errors": 5,
+                                      "carrier_transitions": 3,
+                                      "link_state": "Enabled, Physical link is Up"}
+        assert detail["ge-0/0/2"]["link_state"] == "Administratively down, Physical link is Down"
+
+    def test_ospf_neighbors_parity(self):
+        """UC: OSPF: neighbor rows."""
+        intf = {"PE1": "Interface           State   Area            DR ID           BDR ID          Nbrs\n"
+                       "ge-0/0/0.0          PtToPt  0.0.0.0         0.0.0.0         0.0.0.0            1\n"}
+        info = self._parity("ospf_neighbor",
+                            lambda out: omc.find_ospf_neighbors(out, intf, self.DEVICE_MAP))
+        assert [n["address"] for n in info["neighbors"]["PE1"]] == ["10.1.11.2", "10.1.12.2"]
+
+    def test_bgp_issues_parity(self):
+        """UC: BGP: Establ/Established peers are healthy, Active/Idle are issues."""
+        issues, established = self._parity("bgp_summary",
+                                           lambda out: omc.find_bgp_issues(out, self.DEVICE_MAP))
+        assert [(i["peer"], i["state"]) for i in issues] == [("10.255.255.13", "Active"),
+                                                              ("10.255.255.14", "Idle")]
+        assert [e["peer"] for e in established] == ["10.255.255.12"]
+
+    def test_ldp_issues_parity(self):
+        """UC: LDP: Operational/Open vs Nonexistent/Closed sessions."""
+        issues, healthy = self._parity("ldp_session",
+                                       lambda out: omc.find_ldp_issues(out, self.DEVICE_MAP))
+        assert [i["peer"] for i in issues] == ["10.255.255.13"]
+        assert [h["peer"] for h in healthy] == ["10.255.255.12"]
+
+    def test_isis_issues_parity(self):
+        """UC: IS-IS: Up vs Initializing adjacencies."""
+        issues, healthy = self._parity("isis_adjacency",
+                                       lambda out: omc.find_isis_issues(out, self.DEVICE_MAP))
+        assert [(i["interface"], i["state"]) for i in issues] == [("ge-0/0/1.0", "Initializing")]
+        assert [(h["interface"], h["neighbor"]) for h in healthy] == [("ge-0/0/0.0", "P11")]
+
+    def test_mixed_batch(self):
+        """UC: Text and JSON routers in one batch give the per-router text results."""
+        mixed = {"PE1": _junos_fixture("bgp_summary", "text"), "PE2": _junos_fixture("bgp_summary", "compact")}
+        issues, established = omc.find_bgp_issues(mixed, {})
+        assert [(i["router"], i["peer"]) for i in issues] == [
+            ("PE1", "10.255.255.13"), ("PE1", "10.255.255.14"),
+            ("PE2", "10.255.255.13"), ("PE2", "10.255.255.14")]
+        assert len(established) == 2
+
+
+# ═══════════════════════════════════════════════════════════════
+#  RUN
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short", "-x"])